@@ -0,0 +1,408 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+
+import banco
+import eventos
+from servicos import ErroServico
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # exportação e consultas analíticas são opcionais
+    pa = pq = None
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Grupo 12
+# Cópia colunar (Parquet) das tabelas usadas pelas consultas analíticas de
+# consultas.sql, que passam a rodar no DuckDB, fora do banco de produção.
+# A exportação é incremental: cada execução lê só as linhas com chave acima da
+# última exportada e relê, pela chave primária, as que ainda podiam mudar na
+# execução anterior (aluguéis em andamento, multas em aberto, manutenções
+# abertas) e as citadas pelos eventos novos que alteram linhas já fechadas
+# (aluguéis REPRECIFICADO; a exportação é o consumidor de eventos 'analitico',
+# então `eventos.py limpar` não apaga o que ela ainda não leu). Cada execução
+# grava um arquivo por tabela (um lote); na leitura
+# vale a versão do lote mais recente de cada chave. As dimensões pequenas
+# (usuários, pontos, bikes) são copiadas inteiras a cada vez.
+#
+# Uso: python analitico.py exportar --destino analitico
+#      python analitico.py consultar --destino analitico (as 5 consultas; ou só 1 3)
+#      python analitico.py compactar --destino analitico (um arquivo por tabela)
+
+# Linhas por ida ao banco e por row group do Parquet
+LOTE = int(os.environ.get('ANALITICO_LOTE', '50000'))
+# Chaves relidas por comando (lista IN de tamanho fixo: um único texto SQL)
+TAMANHO_RELEITURA = 500
+# As últimas chaves já exportadas são relidas a cada execução: uma transação
+# que pegou um id menor pode confirmar depois de outra com id maior
+JANELA_REVISAO = 1000
+# Consumidor de eventos (Checkpoint_Rotina 'evento:analitico')
+CONSUMIDOR = 'analitico'
+
+ARQUIVO_ESTADO = 'estado.json'
+ARQUIVO_CONSULTAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'consultas.sql')
+
+class AnaliticoIndisponivel(ErroServico):
+    pass
+
+@dataclass(frozen=True)
+class TabelaAnalitica:
+    """Tabela copiada para o Parquet.
+
+    A chave é a primeira coluna. `pendente` é (coluna, valor): linhas com esse
+    valor ainda podem mudar e são relidas na próxima exportação. `origem` é o
+    tipo em Comentario_Tipo cujas linhas novas indicam as chaves novas da tabela
+    (comentários não têm chave crescente própria). `evento` é (status, coluna)
+    em Evento: linhas que mudam sem passar por `pendente` e são relidas pelas
+    chaves dos eventos novos. Sem `incremental`, a tabela é copiada inteira.
+    """
+    nome: str
+    colunas: tuple  # (coluna, tipo Arrow)
+    incremental: bool = True
+    pendente: tuple = None
+    origem: str = None
+    evento: tuple = None
+
+    @property
+    def chave(self):
+        return self.colunas[0][0]
+
+    def esquema(self):
+        return pa.schema([(c, pa.type_for_alias(t)) for c, t in self.colunas] + [('_lote', pa.int64())])
+
+# Comentario_Tipo vem antes dos comentários, que dependem das suas linhas novas
+TABELAS = [
+    TabelaAnalitica('Usuario', (('cpf', 'string'), ('nome', 'string')), incremental=False),
+    TabelaAnalitica('Ponto', (('cod_ponto', 'int64'), ('rua', 'string'), ('bairro', 'string'),
+                              ('cidade', 'string'), ('capacidade_maxima', 'int64')), incremental=False),
+    TabelaAnalitica('Bike', (('n_registro', 'int64'), ('modelo', 'string')), incremental=False),
+    TabelaAnalitica('Aluguel', (
+        ('id_aluguel', 'int64'), ('bike_n_registro', 'int64'), ('usuario_cpf', 'string'),
+        ('ponto_retirada_id', 'int64'), ('ponto_devolucao_id', 'int64'),
+        ('data_hora_inicio', 'timestamp[us]'), ('data_hora_fim', 'timestamp[us]'),
+        ('valor_aluguel', 'float64'), ('status', 'string'),
+    ), pendente=('status', 'EM_ANDAMENTO'), evento=('REPRECIFICADO', 'aluguel_id')),
+    TabelaAnalitica('Multa', (
+        ('id_multa', 'int64'), ('aluguel_id', 'int64'), ('valor', 'float64'), ('tipo', 'string'),
+        ('vencimento', 'timestamp[us]'), ('data_pagamento_multa', 'timestamp[us]'),
+        ('isPaid', 'int64'), ('tempo_bloqueio', 'int64'),
+    ), pendente=('isPaid', 0)),
+    TabelaAnalitica('Manutencao', (
+        ('id_manutencao', 'int64'), ('bike_n_registro', 'int64'), ('tipo', 'string'),
+        ('valor', 'float64'), ('data_inicio', 'timestamp[us]'), ('data_fim', 'timestamp[us]'),
+    ), pendente=('data_fim', None)),
+    TabelaAnalitica('Comentario_Tipo', (('id_historico', 'int64'), ('aluguel_id', 'int64'),
+                                        ('tipo', 'string'))),
+    TabelaAnalitica('Comentario_Bike', (
+        ('aluguel_id', 'int64'), ('nota', 'int64'), ('freios', 'string'), ('rodas', 'string'),
+        ('aparencia', 'string'), ('acessorios', 'string'), ('pecas', 'string'),
+    ), origem='BIKE'),
+    TabelaAnalitica('Comentario_Ponto', (
+        ('aluguel_id', 'int64'), ('nota', 'int64'), ('sistema_aluguel', 'string'),
+        ('disponibilidade', 'string'), ('n_bikes_avaliacao', 'string'), ('aparencia_geral', 'string'),
+    ), origem='PONTO'),
+]
+
+# consultas.sql lê o movimento diário mantido por gatilho no Oracle; na cópia
+# colunar ele é derivado dos aluguéis (uma varredura vetorizada)
+SQL_MOVIMENTO_PONTO_DIA = """
+    CREATE VIEW Movimento_Ponto_Dia AS
+    SELECT dia, cod_ponto, SUM(retiradas) AS retiradas, SUM(devolucoes) AS devolucoes
+    FROM (
+        SELECT CAST(data_hora_inicio AS DATE) AS dia, ponto_retirada_id AS cod_ponto,
+               1 AS retiradas, 0 AS devolucoes
+        FROM Aluguel
+        UNION ALL
+        SELECT CAST(data_hora_fim AS DATE), ponto_devolucao_id, 0, 1
+        FROM Aluguel
+        WHERE ponto_devolucao_id IS NOT NULL AND data_hora_fim IS NOT NULL
+    )
+    GROUP BY dia, cod_ponto
+"""
+
+# Idem para a cobertura de pontos por usuário e bairro (relatório 1)
+SQL_COBERTURA_USUARIO = """
+    CREATE VIEW Cobertura_Usuario AS
+    SELECT P.cidade, P.bairro, V.usuario_cpf, COUNT(*) AS pontos_visitados
+    FROM (SELECT DISTINCT usuario_cpf, ponto_retirada_id FROM Aluguel) V
+    JOIN Ponto P ON P.cod_ponto = V.ponto_retirada_id
+    WHERE P.bairro IS NOT NULL
+    GROUP BY P.cidade, P.bairro, V.usuario_cpf
+"""
+
+def _exigir(modulo, pacote):
+    if modulo is None:
+        raise AnaliticoIndisponivel(f"Requer o pacote {pacote} (pip install {pacote}).")
+
+# --- EXPORTAÇÃO ---
+
+def _sql(tabela, filtro):
+    colunas = ", ".join(c for c, _ in tabela.colunas)
+    return f"SELECT {colunas} FROM {tabela.nome} WHERE {filtro} ORDER BY {tabela.chave}"
+
+def _sql_releitura(tabela):
+    binds = ", ".join(f":{i}" for i in range(1, TAMANHO_RELEITURA + 1))
+    return _sql(tabela, f"{tabela.chave} IN ({binds})")
+
+def _diretorio(destino, tabela):
+    return os.path.join(destino, tabela.nome.lower())
+
+def _ler_estado(destino):
+    caminho = os.path.join(destino, ARQUIVO_ESTADO)
+    if not os.path.exists(caminho):
+        return {'lote': 0, 'tabelas': {}}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+def _gravar_estado(destino, estado):
+    """Gravado por último e por troca de arquivo: uma exportação interrompida é
+    refeita com o mesmo número de lote, sobrescrevendo os arquivos parciais"""
+    caminho = os.path.join(destino, ARQUIVO_ESTADO)
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+        json.dump(estado, arquivo)
+    os.replace(caminho + '.tmp', caminho)
+
+class _Escritor:
+    """Arquivo Parquet do lote, aberto só quando chega a primeira linha"""
+
+    def __init__(self, caminho, tabela, numero):
+        self.caminho = caminho
+        self.esquema = tabela.esquema()
+        self.numero = numero
+        self.linhas = 0
+        self._arquivo = None
+
+    def gravar(self, linhas):
+        if self._arquivo is None:
+            self._arquivo = pq.ParquetWriter(self.caminho, self.esquema)
+        colunas = [list(valores) for valores in zip(*linhas)] + [[self.numero] * len(linhas)]
+        self._arquivo.write_batch(pa.record_batch(colunas, schema=self.esquema))
+        self.linhas += len(linhas)
+
+    def fechar(self, vazio=False):
+        """Com `vazio`, grava o arquivo mesmo sem linhas (a tabela precisa existir)"""
+        if self._arquivo is None and vazio:
+            self._arquivo = pq.ParquetWriter(self.caminho, self.esquema)
+        if self._arquivo is not None:
+            self._arquivo.close()
+
+def _copiar(cursor, sql, parametros, escritor, tabela, pendentes, lidas):
+    """Grava o resultado no lote; devolve a maior chave lida"""
+    cursor.execute(sql, parametros)
+    indice = [c for c, _ in tabela.colunas].index(tabela.pendente[0]) if tabela.pendente else None
+    maior = None
+    while True:
+        linhas = cursor.fetchmany()
+        if not linhas:
+            return maior
+        escritor.gravar(linhas)
+        maior = linhas[-1][0] if maior is None else max(maior, linhas[-1][0])
+        if indice is not None:
+            pendentes.update(l[0] for l in linhas if l[indice] == tabela.pendente[1])
+        if lidas is not None:
+            lidas.extend(linhas)
+
+def _reler(cursor, tabela, chaves, escritor, pendentes):
+    sql = _sql_releitura(tabela)
+    chaves = sorted(chaves)
+    for inicio in range(0, len(chaves), TAMANHO_RELEITURA):
+        grupo = chaves[inicio:inicio + TAMANHO_RELEITURA]
+        _copiar(cursor, sql, grupo + [None] * (TAMANHO_RELEITURA - len(grupo)),
+                escritor, tabela, pendentes, None)
+
+def _alteradas(consumidor):
+    """Chaves das tabelas com `evento` citadas nos eventos novos, {tabela: chaves}.
+    O consumidor só avança em memória; o checkpoint é gravado no fim da exportação."""
+    chaves = {t.nome: set() for t in TABELAS if t.evento}
+    while True:
+        lidos = consumidor.ler()
+        for evento in lidos:
+            for tabela in TABELAS:
+                if tabela.evento and evento[2] == tabela.evento[0]:
+                    chaves[tabela.nome].add(evento[eventos.COLUNAS.index(tabela.evento[1])])
+        if len(lidos) < consumidor.lote:
+            return chaves
+
+def exportar(destino, lote=LOTE):
+    """Exporta as alterações desde a última execução; devolve (número do lote, {tabela: linhas})"""
+    _exigir(pa, 'pyarrow')
+    os.makedirs(destino, exist_ok=True)
+    estado = _ler_estado(destino)
+    numero = estado['lote'] + 1
+    gravadas = {}
+    comentarios_novos = {}  # tipo -> aluguel_id com comentário novo
+
+    consumidor = eventos.Consumidor(CONSUMIDOR)
+    posicao = None
+    primeira = not estado['tabelas']
+    if not primeira:
+        alteradas = _alteradas(consumidor)
+    else:
+        # Primeira exportação: tudo é lido por faixa; os eventos anteriores não importam
+        alteradas, posicao = {}, eventos.situacao()[1][1]
+
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        cursor.arraysize = lote
+        cursor.prefetchrows = lote
+        for tabela in TABELAS:
+            diretorio = _diretorio(destino, tabela)
+            os.makedirs(diretorio, exist_ok=True)
+            caminho = os.path.join(diretorio, f"{numero:06d}.parquet")
+            escritor = _Escritor(caminho, tabela, numero)
+            situacao = estado['tabelas'].setdefault(tabela.nome, {'ultima_chave': None, 'pendentes': []})
+            pendentes = set()
+            try:
+                if not tabela.incremental:
+                    _copiar(cursor, _sql(tabela, "1 = 1"), (), escritor, tabela, pendentes, None)
+                elif tabela.origem:
+                    _reler(cursor, tabela, comentarios_novos.get(tabela.origem, ()), escritor, pendentes)
+                else:
+                    lidas = [] if tabela.nome == 'Comentario_Tipo' else None
+                    ultima = situacao['ultima_chave']
+                    inicio = ultima - JANELA_REVISAO if ultima is not None else -1
+                    maior = _copiar(cursor, _sql(tabela, f"{tabela.chave} > :1"), (inicio,),
+                                    escritor, tabela, pendentes, lidas)
+                    # as pendentes e alteradas acima de `inicio` já vieram na leitura por faixa
+                    releitura = set(situacao['pendentes']) | alteradas.get(tabela.nome, set())
+                    _reler(cursor, tabela, [k for k in releitura if k <= inicio],
+                           escritor, pendentes)
+                    if maior is not None:
+                        situacao['ultima_chave'] = max(maior, ultima if ultima is not None else maior)
+                    for _, aluguel_id, tipo in lidas or ():
+                        comentarios_novos.setdefault(tipo, set()).add(aluguel_id)
+            finally:
+                escritor.fechar(vazio=not glob.glob(os.path.join(diretorio, '*.parquet')))
+            situacao['pendentes'] = sorted(pendentes)
+            gravadas[tabela.nome] = escritor.linhas
+
+            if not tabela.incremental:
+                for anterior in glob.glob(os.path.join(diretorio, '*.parquet')):
+                    if anterior != caminho:
+                        os.remove(anterior)
+
+    estado['lote'] = numero
+    _gravar_estado(destino, estado)
+    # Depois do estado: uma exportação interrompida relê os mesmos eventos
+    if not primeira or posicao is not None:
+        consumidor.confirmar(posicao)
+    return numero, gravadas
+
+# --- CONSULTAS (DuckDB) ---
+
+def conectar(destino):
+    """Conexão DuckDB com uma visão por tabela (última versão de cada chave)"""
+    _exigir(duckdb, 'duckdb')
+    if not os.path.exists(os.path.join(destino, ARQUIVO_ESTADO)):
+        raise AnaliticoIndisponivel(f"Nenhuma exportação em {destino} (python analitico.py exportar).")
+    conn = duckdb.connect()
+    for tabela in TABELAS:
+        arquivos = os.path.join(_diretorio(destino, tabela), '*.parquet').replace("'", "''")
+        conn.execute(f"""
+            CREATE VIEW {tabela.nome} AS
+            SELECT * EXCLUDE (_lote) FROM read_parquet('{arquivos}')
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY {tabela.chave} ORDER BY _lote DESC) = 1
+        """)
+    conn.execute(SQL_MOVIMENTO_PONTO_DIA)
+    conn.execute(SQL_COBERTURA_USUARIO)
+    return conn
+
+def consultas_analiticas(caminho=ARQUIVO_CONSULTAS):
+    """Consultas de consultas.sql, na ordem do arquivo"""
+    with open(caminho, encoding='utf-8') as arquivo:
+        texto = re.sub(r'--[^\n]*', '', arquivo.read())
+    return [c.strip() for c in texto.split(';') if c.strip().upper().startswith(('SELECT', 'WITH'))]
+
+def consultar(destino, numeros=None):
+    """Roda as consultas na cópia colunar; gera (número, colunas, linhas, segundos)"""
+    conn = conectar(destino)
+    try:
+        for numero, sql in enumerate(consultas_analiticas(), 1):
+            if numeros and numero not in numeros:
+                continue
+            inicio = time.perf_counter()
+            resultado = conn.execute(sql)
+            linhas = resultado.fetchall()
+            colunas = [d[0] for d in resultado.description]
+            yield numero, colunas, linhas, time.perf_counter() - inicio
+    finally:
+        conn.close()
+
+def compactar(destino):
+    """Reescreve cada tabela incremental em um único arquivo com a última versão das linhas"""
+    conn = conectar(destino)
+    estado = _ler_estado(destino)
+    try:
+        for tabela in TABELAS:
+            if not tabela.incremental:
+                continue
+            diretorio = _diretorio(destino, tabela)
+            anteriores = glob.glob(os.path.join(diretorio, '*.parquet'))
+            if len(anteriores) <= 1:
+                continue
+            caminho = os.path.join(diretorio, f"{estado['lote']:06d}.parquet")
+            temporario = os.path.join(diretorio, 'compactado.tmp')
+            arquivos = os.path.join(diretorio, '*.parquet').replace("'", "''")
+            conn.execute(f"""
+                COPY (
+                    SELECT * FROM read_parquet('{arquivos}')
+                    QUALIFY ROW_NUMBER() OVER (PARTITION BY {tabela.chave} ORDER BY _lote DESC) = 1
+                    ORDER BY {tabela.chave}
+                ) TO '{temporario.replace("'", "''")}' (FORMAT PARQUET)
+            """)
+            for anterior in anteriores:
+                os.remove(anterior)
+            os.replace(temporario, caminho)
+            yield tabela.nome, len(anteriores)
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Cópia colunar e consultas analíticas (DuckDB)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_exportar = sub.add_parser('exportar', help="Exporta as alterações desde a última execução")
+    p_exportar.add_argument('--lote', type=int, default=LOTE, help="Linhas por ida ao banco")
+
+    p_consultar = sub.add_parser('consultar', help="Roda as consultas de consultas.sql na cópia")
+    p_consultar.add_argument('consultas', nargs='*', type=int, help="Números das consultas (padrão: todas)")
+    p_consultar.add_argument('--limite', type=int, default=20, help="Linhas exibidas por consulta")
+
+    sub.add_parser('compactar', help="Junta os lotes de cada tabela em um arquivo")
+
+    for p in (p_exportar, p_consultar, sub.choices['compactar']):
+        p.add_argument('--destino', default='analitico', help="Diretório da cópia colunar")
+    args = parser.parse_args()
+
+    try:
+        if args.comando == 'exportar':
+            inicio = time.perf_counter()
+            numero, gravadas = exportar(args.destino, args.lote)
+            banco.fechar_pool()
+            print(f"✅ Lote {numero} exportado em {time.perf_counter() - inicio:.1f} s")
+            for nome, linhas in gravadas.items():
+                print(f"   {nome}: {linhas} linhas")
+        elif args.comando == 'consultar':
+            for numero, colunas, linhas, segundos in consultar(args.destino, set(args.consultas)):
+                print(f"\n📊 CONSULTA {numero} ({len(linhas)} linhas, {segundos * 1000:.1f} ms)")
+                print(" | ".join(colunas))
+                for linha in linhas[:args.limite]:
+                    print(" | ".join("" if v is None else str(v) for v in linha))
+        else:
+            for nome, arquivos in compactar(args.destino):
+                print(f"✅ {nome}: {arquivos} arquivos em 1")
+    except ErroServico as e:
+        sys.exit(f"❌ [ERRO] {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+-- PROJETO: GESTÃO DE BIKES NAS CIDADES - PARTE 3
+-- ARQUIVO: atualizacao_cobertura.sql
+-- DESCRIÇÃO: Cria a cobertura de pontos por usuário em um banco já criado.
+-- Depois de executar este arquivo, executar novamente do esquema.sql o
+-- gatilho trg_cobertura_usuario e o procedimento reconstruir_resumos.
+
+CREATE TABLE Ponto_Visitado (
+    usuario_cpf VARCHAR2(11) NOT NULL,
+    cod_ponto NUMBER NOT NULL,
+    CONSTRAINT pk_ponto_visitado PRIMARY KEY (usuario_cpf, cod_ponto)
+) ORGANIZATION INDEX;
+
+CREATE TABLE Cobertura_Usuario (
+    cidade VARCHAR2(50) NOT NULL,
+    bairro VARCHAR2(50) NOT NULL,
+    usuario_cpf VARCHAR2(11) NOT NULL,
+    pontos_visitados NUMBER DEFAULT 0 NOT NULL,
+    CONSTRAINT pk_cobertura_usuario PRIMARY KEY (cidade, bairro, usuario_cpf)
+) ORGANIZATION INDEX;
+
+CREATE INDEX idx_cobertura_bairro ON Cobertura_Usuario(cidade, bairro, pontos_visitados);
+
+-- Após recriar o gatilho e o procedimento (preenche a cobertura com os
+-- aluguéis já registrados, inclusive os arquivados):
+-- EXEC reconstruir_resumos;
@@ -0,0 +1,15 @@
+-- PROJETO: GESTÃO DE BIKES NAS CIDADES - PARTE 3
+-- ARQUIVO: atualizacao_estoque.sql
+-- DESCRIÇÃO: Cria o estoque de bikes por ponto em um banco já criado.
+-- Depois de executar este arquivo, executar novamente do esquema.sql os
+-- gatilhos trg_estoque_ponto_novo e trg_estoque_ponto e os procedimentos
+-- registrar_movimento e reconstruir_resumos.
+
+CREATE TABLE Estoque_Ponto (
+    cod_ponto NUMBER PRIMARY KEY,
+    disponiveis NUMBER DEFAULT 0 NOT NULL,
+    CONSTRAINT fk_estoque_ponto FOREIGN KEY (cod_ponto) REFERENCES Ponto(cod_ponto)
+);
+
+-- Após recriar os gatilhos e os procedimentos (preenche o estoque atual):
+-- EXEC reconstruir_resumos;
@@ -0,0 +1,33 @@
+-- PROJETO: GESTÃO DE BIKES NAS CIDADES - PARTE 3
+-- ARQUIVO: atualizacao_eventos.sql
+-- DESCRIÇÃO: Cria a tabela de eventos (outbox) e a de lacunas dos
+-- consumidores em um banco já criado. Onde Evento já existe, só
+-- Evento_Lacuna e: ALTER TABLE Evento MODIFY (seq GENERATED ALWAYS AS IDENTITY (CACHE 1000 ORDER));
+-- Depois de executar este arquivo, executar do esquema.sql os gatilhos
+-- trg_evento_aluguel, trg_evento_manutencao e trg_evento_bike. Os eventos
+-- começam a partir daí; o estado anterior continua nas tabelas de base.
+
+CREATE TABLE Evento (
+    seq NUMBER GENERATED ALWAYS AS IDENTITY (CACHE 1000 ORDER) PRIMARY KEY,
+    entidade VARCHAR2(20) NOT NULL CHECK (entidade IN ('ALUGUEL', 'MANUTENCAO', 'BIKE')),
+    status VARCHAR2(20),
+    aluguel_id NUMBER,
+    manutencao_id NUMBER,
+    bike_n_registro NUMBER,
+    usuario_cpf VARCHAR2(11),
+    ponto_id NUMBER,
+    valor NUMBER(10, 2),
+    criado_em DATE DEFAULT SYSDATE NOT NULL
+);
+
+-- Seqs que um consumidor pulou (lacuna mais velha que EVENTOS_ESPERA_LACUNA).
+-- São relidos a cada leitura: o evento que confirma depois é entregue
+-- (ENTREGUE); a lacuna sem evento depois de EVENTOS_JANELA_LACUNA fica EXPIRADA.
+CREATE TABLE Evento_Lacuna (
+    rotina VARCHAR2(50) NOT NULL,
+    seq NUMBER NOT NULL,
+    situacao VARCHAR2(10) DEFAULT 'ABERTA' NOT NULL
+        CHECK (situacao IN ('ABERTA', 'ENTREGUE', 'EXPIRADA')),
+    pulada_em DATE DEFAULT SYSDATE NOT NULL,
+    CONSTRAINT pk_evento_lacuna PRIMARY KEY (rotina, seq)
+);
@@ -0,0 +1,30 @@
+-- PROJETO: GESTÃO DE BIKES NAS CIDADES - PARTE 3
+-- ARQUIVO: atualizacao_indices.sql
+-- DESCRIÇÃO: Aplica os índices do esquema.sql em um banco criado antes deles.
+-- Os índices compostos substituem os de coluna única que eles já cobrem
+-- (a primeira coluna é a mesma), então estes são removidos.
+
+DROP INDEX idx_aluguel_usuario;
+CREATE INDEX idx_aluguel_usuario_status ON Aluguel(usuario_cpf, status);
+CREATE INDEX idx_aluguel_inicio ON Aluguel(data_hora_inicio);
+
+DROP INDEX idx_multa_aluguel;
+CREATE INDEX idx_multa_aluguel_pendente ON Multa(aluguel_id, isPaid, valor);
+
+ALTER TABLE Manutencao ADD (
+    aberta_desde DATE GENERATED ALWAYS AS (
+        CASE WHEN data_fim IS NULL THEN data_inicio END
+    ) VIRTUAL
+);
+CREATE INDEX idx_manutencao_bike_aberta ON Manutencao(bike_n_registro, data_fim);
+CREATE INDEX idx_manutencao_aberta ON Manutencao(aberta_desde);
+
+CREATE INDEX idx_bike_ponto_status ON Bike(ponto_atual_id, status);
+
+CREATE INDEX idx_ponto_cidade_bairro ON Ponto(cidade, bairro);
+
+-- Estatísticas atualizadas para o otimizador considerar os novos índices
+BEGIN
+    DBMS_STATS.GATHER_SCHEMA_STATS(ownname => USER, cascade => TRUE);
+END;
+/
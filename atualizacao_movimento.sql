@@ -0,0 +1,21 @@
+-- PROJETO: GESTÃO DE BIKES NAS CIDADES - PARTE 3
+-- ARQUIVO: atualizacao_movimento.sql
+-- DESCRIÇÃO: Cria o movimento diário por ponto em um banco já criado.
+-- Depois de executar este arquivo, executar novamente do esquema.sql o
+-- gatilho trg_movimento_ponto e o procedimento reconstruir_resumos.
+
+CREATE TABLE Movimento_Ponto_Dia (
+    dia DATE NOT NULL,
+    cod_ponto NUMBER NOT NULL,
+    retiradas NUMBER DEFAULT 0 NOT NULL,
+    devolucoes NUMBER DEFAULT 0 NOT NULL,
+    pico_bikes NUMBER DEFAULT 0 NOT NULL,
+    CONSTRAINT pk_movimento_ponto_dia PRIMARY KEY (dia, cod_ponto),
+    CONSTRAINT fk_movimento_ponto FOREIGN KEY (cod_ponto) REFERENCES Ponto(cod_ponto)
+) ORGANIZATION INDEX;
+
+-- Executar também do esquema.sql o procedimento registrar_movimento.
+
+-- Após recriar o gatilho e os procedimentos (preenche os dias já registrados;
+-- pico_bikes começa a ser medido a partir de hoje):
+-- EXEC reconstruir_resumos;
@@ -0,0 +1,33 @@
+-- PROJETO: GESTÃO DE BIKES NAS CIDADES - PARTE 3
+-- ARQUIVO: atualizacao_multas.sql
+-- DESCRIÇÃO: Prepara um banco já criado para a rotina de multas automáticas
+-- (python rotinas.py multar).
+
+ALTER TABLE Aluguel ADD (
+    aberto_desde TIMESTAMP GENERATED ALWAYS AS (
+        CASE WHEN status = 'EM_ANDAMENTO' THEN data_hora_inicio END
+    ) VIRTUAL
+);
+-- Mantém as colunas do histórico iguais às de Aluguel (arquivamento copia SELECT *)
+ALTER TABLE Aluguel_Historico ADD (aberto_desde TIMESTAMP);
+
+CREATE INDEX idx_aluguel_aberto ON Aluguel(aberto_desde);
+
+-- Falha se já houver mais de uma multa de atraso (ou de não devolução) no
+-- mesmo aluguel; nesse caso, revisar as multas duplicadas antes
+CREATE UNIQUE INDEX ux_multa_automatica ON Multa(
+    CASE WHEN tipo IN ('ATRASO', 'NAO_DEVOLUCAO') THEN aluguel_id END,
+    CASE WHEN tipo IN ('ATRASO', 'NAO_DEVOLUCAO') THEN tipo END
+);
+
+CREATE TABLE Checkpoint_Rotina (
+    rotina VARCHAR2(50) PRIMARY KEY,
+    ultima_data TIMESTAMP,
+    ultimo_id NUMBER,
+    atualizado_em DATE DEFAULT SYSDATE NOT NULL
+);
+
+CREATE GLOBAL TEMPORARY TABLE Multa_Lote (
+    id_aluguel NUMBER PRIMARY KEY,
+    aberto_desde TIMESTAMP NOT NULL
+) ON COMMIT DELETE ROWS;
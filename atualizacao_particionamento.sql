@@ -0,0 +1,30 @@
+-- PROJETO: GESTÃO DE BIKES NAS CIDADES - PARTE 3
+-- ARQUIVO: atualizacao_particionamento.sql
+-- DESCRIÇÃO: Particiona por mês o Aluguel de um banco já criado (Oracle 12.2+,
+-- sem parar a aplicação) e cria as tabelas do arquivo histórico.
+-- Multa e Comentario_* continuam sem partições neste caso: o particionamento
+-- por referência só pode ser definido na criação da tabela. O arquivamento
+-- funciona igual com elas não particionadas.
+
+-- Índices por data e por ponto passam a ser locais; os demais continuam globais
+ALTER TABLE Aluguel MODIFY
+    PARTITION BY RANGE (data_hora_inicio) INTERVAL (NUMTOYMINTERVAL(1, 'MONTH'))
+    (PARTITION p_inicial VALUES LESS THAN (TIMESTAMP '2024-01-01 00:00:00'))
+    ONLINE
+    UPDATE INDEXES (
+        idx_aluguel_inicio LOCAL,
+        idx_aluguel_ponto_ret LOCAL,
+        idx_aluguel_ponto_dev LOCAL
+    );
+
+-- Executar a seção ARQUIVO HISTÓRICO do esquema.sql (tabelas *_Historico e
+-- Arquivo_Lote) e recriar o procedimento reconstruir_resumos.
+
+-- Estatísticas por partição para o otimizador
+BEGIN
+    DBMS_STATS.GATHER_TABLE_STATS(ownname => USER, tabname => 'ALUGUEL', cascade => TRUE);
+END;
+/
+
+-- Planos antes/depois: python planos.py --saida planos.txt
+-- (Pstart/Pstop mostram as partições lidas por consulta)
@@ -0,0 +1,16 @@
+-- PROJETO: GESTÃO DE BIKES NAS CIDADES - PARTE 3
+-- ARQUIVO: atualizacao_resumos.sql
+-- DESCRIÇÃO: Acrescenta ao Resumo_Usuario de um banco já criado os aluguéis
+-- em andamento e o prazo de bloqueio. Depois de executar este arquivo,
+-- executar novamente a seção TABELAS DE RESUMO do esquema.sql a partir dos
+-- gatilhos (CREATE OR REPLACE) para criar trg_resumo_usuario_aluguel e
+-- trg_resumo_usuario_bloqueio e atualizar reconstruir_resumos.
+
+ALTER TABLE Resumo_Usuario ADD (
+    alugueis_ativos NUMBER DEFAULT 0 NOT NULL,
+    bloqueado_ate DATE
+);
+
+-- Após recriar os gatilhos e o procedimento:
+-- EXEC reconstruir_resumos;
+-- Conferência: python rotinas.py conferir-resumos
@@ -0,0 +1,37 @@
+-- PROJETO: GESTÃO DE BIKES NAS CIDADES - PARTE 3
+-- ARQUIVO: atualizacao_tarifas.sql
+-- DESCRIÇÃO: Cria as tabelas de tarifas em um banco já criado.
+-- Depois de executar este arquivo, executar do esquema.sql a função
+-- tarifar_aluguel antes de atualizar a aplicação (a devolução passa a chamá-la).
+-- A versão inicial mantém R$ 0,10 por minuto e isenta o CadÚnico; aluguéis já
+-- concluídos só mudam de valor se forem reprecificados (python tarifas.py reprecificar).
+
+CREATE TABLE Tarifa (
+    id_tarifa NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    vigente_desde TIMESTAMP NOT NULL CONSTRAINT ux_tarifa_vigencia UNIQUE,
+    valor_minuto NUMBER(10, 4) NOT NULL CHECK (valor_minuto >= 0),
+    minutos_franquia NUMBER DEFAULT 0 NOT NULL CHECK (minutos_franquia >= 0),
+    valor_maximo NUMBER(10, 2) CHECK (valor_maximo >= 0), -- Teto do uso (NULL = sem teto)
+    minutos_limite NUMBER CHECK (minutos_limite > 0), -- Início do excedente (NULL = sem excedente)
+    valor_minuto_excedente NUMBER(10, 4) DEFAULT 0 NOT NULL CHECK (valor_minuto_excedente >= 0),
+    desconto_cad_unico NUMBER(5, 2) DEFAULT 100 NOT NULL -- Em %; 100 = isento
+        CHECK (desconto_cad_unico BETWEEN 0 AND 100),
+    descricao VARCHAR2(200)
+);
+
+-- Fator sobre valor_minuto pela hora da retirada, em [hora_inicio, hora_fim).
+-- Horas sem faixa usam fator 1; com faixas sobrepostas vale o maior fator.
+CREATE TABLE Tarifa_Faixa (
+    id_tarifa NUMBER NOT NULL,
+    hora_inicio NUMBER(2) NOT NULL CHECK (hora_inicio BETWEEN 0 AND 23),
+    hora_fim NUMBER(2) NOT NULL CHECK (hora_fim BETWEEN 1 AND 24),
+    fator NUMBER(5, 2) NOT NULL CHECK (fator >= 0),
+    CONSTRAINT pk_tarifa_faixa PRIMARY KEY (id_tarifa, hora_inicio),
+    CONSTRAINT fk_tarifa_faixa FOREIGN KEY (id_tarifa) REFERENCES Tarifa(id_tarifa),
+    CONSTRAINT chk_tarifa_faixa_horas CHECK (hora_fim > hora_inicio)
+);
+
+-- Tarifa original da devolução: R$ 0,10 por minuto, CadÚnico isento
+INSERT INTO Tarifa (vigente_desde, valor_minuto, descricao)
+VALUES (TIMESTAMP '2000-01-01 00:00:00', 0.10, 'R$ 0,10 por minuto');
+COMMIT;
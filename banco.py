@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import sys
+from contextlib import asynccontextmanager, contextmanager
+
+try:
+    import oracledb
+except ImportError:  # dispensável com o banco local (DB_BACKEND=sqlite)
+    oracledb = None
+
+import banco_local
+import registro_sql
+from instrumentacao import Metricas
+
+# Grupo 12
+
+# --- CONFIGURAÇÃO ---
+# Os valores podem ser sobrescritos por variáveis de ambiente, o que permite
+# rodar vários operadores (quiosques, equipe de operação) no mesmo processo.
+DB_USER = os.environ.get('DB_USER', 'system')
+DB_PASS = os.environ.get('DB_PASS', 'oracle')
+DB_DSN = os.environ.get('DB_DSN', 'localhost:1521/xe')
+# 'oracle' (pool de sessões) ou 'sqlite' (banco_local.py: embutido, sem servidor,
+# para desenvolvimento e testes; arquivo em DB_LOCAL)
+BACKEND = os.environ.get('DB_BACKEND', 'oracle')
+
+# Pool de sessões
+POOL_MIN = int(os.environ.get('DB_POOL_MIN', '1'))
+POOL_MAX = int(os.environ.get('DB_POOL_MAX', '8'))
+POOL_INCREMENTO = int(os.environ.get('DB_POOL_INCREMENTO', '1'))
+# Tamanho do cache de statements de cada sessão (0 desativa); sem a variável,
+# cabe todo o registro de comandos (registro_sql.tamanho_cache)
+STMT_CACHE = os.environ.get('DB_STMT_CACHE')
+# Segundos ociosos após os quais a sessão é testada (ping) antes de ser entregue
+PING_INTERVALO = int(os.environ.get('DB_PING_INTERVALO', '60'))
+# Segundos que uma operação espera por uma sessão livre quando o pool está cheio
+ESPERA_SESSAO = int(os.environ.get('DB_ESPERA_SESSAO', '10'))
+# Mede todas as chamadas ao banco desde o início do processo (instrumentacao.py)
+INSTRUMENTAR = os.environ.get('DB_INSTRUMENTAR', '0') == '1'
+
+_pool = None
+_pool_async = None
+metricas = Metricas() if INSTRUMENTAR else None
+
+# Erros do banco em uso, para os blocos except da interface
+ErroBanco = (sqlite3.Error,) if oracledb is None else (oracledb.Error, sqlite3.Error)
+
+def ativar_instrumentacao():
+    """Passa a medir as conexões emprestadas por conexao(); devolve as métricas"""
+    global metricas
+    if metricas is None:
+        metricas = Metricas()
+    return metricas
+
+def _tamanho_cache(stmt_cache):
+    if stmt_cache is not None:
+        return stmt_cache
+    return int(STMT_CACHE) if STMT_CACHE is not None else registro_sql.tamanho_cache()
+
+def criar_pool(minimo=None, maximo=None, incremento=None, stmt_cache=None):
+    """Cria o pool de sessões Oracle (substitui a conexão única)"""
+    global _pool
+    if _pool is not None or BACKEND == 'sqlite':
+        return _pool  # o banco local não tem pool (banco_local.conexao)
+    if oracledb is None:
+        sys.exit("[ERRO CRÍTICO] Pacote oracledb não instalado (DB_BACKEND=sqlite usa o banco local)")
+    try:
+        _pool = oracledb.create_pool(
+            user=DB_USER, password=DB_PASS, dsn=DB_DSN,
+            min=POOL_MIN if minimo is None else minimo,
+            max=POOL_MAX if maximo is None else maximo,
+            increment=POOL_INCREMENTO if incremento is None else incremento,
+            stmtcachesize=_tamanho_cache(stmt_cache),
+            ping_interval=PING_INTERVALO,
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout=ESPERA_SESSAO * 1000,
+        )
+    except oracledb.Error as e:
+        sys.exit(f"[ERRO CRÍTICO] Conexão falhou: {e}")
+    return _pool
+
+def obter_pool():
+    """Retorna o pool ativo, criando-o na primeira chamada"""
+    return _pool if _pool is not None else criar_pool()
+
+@contextmanager
+def conexao():
+    """Empresta uma sessão do pool durante uma operação e a devolve ao final.
+
+    O driver desfaz transações não confirmadas na devolução, então uma sessão
+    nunca volta ao pool com alterações pendentes de outra operação.
+    Com DB_BACKEND=sqlite, a conexão é do banco local (banco_local.py).
+    """
+    if BACKEND == 'sqlite':
+        with banco_local.conexao() as conn:
+            yield conn if metricas is None else metricas.conexao(conn)
+        return
+    with obter_pool().acquire() as conn:
+        yield conn if metricas is None else metricas.conexao(conn)
+
+def fechar_pool():
+    """Encerra todas as sessões do pool"""
+    global _pool
+    if _pool is not None:
+        _pool.close(force=True)
+        _pool = None
+    banco_local.fechar()
+
+# --- POOL ASSÍNCRONO (servicos_async.py) ---
+
+def criar_pool_async(minimo=None, maximo=None, incremento=None, stmt_cache=None):
+    """Cria o pool de sessões para uso com asyncio (AsyncConnection)"""
+    global _pool_async
+    if _pool_async is not None:
+        return _pool_async
+    if oracledb is None:
+        sys.exit("[ERRO CRÍTICO] Pacote oracledb não instalado (a variante assíncrona requer o Oracle)")
+    _pool_async = oracledb.create_pool_async(
+        user=DB_USER, password=DB_PASS, dsn=DB_DSN,
+        min=POOL_MIN if minimo is None else minimo,
+        max=POOL_MAX if maximo is None else maximo,
+        increment=POOL_INCREMENTO if incremento is None else incremento,
+        stmtcachesize=_tamanho_cache(stmt_cache),
+        ping_interval=PING_INTERVALO,
+        getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+        wait_timeout=ESPERA_SESSAO * 1000,
+    )
+    return _pool_async
+
+@asynccontextmanager
+async def conexao_async():
+    """Versão assíncrona de conexao()"""
+    pool = _pool_async if _pool_async is not None else criar_pool_async()
+    async with pool.acquire() as conn:
+        yield conn
+
+async def fechar_pool_async():
+    global _pool_async
+    if _pool_async is not None:
+        await _pool_async.close(force=True)
+        _pool_async = None
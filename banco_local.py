@@ -0,0 +1,482 @@
+import argparse
+import datetime
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import registro_sql
+
+# Grupo 12
+# Banco local embutido (SQLite, da biblioteca padrão) com o esquema de
+# esquema_sqlite.sql, para desenvolvimento e testes sem um servidor Oracle.
+# Com DB_BACKEND=sqlite, banco.conexao() entrega conexões daqui, com a mesma
+# interface de oracledb usada pela aplicação (cursor.var, RETURNING INTO,
+# arraydmlrowcounts, description com nomes em maiúsculas).
+# Os comandos continuam escritos para o Oracle: cada texto é traduzido uma vez
+# (binds, datas, FETCH FIRST, RETURNING INTO) e os blocos PL/SQL registrados em
+# registro_sql têm uma implementação equivalente em Python (PROCEDIMENTOS).
+#
+# Uso: python banco_local.py criar bikes.db --dados
+#      DB_BACKEND=sqlite DB_LOCAL=bikes.db python main.py
+
+# Arquivo do banco; :memory: cria um banco vazio a cada processo
+DB_LOCAL = os.environ.get('DB_LOCAL', ':memory:')
+# Segundos de espera quando outra conexão está gravando no arquivo
+ESPERA_SESSAO = int(os.environ.get('DB_ESPERA_SESSAO', '10'))
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_ESQUEMA = os.path.join(DIRETORIO, 'esquema_sqlite.sql')
+ARQUIVO_DADOS = os.path.join(DIRETORIO, 'dados.sql')
+
+class ErroBancoLocal(sqlite3.DatabaseError):
+    """Comando sem equivalente no banco local"""
+
+# --- DATAS ---
+# Gravadas como texto ISO; lidas de volta como datetime, como no oracledb
+
+sqlite3.register_adapter(datetime.datetime, lambda valor: valor.isoformat(' '))
+sqlite3.register_adapter(datetime.date, lambda valor: valor.isoformat() + ' 00:00:00')
+
+_DATA_ISO = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d{3}|\.\d{6})?$")
+
+def _converter(linha):
+    return tuple(datetime.datetime.fromisoformat(v) if isinstance(v, str) and _DATA_ISO.match(v)
+                 else v for v in linha)
+
+_FORMATOS_DATA = {'YYYY': '%Y', 'MM': '%m', 'DD': '%d', 'HH24': '%H', 'MI': '%M', 'SS': '%S'}
+
+def _to_date(texto, formato):
+    """TO_DATE do Oracle para os formatos usados pela aplicação"""
+    if texto is None:
+        return None
+    padrao = re.sub('|'.join(_FORMATOS_DATA), lambda m: _FORMATOS_DATA[m.group()], formato)
+    return datetime.datetime.strptime(texto, padrao).isoformat(' ')
+
+def _ceil(valor):
+    """CEIL para builds do SQLite sem as funções matemáticas"""
+    return None if valor is None else math.ceil(valor)
+
+def _mod(a, b):
+    """MOD do Oracle: sinal do dividendo e MOD(a, 0) = a"""
+    if a is None or b is None:
+        return None
+    return a if b == 0 else a - b * int(a / b)
+
+# --- TRADUÇÃO ---
+
+AGORA = "datetime('now', 'localtime')"
+AGORA_PRECISO = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+
+# (padrão, substituição) aplicados em ordem, fora dos literais de texto
+REGRAS = [
+    (r"\bTRUNC\(SYSDATE\)\s*-\s*(\d+)", r"datetime('now', 'localtime', 'start of day', '-\1 days')"),
+    (r"\bSYSDATE\s*-\s*([A-Za-z_][\w.]*)", r"(julianday('now', 'localtime') - julianday(\1))"),
+    (r"\bTRUNC\(([^()]+)\)", r"datetime(\1, 'start of day')"),
+    (r"\bSYSDATE\b", AGORA),
+    (r"\b(SYSTIMESTAMP|CURRENT_TIMESTAMP)\b", AGORA_PRECISO),
+    (r"\bNVL\(", "IFNULL("),
+    (r"\bGREATEST\(", "MAX("),
+    (r"\bFETCH\s+FIRST\s+(\S+)\s+ROWS?\s+ONLY\b", r"LIMIT \1"),
+    (r"\bFOR\s+UPDATE(\s+OF\s+[\w.]+(\s*,\s*[\w.]+)*)?", ""),
+    # Divisão decimal, como no Oracle (no SQLite, inteiro / inteiro trunca)
+    (r"\s/\s", " * 1.0 / "),
+    (r":(\d+)\b", r"?\1"),
+]
+REGRAS = [(re.compile(padrao, re.I), substituicao) for padrao, substituicao in REGRAS]
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_LITERAL_DATA = re.compile(r"\b(DATE|TIMESTAMP)\s+'([^']*)'", re.I)
+_RETORNO = re.compile(r"\bRETURNING\s+(.+?)\s+INTO\s+(.+?)\s*$", re.I | re.S)
+
+@dataclass(frozen=True)
+class Traducao:
+    sql: str = None
+    saidas: tuple = ()  # binds de RETURNING ... INTO, na ordem das colunas
+    procedimento: str = None  # bloco PL/SQL: nome em PROCEDIMENTOS
+
+_traducoes = {}
+
+def _literal_data(m):
+    valor = m.group(2)
+    return f"'{valor} 00:00:00'" if m.group(1).upper() == 'DATE' and len(valor) == 10 else f"'{valor}'"
+
+def traduzir(sql):
+    """Texto SQLite de um comando escrito para o Oracle (em cache por texto)"""
+    traducao = _traducoes.get(sql)
+    if traducao is not None:
+        return traducao
+
+    if sql.lstrip().upper().startswith(('DECLARE', 'BEGIN')):
+        traducao = Traducao(procedimento=_procedimento(sql))
+    else:
+        texto, saidas = _LITERAL_DATA.sub(_literal_data, sql.strip().rstrip(';')), ()
+        retorno = _RETORNO.search(texto)
+        if retorno:
+            texto = texto[:retorno.start()] + f"RETURNING {retorno.group(1)}"
+            saidas = tuple(b.strip().lstrip(':') for b in retorno.group(2).split(','))
+        partes = []
+        inicio = 0
+        for literal in _LITERAL.finditer(texto):
+            partes += [_aplicar_regras(texto[inicio:literal.start()]), literal.group()]
+            inicio = literal.end()
+        partes.append(_aplicar_regras(texto[inicio:]))
+        traducao = Traducao(''.join(partes), saidas)
+    _traducoes[sql] = traducao
+    return traducao
+
+def _aplicar_regras(trecho):
+    for padrao, substituicao in REGRAS:
+        trecho = padrao.sub(substituicao, trecho)
+    return trecho
+
+def _procedimento(sql):
+    for nome, comando in registro_sql.REGISTRO.items():
+        if comando.sql == sql and nome in PROCEDIMENTOS:
+            return nome
+    raise ErroBancoLocal(f"Bloco PL/SQL sem equivalente no banco local: {sql.strip()[:60]}...")
+
+def _entradas(parametros, saidas):
+    """Parâmetros sem as variáveis de saída (que ficam no fim em binds posicionais)"""
+    if isinstance(parametros, dict):
+        return {nome: v for nome, v in parametros.items() if not isinstance(v, Variavel)}
+    return tuple(v for v in parametros if not isinstance(v, Variavel))
+
+def _variavel(parametros, bind):
+    return parametros[bind] if isinstance(parametros, dict) else parametros[int(bind) - 1]
+
+# --- CONEXÃO ---
+
+Coluna = namedtuple('Coluna', 'name type_code display_size internal_size precision scale null_ok')
+
+class Variavel:
+    """Equivalente de cursor.var(): recebe um valor de saída (lista em RETURNING INTO)"""
+
+    def __init__(self, tipo=None):
+        self.tipo = tipo
+        self._valor = None
+
+    def getvalue(self, pos=0):
+        return self._valor
+
+    def setvalue(self, pos, valor):
+        self._valor = valor
+
+class CursorLocal:
+    def __init__(self, conexao):
+        self.connection = conexao
+        self._cursor = conexao._conn.cursor()
+        self._linhas = None  # resultado de DML com RETURNING, já lido
+        self._contagens = []
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rowcount = -1
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            linhas = self.fetchmany()
+            if not linhas:
+                return
+            yield from linhas
+
+    def var(self, tipo=None, *args, **kwargs):
+        return Variavel(tipo)
+
+    def setinputsizes(self, *args, **kwargs):
+        """Sem efeito: o SQLite não tem tipos de bind"""
+
+    def execute(self, sql, parametros=None, **nomeados):
+        if parametros is None:
+            parametros = nomeados or ()
+        traducao = traduzir(sql)
+        self._linhas, self.description = None, None
+        if traducao.procedimento:
+            PROCEDIMENTOS[traducao.procedimento](self.connection, parametros)
+            self.rowcount = 1
+            return None
+
+        self._cursor.execute(traducao.sql, _entradas(parametros, traducao.saidas))
+        if self._cursor.description is not None:
+            self.description = [Coluna(d[0].upper(), None, None, None, None, None, None)
+                                for d in self._cursor.description]
+        if traducao.saidas or (self.description and not _eh_consulta(traducao.sql)):
+            # DML com RETURNING: as linhas são lidas já, e a alteração fica completa
+            self._linhas = [_converter(linha) for linha in self._cursor.fetchall()]
+            self.rowcount = len(self._linhas)
+            for i, bind in enumerate(traducao.saidas):
+                _variavel(parametros, bind).setvalue(0, [linha[i] for linha in self._linhas])
+            if traducao.saidas:
+                self.description = None
+        else:
+            self.rowcount = self._cursor.rowcount
+        return self if self.description else None
+
+    def executemany(self, sql, linhas, arraydmlrowcounts=False, **kwargs):
+        traducao = traduzir(sql)
+        if traducao.procedimento or traducao.saidas or arraydmlrowcounts:
+            self._contagens = []
+            for parametros in linhas:
+                self.execute(sql, parametros)
+                self._contagens.append(self.rowcount)
+            self.rowcount = sum(self._contagens)
+            return
+        self._cursor.executemany(traducao.sql, [_entradas(p, ()) for p in linhas])
+        self.rowcount = self._cursor.rowcount
+
+    def getarraydmlrowcounts(self):
+        return list(self._contagens)
+
+    def fetchone(self):
+        if self._linhas is not None:
+            return self._linhas.pop(0) if self._linhas else None
+        linha = self._cursor.fetchone()
+        return _converter(linha) if linha is not None else None
+
+    def fetchmany(self, quantidade=None):
+        quantidade = quantidade or self.arraysize
+        if self._linhas is not None:
+            lote, self._linhas = self._linhas[:quantidade], self._linhas[quantidade:]
+            return lote
+        return [_converter(linha) for linha in self._cursor.fetchmany(quantidade)]
+
+    def fetchall(self):
+        if self._linhas is not None:
+            lote, self._linhas = self._linhas, []
+            return lote
+        return [_converter(linha) for linha in self._cursor.fetchall()]
+
+    def close(self):
+        self._cursor.close()
+
+def _eh_consulta(sql):
+    return sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+
+class ConexaoLocal:
+    """Conexão SQLite com a interface de oracledb usada pela aplicação"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.rollback()
+
+    def cursor(self):
+        return CursorLocal(self)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+def _abrir(caminho):
+    conn = sqlite3.connect(caminho, timeout=ESPERA_SESSAO, check_same_thread=False)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.create_function('TO_DATE', 2, _to_date, deterministic=True)
+    conn.create_function('MOD', 2, _mod, deterministic=True)
+    conn.create_function('CEIL', 1, _ceil, deterministic=True)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Usuario'").fetchone():
+        with open(ARQUIVO_ESQUEMA, encoding='utf-8') as arquivo:
+            conn.executescript(arquivo.read())
+        if caminho != ':memory:':
+            conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+_memoria = None
+_lock_memoria = threading.Lock()
+
+@contextmanager
+def conexao():
+    """Empresta uma conexão ao banco local e desfaz o que não foi confirmado na devolução.
+
+    Com DB_LOCAL=:memory: há uma única conexão, usada por uma operação de cada vez.
+    """
+    global _memoria
+    if DB_LOCAL == ':memory:':
+        with _lock_memoria:
+            if _memoria is None:
+                _memoria = _abrir(':memory:')
+            try:
+                yield ConexaoLocal(_memoria)
+            finally:
+                _memoria.rollback()
+        return
+
+    conn = _abrir(DB_LOCAL)
+    try:
+        yield ConexaoLocal(conn)
+    finally:
+        conn.rollback()
+        conn.close()
+
+def fechar():
+    """Descarta o banco em memória (o próximo uso começa de um banco vazio)"""
+    global _memoria
+    with _lock_memoria:
+        if _memoria is not None:
+            _memoria.close()
+            _memoria = None
+
+def executar_script(conn, caminho):
+    """Executa um script de INSERTs escrito para o Oracle (dados.sql), comando a comando"""
+    with open(caminho, encoding='utf-8') as arquivo:
+        texto = '\n'.join(l for l in arquivo.read().splitlines() if not l.lstrip().startswith('--'))
+    cursor = conn.cursor()
+    total = 0
+    for comando in re.split(r";\s*$", texto, flags=re.M):
+        if not comando.strip():
+            continue
+        if comando.strip().upper() == 'COMMIT':
+            conn.commit()
+            continue
+        cursor.execute(comando)
+        total += 1
+    conn.commit()
+    return total
+
+# --- BLOCOS PL/SQL ---
+# Mesmos passos, resultados e variáveis de saída dos blocos de servicos.py.
+# A condição de status nos UPDATEs faz o papel do bloqueio de linha: de duas
+# operações simultâneas sobre a mesma bike ou aluguel, só uma altera a linha.
+
+def _saida(parametros, **valores):
+    for nome, valor in valores.items():
+        parametros[nome].setvalue(0, valor)
+
+def _iniciar_aluguel(conn, p):
+    """SQL_INICIAR_ALUGUEL"""
+    cursor = conn.cursor()
+    linha = cursor.execute("""
+        SELECT U.nome, C.saldo, R.multas_pendentes,
+               CASE WHEN R.bloqueado_ate > SYSDATE THEN R.bloqueado_ate END
+        FROM Usuario U
+        JOIN Resumo_Usuario R ON R.usuario_cpf = U.cpf
+        LEFT JOIN Cartao C ON U.cpf = C.usuario_cpf
+        WHERE U.cpf = :cpf
+    """, cpf=p['cpf']).fetchone()
+    if linha is None:
+        return _saida(p, resultado='USUARIO_NAO_ENCONTRADO')
+    nome, saldo, multas, bloqueado_ate = linha
+    _saida(p, nome=nome, saldo=saldo, multas=multas, bloqueado_ate=bloqueado_ate)
+
+    if multas > 0 or bloqueado_ate is not None or saldo is None or saldo < p['saldo_minimo']:
+        return _saida(p, resultado='USUARIO_INAPTO')
+
+    linha = cursor.execute("""
+        UPDATE Bike SET status = 'EM_USO'
+        WHERE n_registro = :bike_id AND status = 'DISPONIVEL'
+        RETURNING ponto_atual_id
+    """, bike_id=p['bike_id']).fetchone()
+    if linha is None:
+        status = cursor.execute("SELECT status FROM Bike WHERE n_registro = :1",
+                                (p['bike_id'],)).fetchone()
+        if status is None:
+            return _saida(p, resultado='BIKE_NAO_ENCONTRADA')
+        return _saida(p, status=status[0], resultado='BIKE_INDISPONIVEL')
+    ponto_id = linha[0]
+
+    id_aluguel = cursor.execute("""
+        INSERT INTO Aluguel (bike_n_registro, usuario_cpf, ponto_retirada_id,
+                             data_hora_inicio, status)
+        VALUES (:bike_id, :cpf, :ponto_id, SYSTIMESTAMP, 'EM_ANDAMENTO')
+        RETURNING id_aluguel
+    """, bike_id=p['bike_id'], cpf=p['cpf'], ponto_id=ponto_id).fetchone()[0]
+
+    conn.commit()
+    _saida(p, ponto_id=ponto_id, id_aluguel=id_aluguel, resultado='OK')
+
+def _finalizar_aluguel(conn, p):
+    """SQL_FINALIZAR_ALUGUEL"""
+    cursor = conn.cursor()
+    linha = cursor.execute("""
+        SELECT A.bike_n_registro, A.data_hora_inicio, A.status, U.nome, B.modelo, U.is_cadUnico
+        FROM Aluguel A
+        JOIN Usuario U ON A.usuario_cpf = U.cpf
+        JOIN Bike B ON A.bike_n_registro = B.n_registro
+        WHERE A.id_aluguel = :aluguel_id
+    """, aluguel_id=p['aluguel_id']).fetchone()
+    if linha is None:
+        return _saida(p, resultado='ALUGUEL_NAO_ENCONTRADO')
+    bike_id, inicio, status, nome, modelo, cad_unico = linha
+    _saida(p, bike_id=bike_id, status=status, nome=nome, modelo=modelo)
+
+    if status != 'EM_ANDAMENTO':
+        return _saida(p, resultado='ALUGUEL_INATIVO')
+
+    if cursor.execute("SELECT COUNT(*) FROM Ponto WHERE cod_ponto = :1",
+                      (p['ponto_id'],)).fetchone()[0] == 0:
+        return _saida(p, resultado='PONTO_NAO_ENCONTRADO')
+
+    fim = datetime.datetime.now()
+    duracao = (fim - inicio).total_seconds() / 60
+    # tarifar_aluguel do esquema.sql (tarifas importa banco, que importa este módulo)
+    import tarifas
+    valor = tarifas.tarifa_vigente(conn, inicio).valor(duracao, inicio.hour, cad_unico == 1)
+    linha = cursor.execute("""
+        UPDATE Aluguel SET
+            data_hora_fim = :fim,
+            ponto_devolucao_id = :ponto_id,
+            status = 'CONCLUIDO',
+            valor_aluguel = :valor
+        WHERE id_aluguel = :aluguel_id AND status = 'EM_ANDAMENTO'
+        RETURNING valor_aluguel
+    """, fim=fim, ponto_id=p['ponto_id'], valor=valor, aluguel_id=p['aluguel_id']).fetchone()
+    if linha is None:
+        return _saida(p, status=None, resultado='ALUGUEL_INATIVO')
+    valor = linha[0]
+
+    qnt_alugueis, tempo_total = cursor.execute("""
+        UPDATE Bike SET
+            status = 'DISPONIVEL',
+            ponto_atual_id = :ponto_id,
+            qnt_alugueis = qnt_alugueis + 1,
+            tempo_total_utilizado = tempo_total_utilizado + :duracao
+        WHERE n_registro = :bike_id
+        RETURNING qnt_alugueis, tempo_total_utilizado
+    """, ponto_id=p['ponto_id'], duracao=duracao, bike_id=bike_id).fetchone()
+
+    conn.commit()
+    _saida(p, duracao=duracao, fim=fim, valor=valor, qnt_alugueis=qnt_alugueis,
+           tempo_total=tempo_total, resultado='OK')
+
+# Nome do comando em registro_sql -> implementação local
+PROCEDIMENTOS = {
+    'iniciar_aluguel': _iniciar_aluguel,
+    'finalizar_aluguel': _finalizar_aluguel,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Banco local SQLite (desenvolvimento e testes)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    criar = sub.add_parser('criar', help="Cria o arquivo com o esquema_sqlite.sql")
+    criar.add_argument('arquivo', help="Arquivo do banco (ex.: bikes.db)")
+    criar.add_argument('--dados', action='store_true', help="Carrega também o dados.sql")
+    args = parser.parse_args()
+
+    if os.path.exists(args.arquivo):
+        parser.error(f"{args.arquivo} já existe")
+    conn = _abrir(args.arquivo)
+    try:
+        print(f"✅ Esquema criado em {args.arquivo}")
+        if args.dados:
+            total = executar_script(ConexaoLocal(conn), ARQUIVO_DADOS)
+            print(f"✅ {total} comandos de {os.path.basename(ARQUIVO_DADOS)} executados")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,528 @@
+import argparse
+import asyncio
+import random
+import threading
+import time
+
+import banco
+from relatorios import RELATORIOS, ler_em_fluxo, paginar, sql_completo
+from servicos import (
+    BikeIndisponivel, ErroServico, ServicoAluguel, ServicoManutencao,
+)
+from servicos_async import ServicoAluguelAsync
+
+# Grupo 12
+# Benchmarks de desempenho contra o banco configurado em banco.py.
+# Uso: python benchmark.py pool --workers 1 8 32 --duracao 10
+#      python benchmark.py ciclo --workers 32 --duracao 10
+#      python benchmark.py corrida --workers 32 --rodadas 20
+#      python benchmark.py relatorios --repeticoes 5
+#      python benchmark.py mix --workers 16 --duracao 60 --pesos aluguel=35,devolucao=35,situacao=20
+
+SQL_CONSULTA_USUARIO = """
+    SELECT U.nome, C.saldo,
+           (SELECT COUNT(*) FROM Aluguel A
+            JOIN Multa M ON A.id_aluguel = M.aluguel_id
+            WHERE A.usuario_cpf = U.cpf AND M.isPaid = 0) as multas_pendentes
+    FROM Usuario U
+    LEFT JOIN Cartao C ON U.cpf = C.usuario_cpf
+    WHERE U.cpf = :1
+"""
+
+# Relatórios 2 e 3 como eram antes das tabelas de resumo (agregação completa)
+SQL_RANKING_BIKES_AGREGADO = """
+    SELECT B.n_registro, B.modelo,
+           COUNT(A.id_aluguel) as total_alugueis,
+           ROUND(AVG(CB.nota), 2) as nota_media,
+           SUM(B.tempo_total_utilizado) as horas_uso
+    FROM Bike B
+    LEFT JOIN Aluguel A ON B.n_registro = A.bike_n_registro
+    LEFT JOIN Comentario_Bike CB ON A.id_aluguel = CB.aluguel_id
+    GROUP BY B.n_registro, B.modelo
+    HAVING COUNT(A.id_aluguel) > 0
+    ORDER BY nota_media DESC NULLS LAST
+    FETCH FIRST 10 ROWS ONLY
+"""
+
+SQL_INADIMPLENCIA_AGREGADO = """
+    SELECT U.nome, U.cpf,
+           COUNT(M.id_multa) as multas_pendentes,
+           COALESCE(SUM(M.valor), 0.00) as valor_total
+    FROM Usuario U
+    LEFT JOIN Aluguel A ON U.cpf = A.usuario_cpf
+    LEFT JOIN Multa M ON A.id_aluguel = M.aluguel_id AND M.isPaid = 0
+    GROUP BY U.cpf, U.nome
+    HAVING COALESCE(SUM(M.valor), 0) > 0
+    ORDER BY valor_total DESC
+"""
+
+# Relatório 5 como era antes de Movimento_Ponto_Dia (junção por retirada OU devolução)
+SQL_PONTOS_SOBRECARREGADOS_AGREGADO = """
+    SELECT P.cod_ponto, P.rua, P.bairro, P.capacidade_maxima,
+           COUNT(A.id_aluguel) as movimentacoes,
+           ROUND(COUNT(A.id_aluguel) / P.capacidade_maxima * 100, 2) as taxa_ocupacao
+    FROM Ponto P
+    JOIN Aluguel A ON (P.cod_ponto = A.ponto_retirada_id OR P.cod_ponto = A.ponto_devolucao_id)
+    WHERE A.data_hora_inicio >= SYSDATE - 30
+    GROUP BY P.cod_ponto, P.rua, P.bairro, P.capacidade_maxima
+    HAVING COUNT(A.id_aluguel) > P.capacidade_maxima * 0.8
+"""
+
+def carregar_cpfs(limite=1000):
+    """Busca CPFs existentes para usar como carga nas operações"""
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT cpf FROM Usuario FETCH FIRST :1 ROWS ONLY", (limite,))
+        cpfs = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    if not cpfs:
+        raise SystemExit("[ERRO] Nenhum usuário cadastrado para o benchmark.")
+    return cpfs
+
+def executar_concorrente(operacao, workers, duracao):
+    """Executa `operacao(indice)` em `workers` threads durante `duracao` segundos.
+
+    Retorna (total de operações, segundos decorridos).
+    """
+    contadores = [0] * workers
+    parar = threading.Event()
+
+    def trabalhador(n):
+        i = n
+        while not parar.is_set():
+            operacao(i)
+            contadores[n] += 1
+            i += workers
+
+    threads = [threading.Thread(target=trabalhador, args=(n,)) for n in range(workers)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duracao)
+    parar.set()
+    for t in threads:
+        t.join()
+    return sum(contadores), time.perf_counter() - inicio
+
+def bench_pool(workers_lista, duracao):
+    """Mede operações/s da consulta de usuário com sessões emprestadas do pool"""
+    banco.criar_pool(maximo=max(workers_lista))
+    cpfs = carregar_cpfs()
+
+    def operacao(i):
+        with banco.conexao() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_CONSULTA_USUARIO, (cpfs[i % len(cpfs)],))
+            cursor.fetchone()
+            cursor.close()
+
+    print(f"{'workers':>8} {'operações':>10} {'ops/s':>10}")
+    for workers in workers_lista:
+        total, segundos = executar_concorrente(operacao, workers, duracao)
+        print(f"{workers:>8} {total:>10} {total / segundos:>10.1f}")
+    banco.fechar_pool()
+
+def percentil(amostras, p):
+    """Percentil `p` (0-100) de uma lista de latências"""
+    if not amostras:
+        return 0.0
+    ordenadas = sorted(amostras)
+    indice = min(len(ordenadas) - 1, int(round(p / 100 * (len(ordenadas) - 1))))
+    return ordenadas[indice]
+
+def imprimir_latencias(rotulo, latencias, segundos):
+    """Imprime throughput e p50/p99 (em ms) de uma rodada"""
+    print(f"{rotulo:>8} {len(latencias):>10} {len(latencias) / segundos:>10.1f} "
+          f"{percentil(latencias, 50) * 1000:>9.1f} {percentil(latencias, 99) * 1000:>9.1f}")
+
+def _usuarios_aptos(cursor, quantidade):
+    """CPFs de até `quantidade` usuários aptos a alugar"""
+    cursor.execute("""
+        SELECT C.usuario_cpf FROM Cartao C
+        JOIN Resumo_Usuario R ON R.usuario_cpf = C.usuario_cpf
+        WHERE C.saldo >= 5 AND R.multas_pendentes = 0
+        AND (R.bloqueado_ate IS NULL OR R.bloqueado_ate <= SYSDATE)
+        FETCH FIRST :1 ROWS ONLY
+    """, (quantidade,))
+    return [row[0] for row in cursor.fetchall()]
+
+def _bikes_disponiveis(cursor, quantidade):
+    """(bike, ponto) de até `quantidade` bikes disponíveis em um ponto"""
+    cursor.execute("""
+        SELECT n_registro, ponto_atual_id FROM Bike
+        WHERE status = 'DISPONIVEL' AND ponto_atual_id IS NOT NULL
+        FETCH FIRST :1 ROWS ONLY
+    """, (quantidade,))
+    return cursor.fetchall()
+
+def _carregar(usuarios, bikes):
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        cpfs = _usuarios_aptos(cursor, usuarios)
+        disponiveis = _bikes_disponiveis(cursor, bikes)
+        cursor.close()
+    if len(cpfs) < usuarios or len(disponiveis) < bikes:
+        raise SystemExit(f"[ERRO] São necessários {usuarios} usuários aptos e {bikes} bike(s) "
+                         f"disponível(is) (encontrados: {len(cpfs)} usuários, "
+                         f"{len(disponiveis)} bikes).")
+    return cpfs, disponiveis
+
+def carregar_pares_aluguel(quantidade):
+    """Seleciona pares (cpf, bike, ponto) independentes, um por worker do ciclo.
+
+    Usuários precisam estar aptos a alugar e bikes disponíveis em um ponto.
+    """
+    cpfs, bikes = _carregar(quantidade, quantidade)
+    return [(cpf, bike, ponto) for cpf, (bike, ponto) in zip(cpfs, bikes)]
+
+def carregar_corrida(quantidade):
+    """Seleciona `quantidade` usuários aptos e uma única bike disputada por todos;
+    devolve (cpfs, bike, ponto)"""
+    cpfs, bikes = _carregar(quantidade, 1)
+    bike, ponto = bikes[0]
+    return cpfs, bike, ponto
+
+def ciclo_sync(workers, duracao):
+    """Ciclo aluguel + devolução com threads e o serviço síncrono"""
+    banco.criar_pool(maximo=workers)
+    pares = carregar_pares_aluguel(workers)
+    servico = ServicoAluguel()
+    latencias = [[] for _ in range(workers)]
+    parar = threading.Event()
+
+    def trabalhador(n):
+        cpf, bike, ponto = pares[n]
+        while not parar.is_set():
+            inicio = time.perf_counter()
+            aluguel = servico.iniciar_aluguel(cpf, bike)
+            servico.finalizar_aluguel(aluguel.id_aluguel, ponto)
+            latencias[n].append(time.perf_counter() - inicio)
+
+    threads = [threading.Thread(target=trabalhador, args=(n,)) for n in range(workers)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duracao)
+    parar.set()
+    for t in threads:
+        t.join()
+    segundos = time.perf_counter() - inicio
+    banco.fechar_pool()
+    return [l for lista in latencias for l in lista], segundos
+
+async def ciclo_async(workers, duracao):
+    """Ciclo aluguel + devolução com tarefas asyncio e o serviço assíncrono"""
+    pares = carregar_pares_aluguel(workers)
+    banco.fechar_pool()
+    banco.criar_pool_async(maximo=workers)
+    servico = ServicoAluguelAsync()
+    latencias = []
+    fim = time.perf_counter() + duracao
+
+    async def trabalhador(n):
+        cpf, bike, ponto = pares[n]
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            aluguel = await servico.iniciar_aluguel(cpf, bike)
+            await servico.finalizar_aluguel(aluguel.id_aluguel, ponto)
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador(n) for n in range(workers)))
+    segundos = time.perf_counter() - inicio
+    await banco.fechar_pool_async()
+    return latencias, segundos
+
+def bench_ciclo(workers, duracao):
+    """Compara throughput e latência do ciclo aluguel+devolução sync vs async"""
+    print(f"{'modo':>8} {'ciclos':>10} {'ciclos/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    latencias, segundos = ciclo_sync(workers, duracao)
+    imprimir_latencias('sync', latencias, segundos)
+    latencias, segundos = asyncio.run(ciclo_async(workers, duracao))
+    imprimir_latencias('async', latencias, segundos)
+
+def corrida(cpfs, bike, ponto, rodadas, servico=None):
+    """Gera (aceitos, recusados, erros) de cada rodada da disputa pela bike.
+
+    Em cada rodada, uma thread por CPF dispara junto com as outras o aluguel da
+    mesma bike; só um aluguel pode ser aceito e os demais devem ser recusados
+    com BikeIndisponivel. O aluguel aceito é devolvido ao `ponto` antes da
+    próxima rodada.
+    """
+    servico = servico or ServicoAluguel()
+    for _ in range(rodadas):
+        largada = threading.Barrier(len(cpfs))
+        aceitos, recusados, erros = [], [], []
+
+        def tentativa(cpf):
+            largada.wait()
+            try:
+                aceitos.append(servico.iniciar_aluguel(cpf, bike))
+            except BikeIndisponivel:
+                recusados.append(cpf)
+            except Exception as e:
+                erros.append(e)
+
+        threads = [threading.Thread(target=tentativa, args=(cpf,)) for cpf in cpfs]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for aluguel in aceitos:
+            servico.finalizar_aluguel(aluguel.id_aluguel, ponto)
+        yield aceitos, recusados, erros
+
+def bench_corrida(workers, rodadas):
+    """Verifica que a mesma bike nunca é alugada duas vezes: `workers` usuários
+    disputam uma única bike a cada rodada (ver corrida)"""
+    banco.criar_pool(maximo=workers)
+    cpfs, bike, ponto = carregar_corrida(workers)
+    falhas = 0
+
+    for rodada, (aceitos, recusados, erros) in enumerate(corrida(cpfs, bike, ponto, rodadas), 1):
+        ok = len(aceitos) == 1 and len(recusados) == workers - 1 and not erros
+        if not ok:
+            falhas += 1
+        print(f"Rodada {rodada:3}: {len(aceitos)} aceito(s), {len(recusados)} recusado(s), "
+              f"{len(erros)} erro(s) {'✅' if ok else '❌'}")
+        for e in erros:
+            print(f"   ❌ {e}")
+
+    banco.fechar_pool()
+    if falhas:
+        raise SystemExit(f"❌ {falhas} rodada(s) com aluguel duplicado ou erro.")
+    print(f"✅ Nenhum aluguel duplicado em {rodadas} rodadas.")
+
+def medir_consulta(cursor, sql, repeticoes):
+    """Executa a consulta `repeticoes` vezes lendo todas as linhas; devolve as latências"""
+    latencias = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        cursor.execute(sql)
+        while cursor.fetchmany(1000):
+            pass
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+def bench_relatorios(repeticoes):
+    """Latência dos relatórios 2, 3 e 5: agregação completa vs tabelas de resumo.
+
+    Rode sobre uma base grande (ex.: gerada com o gerador de dados sintéticos)
+    para que a diferença seja representativa.
+    """
+    consultas = [
+        ('ranking', 'agregado', SQL_RANKING_BIKES_AGREGADO),
+        ('ranking', 'resumo', sql_completo(RELATORIOS['2'])),
+        ('dívidas', 'agregado', SQL_INADIMPLENCIA_AGREGADO),
+        ('dívidas', 'resumo', sql_completo(RELATORIOS['3'])),
+        ('ocupação', 'agregado', SQL_PONTOS_SOBRECARREGADOS_AGREGADO),
+        ('ocupação', 'resumo', sql_completo(RELATORIOS['5'])),
+    ]
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        cursor.arraysize = 1000
+        cursor.execute("SELECT COUNT(*) FROM Aluguel")
+        print(f"Aluguéis na base: {cursor.fetchone()[0]}")
+        print(f"{'relatório':>10} {'fonte':>10} {'p50 ms':>10} {'máx ms':>10}")
+        for relatorio, fonte, sql in consultas:
+            latencias = medir_consulta(cursor, sql, repeticoes)
+            print(f"{relatorio:>10} {fonte:>10} {percentil(latencias, 50) * 1000:>10.1f} "
+                  f"{max(latencias) * 1000:>10.1f}")
+        cursor.close()
+    banco.fechar_pool()
+
+PESOS_MIX = {'aluguel': 35, 'devolucao': 35, 'manutencao': 5, 'situacao': 20, 'relatorio': 5}
+
+class EstadoMix:
+    """Bikes livres compartilhadas entre os workers do mix (cada bike com um só dono)"""
+
+    def __init__(self, cpfs, bikes, pontos):
+        self.cpfs = cpfs
+        self.pontos = pontos
+        self._bikes = bikes
+        self._lock = threading.Lock()
+
+    def pegar_bike(self, rng):
+        with self._lock:
+            if not self._bikes:
+                return None
+            i = rng.randrange(len(self._bikes))
+            self._bikes[i], self._bikes[-1] = self._bikes[-1], self._bikes[i]
+            return self._bikes.pop()
+
+    def devolver_bike(self, bike):
+        with self._lock:
+            self._bikes.append(bike)
+
+def carregar_estado_mix(limite=5000):
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        cursor.arraysize = 1000
+        cursor.execute("""
+            SELECT C.usuario_cpf FROM Cartao C
+            JOIN Resumo_Usuario R ON R.usuario_cpf = C.usuario_cpf
+            WHERE C.saldo >= 5 AND R.multas_pendentes = 0
+            AND (R.bloqueado_ate IS NULL OR R.bloqueado_ate <= SYSDATE)
+            FETCH FIRST :1 ROWS ONLY
+        """, (limite,))
+        cpfs = [row[0] for row in cursor.fetchall()]
+        cursor.execute("""
+            SELECT n_registro FROM Bike
+            WHERE status = 'DISPONIVEL' AND ponto_atual_id IS NOT NULL
+            FETCH FIRST :1 ROWS ONLY
+        """, (limite,))
+        bikes = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT cod_ponto FROM Ponto FETCH FIRST :1 ROWS ONLY", (limite,))
+        pontos = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    if not (cpfs and bikes and pontos):
+        raise SystemExit("[ERRO] A base precisa de usuários aptos, bikes disponíveis e pontos "
+                         "(gere com: python gerador.py --alugueis 100000).")
+    return EstadoMix(cpfs, bikes, pontos)
+
+def bench_mix(workers, duracao, pesos):
+    """Repete uma mistura de operações do sistema e mede cada tipo separadamente.
+
+    aluguel/devolucao usam bikes exclusivas de cada worker (nenhuma recusa
+    esperada), manutencao abre ou fecha uma manutenção, situacao consulta um
+    usuário e relatorio lê a primeira página de um relatório. Aluguéis e
+    manutenções que ficarem abertos são encerrados no final.
+    """
+    banco.criar_pool(maximo=workers)
+    estado = carregar_estado_mix()
+    aluguel_srv = ServicoAluguel()
+    manutencao_srv = ServicoManutencao()
+    operacoes, chances = list(pesos), list(pesos.values())
+    resultados = []
+    parar = threading.Event()
+
+    def trabalhador(n):
+        rng = random.Random(n)
+        latencias = {op: [] for op in operacoes}
+        recusas = {op: 0 for op in operacoes}
+        alugadas, em_oficina = [], []
+        while not parar.is_set():
+            op = rng.choices(operacoes, chances)[0]
+            if op == 'devolucao' and not alugadas:
+                op = 'aluguel'
+            inicio = time.perf_counter()
+            try:
+                if op == 'aluguel':
+                    bike = estado.pegar_bike(rng)
+                    if bike is None:
+                        continue
+                    try:
+                        aluguel = aluguel_srv.iniciar_aluguel(rng.choice(estado.cpfs), bike)
+                        alugadas.append((aluguel.id_aluguel, bike))
+                    except ErroServico:
+                        estado.devolver_bike(bike)
+                        raise
+                elif op == 'devolucao':
+                    id_aluguel, bike = alugadas.pop(rng.randrange(len(alugadas)))
+                    aluguel_srv.finalizar_aluguel(id_aluguel, rng.choice(estado.pontos))
+                    estado.devolver_bike(bike)
+                elif op == 'manutencao':
+                    if em_oficina and rng.random() < 0.5:
+                        bike = em_oficina.pop()
+                        manutencao_srv.fechar_manutencao(bike, 50.0, rng.choice(estado.pontos))
+                        estado.devolver_bike(bike)
+                    else:
+                        bike = estado.pegar_bike(rng)
+                        if bike is None:
+                            continue
+                        try:
+                            manutencao_srv.abrir_manutencao(bike, 'PREVENTIVA', "Revisão do teste de carga")
+                            em_oficina.append(bike)
+                        except ErroServico:
+                            estado.devolver_bike(bike)
+                            raise
+                elif op == 'situacao':
+                    aluguel_srv.consultar_situacao(rng.choice(estado.cpfs))
+                elif op == 'relatorio':
+                    relatorio = RELATORIOS[rng.choice(sorted(RELATORIOS))]
+                    with banco.conexao() as conn:
+                        if relatorio.chave is None:
+                            for _ in ler_em_fluxo(conn, relatorio):
+                                pass
+                        else:
+                            paginar(conn, relatorio)
+            except ErroServico:
+                recusas[op] += 1
+                continue
+            latencias[op].append(time.perf_counter() - inicio)
+
+        for id_aluguel, bike in alugadas:
+            aluguel_srv.finalizar_aluguel(id_aluguel, estado.pontos[0])
+        for bike in em_oficina:
+            manutencao_srv.fechar_manutencao(bike, 0.0, estado.pontos[0])
+        resultados.append((latencias, recusas))
+
+    threads = [threading.Thread(target=trabalhador, args=(n,)) for n in range(workers)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duracao)
+    parar.set()
+    segundos = time.perf_counter() - inicio
+    for t in threads:
+        t.join()
+    banco.fechar_pool()
+
+    print(f"{'operação':>10} {'total':>8} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'recusas':>8}")
+    for op in operacoes:
+        latencias = [l for lat, _ in resultados for l in lat[op]]
+        recusas = sum(rec[op] for _, rec in resultados)
+        print(f"{op:>10} {len(latencias):>8} {len(latencias) / segundos:>8.1f} "
+              f"{percentil(latencias, 50) * 1000:>8.1f} {percentil(latencias, 95) * 1000:>8.1f} "
+              f"{percentil(latencias, 99) * 1000:>8.1f} {recusas:>8}")
+
+def ler_pesos(texto):
+    """'aluguel=35,devolucao=35' -> {'aluguel': 35, 'devolucao': 35}"""
+    pesos = {}
+    for parte in texto.split(','):
+        op, _, peso = parte.partition('=')
+        if op.strip() not in PESOS_MIX:
+            raise argparse.ArgumentTypeError(f"operação desconhecida: {op} (use {', '.join(PESOS_MIX)})")
+        pesos[op.strip()] = float(peso)
+    return pesos
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do sistema de bikes")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_pool = sub.add_parser('pool', help="Throughput com pool de sessões")
+    p_pool.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32])
+    p_pool.add_argument('--duracao', type=float, default=10.0, help="Segundos por rodada")
+
+    p_ciclo = sub.add_parser('ciclo', help="Aluguel + devolução: síncrono vs asyncio")
+    p_ciclo.add_argument('--workers', type=int, default=32, help="Ciclos concorrentes")
+    p_ciclo.add_argument('--duracao', type=float, default=10.0, help="Segundos por modo")
+
+    p_corrida = sub.add_parser('corrida', help="Vários quiosques alugando a mesma bike")
+    p_corrida.add_argument('--workers', type=int, default=32, help="Tentativas simultâneas")
+    p_corrida.add_argument('--rodadas', type=int, default=20)
+
+    p_rel = sub.add_parser('relatorios', help="Relatórios 2 e 3: agregação vs tabelas de resumo")
+    p_rel.add_argument('--repeticoes', type=int, default=5)
+
+    p_mix = sub.add_parser('mix', help="Mistura de aluguéis, devoluções, manutenções, consultas e relatórios")
+    p_mix.add_argument('--workers', type=int, default=16)
+    p_mix.add_argument('--duracao', type=float, default=60.0)
+    p_mix.add_argument('--pesos', type=ler_pesos, default=PESOS_MIX,
+                       help="Peso de cada operação, ex.: aluguel=35,devolucao=35,situacao=20")
+
+    args = parser.parse_args()
+    if args.comando == 'pool':
+        bench_pool(args.workers, args.duracao)
+    elif args.comando == 'ciclo':
+        bench_ciclo(args.workers, args.duracao)
+    elif args.comando == 'corrida':
+        bench_corrida(args.workers, args.rodadas)
+    elif args.comando == 'relatorios':
+        bench_relatorios(args.repeticoes)
+    elif args.comando == 'mix':
+        bench_mix(args.workers, args.duracao, args.pesos)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Grupo 12
+# Cache em memória para dados de referência que mudam pouco (pontos, atributos
+# fixos das bikes). Evita uma ida ao banco por operação para validar um ponto.
+# SnapshotTabela guarda uma tabela pequena inteira (estoque dos pontos) e a
+# relê periodicamente.
+
+class CacheReferencia:
+    """Cache chave -> valor com expiração (TTL) e descarte do menos usado (LRU).
+
+    `carregar(chave)` busca o valor no banco quando a chave não está no cache;
+    o retorno None também é guardado (chave inexistente), por isso quem grava
+    no banco deve chamar invalidar() com a chave afetada.
+    """
+
+    def __init__(self, nome, carregar, ttl=300, capacidade=10000):
+        self.nome = nome
+        self._carregar = carregar
+        self._ttl = ttl
+        self._capacidade = capacidade
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.expirados = 0
+        self.descartados = 0
+
+    def obter(self, chave):
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                expira_em, valor = item
+                if expira_em > agora:
+                    self._itens.move_to_end(chave)
+                    self.acertos += 1
+                    return valor
+                del self._itens[chave]
+                self.expirados += 1
+            self.falhas += 1
+
+        valor = self._carregar(chave)
+        self.guardar(chave, valor)
+        return valor
+
+    def espiar(self, chave):
+        """Consulta sem carregar do banco: retorna (encontrado, valor).
+
+        Usado pelos serviços assíncronos, que fazem a carga por conta própria
+        para não bloquear o event loop e depois chamam guardar().
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and item[0] > time.monotonic():
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return True, item[1]
+            self.falhas += 1
+            return False, None
+
+    def guardar(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self._ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self._capacidade:
+                self._itens.popitem(last=False)
+                self.descartados += 1
+
+    def invalidar(self, chave=None):
+        """Remove uma chave (ou todas, sem argumento) do cache"""
+        with self._lock:
+            if chave is None:
+                self._itens.clear()
+            else:
+                self._itens.pop(chave, None)
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'cache': self.nome,
+                'itens': len(self._itens),
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'expirados': self.expirados,
+                'descartados': self.descartados,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            }
+
+class SnapshotTabela:
+    """Cópia completa de uma tabela pequena, recarregada a cada `ttl` segundos.
+
+    `carregar()` devolve um dicionário chave -> valor com todas as linhas. Só
+    uma thread recarrega por vez; as demais continuam lendo a cópia anterior
+    em vez de esperar pelo banco.
+    """
+
+    def __init__(self, nome, carregar, ttl=5):
+        self.nome = nome
+        self._carregar = carregar
+        self._ttl = ttl
+        self._itens = None
+        self._expira_em = 0.0
+        self._lock = threading.Lock()
+        self._recarregando = threading.Lock()
+        self.cargas = 0
+        self.leituras = 0
+
+    def itens(self):
+        """Dicionário atual (não deve ser alterado por quem o recebe)"""
+        with self._lock:
+            self.leituras += 1
+            itens, vencido = self._itens, self._expira_em <= time.monotonic()
+        if itens is None:
+            with self._recarregando:
+                if self._itens is None:
+                    self._recarregar()
+            return self._itens
+        if vencido and self._recarregando.acquire(blocking=False):
+            try:
+                self._recarregar()
+            finally:
+                self._recarregando.release()
+            return self._itens
+        return itens
+
+    def _recarregar(self):
+        itens = self._carregar()
+        with self._lock:
+            self._itens = itens
+            self._expira_em = time.monotonic() + self._ttl
+            self.cargas += 1
+
+    def invalidar(self):
+        """Força a recarga na próxima leitura"""
+        with self._lock:
+            self._expira_em = 0.0
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'cache': self.nome,
+                'itens': len(self._itens) if self._itens is not None else 0,
+                'cargas': self.cargas,
+                'leituras': self.leituras,
+            }
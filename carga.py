@@ -0,0 +1,230 @@
+import argparse
+import csv
+import json
+import sys
+import time
+
+import banco
+from validacoes import (
+    validar_cpf, validar_data, validar_data_passado, validar_uf,
+    validar_numero_positivo,
+)
+
+# Grupo 12
+# Carga em massa de usuários (com cartão), pontos e bikes a partir de CSV ou
+# JSONL. As linhas são lidas em fluxo, validadas com as mesmas regras do
+# cadastro interativo e inseridas em lotes com executemany (array DML),
+# com um commit por lote. Linhas rejeitadas (validação ou banco) são
+# gravadas em um arquivo JSONL com o número da linha e o motivo.
+#
+# Uso: python carga.py usuarios usuarios.csv --lote 5000 --rejeitados rejeitados.jsonl
+
+SQL_USUARIO = """
+    INSERT INTO Usuario (cpf, nome, data_nasc, rua, numero, bairro, cidade, uf, is_cadUnico)
+    VALUES (:1, :2, TO_DATE(:3, 'DD/MM/YYYY'), :4, :5, :6, :7, :8, :9)
+"""
+
+SQL_CARTAO = """
+    INSERT INTO Cartao (usuario_cpf, saldo, data_validade, data_emissao)
+    VALUES (:1, :2, TO_DATE(:3, 'DD/MM/YYYY'), SYSDATE)
+"""
+
+SQL_PONTO = """
+    INSERT INTO Ponto (rua, numero, bairro, cidade, uf, referencia, capacidade_maxima)
+    VALUES (:1, :2, :3, :4, :5, :6, :7)
+"""
+
+SQL_BIKE = """
+    INSERT INTO Bike (modelo, ano_fabricacao, cor, status, qnt_alugueis, tempo_total_utilizado, ponto_atual_id)
+    VALUES (:1, :2, :3, 'DISPONIVEL', 0, 0, :4)
+"""
+
+class LinhaInvalida(Exception):
+    pass
+
+def _texto(registro, campo, obrigatorio=False):
+    valor = (registro.get(campo) or '').strip()
+    if obrigatorio and not valor:
+        raise LinhaInvalida(f"{campo} é obrigatório")
+    return valor or None
+
+def _inteiro_positivo(registro, campo):
+    valor = _texto(registro, campo, obrigatorio=True)
+    if not validar_numero_positivo(valor):
+        raise LinhaInvalida(f"{campo} deve ser um número inteiro positivo")
+    return int(valor)
+
+def converter_usuario(registro):
+    """Linha -> (parâmetros do Usuario, parâmetros do Cartao)"""
+    cpf = _texto(registro, 'cpf', obrigatorio=True)
+    if not validar_cpf(cpf):
+        raise LinhaInvalida("CPF inválido (11 dígitos)")
+    nome = _texto(registro, 'nome', obrigatorio=True)
+    if len(nome) < 3:
+        raise LinhaInvalida("nome deve ter pelo menos 3 caracteres")
+    data_nasc = _texto(registro, 'data_nasc', obrigatorio=True)
+    if not (validar_data(data_nasc) and validar_data_passado(data_nasc)):
+        raise LinhaInvalida("data_nasc inválida ou futura (DD/MM/AAAA)")
+    cidade = _texto(registro, 'cidade', obrigatorio=True)
+    uf = (_texto(registro, 'uf', obrigatorio=True)).upper()
+    if not validar_uf(uf):
+        raise LinhaInvalida("UF inválida")
+    cad_unico = (_texto(registro, 'is_cadunico') or 'N').upper()
+    if cad_unico not in ('S', 'N', '1', '0'):
+        raise LinhaInvalida("is_cadunico deve ser S/N ou 1/0")
+    saldo_str = (_texto(registro, 'saldo') or '0').replace(',', '.')
+    if not validar_numero_positivo(saldo_str, decimal=True):
+        raise LinhaInvalida("saldo deve ser um número positivo")
+    validade = _texto(registro, 'validade', obrigatorio=True)
+    if not validar_data(validade):
+        raise LinhaInvalida("validade inválida (DD/MM/AAAA)")
+
+    usuario = (cpf, nome, data_nasc, _texto(registro, 'rua'), _texto(registro, 'numero'),
+               _texto(registro, 'bairro'), cidade, uf, 1 if cad_unico in ('S', '1') else 0)
+    cartao = (cpf, float(saldo_str), validade)
+    return usuario, cartao
+
+def converter_ponto(registro):
+    uf = (_texto(registro, 'uf', obrigatorio=True)).upper()
+    if not validar_uf(uf):
+        raise LinhaInvalida("UF inválida")
+    capacidade = _inteiro_positivo(registro, 'capacidade_maxima')
+    if capacidade > 100:
+        raise LinhaInvalida("capacidade_maxima muito alta (máx: 100)")
+    return (_texto(registro, 'rua', obrigatorio=True), _texto(registro, 'numero'),
+            _texto(registro, 'bairro'), _texto(registro, 'cidade', obrigatorio=True),
+            uf, _texto(registro, 'referencia'), capacidade)
+
+def converter_bike(registro):
+    ano = _inteiro_positivo(registro, 'ano_fabricacao')
+    if not 1900 <= ano <= time.localtime().tm_year:
+        raise LinhaInvalida("ano_fabricacao fora do intervalo 1900-ano atual")
+    return (_texto(registro, 'modelo', obrigatorio=True), ano,
+            _texto(registro, 'cor') or "Não especificada",
+            _inteiro_positivo(registro, 'ponto_atual_id'))
+
+def ler_registros(caminho):
+    """Gera (número da linha, dicionário) de um CSV com cabeçalho ou JSONL"""
+    with open(caminho, encoding='utf-8', newline='') as arquivo:
+        if caminho.endswith('.jsonl') or caminho.endswith('.json'):
+            for n, linha in enumerate(arquivo, 1):
+                if linha.strip():
+                    yield n, {k.lower(): '' if v is None else str(v)
+                              for k, v in json.loads(linha).items()}
+        else:
+            leitor = csv.DictReader(arquivo)
+            for registro in leitor:
+                yield leitor.line_num, {k.strip().lower(): v for k, v in registro.items() if k}
+
+class Carga:
+    """Acumula linhas válidas e grava um lote por vez"""
+
+    def __init__(self, conn, tamanho_lote, rejeitados):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.tamanho_lote = tamanho_lote
+        self.rejeitados = rejeitados
+        self.inseridos = 0
+        self.total_rejeitados = 0
+
+    def rejeitar(self, linha, motivo):
+        self.total_rejeitados += 1
+        if self.rejeitados:
+            self.rejeitados.write(json.dumps({'linha': linha, 'motivo': motivo},
+                                             ensure_ascii=False) + '\n')
+
+    def _executar(self, sql, linhas, parametros):
+        """executemany com batcherrors; devolve o conjunto de índices rejeitados"""
+        self.cursor.executemany(sql, parametros, batcherrors=True)
+        falhas = set()
+        for erro in self.cursor.getbatcherrors():
+            falhas.add(erro.offset)
+            self.rejeitar(linhas[erro.offset], erro.message)
+        return falhas
+
+    def gravar(self, sql, linhas, parametros):
+        falhas = self._executar(sql, linhas, parametros)
+        self.conn.commit()
+        self.inseridos += len(linhas) - len(falhas)
+
+    def gravar_usuarios(self, linhas, usuarios, cartoes):
+        """Usuário e cartão no mesmo lote; cartões de usuários rejeitados são descartados"""
+        falhas = self._executar(SQL_USUARIO, linhas, usuarios)
+        restantes = [i for i in range(len(linhas)) if i not in falhas]
+        if restantes:
+            falhas_cartao = self._executar(SQL_CARTAO, [linhas[i] for i in restantes],
+                                           [cartoes[i] for i in restantes])
+            if falhas_cartao:
+                # Usuário sem cartão não é aceito: desfaz o lote e regrava sem eles
+                self.conn.rollback()
+                descartar = {restantes[i] for i in falhas_cartao}
+                restantes = [i for i in restantes if i not in descartar]
+                if restantes:
+                    self.cursor.executemany(SQL_USUARIO, [usuarios[i] for i in restantes])
+                    self.cursor.executemany(SQL_CARTAO, [cartoes[i] for i in restantes])
+        self.conn.commit()
+        self.inseridos += len(restantes)
+
+def carregar(entidade, caminho, tamanho_lote=5000, caminho_rejeitados=None):
+    conversores = {'usuarios': converter_usuario, 'pontos': converter_ponto, 'bikes': converter_bike}
+    converter = conversores[entidade]
+    rejeitados = open(caminho_rejeitados, 'w', encoding='utf-8') if caminho_rejeitados else None
+    inicio = time.perf_counter()
+
+    try:
+        with banco.conexao() as conn:
+            carga = Carga(conn, tamanho_lote, rejeitados)
+            linhas, parametros, cartoes = [], [], []
+
+            def descarregar():
+                if entidade == 'usuarios':
+                    carga.gravar_usuarios(linhas, parametros, cartoes)
+                else:
+                    carga.gravar(SQL_PONTO if entidade == 'pontos' else SQL_BIKE, linhas, parametros)
+                linhas.clear()
+                parametros.clear()
+                cartoes.clear()
+                decorrido = time.perf_counter() - inicio
+                print(f"   {carga.inseridos} inseridos, {carga.total_rejeitados} rejeitados "
+                      f"({carga.inseridos / decorrido:.0f} linhas/s)")
+
+            for n, registro in ler_registros(caminho):
+                try:
+                    convertido = converter(registro)
+                except LinhaInvalida as e:
+                    carga.rejeitar(n, str(e))
+                    continue
+                linhas.append(n)
+                if entidade == 'usuarios':
+                    parametros.append(convertido[0])
+                    cartoes.append(convertido[1])
+                else:
+                    parametros.append(convertido)
+                if len(linhas) >= tamanho_lote:
+                    descarregar()
+            if linhas:
+                descarregar()
+    finally:
+        if rejeitados:
+            rejeitados.close()
+
+    return carga.inseridos, carga.total_rejeitados
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga em massa (CSV ou JSONL)")
+    parser.add_argument('entidade', choices=['usuarios', 'pontos', 'bikes'])
+    parser.add_argument('arquivo', help="Arquivo .csv (com cabeçalho) ou .jsonl")
+    parser.add_argument('--lote', type=int, default=5000, help="Linhas por lote/commit")
+    parser.add_argument('--rejeitados', help="Arquivo JSONL para as linhas rejeitadas")
+    args = parser.parse_args()
+
+    print(f"\n📥 CARGA DE {args.entidade.upper()}: {args.arquivo}")
+    inseridos, rejeitados = carregar(args.entidade, args.arquivo, args.lote, args.rejeitados)
+    print(f"\n✅ {inseridos} linha(s) inserida(s), {rejeitados} rejeitada(s).")
+    if rejeitados and not args.rejeitados:
+        print("   Use --rejeitados para gravar o motivo de cada rejeição.")
+    banco.fechar_pool()
+    sys.exit(1 if rejeitados else 0)
+
+if __name__ == "__main__":
+    main()
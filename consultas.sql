@@ -5,24 +5,23 @@
 -- CONSULTA 1: DIVISÃO RELACIONAL
 -- Relatório de Fidelidade e Engajamento de Usuários
 -- Lista o nome dos usuários que alugaram bicicletas em TODOS os pontos 
--- de estacionamento estão no Centro de São Carlos.
+-- de estacionamento do Centro de São Carlos.
 -- Justificativa: Identificar "power users" que frequentam especificamente todos os 
 -- pontos de uma determinada categoria ou localidade para programas de fidelidade.
+-- A divisão é feita sobre Cobertura_Usuario (pontos distintos de retirada de
+-- cada usuário por bairro, mantida por gatilho a cada aluguel): o usuário está
+-- no quociente quando cobre todos os pontos do bairro, sem reagregar Aluguel.
+-- Na aplicação (relatório 1) bairro, cidade e percentual mínimo são binds.
 
 SELECT U.nome
-FROM Usuario U
-WHERE NOT EXISTS (
-    -- Seleciona o ponto de interesse (Divisor)
-    SELECT P.cod_ponto
+FROM Cobertura_Usuario C
+JOIN Usuario U ON U.cpf = C.usuario_cpf
+WHERE C.cidade = 'São Carlos' AND C.bairro = 'Centro'
+  AND C.pontos_visitados = (
+    -- Divisor: pontos do bairro
+    SELECT COUNT(*)
     FROM Ponto P
-    WHERE P.bairro = 'Centro' AND p.cidade = 'São Carlos'
-    
-    EXCEPT
-    
-    -- Seleciona os pontos onde o usuário já alugou (Dividendo)
-    SELECT A.ponto_retirada_id
-    FROM Aluguel A
-    WHERE A.usuario_cpf = U.cpf
+    WHERE P.bairro = 'Centro' AND P.cidade = 'São Carlos'
 );
 
 -- CONSULTA 2: JUNÇÃO INTERNA COM AGRUPAMENTO E ORDENAÇÃO
@@ -100,14 +99,18 @@ AND M.valor > (
 -- OBS: Como os dados de exemplo são poucos, a condição > 5 pode não retornar nada,
 -- ajustado para > 1 para fins de teste da consulta.
 
+-- Lê o movimento diário por ponto (Movimento_Ponto_Dia, mantido por gatilho)
+-- em vez de juntar Ponto a Aluguel por retirada OU devolução, o que impede o
+-- uso dos índices. Cada retirada e cada devolução conta uma movimentação.
+
 SELECT 
     P.rua,
     P.bairro,
     P.capacidade_maxima,
-    COUNT(A.id_aluguel) AS total_movimentacao
+    SUM(M.retiradas + M.devolucoes) AS total_movimentacao
 FROM Ponto P
-JOIN Aluguel A ON P.cod_ponto = A.ponto_retirada_id OR P.cod_ponto = A.ponto_devolucao_id
+JOIN Movimento_Ponto_Dia M ON P.cod_ponto = M.cod_ponto
 WHERE P.capacidade_maxima < 30
 GROUP BY P.cod_ponto, P.rua, P.bairro, P.capacidade_maxima
-HAVING COUNT(A.id_aluguel) > 1 -- Ajustar este valor conforme volume de dados real
+HAVING SUM(M.retiradas + M.devolucoes) > 1 -- Ajustar este valor conforme volume de dados real
 ORDER BY total_movimentacao DESC;
\ No newline at end of file
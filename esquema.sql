@@ -77,6 +77,13 @@ CREATE TABLE Aluguel (
     ) VIRTUAL,
     
     status VARCHAR2(20) CHECK (status IN ('EM_ANDAMENTO', 'CONCLUIDO', 'CANCELADO')),
+
+    -- Coluna Calculada
+    -- Início só enquanto o aluguel está em andamento; o índice sobre ela contém
+    -- apenas os aluguéis abertos (rotina de multas)
+    aberto_desde TIMESTAMP GENERATED ALWAYS AS (
+        CASE WHEN status = 'EM_ANDAMENTO' THEN data_hora_inicio END
+    ) VIRTUAL,
     
     CONSTRAINT fk_aluguel_bike FOREIGN KEY (bike_n_registro) REFERENCES Bike(n_registro),
     CONSTRAINT fk_aluguel_usuario FOREIGN KEY (usuario_cpf) REFERENCES Usuario(cpf),
@@ -87,7 +94,12 @@ CREATE TABLE Aluguel (
         (status = 'EM_ANDAMENTO' AND ponto_devolucao_id IS NULL AND data_hora_fim IS NULL) OR
         (status = 'CANCELADO')
     )
-);
+)
+-- Particionada por mês de início (uma partição nova é criada automaticamente
+-- a cada mês). Consultas com filtro em data_hora_inicio leem só os meses
+-- envolvidos e o arquivamento (rotinas.py arquivar) trabalha mês a mês.
+PARTITION BY RANGE (data_hora_inicio) INTERVAL (NUMTOYMINTERVAL(1, 'MONTH'))
+(PARTITION p_inicial VALUES LESS THAN (TIMESTAMP '2024-01-01 00:00:00'));
 
 -- Tabela MANUTENCAO
 CREATE TABLE Manutencao (
@@ -98,6 +110,13 @@ CREATE TABLE Manutencao (
     data_inicio DATE NOT NULL,
     data_fim DATE,
     descricao_problema VARCHAR2(4000),
+
+    -- Coluna Calculada
+    -- Data de início só enquanto a manutenção está aberta; o índice sobre ela
+    -- contém apenas as manutenções abertas (linhas com NULL não entram no índice)
+    aberta_desde DATE GENERATED ALWAYS AS (
+        CASE WHEN data_fim IS NULL THEN data_inicio END
+    ) VIRTUAL,
     CONSTRAINT fk_manutencao_bike FOREIGN KEY (bike_n_registro) REFERENCES Bike(n_registro)
 );
 
@@ -113,7 +132,9 @@ CREATE TABLE Multa (
     isPaid NUMBER(1) DEFAULT 0 CHECK (isPaid IN (0, 1)), --Adaptação de Boolean com 0 e 1
     tempo_bloqueio NUMBER DEFAULT 0, -- Em dias
     CONSTRAINT fk_multa_aluguel FOREIGN KEY (aluguel_id) REFERENCES Aluguel(id_aluguel)
-);
+)
+-- Mesmas partições do aluguel a que pertence (particionamento por referência)
+PARTITION BY REFERENCE (fk_multa_aluguel);
 
 
 -- Tabela COMENTARIO_BIKE
@@ -127,7 +148,8 @@ CREATE TABLE Comentario_Bike (
     pecas VARCHAR2(20),
     texto_livre VARCHAR2(4000),
     CONSTRAINT fk_comm_bike_aluguel FOREIGN KEY (aluguel_id) REFERENCES Aluguel(id_aluguel)
-);
+)
+PARTITION BY REFERENCE (fk_comm_bike_aluguel);
 
 
 -- Tabela COMENTARIO_PONTO
@@ -139,7 +161,8 @@ CREATE TABLE Comentario_Ponto (
     n_bikes_avaliacao VARCHAR2(20),
     aparencia_geral VARCHAR2(20),
     CONSTRAINT fk_comm_ponto_aluguel FOREIGN KEY (aluguel_id) REFERENCES Aluguel(id_aluguel)
-);
+)
+PARTITION BY REFERENCE (fk_comm_ponto_aluguel);
 
 -- Tabela COMENTARIO_TIPO
 CREATE TABLE Comentario_Tipo (
@@ -147,10 +170,687 @@ CREATE TABLE Comentario_Tipo (
     aluguel_id NUMBER NOT NULL,
     tipo VARCHAR2(10) CHECK (tipo IN ('BIKE', 'PONTO')),
     CONSTRAINT fk_comm_tipo_aluguel FOREIGN KEY (aluguel_id) REFERENCES Aluguel(id_aluguel)
-);
+)
+PARTITION BY REFERENCE (fk_comm_tipo_aluguel);
+
+-- ÍNDICES
+-- Para bancos já criados, os mesmos índices são aplicados por atualizacao_indices.sql.
+-- Conferência dos planos: python planos.py
 
-CREATE INDEX idx_aluguel_usuario ON Aluguel(usuario_cpf);
+-- Índices de Aluguel e Multa: globais quando a busca é por chave sem data
+-- (usuário, bike, aluguel) — um índice local obrigaria a visitar uma partição
+-- de índice por mês; locais quando a consulta também filtra pela data de
+-- início, que então lê só as partições do período.
+
+-- Aluguéis de um usuário, filtrando os em andamento sem visitar a tabela
+CREATE INDEX idx_aluguel_usuario_status ON Aluguel(usuario_cpf, status);
 CREATE INDEX idx_aluguel_bike ON Aluguel(bike_n_registro);
-CREATE INDEX idx_aluguel_ponto_ret ON Aluguel(ponto_retirada_id);
-CREATE INDEX idx_aluguel_ponto_dev ON Aluguel(ponto_devolucao_id);
-CREATE INDEX idx_multa_aluguel ON Multa(aluguel_id);
\ No newline at end of file
+CREATE INDEX idx_aluguel_ponto_ret ON Aluguel(ponto_retirada_id) LOCAL;
+CREATE INDEX idx_aluguel_ponto_dev ON Aluguel(ponto_devolucao_id) LOCAL;
+-- Janela "últimos 30 dias" (pontos sobrecarregados)
+CREATE INDEX idx_aluguel_inicio ON Aluguel(data_hora_inicio) LOCAL;
+-- Somente aluguéis em andamento, em ordem de início (rotina de multas)
+CREATE INDEX idx_aluguel_aberto ON Aluguel(aberto_desde);
+
+-- Multas em aberto de um aluguel: contagem e soma resolvidas só no índice
+CREATE INDEX idx_multa_aluguel_pendente ON Multa(aluguel_id, isPaid, valor);
+-- No máximo uma multa automática (atraso, não devolução) de cada tipo por
+-- aluguel; multas de dano, lançadas à mão, ficam fora do índice
+CREATE UNIQUE INDEX ux_multa_automatica ON Multa(
+    CASE WHEN tipo IN ('ATRASO', 'NAO_DEVOLUCAO') THEN aluguel_id END,
+    CASE WHEN tipo IN ('ATRASO', 'NAO_DEVOLUCAO') THEN tipo END
+);
+
+-- Manutenção aberta de uma bike (conclusão) e chave estrangeira
+CREATE INDEX idx_manutencao_bike_aberta ON Manutencao(bike_n_registro, data_fim);
+-- Somente manutenções abertas, em ordem de abertura (auditoria de manutenção)
+CREATE INDEX idx_manutencao_aberta ON Manutencao(aberta_desde);
+
+-- Bikes de um ponto por status (chave estrangeira e disponibilidade)
+CREATE INDEX idx_bike_ponto_status ON Bike(ponto_atual_id, status);
+
+-- Pontos de um bairro/cidade (relatório de fidelidade)
+CREATE INDEX idx_ponto_cidade_bairro ON Ponto(cidade, bairro);
+
+-- ARQUIVO HISTÓRICO
+-- Aluguéis encerrados há mais de N meses (sem multa em aberto nem bloqueio
+-- vigente), com suas multas e comentários, são movidos para estas tabelas por
+-- "python rotinas.py arquivar --meses N". Só recebem inserções em modo direto
+-- (APPEND), então a compressão básica vale para todas as linhas.
+CREATE TABLE Aluguel_Historico
+ROW STORE COMPRESS BASIC
+PARTITION BY RANGE (data_hora_inicio) INTERVAL (NUMTOYMINTERVAL(1, 'MONTH'))
+(PARTITION p_inicial VALUES LESS THAN (TIMESTAMP '2024-01-01 00:00:00'))
+AS SELECT * FROM Aluguel WHERE 1 = 0;
+
+CREATE TABLE Multa_Historico ROW STORE COMPRESS BASIC
+AS SELECT * FROM Multa WHERE 1 = 0;
+
+CREATE TABLE Comentario_Bike_Historico ROW STORE COMPRESS BASIC
+AS SELECT * FROM Comentario_Bike WHERE 1 = 0;
+
+CREATE TABLE Comentario_Ponto_Historico ROW STORE COMPRESS BASIC
+AS SELECT * FROM Comentario_Ponto WHERE 1 = 0;
+
+CREATE TABLE Comentario_Tipo_Historico ROW STORE COMPRESS BASIC
+AS SELECT * FROM Comentario_Tipo WHERE 1 = 0;
+
+CREATE INDEX idx_aluguel_hist_usuario ON Aluguel_Historico(usuario_cpf);
+CREATE INDEX idx_aluguel_hist_id ON Aluguel_Historico(id_aluguel);
+CREATE INDEX idx_multa_hist_aluguel ON Multa_Historico(aluguel_id);
+CREATE INDEX idx_comm_bike_hist_aluguel ON Comentario_Bike_Historico(aluguel_id);
+CREATE INDEX idx_comm_ponto_hist_aluguel ON Comentario_Ponto_Historico(aluguel_id);
+
+-- Aluguéis do mês que está sendo arquivado (o mesmo conjunto em todos os comandos
+-- da transação); esvaziada no commit
+CREATE GLOBAL TEMPORARY TABLE Arquivo_Lote (
+    id_aluguel NUMBER PRIMARY KEY
+) ON COMMIT DELETE ROWS;
+
+-- ROTINAS EM LOTE
+-- Posição da última unidade concluída de cada rotina (python rotinas.py), gravada
+-- na mesma transação do lote: uma execução interrompida continua dali.
+CREATE TABLE Checkpoint_Rotina (
+    rotina VARCHAR2(50) PRIMARY KEY,
+    ultima_data TIMESTAMP,
+    ultimo_id NUMBER,
+    atualizado_em DATE DEFAULT SYSDATE NOT NULL
+);
+
+-- Aluguéis do lote de multas em andamento; esvaziada no commit
+CREATE GLOBAL TEMPORARY TABLE Multa_Lote (
+    id_aluguel NUMBER PRIMARY KEY,
+    aberto_desde TIMESTAMP NOT NULL
+) ON COMMIT DELETE ROWS;
+
+-- TARIFAS
+-- Versões da tabela de preços: um aluguel é cobrado pela versão vigente no seu
+-- início (a de maior vigente_desde <= data_hora_inicio). Depois de corrigir uma
+-- versão ou criar uma retroativa, os aluguéis do período são recalculados por
+-- "python tarifas.py reprecificar".
+-- Valor de um aluguel de m minutos retirado na hora h:
+--   uso = (LEAST(m, minutos_limite) - minutos_franquia, não negativo)
+--         * valor_minuto * fator da faixa de h, limitado a valor_maximo;
+--         usuários do CadÚnico pagam uso * (1 - desconto_cad_unico / 100)
+--   excedente = (m - minutos_limite, não negativo) * valor_minuto_excedente,
+--         sem teto nem desconto (multa por tempo além do limite)
+CREATE TABLE Tarifa (
+    id_tarifa NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    vigente_desde TIMESTAMP NOT NULL CONSTRAINT ux_tarifa_vigencia UNIQUE,
+    valor_minuto NUMBER(10, 4) NOT NULL CHECK (valor_minuto >= 0),
+    minutos_franquia NUMBER DEFAULT 0 NOT NULL CHECK (minutos_franquia >= 0),
+    valor_maximo NUMBER(10, 2) CHECK (valor_maximo >= 0), -- Teto do uso (NULL = sem teto)
+    minutos_limite NUMBER CHECK (minutos_limite > 0), -- Início do excedente (NULL = sem excedente)
+    valor_minuto_excedente NUMBER(10, 4) DEFAULT 0 NOT NULL CHECK (valor_minuto_excedente >= 0),
+    desconto_cad_unico NUMBER(5, 2) DEFAULT 100 NOT NULL -- Em %; 100 = isento
+        CHECK (desconto_cad_unico BETWEEN 0 AND 100),
+    descricao VARCHAR2(200)
+);
+
+-- Fator sobre valor_minuto pela hora da retirada, em [hora_inicio, hora_fim).
+-- Horas sem faixa usam fator 1; com faixas sobrepostas vale o maior fator.
+CREATE TABLE Tarifa_Faixa (
+    id_tarifa NUMBER NOT NULL,
+    hora_inicio NUMBER(2) NOT NULL CHECK (hora_inicio BETWEEN 0 AND 23),
+    hora_fim NUMBER(2) NOT NULL CHECK (hora_fim BETWEEN 1 AND 24),
+    fator NUMBER(5, 2) NOT NULL CHECK (fator >= 0),
+    CONSTRAINT pk_tarifa_faixa PRIMARY KEY (id_tarifa, hora_inicio),
+    CONSTRAINT fk_tarifa_faixa FOREIGN KEY (id_tarifa) REFERENCES Tarifa(id_tarifa),
+    CONSTRAINT chk_tarifa_faixa_horas CHECK (hora_fim > hora_inicio)
+);
+
+-- Tarifa original da devolução: R$ 0,10 por minuto, CadÚnico isento
+INSERT INTO Tarifa (vigente_desde, valor_minuto, descricao)
+VALUES (TIMESTAMP '2000-01-01 00:00:00', 0.10, 'R$ 0,10 por minuto');
+COMMIT;
+
+-- Valor de um aluguel pela versão vigente no início (regra acima). Chamada na
+-- devolução; tarifas.py faz a mesma conta em lote na reprecificação.
+CREATE OR REPLACE FUNCTION tarifar_aluguel(
+    p_inicio TIMESTAMP, p_minutos NUMBER, p_cad_unico NUMBER
+) RETURN NUMBER AS
+    t       Tarifa%ROWTYPE;
+    v_fator NUMBER;
+    v_uso   NUMBER;
+BEGIN
+    SELECT * INTO t FROM Tarifa
+    WHERE vigente_desde <= p_inicio
+    ORDER BY vigente_desde DESC
+    FETCH FIRST 1 ROWS ONLY;
+
+    SELECT NVL(MAX(fator), 1) INTO v_fator FROM Tarifa_Faixa
+    WHERE id_tarifa = t.id_tarifa
+      AND hora_inicio <= EXTRACT(HOUR FROM p_inicio) AND hora_fim > EXTRACT(HOUR FROM p_inicio);
+
+    v_uso := GREATEST(LEAST(p_minutos, NVL(t.minutos_limite, p_minutos)) - t.minutos_franquia, 0)
+             * t.valor_minuto * v_fator;
+    v_uso := LEAST(v_uso, NVL(t.valor_maximo, v_uso));
+    IF p_cad_unico = 1 THEN
+        v_uso := v_uso * (1 - t.desconto_cad_unico / 100);
+    END IF;
+    RETURN ROUND(v_uso + GREATEST(p_minutos - NVL(t.minutos_limite, p_minutos), 0)
+                         * t.valor_minuto_excedente, 2);
+END;
+/
+
+-- EVENTOS (OUTBOX)
+-- Cada mudança de estado de aluguel, manutenção e bike grava uma linha aqui na
+-- mesma transação da mudança (gatilhos trg_evento_*). Os consumidores leem em
+-- ordem de seq a partir do seu checkpoint em Checkpoint_Rotina (python
+-- eventos.py consumir), em vez de consultar Aluguel e Bike periodicamente.
+-- Sem chave estrangeira: o evento sobrevive ao arquivamento do aluguel.
+-- ORDER: em RAC o seq segue a ordem de criação entre as instâncias (sem ele,
+-- cada instância distribui a sua faixa do cache e as lacunas não fecham logo).
+CREATE TABLE Evento (
+    seq NUMBER GENERATED ALWAYS AS IDENTITY (CACHE 1000 ORDER) PRIMARY KEY,
+    entidade VARCHAR2(20) NOT NULL CHECK (entidade IN ('ALUGUEL', 'MANUTENCAO', 'BIKE')),
+    status VARCHAR2(20), -- Estado novo (ex.: EM_ANDAMENTO, CONCLUIDO, ABERTA, DISPONIVEL)
+    aluguel_id NUMBER,
+    manutencao_id NUMBER,
+    bike_n_registro NUMBER,
+    usuario_cpf VARCHAR2(11),
+    ponto_id NUMBER,
+    valor NUMBER(10, 2),
+    criado_em DATE DEFAULT SYSDATE NOT NULL
+);
+
+-- Seqs que um consumidor pulou (lacuna mais velha que EVENTOS_ESPERA_LACUNA).
+-- São relidos a cada leitura: o evento que confirma depois é entregue
+-- (ENTREGUE); a lacuna sem evento depois de EVENTOS_JANELA_LACUNA fica EXPIRADA.
+CREATE TABLE Evento_Lacuna (
+    rotina VARCHAR2(50) NOT NULL,
+    seq NUMBER NOT NULL,
+    situacao VARCHAR2(10) DEFAULT 'ABERTA' NOT NULL
+        CHECK (situacao IN ('ABERTA', 'ENTREGUE', 'EXPIRADA')),
+    pulada_em DATE DEFAULT SYSDATE NOT NULL,
+    CONSTRAINT pk_evento_lacuna PRIMARY KEY (rotina, seq)
+);
+
+-- TABELAS DE RESUMO
+-- Agregados mantidos por gatilhos na mesma transação das alterações nas tabelas
+-- de base. Os relatórios gerenciais leem estes resumos (consulta por chave)
+-- em vez de agrupar Aluguel, Comentario_Bike e Multa a cada execução.
+
+-- Resumo por bike: total de aluguéis e avaliações (média = soma_notas / qtd_notas)
+CREATE TABLE Resumo_Bike (
+    bike_n_registro NUMBER PRIMARY KEY,
+    total_alugueis NUMBER DEFAULT 0 NOT NULL,
+    qtd_notas NUMBER DEFAULT 0 NOT NULL,
+    soma_notas NUMBER DEFAULT 0 NOT NULL,
+    CONSTRAINT fk_resumo_bike FOREIGN KEY (bike_n_registro) REFERENCES Bike(n_registro)
+);
+
+-- Resumo por usuário: situação lida pelo aluguel e pela consulta de situação
+-- com uma única busca por chave. bloqueado_ate é o maior (vencimento +
+-- tempo_bloqueio) entre as multas do usuário com bloqueio, pagas ou não.
+CREATE TABLE Resumo_Usuario (
+    usuario_cpf VARCHAR2(11) PRIMARY KEY,
+    alugueis_ativos NUMBER DEFAULT 0 NOT NULL,
+    multas_pendentes NUMBER DEFAULT 0 NOT NULL,
+    valor_multas_pendentes NUMBER(12, 2) DEFAULT 0 NOT NULL,
+    bloqueado_ate DATE,
+    CONSTRAINT fk_resumo_usuario FOREIGN KEY (usuario_cpf) REFERENCES Usuario(cpf)
+);
+
+CREATE INDEX idx_resumo_usuario_divida ON Resumo_Usuario(valor_multas_pendentes);
+
+-- Estoque por ponto: bikes DISPONIVEL estacionadas em cada ponto, mantido pelo
+-- gatilho de Bike na mesma transação do aluguel, da devolução e da manutenção.
+CREATE TABLE Estoque_Ponto (
+    cod_ponto NUMBER PRIMARY KEY,
+    disponiveis NUMBER DEFAULT 0 NOT NULL,
+    CONSTRAINT fk_estoque_ponto FOREIGN KEY (cod_ponto) REFERENCES Ponto(cod_ponto)
+);
+
+-- Movimento por ponto e dia: retiradas (pela data de início) e devoluções (pela
+-- data de fim). pico_bikes é o maior número de bikes disponíveis no ponto
+-- observado a cada retirada/devolução do dia corrente; não é recalculável
+-- a partir do histórico. Organizada pelo dia para que uma janela de datas
+-- seja uma leitura por faixa da chave.
+CREATE TABLE Movimento_Ponto_Dia (
+    dia DATE NOT NULL,
+    cod_ponto NUMBER NOT NULL,
+    retiradas NUMBER DEFAULT 0 NOT NULL,
+    devolucoes NUMBER DEFAULT 0 NOT NULL,
+    pico_bikes NUMBER DEFAULT 0 NOT NULL,
+    CONSTRAINT pk_movimento_ponto_dia PRIMARY KEY (dia, cod_ponto),
+    CONSTRAINT fk_movimento_ponto FOREIGN KEY (cod_ponto) REFERENCES Ponto(cod_ponto)
+) ORGANIZATION INDEX;
+
+-- Cobertura de pontos por usuário: os pontos em que cada usuário já retirou
+-- uma bike e, por bairro, quantos são. "Usou todos (ou k%) dos pontos do bairro"
+-- vira uma faixa do índice de Cobertura_Usuario comparada com a contagem de
+-- pontos do bairro, em vez da divisão relacional sobre todo o Aluguel.
+-- Contagem feita com o bairro do ponto no momento da retirada; aluguéis
+-- arquivados continuam contando.
+CREATE TABLE Ponto_Visitado (
+    usuario_cpf VARCHAR2(11) NOT NULL,
+    cod_ponto NUMBER NOT NULL,
+    CONSTRAINT pk_ponto_visitado PRIMARY KEY (usuario_cpf, cod_ponto)
+) ORGANIZATION INDEX;
+
+CREATE TABLE Cobertura_Usuario (
+    cidade VARCHAR2(50) NOT NULL,
+    bairro VARCHAR2(50) NOT NULL,
+    usuario_cpf VARCHAR2(11) NOT NULL,
+    pontos_visitados NUMBER DEFAULT 0 NOT NULL,
+    CONSTRAINT pk_cobertura_usuario PRIMARY KEY (cidade, bairro, usuario_cpf)
+) ORGANIZATION INDEX;
+
+CREATE INDEX idx_cobertura_bairro ON Cobertura_Usuario(cidade, bairro, pontos_visitados);
+
+-- Soma um movimento ao dia do ponto, criando a linha na primeira vez
+CREATE OR REPLACE PROCEDURE registrar_movimento(
+    p_ponto NUMBER, p_dia DATE, p_retiradas NUMBER, p_devolucoes NUMBER
+) AS
+    v_pico NUMBER := 0;
+BEGIN
+    -- A bike em movimento já não conta como disponível (EM_USO), daí o + 1
+    IF p_dia = TRUNC(SYSDATE) THEN
+        SELECT NVL(MAX(disponiveis), 0) + 1 INTO v_pico FROM Estoque_Ponto
+        WHERE cod_ponto = p_ponto;
+    END IF;
+
+    UPDATE Movimento_Ponto_Dia SET
+        retiradas = retiradas + p_retiradas,
+        devolucoes = devolucoes + p_devolucoes,
+        pico_bikes = GREATEST(pico_bikes, v_pico)
+    WHERE dia = p_dia AND cod_ponto = p_ponto;
+
+    IF SQL%ROWCOUNT = 0 THEN
+        BEGIN
+            INSERT INTO Movimento_Ponto_Dia (dia, cod_ponto, retiradas, devolucoes, pico_bikes)
+            VALUES (p_dia, p_ponto, p_retiradas, p_devolucoes, v_pico);
+        EXCEPTION
+            -- Outra sessão criou a linha do dia entre o UPDATE e o INSERT
+            WHEN DUP_VAL_ON_INDEX THEN
+                UPDATE Movimento_Ponto_Dia SET
+                    retiradas = retiradas + p_retiradas,
+                    devolucoes = devolucoes + p_devolucoes,
+                    pico_bikes = GREATEST(pico_bikes, v_pico)
+                WHERE dia = p_dia AND cod_ponto = p_ponto;
+        END;
+    END IF;
+END;
+/
+
+-- Cada bike e cada usuário nasce com sua linha de resumo zerada
+CREATE OR REPLACE TRIGGER trg_resumo_bike_novo
+AFTER INSERT ON Bike
+FOR EACH ROW
+BEGIN
+    INSERT INTO Resumo_Bike (bike_n_registro) VALUES (:NEW.n_registro);
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_resumo_usuario_novo
+AFTER INSERT ON Usuario
+FOR EACH ROW
+BEGIN
+    INSERT INTO Resumo_Usuario (usuario_cpf) VALUES (:NEW.cpf);
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_estoque_ponto_novo
+AFTER INSERT ON Ponto
+FOR EACH ROW
+BEGIN
+    INSERT INTO Estoque_Ponto (cod_ponto) VALUES (:NEW.cod_ponto);
+END;
+/
+
+-- Retira a bike do estoque do ponto antigo e soma no novo quando ela entra ou
+-- sai de DISPONIVEL ou muda de ponto
+CREATE OR REPLACE TRIGGER trg_estoque_ponto
+AFTER INSERT OR UPDATE OF status, ponto_atual_id OR DELETE ON Bike
+FOR EACH ROW
+BEGIN
+    IF :OLD.status = 'DISPONIVEL' AND :NEW.status = 'DISPONIVEL'
+       AND :OLD.ponto_atual_id = :NEW.ponto_atual_id THEN
+        RETURN;
+    END IF;
+    IF :OLD.status = 'DISPONIVEL' AND :OLD.ponto_atual_id IS NOT NULL THEN
+        UPDATE Estoque_Ponto SET disponiveis = disponiveis - 1
+        WHERE cod_ponto = :OLD.ponto_atual_id;
+    END IF;
+    IF :NEW.status = 'DISPONIVEL' AND :NEW.ponto_atual_id IS NOT NULL THEN
+        UPDATE Estoque_Ponto SET disponiveis = disponiveis + 1
+        WHERE cod_ponto = :NEW.ponto_atual_id;
+    END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_resumo_bike_aluguel
+AFTER INSERT ON Aluguel
+FOR EACH ROW
+BEGIN
+    UPDATE Resumo_Bike SET total_alugueis = total_alugueis + 1
+    WHERE bike_n_registro = :NEW.bike_n_registro;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_resumo_usuario_aluguel
+AFTER INSERT OR UPDATE OF status, usuario_cpf OR DELETE ON Aluguel
+FOR EACH ROW
+BEGIN
+    IF :OLD.status = 'EM_ANDAMENTO' AND :NEW.status = 'EM_ANDAMENTO'
+       AND :OLD.usuario_cpf = :NEW.usuario_cpf THEN
+        RETURN;
+    END IF;
+    IF :OLD.status = 'EM_ANDAMENTO' THEN
+        UPDATE Resumo_Usuario SET alugueis_ativos = alugueis_ativos - 1
+        WHERE usuario_cpf = :OLD.usuario_cpf;
+    END IF;
+    IF :NEW.status = 'EM_ANDAMENTO' THEN
+        UPDATE Resumo_Usuario SET alugueis_ativos = alugueis_ativos + 1
+        WHERE usuario_cpf = :NEW.usuario_cpf;
+    END IF;
+END;
+/
+
+-- Exclusões em Comentario_Bike não são descontadas: o resumo preserva o histórico
+-- de avaliações mesmo quando comentários antigos são arquivados.
+CREATE OR REPLACE TRIGGER trg_resumo_bike_nota
+AFTER INSERT OR UPDATE OF nota ON Comentario_Bike
+FOR EACH ROW
+DECLARE
+    v_bike Aluguel.bike_n_registro%TYPE;
+BEGIN
+    SELECT bike_n_registro INTO v_bike FROM Aluguel WHERE id_aluguel = :NEW.aluguel_id;
+
+    UPDATE Resumo_Bike SET
+        qtd_notas = qtd_notas
+                    + CASE WHEN :NEW.nota IS NOT NULL THEN 1 ELSE 0 END
+                    - CASE WHEN :OLD.nota IS NOT NULL THEN 1 ELSE 0 END,
+        soma_notas = soma_notas + NVL(:NEW.nota, 0) - NVL(:OLD.nota, 0)
+    WHERE bike_n_registro = v_bike;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_resumo_usuario_multa
+AFTER INSERT OR UPDATE OF isPaid, valor OR DELETE ON Multa
+FOR EACH ROW
+DECLARE
+    v_cpf Aluguel.usuario_cpf%TYPE;
+    v_qtd NUMBER := 0;
+    v_valor NUMBER := 0;
+BEGIN
+    -- Desconta a contribuição antiga e soma a nova (apenas multas em aberto contam)
+    IF :OLD.isPaid = 0 THEN
+        v_qtd := v_qtd - 1;
+        v_valor := v_valor - :OLD.valor;
+    END IF;
+    IF :NEW.isPaid = 0 THEN
+        v_qtd := v_qtd + 1;
+        v_valor := v_valor + :NEW.valor;
+    END IF;
+
+    IF v_qtd != 0 OR v_valor != 0 THEN
+        SELECT usuario_cpf INTO v_cpf FROM Aluguel
+        WHERE id_aluguel = NVL(:NEW.aluguel_id, :OLD.aluguel_id);
+
+        UPDATE Resumo_Usuario SET
+            multas_pendentes = multas_pendentes + v_qtd,
+            valor_multas_pendentes = valor_multas_pendentes + v_valor
+        WHERE usuario_cpf = v_cpf;
+    END IF;
+END;
+/
+
+-- Exclusões (arquivamento) não são descontadas: o movimento de dias antigos
+-- continua disponível depois que os aluguéis vão para o histórico.
+CREATE OR REPLACE TRIGGER trg_movimento_ponto
+AFTER INSERT OR UPDATE OF ponto_devolucao_id, data_hora_fim ON Aluguel
+FOR EACH ROW
+BEGIN
+    IF INSERTING THEN
+        registrar_movimento(:NEW.ponto_retirada_id, TRUNC(:NEW.data_hora_inicio), 1, 0);
+    END IF;
+    IF :OLD.ponto_devolucao_id IS NOT NULL AND :OLD.data_hora_fim IS NOT NULL THEN
+        registrar_movimento(:OLD.ponto_devolucao_id, TRUNC(:OLD.data_hora_fim), 0, -1);
+    END IF;
+    IF :NEW.ponto_devolucao_id IS NOT NULL AND :NEW.data_hora_fim IS NOT NULL THEN
+        registrar_movimento(:NEW.ponto_devolucao_id, TRUNC(:NEW.data_hora_fim), 0, 1);
+    END IF;
+END;
+/
+
+-- O maior prazo de bloqueio não pode ser descontado linha a linha (ao excluir
+-- ou reduzir uma multa é preciso olhar as demais), então é recalculado uma vez
+-- por usuário afetado ao final do comando, quando Multa já pode ser consultada.
+CREATE OR REPLACE TRIGGER trg_resumo_usuario_bloqueio
+FOR INSERT OR UPDATE OF vencimento, tempo_bloqueio, aluguel_id OR DELETE ON Multa
+COMPOUND TRIGGER
+    TYPE t_usuarios IS TABLE OF NUMBER(1) INDEX BY VARCHAR2(11);
+    v_usuarios t_usuarios;
+
+    PROCEDURE marcar(p_aluguel NUMBER) IS
+        v_cpf Aluguel.usuario_cpf%TYPE;
+    BEGIN
+        SELECT usuario_cpf INTO v_cpf FROM Aluguel WHERE id_aluguel = p_aluguel;
+        v_usuarios(v_cpf) := 1;
+    END marcar;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF NVL(:NEW.tempo_bloqueio, 0) > 0 OR NVL(:OLD.tempo_bloqueio, 0) > 0 THEN
+            IF :OLD.aluguel_id IS NOT NULL THEN
+                marcar(:OLD.aluguel_id);
+            END IF;
+            IF :NEW.aluguel_id IS NOT NULL THEN
+                marcar(:NEW.aluguel_id);
+            END IF;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_cpf Aluguel.usuario_cpf%TYPE := v_usuarios.FIRST;
+    BEGIN
+        WHILE v_cpf IS NOT NULL LOOP
+            UPDATE Resumo_Usuario SET bloqueado_ate = (
+                SELECT MAX(M.vencimento + M.tempo_bloqueio)
+                FROM Aluguel A
+                JOIN Multa M ON A.id_aluguel = M.aluguel_id
+                WHERE A.usuario_cpf = v_cpf AND M.tempo_bloqueio > 0
+            )
+            WHERE usuario_cpf = v_cpf;
+            v_cpf := v_usuarios.NEXT(v_cpf);
+        END LOOP;
+    END AFTER STATEMENT;
+END trg_resumo_usuario_bloqueio;
+/
+
+-- Primeira retirada do usuário em um ponto: soma o ponto à cobertura do bairro
+CREATE OR REPLACE TRIGGER trg_cobertura_usuario
+AFTER INSERT ON Aluguel
+FOR EACH ROW
+DECLARE
+    v_cidade Ponto.cidade%TYPE;
+    v_bairro Ponto.bairro%TYPE;
+BEGIN
+    BEGIN
+        INSERT INTO Ponto_Visitado (usuario_cpf, cod_ponto)
+        VALUES (:NEW.usuario_cpf, :NEW.ponto_retirada_id);
+    EXCEPTION
+        -- Ponto já visitado: a cobertura não muda
+        WHEN DUP_VAL_ON_INDEX THEN
+            RETURN;
+    END;
+
+    SELECT cidade, bairro INTO v_cidade, v_bairro FROM Ponto WHERE cod_ponto = :NEW.ponto_retirada_id;
+    IF v_bairro IS NULL THEN
+        RETURN;
+    END IF;
+
+    UPDATE Cobertura_Usuario SET pontos_visitados = pontos_visitados + 1
+    WHERE cidade = v_cidade AND bairro = v_bairro AND usuario_cpf = :NEW.usuario_cpf;
+
+    IF SQL%ROWCOUNT = 0 THEN
+        BEGIN
+            INSERT INTO Cobertura_Usuario (cidade, bairro, usuario_cpf, pontos_visitados)
+            VALUES (v_cidade, v_bairro, :NEW.usuario_cpf, 1);
+        EXCEPTION
+            -- Outra sessão do mesmo usuário criou a linha do bairro entre o UPDATE e o INSERT
+            WHEN DUP_VAL_ON_INDEX THEN
+                UPDATE Cobertura_Usuario SET pontos_visitados = pontos_visitados + 1
+                WHERE cidade = v_cidade AND bairro = v_bairro AND usuario_cpf = :NEW.usuario_cpf;
+        END;
+    END IF;
+END;
+/
+
+-- Eventos: uma linha por mudança de estado. O aluguel informa o ponto de
+-- retirada ao começar e o de devolução ao terminar.
+CREATE OR REPLACE TRIGGER trg_evento_aluguel
+AFTER INSERT OR UPDATE OF status ON Aluguel
+FOR EACH ROW
+BEGIN
+    IF INSERTING OR NVL(:NEW.status, '-') != NVL(:OLD.status, '-') THEN
+        INSERT INTO Evento (entidade, status, aluguel_id, bike_n_registro, usuario_cpf, ponto_id, valor)
+        VALUES ('ALUGUEL', :NEW.status, :NEW.id_aluguel, :NEW.bike_n_registro, :NEW.usuario_cpf,
+                NVL(:NEW.ponto_devolucao_id, :NEW.ponto_retirada_id), :NEW.valor_aluguel);
+    END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_evento_manutencao
+AFTER INSERT OR UPDATE OF data_fim ON Manutencao
+FOR EACH ROW
+BEGIN
+    IF INSERTING OR (:OLD.data_fim IS NULL AND :NEW.data_fim IS NOT NULL) THEN
+        INSERT INTO Evento (entidade, status, manutencao_id, bike_n_registro, valor)
+        VALUES ('MANUTENCAO', CASE WHEN :NEW.data_fim IS NULL THEN 'ABERTA' ELSE 'CONCLUIDA' END,
+                :NEW.id_manutencao, :NEW.bike_n_registro, :NEW.valor);
+    END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_evento_bike
+AFTER INSERT OR UPDATE OF status, ponto_atual_id ON Bike
+FOR EACH ROW
+BEGIN
+    IF INSERTING OR NVL(:NEW.status, '-') != NVL(:OLD.status, '-')
+       OR NVL(:NEW.ponto_atual_id, -1) != NVL(:OLD.ponto_atual_id, -1) THEN
+        INSERT INTO Evento (entidade, status, bike_n_registro, ponto_id)
+        VALUES ('BIKE', :NEW.status, :NEW.n_registro, :NEW.ponto_atual_id);
+    END IF;
+END;
+/
+
+-- Recalcula os resumos a partir das tabelas de base (carga inicial em um banco
+-- já populado ou correção após manutenção manual). Uso: EXEC reconstruir_resumos;
+-- O resumo de bikes conta também os aluguéis arquivados; o de usuários não
+-- precisa deles (só aluguéis encerrados sem pendência são arquivados).
+CREATE OR REPLACE PROCEDURE reconstruir_resumos AS
+BEGIN
+    MERGE INTO Resumo_Bike R
+    USING (
+        SELECT B.n_registro,
+               COUNT(A.id_aluguel) AS total_alugueis,
+               COUNT(CB.nota) AS qtd_notas,
+               COALESCE(SUM(CB.nota), 0) AS soma_notas
+        FROM Bike B
+        LEFT JOIN (
+            SELECT id_aluguel, bike_n_registro FROM Aluguel
+            UNION ALL
+            SELECT id_aluguel, bike_n_registro FROM Aluguel_Historico
+        ) A ON B.n_registro = A.bike_n_registro
+        LEFT JOIN (
+            SELECT aluguel_id, nota FROM Comentario_Bike
+            UNION ALL
+            SELECT aluguel_id, nota FROM Comentario_Bike_Historico
+        ) CB ON A.id_aluguel = CB.aluguel_id
+        GROUP BY B.n_registro
+    ) S
+    ON (R.bike_n_registro = S.n_registro)
+    WHEN MATCHED THEN UPDATE SET
+        R.total_alugueis = S.total_alugueis, R.qtd_notas = S.qtd_notas, R.soma_notas = S.soma_notas
+    WHEN NOT MATCHED THEN INSERT (bike_n_registro, total_alugueis, qtd_notas, soma_notas)
+        VALUES (S.n_registro, S.total_alugueis, S.qtd_notas, S.soma_notas);
+
+    MERGE INTO Resumo_Usuario R
+    USING (
+        SELECT U.cpf,
+               COUNT(DISTINCT CASE WHEN A.status = 'EM_ANDAMENTO' THEN A.id_aluguel END) AS alugueis_ativos,
+               COUNT(CASE WHEN M.isPaid = 0 THEN M.id_multa END) AS multas_pendentes,
+               COALESCE(SUM(CASE WHEN M.isPaid = 0 THEN M.valor END), 0) AS valor_multas_pendentes,
+               MAX(CASE WHEN M.tempo_bloqueio > 0 THEN M.vencimento + M.tempo_bloqueio END) AS bloqueado_ate
+        FROM Usuario U
+        LEFT JOIN Aluguel A ON U.cpf = A.usuario_cpf
+        LEFT JOIN Multa M ON A.id_aluguel = M.aluguel_id
+        GROUP BY U.cpf
+    ) S
+    ON (R.usuario_cpf = S.cpf)
+    WHEN MATCHED THEN UPDATE SET
+        R.alugueis_ativos = S.alugueis_ativos,
+        R.multas_pendentes = S.multas_pendentes, R.valor_multas_pendentes = S.valor_multas_pendentes,
+        R.bloqueado_ate = S.bloqueado_ate
+    WHEN NOT MATCHED THEN INSERT (usuario_cpf, alugueis_ativos, multas_pendentes,
+                                  valor_multas_pendentes, bloqueado_ate)
+        VALUES (S.cpf, S.alugueis_ativos, S.multas_pendentes,
+                S.valor_multas_pendentes, S.bloqueado_ate);
+
+    MERGE INTO Estoque_Ponto R
+    USING (
+        SELECT P.cod_ponto, COUNT(B.n_registro) AS disponiveis
+        FROM Ponto P
+        LEFT JOIN Bike B ON B.ponto_atual_id = P.cod_ponto AND B.status = 'DISPONIVEL'
+        GROUP BY P.cod_ponto
+    ) S
+    ON (R.cod_ponto = S.cod_ponto)
+    WHEN MATCHED THEN UPDATE SET R.disponiveis = S.disponiveis
+    WHEN NOT MATCHED THEN INSERT (cod_ponto, disponiveis) VALUES (S.cod_ponto, S.disponiveis);
+
+    -- Movimento por ponto e dia; pico_bikes dos dias já registrados é mantido
+    MERGE INTO Movimento_Ponto_Dia R
+    USING (
+        SELECT dia, cod_ponto, SUM(retiradas) AS retiradas, SUM(devolucoes) AS devolucoes
+        FROM (
+            SELECT TRUNC(data_hora_inicio) AS dia, ponto_retirada_id AS cod_ponto,
+                   1 AS retiradas, 0 AS devolucoes
+            FROM Aluguel
+            UNION ALL
+            SELECT TRUNC(data_hora_fim), ponto_devolucao_id, 0, 1
+            FROM Aluguel
+            WHERE ponto_devolucao_id IS NOT NULL AND data_hora_fim IS NOT NULL
+            UNION ALL
+            SELECT TRUNC(data_hora_inicio), ponto_retirada_id, 1, 0
+            FROM Aluguel_Historico
+            UNION ALL
+            SELECT TRUNC(data_hora_fim), ponto_devolucao_id, 0, 1
+            FROM Aluguel_Historico
+            WHERE ponto_devolucao_id IS NOT NULL AND data_hora_fim IS NOT NULL
+        )
+        GROUP BY dia, cod_ponto
+    ) S
+    ON (R.dia = S.dia AND R.cod_ponto = S.cod_ponto)
+    WHEN MATCHED THEN UPDATE SET R.retiradas = S.retiradas, R.devolucoes = S.devolucoes
+    WHEN NOT MATCHED THEN INSERT (dia, cod_ponto, retiradas, devolucoes)
+        VALUES (S.dia, S.cod_ponto, S.retiradas, S.devolucoes);
+
+    -- Cobertura: pontos visitados (inclusive em aluguéis arquivados) e contagem por bairro
+    MERGE INTO Ponto_Visitado R
+    USING (
+        SELECT usuario_cpf, ponto_retirada_id AS cod_ponto FROM Aluguel
+        UNION
+        SELECT usuario_cpf, ponto_retirada_id FROM Aluguel_Historico
+    ) S
+    ON (R.usuario_cpf = S.usuario_cpf AND R.cod_ponto = S.cod_ponto)
+    WHEN NOT MATCHED THEN INSERT (usuario_cpf, cod_ponto) VALUES (S.usuario_cpf, S.cod_ponto);
+
+    MERGE INTO Cobertura_Usuario R
+    USING (
+        SELECT P.cidade, P.bairro, V.usuario_cpf, COUNT(*) AS pontos_visitados
+        FROM Ponto_Visitado V
+        JOIN Ponto P ON P.cod_ponto = V.cod_ponto
+        WHERE P.bairro IS NOT NULL
+        GROUP BY P.cidade, P.bairro, V.usuario_cpf
+    ) S
+    ON (R.cidade = S.cidade AND R.bairro = S.bairro AND R.usuario_cpf = S.usuario_cpf)
+    WHEN MATCHED THEN UPDATE SET R.pontos_visitados = S.pontos_visitados
+    WHEN NOT MATCHED THEN INSERT (cidade, bairro, usuario_cpf, pontos_visitados)
+        VALUES (S.cidade, S.bairro, S.usuario_cpf, S.pontos_visitados);
+
+    COMMIT;
+END;
+/
@@ -0,0 +1,595 @@
+-- PROJETO: GESTÃO DE BIKES NAS CIDADES - PARTE 3
+-- ARQUIVO: esquema_sqlite.sql
+-- Linguagem: SQL (SQLite 3.35+)
+-- GRUPO: G12
+
+-- Versão embutida do esquema.sql para desenvolvimento e testes sem um servidor
+-- Oracle (banco_local.py, DB_BACKEND=sqlite). Mesmas tabelas, colunas
+-- calculadas, restrições e resumos mantidos por gatilhos. Ficam de fora o
+-- particionamento, a compressão e as tabelas temporárias das rotinas em lote
+-- (rotinas.py continua exclusivo do Oracle; Checkpoint_Rotina fica para os
+-- consumidores de eventos e a reprecificação). A conta de tarifar_aluguel é
+-- feita em Python na devolução (banco_local.py, tarifas.py).
+-- Diferenças de tipo: identidade = INTEGER PRIMARY KEY AUTOINCREMENT; datas são
+-- texto 'AAAA-MM-DD HH:MM:SS' (ordem do texto = ordem cronológica); o tamanho
+-- de VARCHAR não é imposto pelo SQLite.
+
+
+-- Tabela USUARIO
+CREATE TABLE Usuario (
+    cpf VARCHAR(11) PRIMARY KEY,
+    nome VARCHAR(100) NOT NULL,
+    data_nasc DATE NOT NULL,
+    rua VARCHAR(100),
+    numero VARCHAR(10),
+    bairro VARCHAR(50),
+    cidade VARCHAR(50),
+    uf CHAR(2),
+    is_cadUnico INTEGER DEFAULT 0 CHECK (is_cadUnico IN (0, 1))
+);
+
+-- Tabela PONTO (Pontos de Estacionamento)
+CREATE TABLE Ponto (
+    cod_ponto INTEGER PRIMARY KEY AUTOINCREMENT,
+    rua VARCHAR(100) NOT NULL,
+    numero VARCHAR(10),
+    bairro VARCHAR(50),
+    cidade VARCHAR(50) NOT NULL,
+    uf CHAR(2) NOT NULL,
+    referencia VARCHAR(100),
+    capacidade_maxima INTEGER CHECK (capacidade_maxima > 0)
+);
+
+-- Tabela CARTAO
+CREATE TABLE Cartao (
+    id_cartao INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_cpf VARCHAR(11) NOT NULL UNIQUE,
+    saldo NUMERIC(10, 2) DEFAULT 0.00 CHECK (saldo >= 0),
+    data_validade DATE NOT NULL,
+    data_emissao DATE DEFAULT (datetime('now', 'localtime')),
+    CONSTRAINT fk_cartao_usuario FOREIGN KEY (usuario_cpf) REFERENCES Usuario(cpf)
+);
+
+-- Tabela BIKE
+CREATE TABLE Bike (
+    n_registro INTEGER PRIMARY KEY AUTOINCREMENT,
+    modelo VARCHAR(50) NOT NULL,
+    ano_fabricacao INTEGER,
+    cor VARCHAR(30),
+    qnt_alugueis INTEGER DEFAULT 0,
+    status VARCHAR(20) CHECK (status IN ('DISPONIVEL', 'EM_USO', 'MANUTENCAO')),
+    tempo_total_utilizado NUMERIC DEFAULT 0, -- Em minutos
+    ponto_atual_id INTEGER,
+    CONSTRAINT fk_bike_ponto FOREIGN KEY (ponto_atual_id) REFERENCES Ponto(cod_ponto)
+);
+
+-- Tabela ALUGUEL
+CREATE TABLE Aluguel (
+    id_aluguel INTEGER PRIMARY KEY AUTOINCREMENT,
+    bike_n_registro INTEGER NOT NULL,
+    usuario_cpf VARCHAR(11) NOT NULL,
+    ponto_retirada_id INTEGER NOT NULL,
+    ponto_devolucao_id INTEGER,
+    data_hora_inicio TIMESTAMP NOT NULL,
+    data_hora_fim TIMESTAMP,
+    valor_aluguel NUMERIC(10, 2),
+
+    -- Coluna Calculada
+    -- Minutos inteiros entre início e fim (os segundos são descartados, como no Oracle)
+    periodo_alugado INTEGER GENERATED ALWAYS AS (
+        (strftime('%s', data_hora_fim) - strftime('%s', data_hora_inicio)) / 60
+    ) VIRTUAL,
+
+    status VARCHAR(20) CHECK (status IN ('EM_ANDAMENTO', 'CONCLUIDO', 'CANCELADO')),
+
+    -- Coluna Calculada
+    -- Início só enquanto o aluguel está em andamento
+    aberto_desde TIMESTAMP GENERATED ALWAYS AS (
+        CASE WHEN status = 'EM_ANDAMENTO' THEN data_hora_inicio END
+    ) VIRTUAL,
+
+    CONSTRAINT fk_aluguel_bike FOREIGN KEY (bike_n_registro) REFERENCES Bike(n_registro),
+    CONSTRAINT fk_aluguel_usuario FOREIGN KEY (usuario_cpf) REFERENCES Usuario(cpf),
+    CONSTRAINT fk_aluguel_ponto_ret FOREIGN KEY (ponto_retirada_id) REFERENCES Ponto(cod_ponto),
+    CONSTRAINT fk_aluguel_ponto_dev FOREIGN KEY (ponto_devolucao_id) REFERENCES Ponto(cod_ponto),
+    CONSTRAINT chk_status_devolucao CHECK (
+        (status = 'CONCLUIDO' AND ponto_devolucao_id IS NOT NULL AND data_hora_fim IS NOT NULL) OR
+        (status = 'EM_ANDAMENTO' AND ponto_devolucao_id IS NULL AND data_hora_fim IS NULL) OR
+        (status = 'CANCELADO')
+    )
+);
+
+-- Tabela MANUTENCAO
+CREATE TABLE Manutencao (
+    id_manutencao INTEGER PRIMARY KEY AUTOINCREMENT,
+    bike_n_registro INTEGER NOT NULL,
+    tipo VARCHAR(20) CHECK (tipo IN ('PREVENTIVA', 'CORRETIVA', 'ANTECIPADA')),
+    valor NUMERIC(10, 2),
+    data_inicio DATE NOT NULL,
+    data_fim DATE,
+    descricao_problema VARCHAR(4000),
+
+    -- Coluna Calculada
+    -- Data de início só enquanto a manutenção está aberta
+    aberta_desde DATE GENERATED ALWAYS AS (
+        CASE WHEN data_fim IS NULL THEN data_inicio END
+    ) VIRTUAL,
+    CONSTRAINT fk_manutencao_bike FOREIGN KEY (bike_n_registro) REFERENCES Bike(n_registro)
+);
+
+-- Tabela MULTA
+CREATE TABLE Multa (
+    id_multa INTEGER PRIMARY KEY AUTOINCREMENT,
+    aluguel_id INTEGER NOT NULL,
+    valor NUMERIC(10, 2) NOT NULL,
+    tipo VARCHAR(50) CHECK (tipo IN ('ATRASO', 'DANO', 'NAO_DEVOLUCAO')),
+    vencimento DATE NOT NULL,
+    data_pagamento_multa DATE,
+    isPaid INTEGER DEFAULT 0 CHECK (isPaid IN (0, 1)),
+    tempo_bloqueio INTEGER DEFAULT 0, -- Em dias
+    CONSTRAINT fk_multa_aluguel FOREIGN KEY (aluguel_id) REFERENCES Aluguel(id_aluguel)
+);
+
+-- Tabela COMENTARIO_BIKE
+CREATE TABLE Comentario_Bike (
+    aluguel_id INTEGER PRIMARY KEY,
+    nota INTEGER CHECK (nota BETWEEN 0 AND 10),
+    freios VARCHAR(20),
+    rodas VARCHAR(20),
+    aparencia VARCHAR(20),
+    acessorios VARCHAR(20),
+    pecas VARCHAR(20),
+    texto_livre VARCHAR(4000),
+    CONSTRAINT fk_comm_bike_aluguel FOREIGN KEY (aluguel_id) REFERENCES Aluguel(id_aluguel)
+);
+
+-- Tabela COMENTARIO_PONTO
+CREATE TABLE Comentario_Ponto (
+    aluguel_id INTEGER PRIMARY KEY,
+    nota INTEGER CHECK (nota BETWEEN 0 AND 10),
+    sistema_aluguel VARCHAR(20),
+    disponibilidade VARCHAR(20),
+    n_bikes_avaliacao VARCHAR(20),
+    aparencia_geral VARCHAR(20),
+    CONSTRAINT fk_comm_ponto_aluguel FOREIGN KEY (aluguel_id) REFERENCES Aluguel(id_aluguel)
+);
+
+-- Tabela COMENTARIO_TIPO
+CREATE TABLE Comentario_Tipo (
+    id_historico INTEGER PRIMARY KEY AUTOINCREMENT,
+    aluguel_id INTEGER NOT NULL,
+    tipo VARCHAR(10) CHECK (tipo IN ('BIKE', 'PONTO')),
+    CONSTRAINT fk_comm_tipo_aluguel FOREIGN KEY (aluguel_id) REFERENCES Aluguel(id_aluguel)
+);
+
+-- ÍNDICES
+-- Os mesmos do esquema.sql; os índices sobre colunas que só têm valor nas linhas
+-- abertas são parciais (o SQLite indexa também os NULL).
+CREATE INDEX idx_aluguel_usuario_status ON Aluguel(usuario_cpf, status);
+CREATE INDEX idx_aluguel_bike ON Aluguel(bike_n_registro);
+CREATE INDEX idx_aluguel_ponto_ret ON Aluguel(ponto_retirada_id);
+CREATE INDEX idx_aluguel_ponto_dev ON Aluguel(ponto_devolucao_id);
+CREATE INDEX idx_aluguel_inicio ON Aluguel(data_hora_inicio);
+CREATE INDEX idx_aluguel_aberto ON Aluguel(aberto_desde) WHERE aberto_desde IS NOT NULL;
+
+CREATE INDEX idx_multa_aluguel_pendente ON Multa(aluguel_id, isPaid, valor);
+CREATE UNIQUE INDEX ux_multa_automatica ON Multa(aluguel_id, tipo)
+    WHERE tipo IN ('ATRASO', 'NAO_DEVOLUCAO');
+
+CREATE INDEX idx_manutencao_bike_aberta ON Manutencao(bike_n_registro, data_fim);
+CREATE INDEX idx_manutencao_aberta ON Manutencao(aberta_desde) WHERE aberta_desde IS NOT NULL;
+
+CREATE INDEX idx_bike_ponto_status ON Bike(ponto_atual_id, status);
+
+CREATE INDEX idx_ponto_cidade_bairro ON Ponto(cidade, bairro);
+
+-- ARQUIVO HISTÓRICO
+-- Lidas pelo histórico do usuário; o arquivamento (rotinas.py) só roda no Oracle
+CREATE TABLE Aluguel_Historico AS SELECT * FROM Aluguel WHERE 1 = 0;
+CREATE TABLE Multa_Historico AS SELECT * FROM Multa WHERE 1 = 0;
+CREATE TABLE Comentario_Bike_Historico AS SELECT * FROM Comentario_Bike WHERE 1 = 0;
+CREATE TABLE Comentario_Ponto_Historico AS SELECT * FROM Comentario_Ponto WHERE 1 = 0;
+CREATE TABLE Comentario_Tipo_Historico AS SELECT * FROM Comentario_Tipo WHERE 1 = 0;
+
+CREATE INDEX idx_aluguel_hist_usuario ON Aluguel_Historico(usuario_cpf);
+CREATE INDEX idx_aluguel_hist_id ON Aluguel_Historico(id_aluguel);
+CREATE INDEX idx_comm_bike_hist_aluguel ON Comentario_Bike_Historico(aluguel_id);
+CREATE INDEX idx_comm_ponto_hist_aluguel ON Comentario_Ponto_Historico(aluguel_id);
+
+-- Cobertura de pontos por usuário (pontos já visitados e contagem por bairro)
+CREATE TABLE Ponto_Visitado (
+    usuario_cpf VARCHAR(11) NOT NULL,
+    cod_ponto INTEGER NOT NULL,
+    CONSTRAINT pk_ponto_visitado PRIMARY KEY (usuario_cpf, cod_ponto)
+) WITHOUT ROWID;
+
+CREATE TABLE Cobertura_Usuario (
+    cidade VARCHAR(50) NOT NULL,
+    bairro VARCHAR(50) NOT NULL,
+    usuario_cpf VARCHAR(11) NOT NULL,
+    pontos_visitados INTEGER DEFAULT 0 NOT NULL,
+    CONSTRAINT pk_cobertura_usuario PRIMARY KEY (cidade, bairro, usuario_cpf)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_cobertura_bairro ON Cobertura_Usuario(cidade, bairro, pontos_visitados);
+
+-- TARIFAS (versões e faixas horárias; regra de cobrança no esquema.sql)
+CREATE TABLE Tarifa (
+    id_tarifa INTEGER PRIMARY KEY AUTOINCREMENT,
+    vigente_desde TIMESTAMP NOT NULL CONSTRAINT ux_tarifa_vigencia UNIQUE,
+    valor_minuto NUMERIC(10, 4) NOT NULL CHECK (valor_minuto >= 0),
+    minutos_franquia NUMERIC DEFAULT 0 NOT NULL CHECK (minutos_franquia >= 0),
+    valor_maximo NUMERIC(10, 2) CHECK (valor_maximo >= 0),
+    minutos_limite NUMERIC CHECK (minutos_limite > 0),
+    valor_minuto_excedente NUMERIC(10, 4) DEFAULT 0 NOT NULL CHECK (valor_minuto_excedente >= 0),
+    desconto_cad_unico NUMERIC(5, 2) DEFAULT 100 NOT NULL
+        CHECK (desconto_cad_unico BETWEEN 0 AND 100),
+    descricao VARCHAR(200)
+);
+
+CREATE TABLE Tarifa_Faixa (
+    id_tarifa INTEGER NOT NULL,
+    hora_inicio INTEGER NOT NULL CHECK (hora_inicio BETWEEN 0 AND 23),
+    hora_fim INTEGER NOT NULL CHECK (hora_fim BETWEEN 1 AND 24),
+    fator NUMERIC(5, 2) NOT NULL CHECK (fator >= 0),
+    CONSTRAINT pk_tarifa_faixa PRIMARY KEY (id_tarifa, hora_inicio),
+    CONSTRAINT fk_tarifa_faixa FOREIGN KEY (id_tarifa) REFERENCES Tarifa(id_tarifa),
+    CONSTRAINT chk_tarifa_faixa_horas CHECK (hora_fim > hora_inicio)
+);
+
+INSERT INTO Tarifa (vigente_desde, valor_minuto, descricao)
+VALUES ('2000-01-01 00:00:00', 0.10, 'R$ 0,10 por minuto');
+
+-- EVENTOS (OUTBOX) e checkpoints dos consumidores (eventos.py)
+CREATE TABLE Evento (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    entidade VARCHAR(20) NOT NULL CHECK (entidade IN ('ALUGUEL', 'MANUTENCAO', 'BIKE')),
+    status VARCHAR(20),
+    aluguel_id INTEGER,
+    manutencao_id INTEGER,
+    bike_n_registro INTEGER,
+    usuario_cpf VARCHAR(11),
+    ponto_id INTEGER,
+    valor NUMERIC(10, 2),
+    criado_em DATE DEFAULT (datetime('now', 'localtime')) NOT NULL
+);
+
+CREATE TABLE Checkpoint_Rotina (
+    rotina VARCHAR(50) PRIMARY KEY,
+    ultima_data TIMESTAMP,
+    ultimo_id INTEGER,
+    atualizado_em DATE DEFAULT (datetime('now', 'localtime')) NOT NULL
+);
+
+CREATE TABLE Evento_Lacuna (
+    rotina VARCHAR(50) NOT NULL,
+    seq INTEGER NOT NULL,
+    situacao VARCHAR(10) DEFAULT 'ABERTA' NOT NULL
+        CHECK (situacao IN ('ABERTA', 'ENTREGUE', 'EXPIRADA')),
+    pulada_em DATE DEFAULT (datetime('now', 'localtime')) NOT NULL,
+    CONSTRAINT pk_evento_lacuna PRIMARY KEY (rotina, seq)
+);
+
+-- TABELAS DE RESUMO
+CREATE TABLE Resumo_Bike (
+    bike_n_registro INTEGER PRIMARY KEY,
+    total_alugueis INTEGER DEFAULT 0 NOT NULL,
+    qtd_notas INTEGER DEFAULT 0 NOT NULL,
+    soma_notas INTEGER DEFAULT 0 NOT NULL,
+    CONSTRAINT fk_resumo_bike FOREIGN KEY (bike_n_registro) REFERENCES Bike(n_registro)
+);
+
+CREATE TABLE Resumo_Usuario (
+    usuario_cpf VARCHAR(11) PRIMARY KEY,
+    alugueis_ativos INTEGER DEFAULT 0 NOT NULL,
+    multas_pendentes INTEGER DEFAULT 0 NOT NULL,
+    valor_multas_pendentes NUMERIC(12, 2) DEFAULT 0 NOT NULL,
+    bloqueado_ate DATE,
+    CONSTRAINT fk_resumo_usuario FOREIGN KEY (usuario_cpf) REFERENCES Usuario(cpf)
+);
+
+CREATE INDEX idx_resumo_usuario_divida ON Resumo_Usuario(valor_multas_pendentes);
+
+CREATE TABLE Estoque_Ponto (
+    cod_ponto INTEGER PRIMARY KEY,
+    disponiveis INTEGER DEFAULT 0 NOT NULL,
+    CONSTRAINT fk_estoque_ponto FOREIGN KEY (cod_ponto) REFERENCES Ponto(cod_ponto)
+);
+
+-- Organizada pela chave, como a tabela organizada por índice do Oracle
+CREATE TABLE Movimento_Ponto_Dia (
+    dia DATE NOT NULL,
+    cod_ponto INTEGER NOT NULL,
+    retiradas INTEGER DEFAULT 0 NOT NULL,
+    devolucoes INTEGER DEFAULT 0 NOT NULL,
+    pico_bikes INTEGER DEFAULT 0 NOT NULL,
+    CONSTRAINT pk_movimento_ponto_dia PRIMARY KEY (dia, cod_ponto),
+    CONSTRAINT fk_movimento_ponto FOREIGN KEY (cod_ponto) REFERENCES Ponto(cod_ponto)
+) WITHOUT ROWID;
+
+-- GATILHOS
+-- Mesmas regras dos gatilhos do esquema.sql. O SQLite não tem gatilhos para
+-- vários eventos nem procedimentos, então cada evento tem o seu gatilho e
+-- registrar_movimento vira um INSERT ... ON CONFLICT DO UPDATE.
+
+CREATE TRIGGER trg_resumo_bike_novo
+AFTER INSERT ON Bike
+BEGIN
+    INSERT INTO Resumo_Bike (bike_n_registro) VALUES (NEW.n_registro);
+END;
+
+CREATE TRIGGER trg_resumo_usuario_novo
+AFTER INSERT ON Usuario
+BEGIN
+    INSERT INTO Resumo_Usuario (usuario_cpf) VALUES (NEW.cpf);
+END;
+
+CREATE TRIGGER trg_estoque_ponto_novo
+AFTER INSERT ON Ponto
+BEGIN
+    INSERT INTO Estoque_Ponto (cod_ponto) VALUES (NEW.cod_ponto);
+END;
+
+CREATE TRIGGER trg_estoque_ponto_insercao
+AFTER INSERT ON Bike
+WHEN NEW.status = 'DISPONIVEL' AND NEW.ponto_atual_id IS NOT NULL
+BEGIN
+    UPDATE Estoque_Ponto SET disponiveis = disponiveis + 1
+    WHERE cod_ponto = NEW.ponto_atual_id;
+END;
+
+CREATE TRIGGER trg_estoque_ponto
+AFTER UPDATE OF status, ponto_atual_id ON Bike
+WHEN OLD.status IS NOT NEW.status OR OLD.ponto_atual_id IS NOT NEW.ponto_atual_id
+BEGIN
+    UPDATE Estoque_Ponto SET disponiveis = disponiveis - 1
+    WHERE OLD.status = 'DISPONIVEL' AND cod_ponto = OLD.ponto_atual_id;
+    UPDATE Estoque_Ponto SET disponiveis = disponiveis + 1
+    WHERE NEW.status = 'DISPONIVEL' AND cod_ponto = NEW.ponto_atual_id;
+END;
+
+CREATE TRIGGER trg_estoque_ponto_exclusao
+AFTER DELETE ON Bike
+WHEN OLD.status = 'DISPONIVEL' AND OLD.ponto_atual_id IS NOT NULL
+BEGIN
+    UPDATE Estoque_Ponto SET disponiveis = disponiveis - 1
+    WHERE cod_ponto = OLD.ponto_atual_id;
+END;
+
+CREATE TRIGGER trg_resumo_bike_aluguel
+AFTER INSERT ON Aluguel
+BEGIN
+    UPDATE Resumo_Bike SET total_alugueis = total_alugueis + 1
+    WHERE bike_n_registro = NEW.bike_n_registro;
+END;
+
+CREATE TRIGGER trg_resumo_usuario_aluguel_insercao
+AFTER INSERT ON Aluguel
+WHEN NEW.status = 'EM_ANDAMENTO'
+BEGIN
+    UPDATE Resumo_Usuario SET alugueis_ativos = alugueis_ativos + 1
+    WHERE usuario_cpf = NEW.usuario_cpf;
+END;
+
+CREATE TRIGGER trg_resumo_usuario_aluguel
+AFTER UPDATE OF status, usuario_cpf ON Aluguel
+WHEN OLD.status IS NOT NEW.status OR OLD.usuario_cpf IS NOT NEW.usuario_cpf
+BEGIN
+    UPDATE Resumo_Usuario SET alugueis_ativos = alugueis_ativos - 1
+    WHERE OLD.status = 'EM_ANDAMENTO' AND usuario_cpf = OLD.usuario_cpf;
+    UPDATE Resumo_Usuario SET alugueis_ativos = alugueis_ativos + 1
+    WHERE NEW.status = 'EM_ANDAMENTO' AND usuario_cpf = NEW.usuario_cpf;
+END;
+
+CREATE TRIGGER trg_resumo_usuario_aluguel_exclusao
+AFTER DELETE ON Aluguel
+WHEN OLD.status = 'EM_ANDAMENTO'
+BEGIN
+    UPDATE Resumo_Usuario SET alugueis_ativos = alugueis_ativos - 1
+    WHERE usuario_cpf = OLD.usuario_cpf;
+END;
+
+CREATE TRIGGER trg_resumo_bike_nota_insercao
+AFTER INSERT ON Comentario_Bike
+WHEN NEW.nota IS NOT NULL
+BEGIN
+    UPDATE Resumo_Bike SET qtd_notas = qtd_notas + 1, soma_notas = soma_notas + NEW.nota
+    WHERE bike_n_registro = (SELECT bike_n_registro FROM Aluguel WHERE id_aluguel = NEW.aluguel_id);
+END;
+
+CREATE TRIGGER trg_resumo_bike_nota
+AFTER UPDATE OF nota ON Comentario_Bike
+BEGIN
+    UPDATE Resumo_Bike SET
+        qtd_notas = qtd_notas
+                    + CASE WHEN NEW.nota IS NOT NULL THEN 1 ELSE 0 END
+                    - CASE WHEN OLD.nota IS NOT NULL THEN 1 ELSE 0 END,
+        soma_notas = soma_notas + IFNULL(NEW.nota, 0) - IFNULL(OLD.nota, 0)
+    WHERE bike_n_registro = (SELECT bike_n_registro FROM Aluguel WHERE id_aluguel = NEW.aluguel_id);
+END;
+
+CREATE TRIGGER trg_resumo_usuario_multa_insercao
+AFTER INSERT ON Multa
+WHEN NEW.isPaid = 0
+BEGIN
+    UPDATE Resumo_Usuario SET
+        multas_pendentes = multas_pendentes + 1,
+        valor_multas_pendentes = valor_multas_pendentes + NEW.valor
+    WHERE usuario_cpf = (SELECT usuario_cpf FROM Aluguel WHERE id_aluguel = NEW.aluguel_id);
+END;
+
+CREATE TRIGGER trg_resumo_usuario_multa
+AFTER UPDATE OF isPaid, valor ON Multa
+BEGIN
+    UPDATE Resumo_Usuario SET
+        multas_pendentes = multas_pendentes
+                           + CASE WHEN NEW.isPaid = 0 THEN 1 ELSE 0 END
+                           - CASE WHEN OLD.isPaid = 0 THEN 1 ELSE 0 END,
+        valor_multas_pendentes = valor_multas_pendentes
+                                 + CASE WHEN NEW.isPaid = 0 THEN NEW.valor ELSE 0 END
+                                 - CASE WHEN OLD.isPaid = 0 THEN OLD.valor ELSE 0 END
+    WHERE usuario_cpf = (SELECT usuario_cpf FROM Aluguel WHERE id_aluguel = NEW.aluguel_id);
+END;
+
+CREATE TRIGGER trg_resumo_usuario_multa_exclusao
+AFTER DELETE ON Multa
+WHEN OLD.isPaid = 0
+BEGIN
+    UPDATE Resumo_Usuario SET
+        multas_pendentes = multas_pendentes - 1,
+        valor_multas_pendentes = valor_multas_pendentes - OLD.valor
+    WHERE usuario_cpf = (SELECT usuario_cpf FROM Aluguel WHERE id_aluguel = OLD.aluguel_id);
+END;
+
+-- Maior prazo de bloqueio recalculado para os usuários afetados; no SQLite o
+-- gatilho de linha já enxerga a tabela alterada, sem o gatilho composto do Oracle
+CREATE TRIGGER trg_resumo_usuario_bloqueio_insercao
+AFTER INSERT ON Multa
+WHEN NEW.tempo_bloqueio > 0
+BEGIN
+    UPDATE Resumo_Usuario SET bloqueado_ate = (
+        SELECT MAX(datetime(M.vencimento, '+' || M.tempo_bloqueio || ' days'))
+        FROM Aluguel A
+        JOIN Multa M ON A.id_aluguel = M.aluguel_id
+        WHERE A.usuario_cpf = Resumo_Usuario.usuario_cpf AND M.tempo_bloqueio > 0
+    )
+    WHERE usuario_cpf = (SELECT usuario_cpf FROM Aluguel WHERE id_aluguel = NEW.aluguel_id);
+END;
+
+CREATE TRIGGER trg_resumo_usuario_bloqueio
+AFTER UPDATE OF vencimento, tempo_bloqueio, aluguel_id ON Multa
+WHEN IFNULL(NEW.tempo_bloqueio, 0) > 0 OR IFNULL(OLD.tempo_bloqueio, 0) > 0
+BEGIN
+    UPDATE Resumo_Usuario SET bloqueado_ate = (
+        SELECT MAX(datetime(M.vencimento, '+' || M.tempo_bloqueio || ' days'))
+        FROM Aluguel A
+        JOIN Multa M ON A.id_aluguel = M.aluguel_id
+        WHERE A.usuario_cpf = Resumo_Usuario.usuario_cpf AND M.tempo_bloqueio > 0
+    )
+    WHERE usuario_cpf IN (SELECT usuario_cpf FROM Aluguel
+                          WHERE id_aluguel IN (OLD.aluguel_id, NEW.aluguel_id));
+END;
+
+CREATE TRIGGER trg_resumo_usuario_bloqueio_exclusao
+AFTER DELETE ON Multa
+WHEN OLD.tempo_bloqueio > 0
+BEGIN
+    UPDATE Resumo_Usuario SET bloqueado_ate = (
+        SELECT MAX(datetime(M.vencimento, '+' || M.tempo_bloqueio || ' days'))
+        FROM Aluguel A
+        JOIN Multa M ON A.id_aluguel = M.aluguel_id
+        WHERE A.usuario_cpf = Resumo_Usuario.usuario_cpf AND M.tempo_bloqueio > 0
+    )
+    WHERE usuario_cpf = (SELECT usuario_cpf FROM Aluguel WHERE id_aluguel = OLD.aluguel_id);
+END;
+
+-- Movimento por ponto e dia. pico_bikes só é observado no dia corrente; a bike
+-- em movimento já não conta como disponível (EM_USO), daí o + 1
+CREATE TRIGGER trg_movimento_ponto_retirada
+AFTER INSERT ON Aluguel
+BEGIN
+    INSERT INTO Movimento_Ponto_Dia (dia, cod_ponto, retiradas, devolucoes, pico_bikes)
+    VALUES (
+        datetime(NEW.data_hora_inicio, 'start of day'), NEW.ponto_retirada_id, 1, 0,
+        CASE WHEN date(NEW.data_hora_inicio) = date('now', 'localtime') THEN
+            (SELECT IFNULL(MAX(disponiveis), 0) + 1 FROM Estoque_Ponto
+             WHERE cod_ponto = NEW.ponto_retirada_id)
+        ELSE 0 END
+    )
+    ON CONFLICT (dia, cod_ponto) DO UPDATE SET
+        retiradas = retiradas + 1,
+        pico_bikes = MAX(pico_bikes, excluded.pico_bikes);
+
+    -- Aluguel inserido já concluído (dados.sql, cargas): conta também a devolução
+    INSERT INTO Movimento_Ponto_Dia (dia, cod_ponto, retiradas, devolucoes, pico_bikes)
+    SELECT datetime(NEW.data_hora_fim, 'start of day'), NEW.ponto_devolucao_id, 0, 1,
+           CASE WHEN date(NEW.data_hora_fim) = date('now', 'localtime') THEN
+               (SELECT IFNULL(MAX(disponiveis), 0) + 1 FROM Estoque_Ponto
+                WHERE cod_ponto = NEW.ponto_devolucao_id)
+           ELSE 0 END
+    WHERE NEW.ponto_devolucao_id IS NOT NULL AND NEW.data_hora_fim IS NOT NULL
+    ON CONFLICT (dia, cod_ponto) DO UPDATE SET
+        devolucoes = devolucoes + 1,
+        pico_bikes = MAX(pico_bikes, excluded.pico_bikes);
+END;
+
+CREATE TRIGGER trg_movimento_ponto
+AFTER UPDATE OF ponto_devolucao_id, data_hora_fim ON Aluguel
+BEGIN
+    UPDATE Movimento_Ponto_Dia SET devolucoes = devolucoes - 1
+    WHERE OLD.ponto_devolucao_id IS NOT NULL AND OLD.data_hora_fim IS NOT NULL
+      AND dia = datetime(OLD.data_hora_fim, 'start of day') AND cod_ponto = OLD.ponto_devolucao_id;
+
+    INSERT INTO Movimento_Ponto_Dia (dia, cod_ponto, retiradas, devolucoes, pico_bikes)
+    SELECT datetime(NEW.data_hora_fim, 'start of day'), NEW.ponto_devolucao_id, 0, 1,
+           CASE WHEN date(NEW.data_hora_fim) = date('now', 'localtime') THEN
+               (SELECT IFNULL(MAX(disponiveis), 0) + 1 FROM Estoque_Ponto
+                WHERE cod_ponto = NEW.ponto_devolucao_id)
+           ELSE 0 END
+    WHERE NEW.ponto_devolucao_id IS NOT NULL AND NEW.data_hora_fim IS NOT NULL
+    ON CONFLICT (dia, cod_ponto) DO UPDATE SET
+        devolucoes = devolucoes + 1,
+        pico_bikes = MAX(pico_bikes, excluded.pico_bikes);
+END;
+
+-- Primeira retirada do usuário em um ponto: soma o ponto à cobertura do bairro
+CREATE TRIGGER trg_cobertura_usuario
+AFTER INSERT ON Aluguel
+WHEN NOT EXISTS (SELECT 1 FROM Ponto_Visitado
+                 WHERE usuario_cpf = NEW.usuario_cpf AND cod_ponto = NEW.ponto_retirada_id)
+BEGIN
+    INSERT INTO Ponto_Visitado (usuario_cpf, cod_ponto) VALUES (NEW.usuario_cpf, NEW.ponto_retirada_id);
+    INSERT INTO Cobertura_Usuario (cidade, bairro, usuario_cpf, pontos_visitados)
+    SELECT cidade, bairro, NEW.usuario_cpf, 1 FROM Ponto
+    WHERE cod_ponto = NEW.ponto_retirada_id AND bairro IS NOT NULL
+    ON CONFLICT (cidade, bairro, usuario_cpf) DO UPDATE SET pontos_visitados = pontos_visitados + 1;
+END;
+
+-- Eventos (outbox): um gatilho por operação, com as mesmas condições do esquema.sql
+CREATE TRIGGER trg_evento_aluguel_insercao
+AFTER INSERT ON Aluguel
+BEGIN
+    INSERT INTO Evento (entidade, status, aluguel_id, bike_n_registro, usuario_cpf, ponto_id, valor)
+    VALUES ('ALUGUEL', NEW.status, NEW.id_aluguel, NEW.bike_n_registro, NEW.usuario_cpf,
+            IFNULL(NEW.ponto_devolucao_id, NEW.ponto_retirada_id), NEW.valor_aluguel);
+END;
+
+CREATE TRIGGER trg_evento_aluguel
+AFTER UPDATE OF status ON Aluguel
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    INSERT INTO Evento (entidade, status, aluguel_id, bike_n_registro, usuario_cpf, ponto_id, valor)
+    VALUES ('ALUGUEL', NEW.status, NEW.id_aluguel, NEW.bike_n_registro, NEW.usuario_cpf,
+            IFNULL(NEW.ponto_devolucao_id, NEW.ponto_retirada_id), NEW.valor_aluguel);
+END;
+
+CREATE TRIGGER trg_evento_manutencao_insercao
+AFTER INSERT ON Manutencao
+BEGIN
+    INSERT INTO Evento (entidade, status, manutencao_id, bike_n_registro, valor)
+    VALUES ('MANUTENCAO', CASE WHEN NEW.data_fim IS NULL THEN 'ABERTA' ELSE 'CONCLUIDA' END,
+            NEW.id_manutencao, NEW.bike_n_registro, NEW.valor);
+END;
+
+CREATE TRIGGER trg_evento_manutencao
+AFTER UPDATE OF data_fim ON Manutencao
+WHEN OLD.data_fim IS NULL AND NEW.data_fim IS NOT NULL
+BEGIN
+    INSERT INTO Evento (entidade, status, manutencao_id, bike_n_registro, valor)
+    VALUES ('MANUTENCAO', 'CONCLUIDA', NEW.id_manutencao, NEW.bike_n_registro, NEW.valor);
+END;
+
+CREATE TRIGGER trg_evento_bike_insercao
+AFTER INSERT ON Bike
+BEGIN
+    INSERT INTO Evento (entidade, status, bike_n_registro, ponto_id)
+    VALUES ('BIKE', NEW.status, NEW.n_registro, NEW.ponto_atual_id);
+END;
+
+CREATE TRIGGER trg_evento_bike
+AFTER UPDATE OF status, ponto_atual_id ON Bike
+WHEN OLD.status IS NOT NEW.status OR OLD.ponto_atual_id IS NOT NEW.ponto_atual_id
+BEGIN
+    INSERT INTO Evento (entidade, status, bike_n_registro, ponto_id)
+    VALUES ('BIKE', NEW.status, NEW.n_registro, NEW.ponto_atual_id);
+END;
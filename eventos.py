@@ -0,0 +1,326 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import banco
+from servicos import ErroServico
+
+try:
+    import pyarrow as pa
+except ImportError:  # saída Arrow é opcional
+    pa = None
+
+# Grupo 12
+# Consumo dos eventos de aluguel, manutenção e bike (tabela Evento), gravados
+# pelos gatilhos trg_evento_* na mesma transação de cada mudança de estado.
+# Cada consumidor lê em ordem de seq a partir do seu checkpoint
+# (Checkpoint_Rotina, rotina 'evento:<nome>') e grava os eventos em JSONL ou
+# Arrow; o checkpoint avança depois que o lote foi gravado (entrega pelo menos
+# uma vez: após uma queda, o último lote pode ser repetido). Os seqs que o
+# consumidor pula ficam em Evento_Lacuna e são relidos por JANELA_LACUNA: o
+# evento confirmado nesse prazo é entregue atrasado, fora da ordem de seq.
+#
+# Uso: python eventos.py consumir --consumidor painel --saida eventos.jsonl
+#      python eventos.py consumir --consumidor cobranca --formato arrow --saida eventos/ --continuo
+#      python eventos.py situacao (posição e atraso de cada consumidor)
+#      python eventos.py limpar (apaga os eventos já lidos por todos os consumidores)
+
+# Eventos por ida ao banco
+LOTE = int(os.environ.get('EVENTOS_LOTE', '10000'))
+# seq é atribuído no INSERT e a transação confirma depois: um seq menor pode
+# aparecer depois de um maior. O consumidor não passa de uma lacuna até que o
+# evento seguinte a ela tenha essa idade (segundos); lacunas que não se fecham
+# (rollback, cache da identidade descartado) custam essa espera uma vez.
+ESPERA_LACUNA = int(os.environ.get('EVENTOS_ESPERA_LACUNA', '30'))
+# Depois da espera, os seqs da lacuna são registrados em Evento_Lacuna e
+# relidos a cada leitura por esse prazo (segundos); a lacuna que não se fecha
+# nele fica EXPIRADA e aparece em `situacao` (evento perdido ou rollback).
+# Transações que gravam eventos (uma operação nos serviços, um lote de array
+# DML nas rotinas, tarifas.LOTE_ESCRITA aluguéis na reprecificação) devem
+# confirmar bem antes disso.
+JANELA_LACUNA = int(os.environ.get('EVENTOS_JANELA_LACUNA', '3600'))
+# Faixa de seq apagada por transação na limpeza
+LOTE_LIMPEZA = 50000
+
+PREFIXO = 'evento:'
+
+COLUNAS = ('seq', 'entidade', 'status', 'aluguel_id', 'manutencao_id', 'bike_n_registro',
+           'usuario_cpf', 'ponto_id', 'valor', 'criado_em')
+
+# Faixa da chave primária, sem ler Aluguel nem Bike
+SQL_LER_EVENTOS = f"""
+    SELECT {', '.join('E.' + c for c in COLUNAS)}, (SYSDATE - E.criado_em) * 86400
+    FROM Evento E
+    WHERE E.seq > :1
+    ORDER BY E.seq
+    FETCH FIRST :2 ROWS ONLY
+"""
+
+SQL_LER_CHECKPOINT = "SELECT ultimo_id FROM Checkpoint_Rotina WHERE rotina = :1"
+SQL_ATUALIZAR_CHECKPOINT = """
+    UPDATE Checkpoint_Rotina SET ultimo_id = :1, atualizado_em = SYSDATE WHERE rotina = :2
+"""
+SQL_CRIAR_CHECKPOINT = "INSERT INTO Checkpoint_Rotina (rotina, ultimo_id) VALUES (:1, :2)"
+
+# Eventos que chegaram depois que o consumidor passou pela lacuna
+SQL_LER_ATRASADOS = f"""
+    SELECT {', '.join('E.' + c for c in COLUNAS)}
+    FROM Evento_Lacuna L
+    JOIN Evento E ON E.seq = L.seq
+    WHERE L.rotina = :1 AND L.situacao = 'ABERTA'
+    ORDER BY E.seq
+"""
+SQL_REGISTRAR_LACUNA = "INSERT INTO Evento_Lacuna (rotina, seq) VALUES (:1, :2)"
+SQL_LACUNA_ENTREGUE = "UPDATE Evento_Lacuna SET situacao = 'ENTREGUE' WHERE rotina = :1 AND seq = :2"
+SQL_EXPIRAR_LACUNAS = """
+    UPDATE Evento_Lacuna SET situacao = 'EXPIRADA'
+    WHERE rotina = :1 AND situacao = 'ABERTA' AND (SYSDATE - pulada_em) * 86400 >= :2
+"""
+SQL_LACUNAS = "SELECT rotina, situacao, COUNT(*) FROM Evento_Lacuna GROUP BY rotina, situacao"
+SQL_MENOR_LACUNA_ABERTA = "SELECT MIN(seq) FROM Evento_Lacuna WHERE situacao = 'ABERTA'"
+SQL_APAGAR_LACUNAS = "DELETE FROM Evento_Lacuna WHERE seq <= :1 AND situacao <> 'ABERTA'"
+
+SQL_CONSUMIDORES = f"""
+    SELECT rotina, ultimo_id, atualizado_em FROM Checkpoint_Rotina
+    WHERE rotina LIKE '{PREFIXO}%'
+    ORDER BY rotina
+"""
+SQL_FAIXA_EVENTOS = "SELECT MIN(seq), MAX(seq) FROM Evento"
+SQL_APAGAR_EVENTOS = "DELETE FROM Evento WHERE seq > :1 AND seq <= :2"
+
+class SaidaIndisponivel(ErroServico):
+    pass
+
+class Consumidor:
+    """Lê os eventos em lotes, em ordem de seq, a partir do checkpoint.
+
+    `ler` devolve os eventos atrasados das lacunas abertas e até `lote` eventos
+    novos (tuplas na ordem de COLUNAS), sem passar de uma lacuna recente, e
+    avança a posição em memória; `confirmar` grava a posição, as lacunas
+    puladas e os atrasados entregues em uma transação.
+    """
+
+    def __init__(self, nome, conexao=banco.conexao, lote=LOTE, espera_lacuna=ESPERA_LACUNA,
+                 janela_lacuna=JANELA_LACUNA):
+        self.rotina = PREFIXO + nome
+        self.conexao = conexao
+        self.lote = lote
+        self.espera_lacuna = espera_lacuna
+        self.janela_lacuna = janela_lacuna
+        self.ultimo = None
+        self._puladas = []
+        self._entregues = set()
+
+    def posicao(self):
+        if self.ultimo is None:
+            with self.conexao() as conn:
+                cursor = conn.cursor()
+                row = cursor.execute(SQL_LER_CHECKPOINT, (self.rotina,)).fetchone()
+                self.ultimo = row[0] if row and row[0] is not None else 0
+        return self.ultimo
+
+    def ler(self):
+        ultimo = self.posicao()
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            # Uma linha a mais que o lote: a ida que traz o lote também traz o fim dos dados
+            cursor.prefetchrows = cursor.arraysize = self.lote + 1
+            cursor.execute(SQL_LER_EVENTOS, (ultimo, self.lote))
+            linhas = cursor.fetchall()
+            atrasados = [tuple(e) for e in cursor.execute(SQL_LER_ATRASADOS, (self.rotina,)).fetchall()
+                         if e[0] not in self._entregues]
+
+        eventos = []
+        # Consumidor novo: começa do primeiro evento que ainda está na tabela
+        esperado = ultimo + 1 if ultimo else None
+        for *evento, idade in linhas:
+            if esperado is not None and evento[0] != esperado:
+                if idade < self.espera_lacuna:
+                    break
+                self._puladas.extend(range(esperado, evento[0]))
+            eventos.append(tuple(evento))
+            esperado = evento[0] + 1
+        if eventos:
+            self.ultimo = eventos[-1][0]
+        self._entregues.update(e[0] for e in atrasados)
+        return atrasados + eventos
+
+    def confirmar(self, seq=None):
+        """Grava a posição lida (ou `seq`), as lacunas puladas e os atrasados
+        entregues; lacunas abertas há mais de `janela_lacuna` expiram"""
+        seq = self.posicao() if seq is None else seq
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_ATUALIZAR_CHECKPOINT, (seq, self.rotina))
+            if cursor.rowcount == 0:
+                cursor.execute(SQL_CRIAR_CHECKPOINT, (self.rotina, seq))
+            if self._puladas:
+                cursor.executemany(SQL_REGISTRAR_LACUNA, [(self.rotina, s) for s in self._puladas])
+            if self._entregues:
+                cursor.executemany(SQL_LACUNA_ENTREGUE, [(self.rotina, s) for s in self._entregues])
+            cursor.execute(SQL_EXPIRAR_LACUNAS, (self.rotina, self.janela_lacuna))
+            conn.commit()
+        self.ultimo = seq
+        self._puladas, self._entregues = [], set()
+
+def _valor_json(valor):
+    return valor.isoformat() if hasattr(valor, 'isoformat') else str(valor)
+
+# Um codificador para todos os eventos (json.dumps com opções cria um por chamada)
+_codificar = json.JSONEncoder(ensure_ascii=False, default=_valor_json).encode
+
+class SaidaJsonl:
+    """Um objeto JSON por linha, acrescentado ao arquivo (ou à saída padrão com '-')"""
+
+    def __init__(self, caminho):
+        self._arquivo = sys.stdout if caminho == '-' else open(caminho, 'a', encoding='utf-8')
+
+    def gravar(self, eventos):
+        self._arquivo.write(''.join(_codificar(dict(zip(COLUNAS, evento))) + '\n' for evento in eventos))
+        self._arquivo.flush()
+
+    def fechar(self):
+        if self._arquivo is not sys.stdout:
+            self._arquivo.close()
+
+class SaidaArrow:
+    """Stream Arrow IPC: um arquivo por execução no diretório, nomeado pelo
+    primeiro seq; cada lote é um record batch"""
+
+    def __init__(self, diretorio):
+        if pa is None:
+            raise SaidaIndisponivel("Saída Arrow requer o pacote pyarrow (pip install pyarrow).")
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self.esquema = pa.schema([
+            ('seq', pa.int64()), ('entidade', pa.string()), ('status', pa.string()),
+            ('aluguel_id', pa.int64()), ('manutencao_id', pa.int64()),
+            ('bike_n_registro', pa.int64()), ('usuario_cpf', pa.string()),
+            ('ponto_id', pa.int64()), ('valor', pa.float64()), ('criado_em', pa.timestamp('s')),
+        ])
+        self._arquivo = self._escritor = None
+
+    def gravar(self, eventos):
+        if self._escritor is None:
+            caminho = os.path.join(self.diretorio, f"{eventos[0][0]:012d}.arrow")
+            self._arquivo = pa.OSFile(caminho, 'wb')
+            self._escritor = pa.ipc.new_stream(self._arquivo, self.esquema)
+        colunas = [list(valores) for valores in zip(*eventos)]
+        self._escritor.write_batch(pa.record_batch(colunas, schema=self.esquema))
+        self._arquivo.flush()
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            self._arquivo.close()
+
+def consumir(consumidor, saida, continuo=False, intervalo=1.0):
+    """Grava os eventos pendentes do consumidor; com `continuo`, segue esperando
+    novos a cada `intervalo` segundos. Devolve o número de eventos gravados."""
+    total = 0
+    while True:
+        eventos = consumidor.ler()
+        if eventos:
+            saida.gravar(eventos)
+            consumidor.confirmar()
+            total += len(eventos)
+        if len(eventos) < consumidor.lote:
+            if not continuo:
+                return total
+            time.sleep(intervalo)
+
+def situacao(conexao=banco.conexao):
+    """[(consumidor, último seq lido, eventos a ler, atualizado em, {situação: lacunas})]
+    e a faixa de seq na tabela. As lacunas ENTREGUE (eventos atrasados) e
+    EXPIRADA contam desde a última limpeza."""
+    with conexao() as conn:
+        cursor = conn.cursor()
+        menor, maior = cursor.execute(SQL_FAIXA_EVENTOS).fetchone()
+        lacunas = {}
+        for rotina, estado, quantidade in cursor.execute(SQL_LACUNAS).fetchall():
+            lacunas.setdefault(rotina, {})[estado] = quantidade
+        consumidores = [(rotina[len(PREFIXO):], ultimo, max((maior or 0) - (ultimo or 0), 0), atualizado,
+                         lacunas.get(rotina, {}))
+                        for rotina, ultimo, atualizado in cursor.execute(SQL_CONSUMIDORES).fetchall()]
+    return consumidores, (menor, maior)
+
+def limpar(conexao=banco.conexao, lote=LOTE_LIMPEZA):
+    """Apaga os eventos já lidos por todos os consumidores, uma faixa de seq por
+    transação, até antes da menor lacuna aberta (o evento atrasado ainda pode
+    chegar); sem consumidores registrados, nada é apagado. Devolve o número apagado."""
+    consumidores, (menor, _) = situacao(conexao)
+    if not consumidores or menor is None:
+        return 0
+    limite = min(ultimo or 0 for _, ultimo, _, _, _ in consumidores)
+    apagados = 0
+    with conexao() as conn:
+        cursor = conn.cursor()
+        aberta, = cursor.execute(SQL_MENOR_LACUNA_ABERTA).fetchone()
+        if aberta is not None:
+            limite = min(limite, aberta - 1)
+        for inicio in range(menor - 1, limite, lote):
+            cursor.execute(SQL_APAGAR_EVENTOS, (inicio, min(inicio + lote, limite)))
+            apagados += cursor.rowcount
+            conn.commit()
+        cursor.execute(SQL_APAGAR_LACUNAS, (limite,))
+        conn.commit()
+    return apagados
+
+def main():
+    parser = argparse.ArgumentParser(description="Eventos de aluguel, manutenção e bike (outbox)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_consumir = sub.add_parser('consumir', help="Grava os eventos novos do consumidor")
+    p_consumir.add_argument('--consumidor', required=True, help="Nome do consumidor (um checkpoint cada)")
+    p_consumir.add_argument('--formato', choices=['jsonl', 'arrow'], default='jsonl')
+    p_consumir.add_argument('--saida', default='-',
+                            help="Arquivo JSONL (acrescenta; '-' = saída padrão) ou diretório Arrow")
+    p_consumir.add_argument('--lote', type=int, default=LOTE, help="Eventos por ida ao banco")
+    p_consumir.add_argument('--continuo', action='store_true', help="Continua aguardando eventos novos")
+    p_consumir.add_argument('--intervalo', type=float, default=1.0,
+                            help="Segundos entre leituras quando não há eventos (com --continuo)")
+
+    sub.add_parser('situacao', help="Posição e atraso de cada consumidor")
+    sub.add_parser('limpar', help="Apaga os eventos já lidos por todos os consumidores")
+    args = parser.parse_args()
+
+    try:
+        if args.comando == 'consumir':
+            if args.formato == 'arrow' and args.saida == '-':
+                parser.error("--formato arrow requer --saida com um diretório")
+            saida = SaidaArrow(args.saida) if args.formato == 'arrow' else SaidaJsonl(args.saida)
+            consumidor = Consumidor(args.consumidor, lote=args.lote)
+            inicio = time.perf_counter()
+            try:
+                total = consumir(consumidor, saida, args.continuo, args.intervalo)
+            except KeyboardInterrupt:
+                total = None
+            finally:
+                saida.fechar()
+                banco.fechar_pool()
+            segundos = time.perf_counter() - inicio
+            if total is not None:
+                # Na saída de erros: a saída padrão pode ser o próprio fluxo de eventos
+                print(f"✅ {total} eventos em {segundos:.1f} s ({total / max(segundos, 1e-9):.0f}/s); "
+                      f"checkpoint em {consumidor.ultimo}", file=sys.stderr)
+        elif args.comando == 'situacao':
+            consumidores, (menor, maior) = situacao()
+            banco.fechar_pool()
+            print(f"📋 Eventos na tabela: seq {menor or '-'} a {maior or '-'}")
+            for nome, ultimo, atraso, atualizado, lacunas in consumidores:
+                print(f"   {nome}: seq {ultimo}, {atraso} a ler (atualizado em {atualizado})")
+                if lacunas:
+                    print(f"      lacunas: {lacunas.get('ABERTA', 0)} aberta(s), "
+                          f"{lacunas.get('ENTREGUE', 0)} evento(s) atrasado(s) entregue(s), "
+                          f"{lacunas.get('EXPIRADA', 0)} expirada(s)")
+        else:
+            apagados = limpar()
+            banco.fechar_pool()
+            print(f"🧹 {apagados} eventos apagados")
+    except ErroServico as e:
+        sys.exit(f"❌ [ERRO] {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+import argparse
+import bisect
+import datetime
+import random
+import sys
+import time
+
+import banco
+from carga import SQL_BIKE, SQL_CARTAO, SQL_PONTO, SQL_USUARIO
+from servicos import DadosInvalidos, ErroServico
+from tarifas import TarifaNaoEncontrada, carregar_tarifas
+
+# Grupo 12
+# Gerador de dados sintéticos para testes de desempenho. Produz usuários com
+# cartão, pontos, bikes (sem passar da capacidade de nenhum ponto), aluguéis
+# concluídos (sem sobreposição por bike),
+# multas, comentários e manutenções coerentes entre si, na escala pedida
+# (de mil a 100 milhões de aluguéis), inseridos com executemany em lotes.
+# O valor de cada aluguel é o da versão de tarifa vigente na retirada
+# (tarifas.py), com o desconto do CadÚnico, como na devolução.
+# Os dados são acrescentados aos existentes; CPFs gerados começam com G
+# (PREFIXO_CPF), que nenhum CPF real tem: cadastro e carga só aceitam dígitos.
+#
+# Uso: python gerador.py --alugueis 1000000 --lote 10000 --semente 42
+
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor',
+         'Isabela', 'João', 'Karina', 'Lucas', 'Mariana', 'Nicolas', 'Olívia', 'Pedro',
+         'Rafaela', 'Samuel', 'Tatiane', 'Vitor']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa',
+              'Rodrigues', 'Almeida', 'Nascimento', 'Carvalho', 'Ribeiro', 'Martins']
+CIDADES = {
+    'São Carlos': ['Centro', 'Vila Prado', 'Jardim Paulista', 'Cidade Jardim', 'Santa Felícia'],
+    'Araraquara': ['Centro', 'Vila Xavier', 'Jardim América', 'Fonte Luminosa'],
+    'Ribeirão Preto': ['Centro', 'Jardim Irajá', 'Ribeirânia', 'Campos Elíseos'],
+}
+RUAS = ['Rua XV de Novembro', 'Av. São Carlos', 'Rua Episcopal', 'Rua Dona Alexandrina',
+        'Av. Trabalhador São-carlense', 'Rua Nove de Julho', 'Av. Bandeirantes', 'Rua Sete de Setembro']
+MODELOS = ['Urbana X', 'Urbana Plus', 'Eletrica Z', 'Dobrável 20', 'Mountain 29']
+CORES = ['Branca', 'Preta', 'Vermelha', 'Azul', 'Verde']
+AVALIACOES = ['Bom', 'Regular', 'Ruim']
+# CPF gerado: o prefixo e 10 dígitos com a numeração dos usuários gerados
+PREFIXO_CPF = 'G'
+
+SQL_ALUGUEL = """
+    INSERT INTO Aluguel (bike_n_registro, usuario_cpf, ponto_retirada_id, ponto_devolucao_id,
+                         data_hora_inicio, data_hora_fim, valor_aluguel, status)
+    VALUES (:1, :2, :3, :4, :5, :6, :7, :8)
+    RETURNING id_aluguel INTO :9
+"""
+
+SQL_MULTA = """
+    INSERT INTO Multa (aluguel_id, valor, tipo, vencimento, data_pagamento_multa, isPaid, tempo_bloqueio)
+    VALUES (:1, :2, :3, :4, :5, :6, :7)
+"""
+
+SQL_COMENTARIO_BIKE = """
+    INSERT INTO Comentario_Bike (aluguel_id, nota, freios, rodas, aparencia, acessorios, pecas, texto_livre)
+    VALUES (:1, :2, :3, :4, :5, :6, :7, :8)
+"""
+
+SQL_COMENTARIO_PONTO = """
+    INSERT INTO Comentario_Ponto (aluguel_id, nota, sistema_aluguel, disponibilidade,
+                                  n_bikes_avaliacao, aparencia_geral)
+    VALUES (:1, :2, :3, :4, :5, :6)
+"""
+
+SQL_COMENTARIO_TIPO = "INSERT INTO Comentario_Tipo (aluguel_id, tipo) VALUES (:1, :2)"
+
+SQL_MANUTENCAO = """
+    INSERT INTO Manutencao (bike_n_registro, tipo, valor, data_inicio, data_fim, descricao_problema)
+    VALUES (:1, :2, :3, :4, :5, :6)
+"""
+
+SQL_ATUALIZAR_BIKE = """
+    UPDATE Bike SET qnt_alugueis = :1, tempo_total_utilizado = :2,
+                    ponto_atual_id = :3, status = :4
+    WHERE n_registro = :5
+"""
+
+# Gatilhos de resumo ficam desligados durante a carga; os resumos são
+# recalculados de uma vez no final (reconstruir_resumos). Os de eventos também:
+# a carga sintética não é uma sequência de mudanças a publicar
+GATILHOS_RESUMO = [
+    'trg_resumo_bike_novo', 'trg_resumo_usuario_novo', 'trg_resumo_bike_aluguel',
+    'trg_resumo_usuario_aluguel', 'trg_resumo_bike_nota', 'trg_resumo_usuario_multa',
+    'trg_resumo_usuario_bloqueio', 'trg_movimento_ponto', 'trg_estoque_ponto_novo',
+    'trg_estoque_ponto', 'trg_cobertura_usuario',
+    'trg_evento_aluguel', 'trg_evento_manutencao', 'trg_evento_bike',
+]
+
+def cpf_gerado(numero):
+    return f"{PREFIXO_CPF}{numero:010d}"
+
+def indice_enviesado(n, rng, vies=2.0):
+    """Índice em [0, n) com poucos índices baixos muito frequentes (usuários e pontos populares)"""
+    return min(n - 1, int(n * rng.random() ** vies))
+
+class Gerador:
+    def __init__(self, conn, rng, tamanho_lote, dias):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.rng = rng
+        self.tamanho_lote = tamanho_lote
+        self.agora = datetime.datetime.now().replace(microsecond=0)
+        self.inicio_periodo = self.agora - datetime.timedelta(days=dias)
+        self.inseridos = {}
+        self.cad_unico = bytearray()  # is_cadUnico dos usuários gerados, por índice
+
+    def _gravar(self, tabela, sql, linhas):
+        if linhas:
+            self.cursor.executemany(sql, linhas)
+            self.inseridos[tabela] = self.inseridos.get(tabela, 0) + len(linhas)
+
+    def _em_lotes(self, tabela, sql, quantidade, gerar_linha):
+        lote = []
+        for i in range(quantidade):
+            lote.append(gerar_linha(i))
+            if len(lote) >= self.tamanho_lote:
+                self._gravar(tabela, sql, lote)
+                self.conn.commit()
+                lote = []
+        self._gravar(tabela, sql, lote)
+        self.conn.commit()
+
+    def _nome(self):
+        return f"{self.rng.choice(NOMES)} {self.rng.choice(SOBRENOMES)} {self.rng.choice(SOBRENOMES)}"
+
+    def usuarios(self, quantidade):
+        """Insere usuários e cartões; devolve o número do primeiro CPF gerado.
+
+        O CPF do i-ésimo usuário é cpf_gerado(primeiro + i), então a lista de
+        CPFs não precisa ficar em memória; só o is_cadUnico fica, em cad_unico[i].
+        """
+        # Largura fixa: o maior texto é o maior número já gerado
+        self.cursor.execute("SELECT MAX(cpf) FROM Usuario WHERE cpf LIKE :1", (PREFIXO_CPF + '%',))
+        ultimo = self.cursor.fetchone()[0]
+        primeiro = int(ultimo[len(PREFIXO_CPF):]) + 1 if ultimo else 0
+        rng = self.rng
+
+        lote_usuarios, lote_cartoes = [], []
+        for i in range(quantidade):
+            cpf = cpf_gerado(primeiro + i)
+            cidade = rng.choice(list(CIDADES))
+            nascimento = datetime.date(rng.randint(1950, 2008), rng.randint(1, 12), rng.randint(1, 28))
+            validade = self.agora.date() + datetime.timedelta(days=rng.randint(60, 1500))
+            self.cad_unico.append(1 if rng.random() < 0.15 else 0)
+            lote_usuarios.append((cpf, self._nome(), nascimento.strftime('%d/%m/%Y'),
+                                  rng.choice(RUAS), str(rng.randint(1, 3000)),
+                                  rng.choice(CIDADES[cidade]), cidade, 'SP',
+                                  self.cad_unico[-1]))
+            saldo = round(rng.uniform(0, 4.99), 2) if rng.random() < 0.1 else round(rng.uniform(5, 200), 2)
+            lote_cartoes.append((cpf, saldo, validade.strftime('%d/%m/%Y')))
+            if len(lote_usuarios) >= self.tamanho_lote:
+                self._gravar('Usuario', SQL_USUARIO, lote_usuarios)
+                self._gravar('Cartao', SQL_CARTAO, lote_cartoes)
+                self.conn.commit()
+                lote_usuarios, lote_cartoes = [], []
+        self._gravar('Usuario', SQL_USUARIO, lote_usuarios)
+        self._gravar('Cartao', SQL_CARTAO, lote_cartoes)
+        self.conn.commit()
+        return primeiro
+
+    def pontos(self, quantidade):
+        """Insere pontos; devolve [(cod_ponto, capacidade)]"""
+        self.cursor.execute("SELECT NVL(MAX(cod_ponto), 0) FROM Ponto")
+        ultimo = self.cursor.fetchone()[0]
+        rng = self.rng
+
+        def linha(i):
+            cidade = rng.choice(list(CIDADES))
+            return (rng.choice(RUAS), str(rng.randint(1, 3000)), rng.choice(CIDADES[cidade]),
+                    cidade, 'SP', f"Estação {i + 1}", rng.randint(10, 40))
+
+        self._em_lotes('Ponto', SQL_PONTO, quantidade, linha)
+        self.cursor.execute("SELECT cod_ponto, capacidade_maxima FROM Ponto WHERE cod_ponto > :1 "
+                            "ORDER BY cod_ponto", (ultimo,))
+        return self.cursor.fetchall()
+
+    def bikes(self, quantidade, pontos):
+        """Insere bikes nos pontos em proporção à capacidade, sem passar dela;
+        devolve [(n_registro, ponto)]"""
+        self.cursor.execute("SELECT NVL(MAX(n_registro), 0) FROM Bike")
+        ultimo = self.cursor.fetchone()[0]
+        rng = self.rng
+
+        # Cota inteira de cada ponto; os maiores restos completam a quantidade
+        # (a cota fica abaixo da capacidade sempre que há resto)
+        capacidade = sum(c for _, c in pontos)
+        vagas = [c * quantidade // capacidade for _, c in pontos]
+        restos = sorted(range(len(pontos)), key=lambda i: -(pontos[i][1] * quantidade % capacidade))
+        for i in restos[:quantidade - sum(vagas)]:
+            vagas[i] += 1
+        destinos = [p for (p, _), n in zip(pontos, vagas) for _ in range(n)]
+
+        def linha(i):
+            return (rng.choice(MODELOS), rng.randint(2015, self.agora.year), rng.choice(CORES),
+                    destinos[i])
+
+        self._em_lotes('Bike', SQL_BIKE, quantidade, linha)
+        self.cursor.execute("SELECT n_registro, ponto_atual_id FROM Bike WHERE n_registro > :1 "
+                            "ORDER BY n_registro", (ultimo,))
+        return self.cursor.fetchall()
+
+    def alugueis(self, quantidade, primeiro_cpf, usuarios, pontos, bikes, tarifas):
+        """Insere aluguéis concluídos em ordem cronológica, com multas e comentários.
+
+        Cada bike só é retirada depois da devolução anterior e parte do ponto
+        onde foi devolvida; a devolução evita pontos lotados (volta à origem se
+        não achar vaga). O valor vem da versão de `tarifas` (em ordem de
+        vigência) do início. Devolve o estado final das bikes para atualizar
+        Bike (contadores e ponto atual).
+        """
+        rng = self.rng
+        vigencias = [t.vigente_desde for t in tarifas]
+        ids_pontos = [p for p, _ in pontos]
+        capacidade = dict(pontos)
+        ocupacao = dict.fromkeys(ids_pontos, 0)
+        for _, p in bikes:
+            ocupacao[p] += 1
+        livre_em = [self.inicio_periodo] * len(bikes)
+        ponto_bike = [p for _, p in bikes]
+        qnt = [0] * len(bikes)
+        minutos_bike = [0.0] * len(bikes)
+        passo = (self.agora - self.inicio_periodo).total_seconds() / max(quantidade, 1)
+        qualidade = [rng.uniform(4, 10) for _ in bikes]  # nota média de cada bike
+
+        ids = self.cursor.var(int, arraysize=self.tamanho_lote)
+        feitos = 0
+        inicio_carga = time.perf_counter()
+        while feitos < quantidade:
+            n = min(self.tamanho_lote, quantidade - feitos)
+            lote, multas_e_comentarios = [], []
+            for i in range(feitos, feitos + n):
+                momento = self.inicio_periodo + datetime.timedelta(seconds=i * passo)
+                for _ in range(4):
+                    b = rng.randrange(len(bikes))
+                    if livre_em[b] <= momento:
+                        break
+                inicio = max(momento, livre_em[b])
+                duracao = min(600.0, rng.lognormvariate(3.0, 0.8))
+                fim = inicio + datetime.timedelta(minutes=duracao)
+                retirada = ponto_bike[b]
+                ocupacao[retirada] -= 1
+                for _ in range(4):
+                    devolucao = ids_pontos[indice_enviesado(len(ids_pontos), rng)]
+                    if ocupacao[devolucao] < capacidade[devolucao]:
+                        break
+                else:
+                    devolucao = retirada  # a vaga que a bike deixou
+                ocupacao[devolucao] += 1
+                usuario = indice_enviesado(usuarios, rng)
+                cpf = cpf_gerado(primeiro_cpf + usuario)
+                tarifa = tarifas[bisect.bisect_right(vigencias, inicio) - 1]
+                lote.append((bikes[b][0], cpf, retirada, devolucao, inicio, fim,
+                             tarifa.valor(duracao, inicio.hour, self.cad_unico[usuario]),
+                             'CONCLUIDO'))
+                multas_e_comentarios.append((b, duracao, fim))
+                livre_em[b] = fim + datetime.timedelta(minutes=rng.randint(1, 120))
+                ponto_bike[b] = devolucao
+                qnt[b] += 1
+                minutos_bike[b] += duracao
+
+            self.cursor.setinputsizes(None, None, None, None, None, None, None, None, ids)
+            self.cursor.executemany(SQL_ALUGUEL, lote)
+            self.inseridos['Aluguel'] = self.inseridos.get('Aluguel', 0) + n
+            id_alugueis = [ids.getvalue(j)[0] for j in range(n)]
+            self.cursor.setinputsizes()
+            self._dependentes(id_alugueis, multas_e_comentarios, qualidade)
+            self.conn.commit()
+
+            feitos += n
+            decorrido = time.perf_counter() - inicio_carga
+            print(f"   {feitos} aluguéis ({feitos / decorrido:.0f}/s)")
+
+        return livre_em, ponto_bike, qnt, minutos_bike
+
+    def _dependentes(self, id_alugueis, dados, qualidade):
+        """Multas (atrasos e alguns danos) e comentários dos aluguéis de um lote"""
+        rng = self.rng
+        multas, com_bike, com_ponto, tipos = [], [], [], []
+        for id_aluguel, (b, duracao, fim) in zip(id_alugueis, dados):
+            tipo_multa = 'ATRASO' if duracao > 240 else ('DANO' if rng.random() < 0.005 else None)
+            if tipo_multa:
+                vencimento = (fim + datetime.timedelta(days=10)).date()
+                pago = vencimento < self.agora.date() and rng.random() < 0.8
+                pagamento = vencimento - datetime.timedelta(days=rng.randint(0, 9)) if pago else None
+                multas.append((id_aluguel, round(rng.uniform(10, 80), 2), tipo_multa,
+                               vencimento, pagamento, 1 if pago else 0,
+                               5 if rng.random() < 0.2 else 0))
+            if rng.random() < 0.3:
+                nota = max(0, min(10, round(rng.gauss(qualidade[b], 1.5))))
+                com_bike.append((id_aluguel, nota, rng.choice(AVALIACOES), rng.choice(AVALIACOES),
+                                 rng.choice(AVALIACOES), rng.choice(AVALIACOES),
+                                 rng.choice(AVALIACOES), None))
+                tipos.append((id_aluguel, 'BIKE'))
+            if rng.random() < 0.2:
+                com_ponto.append((id_aluguel, rng.randint(3, 10), rng.choice(AVALIACOES),
+                                  rng.choice(AVALIACOES), rng.choice(AVALIACOES), rng.choice(AVALIACOES)))
+                tipos.append((id_aluguel, 'PONTO'))
+        self._gravar('Multa', SQL_MULTA, multas)
+        self._gravar('Comentario_Bike', SQL_COMENTARIO_BIKE, com_bike)
+        self._gravar('Comentario_Ponto', SQL_COMENTARIO_PONTO, com_ponto)
+        self._gravar('Comentario_Tipo', SQL_COMENTARIO_TIPO, tipos)
+
+    def manutencoes(self, bikes, livre_em, ponto_bike, qnt, minutos_bike, fracao_aberta=0.02):
+        """Manutenções concluídas (histórico) e abertas; atualiza o estado final das bikes"""
+        rng = self.rng
+        historico, abertas, atualizacoes = [], [], []
+        for b, (n_registro, _) in enumerate(bikes):
+            for _ in range(qnt[b] // 200):
+                inicio = self.inicio_periodo + datetime.timedelta(
+                    seconds=rng.uniform(0, (livre_em[b] - self.inicio_periodo).total_seconds()))
+                historico.append((n_registro, rng.choice(['PREVENTIVA', 'CORRETIVA']),
+                                  round(rng.uniform(20, 300), 2), inicio,
+                                  inicio + datetime.timedelta(days=rng.randint(1, 5)),
+                                  'Revisão periódica gerada para testes'))
+            status, ponto = 'DISPONIVEL', ponto_bike[b]
+            if rng.random() < fracao_aberta:
+                # Aberta depois da última devolução, então não há aluguel durante ela
+                abertas.append((n_registro, 'CORRETIVA', 0, livre_em[b], None,
+                                'Defeito relatado em teste de carga'))
+                status, ponto = 'MANUTENCAO', None
+            atualizacoes.append((qnt[b], round(minutos_bike[b]), ponto, status, n_registro))
+
+        for i in range(0, len(historico), self.tamanho_lote):
+            self._gravar('Manutencao', SQL_MANUTENCAO, historico[i:i + self.tamanho_lote])
+        self._gravar('Manutencao', SQL_MANUTENCAO, abertas)
+        for i in range(0, len(atualizacoes), self.tamanho_lote):
+            self.cursor.executemany(SQL_ATUALIZAR_BIKE, atualizacoes[i:i + self.tamanho_lote])
+        self.conn.commit()
+
+    def alternar_gatilhos(self, ligar):
+        acao = 'ENABLE' if ligar else 'DISABLE'
+        for gatilho in GATILHOS_RESUMO:
+            self.cursor.execute(f"ALTER TRIGGER {gatilho} {acao}")
+
+def gerar(alugueis, usuarios=None, pontos=None, bikes=None, tamanho_lote=10000, dias=365, semente=None):
+    """Gera uma base coerente; quantidades omitidas são derivadas do número de aluguéis"""
+    usuarios = usuarios or max(100, alugueis // 20)
+    pontos = pontos or max(10, alugueis // 20000)
+    bikes = bikes or pontos * 15
+    rng = random.Random(semente)
+
+    with banco.conexao() as conn:
+        gerador = Gerador(conn, rng, tamanho_lote, dias)
+        tarifas = carregar_tarifas(conn)
+        if not tarifas or tarifas[0].vigente_desde > gerador.inicio_periodo:
+            raise TarifaNaoEncontrada(
+                f"Nenhuma tarifa vigente em {gerador.inicio_periodo:%d/%m/%Y %H:%M}.")
+        # Poucos pontos: entram com os gatilhos ligados, antes de conferir a capacidade
+        print(f"📍 {pontos} pontos")
+        lista_pontos = gerador.pontos(pontos)
+        capacidade = sum(c for _, c in lista_pontos)
+        if bikes > capacidade:
+            raise DadosInvalidos(f"{bikes} bikes não cabem nos {pontos} pontos gerados "
+                                 f"(capacidade total {capacidade}).")
+        gerador.alternar_gatilhos(ligar=False)
+        try:
+            print(f"👤 {usuarios} usuários e cartões")
+            primeiro_cpf = gerador.usuarios(usuarios)
+            print(f"🚲 {bikes} bikes")
+            lista_bikes = gerador.bikes(bikes, lista_pontos)
+            print(f"🚀 {alugueis} aluguéis, multas e comentários")
+            estado = gerador.alugueis(alugueis, primeiro_cpf, usuarios, lista_pontos, lista_bikes,
+                                      tarifas)
+            print("🔧 Manutenções e estado final das bikes")
+            gerador.manutencoes(lista_bikes, *estado)
+        finally:
+            gerador.alternar_gatilhos(ligar=True)
+        print("📊 Recalculando resumos e estatísticas")
+        gerador.cursor.execute("BEGIN reconstruir_resumos; END;")
+        gerador.cursor.execute("BEGIN DBMS_STATS.GATHER_SCHEMA_STATS(ownname => USER); END;")
+        return gerador.inseridos
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos coerentes para testes de carga")
+    parser.add_argument('--alugueis', type=int, default=100000, help="Aluguéis a gerar (1e3 a 1e8)")
+    parser.add_argument('--usuarios', type=int, help="Padrão: aluguéis / 20")
+    parser.add_argument('--pontos', type=int, help="Padrão: aluguéis / 20000 (mínimo 10)")
+    parser.add_argument('--bikes', type=int, help="Padrão: 15 por ponto")
+    parser.add_argument('--dias', type=int, default=365, help="Período coberto pelos aluguéis")
+    parser.add_argument('--lote', type=int, default=10000, help="Linhas por executemany/commit")
+    parser.add_argument('--semente', type=int, help="Semente aleatória (base reprodutível)")
+    args = parser.parse_args()
+
+    print(f"\n🧪 GERAÇÃO DE DADOS SINTÉTICOS ({args.alugueis} aluguéis)")
+    inicio = time.perf_counter()
+    try:
+        inseridos = gerar(args.alugueis, args.usuarios, args.pontos, args.bikes,
+                          args.lote, args.dias, args.semente)
+    except ErroServico as e:
+        banco.fechar_pool()
+        sys.exit(f"❌ [ERRO] {e}")
+    print(f"\n✅ Concluído em {time.perf_counter() - inicio:.0f}s")
+    for tabela, total in inseridos.items():
+        print(f"   {tabela}: {total}")
+    banco.fechar_pool()
+
+if __name__ == "__main__":
+    main()
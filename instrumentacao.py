@@ -0,0 +1,270 @@
+import bisect
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+
+# Grupo 12
+# Medição de cada chamada ao banco: latência por SQL (histograma), linhas lidas,
+# idas ao servidor estimadas, commits e erros. Ativada em banco.py
+# (banco.ativar_instrumentacao() ou DB_INSTRUMENTAR=1), envolve a conexão
+# emprestada do pool; o custo por chamada é um perf_counter e um lock curto.
+
+# Limites superiores dos baldes do histograma, em segundos
+BALDES = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+def normalizar_sql(sql):
+    """Texto do SQL em uma linha, usado como rótulo"""
+    return re.sub(r'\s+', ' ', sql).strip()
+
+class EstatisticaSql:
+    __slots__ = ('sql', 'execucoes', 'tempo_total', 'tempo_max', 'baldes',
+                 'linhas', 'idas', 'erros')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.execucoes = 0
+        self.tempo_total = 0.0
+        self.tempo_max = 0.0
+        self.baldes = [0] * (len(BALDES) + 1)  # último: acima do maior limite
+        self.linhas = 0
+        self.idas = 0
+        self.erros = 0
+
+    def percentil(self, p):
+        """Percentil aproximado pelo limite do balde (s)"""
+        alvo = self.execucoes * p / 100
+        acumulado = 0
+        for i, quantidade in enumerate(self.baldes):
+            acumulado += quantidade
+            if quantidade and acumulado >= alvo:
+                return BALDES[i] if i < len(BALDES) else self.tempo_max
+        return 0.0
+
+class Metricas:
+    """Acumula as medições de todas as sessões do processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_sql = {}
+        self.commits = 0
+        self.tempo_commits = 0.0
+        self.rollbacks = 0
+        self.inicio = time.time()
+
+    def _estatistica(self, sql):
+        estatistica = self._por_sql.get(sql)
+        if estatistica is None:
+            estatistica = self._por_sql.setdefault(sql, EstatisticaSql(normalizar_sql(sql)))
+        return estatistica
+
+    def registrar_execucao(self, sql, segundos, erro=False):
+        with self._lock:
+            e = self._estatistica(sql)
+            e.execucoes += 1
+            e.tempo_total += segundos
+            e.idas += 1
+            if segundos > e.tempo_max:
+                e.tempo_max = segundos
+            e.baldes[bisect.bisect_left(BALDES, segundos)] += 1
+            if erro:
+                e.erros += 1
+
+    def registrar_leitura(self, sql, segundos, linhas, idas):
+        with self._lock:
+            e = self._estatistica(sql)
+            e.tempo_total += segundos
+            e.linhas += linhas
+            e.idas += idas
+
+    def registrar_commit(self, segundos):
+        with self._lock:
+            self.commits += 1
+            self.tempo_commits += segundos
+
+    def registrar_rollback(self):
+        with self._lock:
+            self.rollbacks += 1
+
+    def conexao(self, conn):
+        return ConexaoInstrumentada(conn, self)
+
+    def estatisticas(self):
+        """Cópia das estatísticas por SQL, da que mais consumiu tempo para a que menos"""
+        with self._lock:
+            return sorted((_copiar(e) for e in self._por_sql.values()),
+                          key=lambda e: e.tempo_total, reverse=True)
+
+    def resumo(self, limite=15):
+        """Tabela de texto com os SQL que mais consumiram tempo"""
+        linhas = [f"{'execuções':>9} {'total ms':>10} {'p50 ms':>8} {'p99 ms':>8} {'linhas':>9} "
+                  f"{'idas':>7} {'erros':>5}  SQL"]
+        for e in self.estatisticas()[:limite]:
+            linhas.append(f"{e.execucoes:>9} {e.tempo_total * 1000:>10.1f} "
+                          f"{e.percentil(50) * 1000:>8.1f} {e.percentil(99) * 1000:>8.1f} "
+                          f"{e.linhas:>9} {e.idas:>7} {e.erros:>5}  {e.sql[:70]}")
+        media = self.tempo_commits / self.commits * 1000 if self.commits else 0.0
+        linhas.append(f"Commits: {self.commits} (média {media:.1f} ms), rollbacks: {self.rollbacks}")
+        return "\n".join(linhas)
+
+    def para_json(self):
+        return json.dumps({
+            'inicio': self.inicio,
+            'commits': self.commits,
+            'tempo_commits_s': self.tempo_commits,
+            'rollbacks': self.rollbacks,
+            'sql': [{
+                'id': _id_sql(e.sql), 'sql': e.sql, 'execucoes': e.execucoes,
+                'tempo_total_s': e.tempo_total, 'tempo_max_s': e.tempo_max,
+                'p50_s': e.percentil(50), 'p99_s': e.percentil(99),
+                'linhas': e.linhas, 'idas': e.idas, 'erros': e.erros,
+                'histograma': dict(zip([str(b) for b in BALDES] + ['+Inf'], e.baldes)),
+            } for e in self.estatisticas()],
+        }, ensure_ascii=False, indent=2)
+
+    def para_openmetrics(self):
+        """Formato texto OpenMetrics/Prometheus"""
+        saida = [
+            "# TYPE bikes_sql_duracao_segundos histogram",
+            "# HELP bikes_sql_duracao_segundos Latência de execute() por SQL",
+        ]
+        contadores = {'bikes_sql_linhas': [], 'bikes_sql_idas': [], 'bikes_sql_erros': []}
+        for e in self.estatisticas():
+            rotulo = f'sql_id="{_id_sql(e.sql)}",sql="{_escapar(e.sql[:200])}"'
+            acumulado = 0
+            for limite, quantidade in zip(BALDES, e.baldes):
+                acumulado += quantidade
+                saida.append(f'bikes_sql_duracao_segundos_bucket{{{rotulo},le="{limite}"}} {acumulado}')
+            saida.append(f'bikes_sql_duracao_segundos_bucket{{{rotulo},le="+Inf"}} {e.execucoes}')
+            saida.append(f'bikes_sql_duracao_segundos_sum{{{rotulo}}} {e.tempo_total}')
+            saida.append(f'bikes_sql_duracao_segundos_count{{{rotulo}}} {e.execucoes}')
+            contadores['bikes_sql_linhas'].append(f'bikes_sql_linhas_total{{{rotulo}}} {e.linhas}')
+            contadores['bikes_sql_idas'].append(f'bikes_sql_idas_total{{{rotulo}}} {e.idas}')
+            contadores['bikes_sql_erros'].append(f'bikes_sql_erros_total{{{rotulo}}} {e.erros}')
+        for nome, valores in contadores.items():
+            saida.append(f"# TYPE {nome} counter")
+            saida.extend(valores)
+        saida += [
+            "# TYPE bikes_commits counter", f"bikes_commits_total {self.commits}",
+            "# TYPE bikes_commit_segundos counter", f"bikes_commit_segundos_total {self.tempo_commits}",
+            "# TYPE bikes_rollbacks counter", f"bikes_rollbacks_total {self.rollbacks}",
+            "# EOF",
+        ]
+        return "\n".join(saida) + "\n"
+
+    def exportar(self, caminho):
+        """Grava em JSON (.json) ou OpenMetrics (qualquer outra extensão)"""
+        conteudo = self.para_json() if caminho.endswith('.json') else self.para_openmetrics()
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(conteudo)
+
+def _copiar(e):
+    copia = EstatisticaSql(e.sql)
+    for campo in EstatisticaSql.__slots__[1:]:
+        valor = getattr(e, campo)
+        setattr(copia, campo, list(valor) if isinstance(valor, list) else valor)
+    return copia
+
+def _id_sql(sql):
+    return hashlib.sha1(sql.encode('utf-8')).hexdigest()[:10]
+
+def _escapar(texto):
+    return texto.replace('\\', '\\\\').replace('"', '\\"')
+
+class CursorInstrumentado:
+    """Cursor que mede execute/executemany/fetch; o resto é repassado ao cursor real"""
+
+    def __init__(self, cursor, metricas):
+        self._cursor = cursor
+        self._metricas = metricas
+        self._sql = None
+        self._lidas = 0
+        self._idas_leitura = 0
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __setattr__(self, nome, valor):
+        if nome.startswith('_'):
+            object.__setattr__(self, nome, valor)
+        else:
+            setattr(self._cursor, nome, valor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __iter__(self):
+        while True:
+            linhas = self.fetchmany()
+            if not linhas:
+                return
+            yield from linhas
+
+    def _medir_execucao(self, metodo, sql, args, kwargs):
+        self._sql, self._lidas, self._idas_leitura = sql, 0, 0
+        inicio = time.perf_counter()
+        try:
+            resultado = metodo(sql, *args, **kwargs)
+        except Exception:
+            self._metricas.registrar_execucao(sql, time.perf_counter() - inicio, erro=True)
+            raise
+        self._metricas.registrar_execucao(sql, time.perf_counter() - inicio)
+        # execute devolve o próprio cursor nas consultas: o encadeamento
+        # (cursor.execute(...).fetchall()) continua passando pela medição
+        return self if resultado is self._cursor else resultado
+
+    def execute(self, sql, *args, **kwargs):
+        return self._medir_execucao(self._cursor.execute, sql, args, kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._medir_execucao(self._cursor.executemany, sql, args, kwargs)
+
+    def _medir_leitura(self, metodo, uma_linha, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(*args)
+        segundos = time.perf_counter() - inicio
+        if self._sql is not None:
+            linhas = int(resultado is not None) if uma_linha else len(resultado)
+            self._lidas += linhas
+            # O execute já traz prefetchrows linhas; cada arraysize seguinte é outra ida
+            excedente = self._lidas - self._cursor.prefetchrows
+            idas = math.ceil(excedente / self._cursor.arraysize) if excedente > 0 else 0
+            self._metricas.registrar_leitura(self._sql, segundos, linhas, idas - self._idas_leitura)
+            self._idas_leitura = idas
+        return resultado
+
+    def fetchone(self):
+        return self._medir_leitura(self._cursor.fetchone, True)
+
+    def fetchmany(self, *args):
+        return self._medir_leitura(self._cursor.fetchmany, False, *args)
+
+    def fetchall(self):
+        return self._medir_leitura(self._cursor.fetchall, False)
+
+class ConexaoInstrumentada:
+    """Conexão que entrega cursores instrumentados e mede commits"""
+
+    def __init__(self, conn, metricas):
+        self._conn = conn
+        self._metricas = metricas
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def cursor(self, *args, **kwargs):
+        return CursorInstrumentado(self._conn.cursor(*args, **kwargs), self._metricas)
+
+    def commit(self):
+        inicio = time.perf_counter()
+        self._conn.commit()
+        self._metricas.registrar_commit(time.perf_counter() - inicio)
+
+    def rollback(self):
+        self._conn.rollback()
+        self._metricas.registrar_rollback()
@@ -1,98 +1,30 @@
-import oracledb
+import argparse
 import getpass
 import datetime
-import re
-import sys
-from datetime import datetime as dt
 
-# Grupo 12
-
-# --- CONFIGURAÇÃO ---
-DB_USER = 'system'
-DB_PASS = 'oracle'
-DB_DSN = 'localhost:1521/xe'
-
-def validar_cpf(cpf):
-    """Valida se o CPF tem 11 dígitos numéricos"""
-    return cpf.isdigit() and len(cpf) == 11
-
-def validar_data(data_str, formato='%d/%m/%Y'):
-    """Valida se a data está no formato correto"""
-    try:
-        dt.strptime(data_str, formato)
-        return True
-    except ValueError:
-        return False
-
-def validar_data_futura(data_str, formato='%d/%m/%Y'):
-    """Valida se a data é futura"""
-    try:
-        data = dt.strptime(data_str, formato)
-        return data.date() > dt.now().date()
-    except ValueError:
-        return False
+import banco
+from relatorios import (
+    RELATORIOS, chave_da_linha, exportar_csv, exportar_parquet, historico_usuario,
+    ler_em_fluxo, ocupacao_periodo, paginar, relatorio_cobertura,
+)
+from servicos import (
+    ErroServico, ServicoAluguel, ServicoCadastro, ServicoEstoque, ServicoManutencao,
+    cache_bikes, cache_pontos, estoque_pontos,
+)
+from validacoes import (
+    validar_cpf, validar_data, validar_data_passado, validar_uf,
+    validar_numero_positivo, validar_sn, validar_tipo_manutencao,
+    validar_validade_cartao, formatar_cpf,
+)
 
-def validar_data_passado(data_str, formato='%d/%m/%Y'):
-    """Valida se a data é no passado (para nascimento)"""
-    try:
-        data = dt.strptime(data_str, formato)
-        return data.date() < dt.now().date()
-    except ValueError:
-        return False
+# Grupo 12
 
-def validar_uf(uf):
-    """Valida UF (2 letras maiúsculas)"""
-    return len(uf) == 2 and uf.isalpha() and uf.isupper()
+servico_cadastro = ServicoCadastro()
+servico_aluguel = ServicoAluguel()
+servico_manutencao = ServicoManutencao()
+servico_estoque = ServicoEstoque()
 
-def validar_numero_positivo(valor_str, decimal=False):
-    """Valida número positivo"""
-    try:
-        if decimal:
-            valor = float(valor_str)
-            return valor >= 0
-        else:
-            valor = int(valor_str)
-            return valor > 0
-    except ValueError:
-        return False
-
-def validar_email(email):
-    """Valida formato de email básico"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
-
-def validar_telefone(telefone):
-    """Valida telefone (10 ou 11 dígitos)"""
-    telefone_limpo = re.sub(r'\D', '', telefone)
-    return len(telefone_limpo) in [10, 11]
-
-def validar_sn(resposta):
-    """Valida resposta Sim/Não"""
-    return resposta.upper() in ['S', 'N']
-
-def validar_tipo_manutencao(tipo):
-    """Valida tipo de manutenção"""
-    return tipo.upper() in ['PREVENTIVA', 'CORRETIVA', 'ANTECIPADA']
-
-def validar_status_bike(status):
-    """Valida status da bike"""
-    return status.upper() in ['DISPONIVEL', 'EM_USO', 'MANUTENCAO']
-
-def formatar_cpf(cpf):
-    """Formata CPF para exibição"""
-    cpf_limpo = re.sub(r'\D', '', cpf)
-    if len(cpf_limpo) == 11:
-        return f'{cpf_limpo[:3]}.{cpf_limpo[3:6]}.{cpf_limpo[6:9]}-{cpf_limpo[9:]}'
-    return cpf
-
-def conectar_banco():
-    """Estabelece a conexão com o banco de dados Oracle"""
-    try:
-        return oracledb.connect(user=DB_USER, password=DB_PASS, dsn=DB_DSN)
-    except oracledb.Error as e:
-        sys.exit(f"[ERRO CRÍTICO] Conexão falhou: {e}")
-
-def cadastrar_usuario(conn):
+def cadastrar_usuario():
     print("\n--- CADASTRO UNIFICADO (USUÁRIO + CARTÃO) ---")
     
     try:
@@ -103,13 +35,9 @@ def cadastrar_usuario(conn):
             cpf = input("CPF (apenas números, 11 dígitos): ").strip()
             if validar_cpf(cpf):
                 # Verifica se CPF já existe
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM Usuario WHERE cpf = :1", (cpf,))
-                if cursor.fetchone()[0] > 0:
+                if servico_cadastro.cpf_cadastrado(cpf):
                     print(f"[ERRO] CPF {formatar_cpf(cpf)} já cadastrado!")
-                    cursor.close()
                     continue
-                cursor.close()
                 break
             else:
                 print("[ERRO] CPF inválido! Deve conter exatamente 11 números.")
@@ -149,7 +77,7 @@ def cadastrar_usuario(conn):
         while True:
             cad_unico_in = input("Possui CadÚnico? (S/N): ").strip().upper()
             if validar_sn(cad_unico_in):
-                is_cad_unico = 1 if cad_unico_in == 'S' else 0
+                is_cad_unico = cad_unico_in == 'S'
                 break
             print("[ERRO] Digite apenas 'S' ou 'N'.")
         
@@ -166,57 +94,31 @@ def cadastrar_usuario(conn):
         # Validade do cartão
         while True:
             validade = input("Validade do Cartão (DD/MM/AAAA): ").strip()
-            if validar_data(validade):
-                data_validade = dt.strptime(validade, '%d/%m/%Y')
-                data_minima = dt.now() + datetime.timedelta(days=30)
-                data_maxima = dt.now() + datetime.timedelta(days=5*365)
-                
-                if data_validade.date() < data_minima.date():
-                    print("[ERRO] Validade deve ser pelo menos 1 mês à frente.")
-                elif data_validade.date() > data_maxima.date():
-                    print("[ERRO] Validade não pode ultrapassar 5 anos.")
-                else:
-                    break
-            else:
+            if not validar_data(validade):
                 print("[ERRO] Data inválida! Use formato DD/MM/AAAA.")
+            elif not validar_validade_cartao(validade):
+                print("[ERRO] Validade deve estar entre 1 mês e 5 anos à frente.")
+            else:
+                break
         
-        cursor = conn.cursor()
-        
-        # Inserir usuário
-        sql_usuario = """
-            INSERT INTO Usuario (cpf, nome, data_nasc, rua, numero, bairro, cidade, uf, is_cadUnico)
-            VALUES (:1, :2, TO_DATE(:3, 'DD/MM/YYYY'), :4, :5, :6, :7, :8, :9)
-        """
-        cursor.execute(sql_usuario, (cpf, nome, data_nasc, rua, numero, bairro, cidade, uf, is_cad_unico))
-        
-        # Inserir cartão
-        sql_cartao = """
-            INSERT INTO Cartao (usuario_cpf, saldo, data_validade, data_emissao)
-            VALUES (:1, :2, TO_DATE(:3, 'DD/MM/YYYY'), SYSDATE)
-        """
-        cursor.execute(sql_cartao, (cpf, saldo, validade))
-        
-        conn.commit()
+        servico_cadastro.cadastrar_usuario(cpf, nome, data_nasc, cidade, uf, saldo, validade,
+                                           rua=rua, numero=numero, bairro=bairro,
+                                           is_cad_unico=is_cad_unico)
         print(f"\n✅ [SUCESSO] Usuário {nome} cadastrado com sucesso!")
         print(f"   CPF: {formatar_cpf(cpf)}")
         print(f"   Cartão emitido com saldo: R$ {saldo:.2f}")
         print(f"   Validade: {validade}")
         
-    except oracledb.DatabaseError as e:
-        conn.rollback()
-        error, = e.args
-        print(f"\n❌ [ERRO DE BANCO] Falha no cadastro: {error.message}")
+    except ErroServico as e:
+        print(f"\n❌ [ERRO] {e}")
+    except banco.ErroBanco as e:
+        print(f"\n❌ [ERRO DE BANCO] Falha no cadastro: {e}")
     except Exception as e:
-        conn.rollback()
         print(f"\n❌ [ERRO] {e}")
-    finally:
-        if 'cursor' in locals():
-            cursor.close()
 
-def registrar_aluguel(conn):
+def registrar_aluguel():
     print("\n--- NOVO ALUGUEL ---")
     
-    cursor = conn.cursor()
     try:
         # Validação CPF
         while True:
@@ -225,34 +127,8 @@ def registrar_aluguel(conn):
                 break
             print("[ERRO] CPF inválido! 11 dígitos necessários.")
         
-        # Verificar usuário
-        sql_user_check = """
-            SELECT U.nome, C.saldo,
-                   (SELECT COUNT(*) FROM Aluguel A 
-                    JOIN Multa M ON A.id_aluguel = M.aluguel_id 
-                    WHERE A.usuario_cpf = U.cpf AND M.isPaid = 0) as multas_pendentes
-            FROM Usuario U 
-            LEFT JOIN Cartao C ON U.cpf = C.usuario_cpf
-            WHERE U.cpf = :1
-        """
-        cursor.execute(sql_user_check, (cpf,))
-        user_data = cursor.fetchone()
-        
-        if not user_data:
-            print(f"❌ [ERRO] Usuário com CPF {formatar_cpf(cpf)} não encontrado.")
-            return
-        
-        nome, saldo, multas = user_data
-        
-        if multas > 0:
-            print(f"❌ [BLOQUEIO] Usuário {nome} possui {multas} multa(s) pendente(s).")
-            return
-        
-        # Verificar saldo mínimo (R$ 5.00)
-        if saldo is None or saldo < 5.00:
-            print(f"❌ [BLOQUEIO] Saldo insuficiente. Mínimo necessário: R$ 5.00")
-            print(f"   Saldo atual: R$ {saldo:.2f if saldo else 0.00}")
-            return
+        # Verificar usuário (existência, multas e saldo mínimo)
+        usuario = servico_aluguel.verificar_usuario(cpf)
         
         # Validação Bike ID
         while True:
@@ -263,28 +139,13 @@ def registrar_aluguel(conn):
             print("[ERRO] ID da bike deve ser um número positivo.")
         
         # Verificar bike
-        sql_bike_check = """
-            SELECT B.status, B.ponto_atual_id, P.rua, P.bairro
-            FROM Bike B 
-            LEFT JOIN Ponto P ON B.ponto_atual_id = P.cod_ponto
-            WHERE B.n_registro = :1
-        """
-        cursor.execute(sql_bike_check, (bike_id,))
-        bike_data = cursor.fetchone()
-        
-        if not bike_data:
-            print("❌ [ERRO] Bicicleta não encontrada.")
-            return
-        
-        status, ponto_atual, rua, bairro = bike_data
-        
-        if status != 'DISPONIVEL':
-            print(f"❌ [ERRO] Bike indisponível. Status atual: {status}")
-            return
+        bike = servico_aluguel.verificar_bike(bike_id)
+        cadastro = servico_cadastro.obter_bike(bike_id)
         
-        print(f"\n📍 Bike disponível no ponto: {rua}, {bairro}")
-        print(f"👤 Usuário: {nome}")
-        print(f"💳 Saldo disponível: R$ {saldo:.2f}")
+        print(f"\n🚲 Bike: {cadastro.modelo} ({cadastro.cor})")
+        print(f"📍 Bike disponível no ponto: {bike.rua}, {bike.bairro}")
+        print(f"👤 Usuário: {usuario.nome}")
+        print(f"💳 Saldo disponível: R$ {usuario.saldo:.2f}")
         
         # Confirmar aluguel
         while True:
@@ -297,191 +158,195 @@ def registrar_aluguel(conn):
             print("Aluguel cancelado pelo usuário.")
             return
         
-        # Registrar aluguel
-        sql_insert_aluguel = """
-            INSERT INTO Aluguel (bike_n_registro, usuario_cpf, ponto_retirada_id, 
-                                data_hora_inicio, status)
-            VALUES (:1, :2, :3, SYSTIMESTAMP, 'EM_ANDAMENTO')
-        """
-        cursor.execute(sql_insert_aluguel, (bike_id, cpf, ponto_atual))
-        
-        # Atualizar bike
-        sql_update_bike = "UPDATE Bike SET status = 'EM_USO' WHERE n_registro = :1"
-        cursor.execute(sql_update_bike, (bike_id,))
-        
-        conn.commit()
+        aluguel = servico_aluguel.iniciar_aluguel(cpf, bike_id)
         print(f"\n✅ [SUCESSO] Aluguel registrado!")
-        print(f"   Bike: {bike_id}")
-        print(f"   Usuário: {nome}")
+        print(f"   Aluguel: {aluguel.id_aluguel}")
+        print(f"   Bike: {aluguel.bike_id}")
+        print(f"   Usuário: {aluguel.nome}")
         print(f"   Hora de início: {datetime.datetime.now().strftime('%H:%M')}")
         
-    except oracledb.DatabaseError as e:
-        conn.rollback()
-        error, = e.args
-        print(f"❌ [ERRO DE BANCO] Não foi possível registrar o aluguel: {error.message}")
+    except ErroServico as e:
+        print(f"❌ [ERRO] {e}")
+    except banco.ErroBanco as e:
+        print(f"❌ [ERRO DE BANCO] Não foi possível registrar o aluguel: {e}")
     except Exception as e:
-        conn.rollback()
         print(f"❌ [ERRO] {e}")
-    finally:
-        cursor.close()
 
-def menu_relatorios(conn):
+def menu_relatorios():
     while True:
         print("\n" + "="*50)
         print("📊 [ADM] PAINEL DE RELATÓRIOS")
         print("="*50)
-        print("1. Relatório de Fidelidade (Users em todos pontos do Centro)")
+        print("1. Relatório de Fidelidade (Users nos pontos de um bairro)")
         print("2. Ranking de Melhores Bikes")
         print("3. Relatório de Inadimplência")
         print("4. Auditoria de Manutenção")
         print("5. Pontos Sobrecarregados")
         print("6. Histórico de Usuário")
+        print("7. Ocupação dos Pontos por Período")
         print("0. Voltar")
         
         while True:
-            op = input("\nSelecione o relatório (0-6): ").strip()
-            if op in ['0', '1', '2', '3', '4', '5', '6']:
+            op = input("\nSelecione o relatório (0-7): ").strip()
+            if op in ['0', '1', '2', '3', '4', '5', '6', '7']:
                 break
-            print("[ERRO] Digite um número entre 0 e 6.")
+            print("[ERRO] Digite um número entre 0 e 7.")
         
         if op == '0': 
             break
         
-        cursor = conn.cursor()
         try:
-            if op == '1':
-                print("\n📋 USUÁRIOS 'POWER USER' (Fidelidade Centro)")
-                print("-" * 50)
-                sql = """
-                SELECT U.nome, U.cpf, COUNT(DISTINCT A.ponto_retirada_id) as pontos_centro
-                FROM Usuario U
-                JOIN Aluguel A ON U.cpf = A.usuario_cpf
-                JOIN Ponto P ON A.ponto_retirada_id = P.cod_ponto
-                WHERE P.bairro = 'Centro' AND P.cidade = 'São Carlos'
-                GROUP BY U.cpf, U.nome
-                HAVING COUNT(DISTINCT A.ponto_retirada_id) = (
-                    SELECT COUNT(*) FROM Ponto 
-                    WHERE bairro = 'Centro' AND cidade = 'São Carlos'
-                )
-                ORDER BY pontos_centro DESC
-                """
-                cursor.execute(sql)
-                
-            elif op == '2':
-                print("\n🏆 RANKING DE BIKES (por avaliação)")
-                print("-" * 50)
-                sql = """
-                SELECT B.n_registro, B.modelo, 
-                       COUNT(A.id_aluguel) as total_alugueis,
-                       ROUND(AVG(CB.nota), 2) as nota_media,
-                       SUM(B.tempo_total_utilizado) as horas_uso
-                FROM Bike B
-                LEFT JOIN Aluguel A ON B.n_registro = A.bike_n_registro
-                LEFT JOIN Comentario_Bike CB ON A.id_aluguel = CB.aluguel_id
-                GROUP BY B.n_registro, B.modelo 
-                HAVING COUNT(A.id_aluguel) > 0
-                ORDER BY nota_media DESC NULLS LAST
-                FETCH FIRST 10 ROWS ONLY
-                """
-                cursor.execute(sql)
-                
-            elif op == '3':
-                print("\n💰 RELATÓRIO DE DÍVIDAS")
-                print("-" * 50)
-                sql = """
-                SELECT U.nome, U.cpf, 
-                       COUNT(M.id_multa) as multas_pendentes,
-                       COALESCE(SUM(M.valor), 0.00) as valor_total
-                FROM Usuario U
-                LEFT JOIN Aluguel A ON U.cpf = A.usuario_cpf
-                LEFT JOIN Multa M ON A.id_aluguel = M.aluguel_id AND M.isPaid = 0
-                GROUP BY U.cpf, U.nome 
-                HAVING COALESCE(SUM(M.valor), 0) > 0
-                ORDER BY valor_total DESC
-                """
-                cursor.execute(sql)
-                
-            elif op == '4':
-                print("\n🔧 AUDITORIA DE MANUTENÇÃO")
-                print("-" * 50)
-                sql = """
-                SELECT B.n_registro, B.modelo, 
-                       M.tipo, M.valor, 
-                       M.data_inicio,
-                       (SYSDATE - M.data_inicio) as dias_em_manutencao,
-                       M.descricao_problema
-                FROM Bike B 
-                JOIN Manutencao M ON B.n_registro = M.bike_n_registro
-                WHERE M.data_fim IS NULL
-                ORDER BY dias_em_manutencao DESC
-                """
-                cursor.execute(sql)
-                
-            elif op == '5':
-                print("\n⚠️ PONTOS COM ALTA OCUPAÇÃO")
-                print("-" * 50)
-                sql = """
-                SELECT P.cod_ponto, P.rua, P.bairro, P.capacidade_maxima,
-                       COUNT(A.id_aluguel) as movimentacoes,
-                       ROUND(COUNT(A.id_aluguel) / P.capacidade_maxima * 100, 2) as taxa_ocupacao
-                FROM Ponto P
-                JOIN Aluguel A ON (P.cod_ponto = A.ponto_retirada_id OR P.cod_ponto = A.ponto_devolucao_id)
-                WHERE A.data_hora_inicio >= SYSDATE - 30
-                GROUP BY P.cod_ponto, P.rua, P.bairro, P.capacidade_maxima
-                HAVING COUNT(A.id_aluguel) > P.capacidade_maxima * 0.8
-                ORDER BY taxa_ocupacao DESC
-                """
-                cursor.execute(sql)
-                
-            elif op == '6':
-                print("\n👤 HISTÓRICO COMPLETO DO USUÁRIO")
-                print("-" * 50)
-                while True:
-                    cpf_hist = input("Digite o CPF do usuário: ").strip()
-                    if validar_cpf(cpf_hist):
-                        break
-                    print("[ERRO] CPF inválido!")
-                
-                sql = """
-                SELECT U.nome, COUNT(A.id_aluguel) as total_alugueis,
-                       COALESCE(SUM(A.periodo_alugado), 0) as minutos_totais,
-                       ROUND(AVG(CB.nota), 2) as nota_media_bikes,
-                       ROUND(AVG(CP.nota), 2) as nota_media_pontos
-                FROM Usuario U
-                LEFT JOIN Aluguel A ON U.cpf = A.usuario_cpf
-                LEFT JOIN Comentario_Bike CB ON A.id_aluguel = CB.aluguel_id
-                LEFT JOIN Comentario_Ponto CP ON A.id_aluguel = CP.aluguel_id
-                WHERE U.cpf = :1
-                GROUP BY U.nome
-                """
-                cursor.execute(sql, (cpf_hist,))
-                historico = cursor.fetchone()
-                
-                if historico:
-                    nome, total, minutos, nota_bike, nota_ponto = historico
-                    print(f"\n📊 RESUMO DO USUÁRIO: {nome}")
-                    print(f"   Total de aluguéis: {total}")
-                    print(f"   Tempo total de uso: {minutos} minutos ({minutos/60:.1f} horas)")
-                    print(f"   Nota média das bikes: {nota_bike if nota_bike else 'N/A'}/10")
-                    print(f"   Nota média dos pontos: {nota_ponto if nota_ponto else 'N/A'}/10")
-                else:
-                    print("Usuário não encontrado ou sem histórico.")
+            if op == '6':
+                exibir_historico_usuario()
                 continue
-            
-            rows = cursor.fetchall()
-            if not rows:
-                print("   📭 Nenhum registro encontrado para esta consulta")
+            if op == '7':
+                exibir_ocupacao_periodo()
+                continue
+
+            relatorio = ler_relatorio_cobertura() if op == '1' else RELATORIOS[op]
+            print("\nSaída: 1. Tela  2. Arquivo CSV  3. Arquivo Parquet")
+            while True:
+                saida = input("Escolha (1-3): ").strip() or '1'
+                if saida in ['1', '2', '3']:
+                    break
+                print("[ERRO] Digite 1, 2 ou 3.")
+
+            if saida == '1':
+                exibir_relatorio(relatorio)
             else:
-                for i, row in enumerate(rows, 1):
-                    print(f"{i:2}. {row}")
-                print(f"\nTotal de registros: {len(rows)}")
-                
-        except oracledb.Error as e:
+                exportar_relatorio(relatorio, 'csv' if saida == '2' else 'parquet')
+        except ErroServico as e:
+            print(f"❌ [ERRO] {e}")
+        except banco.ErroBanco as e:
             print(f"❌ [ERRO SQL] {e}")
-        finally:
-            cursor.close()
 
-def cadastrar_ponto(conn):
+def ler_relatorio_cobertura():
+    cidade = input("Cidade [São Carlos]: ").strip() or 'São Carlos'
+    bairro = input("Bairro [Centro]: ").strip() or 'Centro'
+    while True:
+        texto = input("Percentual mínimo dos pontos do bairro [100]: ").strip() or '100'
+        try:
+            return relatorio_cobertura(cidade, bairro, float(texto.replace(',', '.')))
+        except ValueError:
+            print("[ERRO] Digite um número.")
+        except ErroServico as e:
+            print(f"[ERRO] {e}")
+
+def exibir_historico_usuario():
+    while True:
+        cpf_hist = input("Digite o CPF do usuário: ").strip()
+        if validar_cpf(cpf_hist):
+            break
+        print("[ERRO] CPF inválido!")
+
+    print("\n👤 HISTÓRICO COMPLETO DO USUÁRIO")
+    print("-" * 50)
+    with banco.conexao() as conn:
+        historico = historico_usuario(conn, cpf_hist)
+
+    if historico:
+        nome, total, minutos, nota_bike, nota_ponto = historico
+        print(f"\n📊 RESUMO DO USUÁRIO: {nome}")
+        print(f"   Total de aluguéis: {total}")
+        print(f"   Tempo total de uso: {minutos} minutos ({minutos/60:.1f} horas)")
+        print(f"   Nota média das bikes: {nota_bike if nota_bike else 'N/A'}/10")
+        print(f"   Nota média dos pontos: {nota_ponto if nota_ponto else 'N/A'}/10")
+    else:
+        print("Usuário não encontrado ou sem histórico.")
+
+def exibir_ocupacao_periodo():
+    while True:
+        inicio_str = input("Data inicial (DD/MM/AAAA): ").strip()
+        if validar_data(inicio_str):
+            break
+        print("[ERRO] Data inválida! Use DD/MM/AAAA")
+    while True:
+        fim_str = input("Data final (DD/MM/AAAA): ").strip()
+        if validar_data(fim_str):
+            break
+        print("[ERRO] Data inválida! Use DD/MM/AAAA")
+
+    inicio = datetime.datetime.strptime(inicio_str, '%d/%m/%Y')
+    # A data final entra inteira no período
+    fim = datetime.datetime.strptime(fim_str, '%d/%m/%Y') + datetime.timedelta(days=1)
+    if fim <= inicio:
+        print("[ERRO] A data final deve ser igual ou posterior à inicial.")
+        return
+
+    print(f"\n📍 PONTOS MAIS MOVIMENTADOS ({inicio_str} a {fim_str})")
+    print("-" * 50)
+    with banco.conexao() as conn:
+        _, linhas = ocupacao_periodo(conn, inicio, fim)
+
+    if not linhas:
+        print("   📭 Nenhum movimento no período")
+        return
+    for i, (cod, rua, bairro, capacidade, retiradas, devolucoes, movimentos, pico, ocupacao) \
+            in enumerate(linhas, 1):
+        print(f"{i:2}. Ponto {cod} - {rua}, {bairro}: {movimentos} movimentos "
+              f"({retiradas} retiradas, {devolucoes} devoluções), "
+              f"pico {pico}/{capacidade} bikes ({ocupacao or 0}%)")
+
+def exibir_relatorio(relatorio):
+    """Mostra o relatório uma página por vez; cada página usa uma sessão do pool só enquanto é lida"""
+    print(f"\n{relatorio.titulo}")
+    print("-" * 50)
+
+    if relatorio.chave is None:
+        with banco.conexao() as conn:
+            total = 0
+            for _, lote in ler_em_fluxo(conn, relatorio):
+                for row in lote:
+                    total += 1
+                    print(f"{total:2}. {row}")
+        if total == 0:
+            print("   📭 Nenhum registro encontrado para esta consulta")
+        else:
+            print(f"\nTotal de registros: {total}")
+        return
+
+    inicio = 1
+    apos = antes = None
+    while True:
+        with banco.conexao() as conn:
+            pagina = paginar(conn, relatorio, apos=apos, antes=antes)
+
+        if not pagina.linhas:
+            if inicio == 1:
+                print("   📭 Nenhum registro encontrado para esta consulta")
+            else:
+                print("   📭 Não há mais registros.")
+            return
+
+        if antes is not None:
+            inicio -= len(pagina.linhas)
+        for i, row in enumerate(pagina.linhas, inicio):
+            print(f"{i:2}. {row}")
+
+        tem_proxima = pagina.tem_mais if antes is None else True
+        tem_anterior = inicio > 1
+        opcoes = (["[P]róxima"] if tem_proxima else []) + (["[A]nterior"] if tem_anterior else [])
+        if not opcoes:
+            print(f"\nTotal de registros: {inicio + len(pagina.linhas) - 1}")
+            return
+
+        acao = input(f"\n{' '.join(opcoes)} [S]air: ").strip().upper()
+        if acao == 'P' and tem_proxima:
+            inicio += len(pagina.linhas)
+            apos, antes = chave_da_linha(relatorio, pagina.colunas, pagina.linhas[-1]), None
+        elif acao == 'A' and tem_anterior:
+            apos, antes = None, chave_da_linha(relatorio, pagina.colunas, pagina.linhas[0])
+        else:
+            return
+
+def exportar_relatorio(relatorio, formato):
+    caminho = input(f"Arquivo de saída (.{formato}): ").strip() or f"relatorio.{formato}"
+    exportar = exportar_csv if formato == 'csv' else exportar_parquet
+    with banco.conexao() as conn:
+        total = exportar(conn, relatorio, caminho)
+    print(f"✅ {total} registro(s) exportado(s) para {caminho}")
+
+def cadastrar_ponto():
     print("\n📍 NOVO PONTO DE ESTACIONAMENTO")
     
     try:
@@ -520,27 +385,16 @@ def cadastrar_ponto(conn):
             else:
                 print("[ERRO] Capacidade deve ser um número inteiro positivo.")
         
-        cursor = conn.cursor()
-        sql = """
-            INSERT INTO Ponto (rua, numero, bairro, cidade, uf, referencia, capacidade_maxima)
-            VALUES (:1, :2, :3, :4, :5, :6, :7)
-        """
-        cursor.execute(sql, (rua, numero, bairro, cidade, uf, referencia, capacidade))
-        conn.commit()
-        
-        print(f"✅ [SUCESSO] Ponto registrado com capacidade para {capacidade} bikes.")
+        cod_ponto = servico_cadastro.cadastrar_ponto(rua, cidade, uf, capacidade, numero=numero,
+                                                     bairro=bairro, referencia=referencia)
+        print(f"✅ [SUCESSO] Ponto {cod_ponto} registrado com capacidade para {capacidade} bikes.")
         
     except Exception as e:
-        conn.rollback()
         print(f"❌ [ERRO] {e}")
-    finally:
-        if 'cursor' in locals():
-            cursor.close()
 
-def cadastrar_bike(conn):
+def cadastrar_bike():
     print("\n🚲 NOVA BICICLETA")
     
-    cursor = conn.cursor()
     try:
         # Modelo
         while True:
@@ -570,33 +424,22 @@ def cadastrar_bike(conn):
             if validar_numero_positivo(ponto_id_str):
                 ponto_id = int(ponto_id_str)
                 # Verificar se ponto existe
-                cursor.execute("SELECT COUNT(*) FROM Ponto WHERE cod_ponto = :1", (ponto_id,))
-                if cursor.fetchone()[0] > 0:
+                if servico_cadastro.ponto_existe(ponto_id):
                     break
                 else:
                     print("[ERRO] Ponto não encontrado. Verifique o ID.")
             else:
                 print("[ERRO] ID do ponto deve ser um número positivo.")
         
-        sql = """
-            INSERT INTO Bike (modelo, ano_fabricacao, cor, status, qnt_alugueis, tempo_total_utilizado, ponto_atual_id)
-            VALUES (:1, :2, :3, 'DISPONIVEL', 0, 0, :4)
-        """
-        cursor.execute(sql, (modelo, ano, cor, ponto_id))
-        conn.commit()
-        
-        print(f"✅ [SUCESSO] Bicicleta {modelo} {ano} adicionada à frota.")
+        n_registro = servico_cadastro.cadastrar_bike(modelo, ano, cor, ponto_id)
+        print(f"✅ [SUCESSO] Bicicleta {modelo} {ano} adicionada à frota (registro {n_registro}).")
         
     except Exception as e:
-        conn.rollback()
         print(f"❌ [ERRO] {e}")
-    finally:
-        cursor.close()
 
-def gerir_manutencao(conn):
+def gerir_manutencao():
     print("\n🔧 GESTÃO DE MANUTENÇÃO")
     
-    cursor = conn.cursor()
     try:
         while True:
             print("\n1. Enviar Bike para Manutenção (Início)")
@@ -620,21 +463,6 @@ def gerir_manutencao(conn):
                     break
                 print("[ERRO] ID da bike deve ser um número positivo.")
             
-            # Verificar status da bike
-            cursor.execute("SELECT status FROM Bike WHERE n_registro = :1", (bike_id,))
-            row = cursor.fetchone()
-            
-            if not row:
-                print("❌ [ERRO] Bike não encontrada.")
-                return
-            
-            if row[0] == 'EM_USO':
-                print("❌ [BLOQUEIO] Bike está alugada. Aguarde devolução.")
-                return
-            elif row[0] == 'MANUTENCAO':
-                print("⚠️ [AVISO] Bike já está em manutenção.")
-                return
-            
             # Tipo de manutenção
             while True:
                 tipo = input("Tipo (PREVENTIVA/CORRETIVA/ANTECIPADA): ").strip().upper()
@@ -649,18 +477,7 @@ def gerir_manutencao(conn):
                     break
                 print("[ERRO] Descrição muito curta. Forneça mais detalhes.")
             
-            # Inserir manutenção
-            sql_insert = """
-                INSERT INTO Manutencao (bike_n_registro, tipo, data_inicio, descricao_problema, valor)
-                VALUES (:1, :2, SYSDATE, :3, 0)
-            """
-            cursor.execute(sql_insert, (bike_id, tipo, problema))
-            
-            # Atualizar status da bike
-            sql_update = "UPDATE Bike SET status = 'MANUTENCAO', ponto_atual_id = NULL WHERE n_registro = :1"
-            cursor.execute(sql_update, (bike_id,))
-            
-            conn.commit()
+            servico_manutencao.abrir_manutencao(bike_id, tipo, problema)
             print(f"✅ [SUCESSO] Bike {bike_id} enviada para manutenção.")
         
         elif op == '2':
@@ -688,39 +505,16 @@ def gerir_manutencao(conn):
                     break
                 print("[ERRO] ID do ponto deve ser um número positivo.")
             
-            # Finalizar manutenção
-            sql_manut = """
-                UPDATE Manutencao SET data_fim = SYSDATE, valor = :1 
-                WHERE bike_n_registro = :2 AND data_fim IS NULL
-            """
-            cursor.execute(sql_manut, (custo, bike_id))
-            
-            if cursor.rowcount == 0:
-                print("❌ [ERRO] Nenhuma manutenção aberta encontrada para essa bike.")
-                conn.rollback()
-                return
-            
-            # Atualizar bike
-            sql_bike = """
-                UPDATE Bike SET status = 'DISPONIVEL', ponto_atual_id = :1 
-                WHERE n_registro = :2
-            """
-            cursor.execute(sql_bike, (ponto_novo, bike_id))
-            
-            conn.commit()
+            servico_manutencao.fechar_manutencao(bike_id, custo, ponto_novo)
             print(f"✅ [SUCESSO] Bike {bike_id} disponível novamente.")
             print(f"   Custo da manutenção: R$ {custo:.2f}")
     
     except Exception as e:
-        conn.rollback()
         print(f"❌ [ERRO] {e}")
-    finally:
-        cursor.close()
 
-def realizar_devolucao(conn):
+def realizar_devolucao():
     print("\n🔄 DEVOLUÇÃO DE BIKE")
     
-    cursor = conn.cursor()
     try:
         # Validar ID do aluguel
         while True:
@@ -730,90 +524,41 @@ def realizar_devolucao(conn):
                 break
             print("[ERRO] ID do aluguel deve ser um número positivo.")
         
-        # Verificar aluguel
-        sql_check = """
-            SELECT A.bike_n_registro, A.data_hora_inicio, A.status, U.nome, B.modelo
-            FROM Aluguel A
-            JOIN Usuario U ON A.usuario_cpf = U.cpf
-            JOIN Bike B ON A.bike_n_registro = B.n_registro
-            WHERE A.id_aluguel = :1
-        """
-        cursor.execute(sql_check, (aluguel_id,))
-        dados = cursor.fetchone()
-        
-        if not dados:
-            print("❌ [ERRO] Aluguel não encontrado.")
-            return
-        
-        bike_id, inicio, status, nome, modelo = dados
-        
-        if status != 'EM_ANDAMENTO':
-            print(f"❌ [ERRO] Este aluguel não está ativo. Status: {status}")
-            return
-        
         # Validar ponto de devolução
         while True:
             ponto_dest_str = input("ID do Ponto de Devolução: ").strip()
             if validar_numero_positivo(ponto_dest_str):
                 ponto_dest = int(ponto_dest_str)
                 # Verificar se ponto existe
-                cursor.execute("SELECT COUNT(*) FROM Ponto WHERE cod_ponto = :1", (ponto_dest,))
-                if cursor.fetchone()[0] > 0:
+                if servico_cadastro.ponto_existe(ponto_dest):
                     break
                 else:
                     print("[ERRO] Ponto não encontrado.")
             else:
                 print("[ERRO] ID do ponto deve ser um número positivo.")
         
-        # Calcular duração
-        agora = datetime.datetime.now()
-        duracao_minutos = (agora - inicio).total_seconds() / 60
-        
-        # Atualizar aluguel
-        sql_aluguel = """
-            UPDATE Aluguel SET 
-                data_hora_fim = SYSDATE, 
-                ponto_devolucao_id = :1, 
-                status = 'CONCLUIDO',
-                valor_aluguel = ROUND(:2 * 0.10, 2) -- Exemplo: R$ 0,10 por minuto
-            WHERE id_aluguel = :3
-        """
-        cursor.execute(sql_aluguel, (ponto_dest, duracao_minutos, aluguel_id))
-        
-        # Atualizar bike
-        sql_bike_stats = """
-            UPDATE Bike SET 
-                status = 'DISPONIVEL',
-                ponto_atual_id = :1,
-                qnt_alugueis = qnt_alugueis + 1,
-                tempo_total_utilizado = tempo_total_utilizado + :2
-            WHERE n_registro = :3
-        """
-        cursor.execute(sql_bike_stats, (ponto_dest, duracao_minutos, bike_id))
-        
-        conn.commit()
+        devolucao = servico_aluguel.finalizar_aluguel(aluguel_id, ponto_dest)
         
         print(f"\n✅ [SUCESSO] Devolução realizada com sucesso!")
-        print(f"   Usuário: {nome}")
-        print(f"   Bike: {modelo} (ID: {bike_id})")
-        print(f"   Tempo de uso: {int(duracao_minutos)} minutos")
-        print(f"   Ponto de devolução: {ponto_dest}")
+        print(f"   Usuário: {devolucao.nome}")
+        print(f"   Bike: {devolucao.modelo} (ID: {devolucao.bike_id})")
+        print(f"   Tempo de uso: {int(devolucao.duracao_minutos)} minutos")
+        print(f"   Valor: R$ {devolucao.valor:.2f}")
+        print(f"   Ponto de devolução: {devolucao.ponto_devolucao_id}")
         
         # Sugerir comentário
         print("\n💬 Lembre-se de avaliar sua experiência:")
         print("   - Use a opção 8 no menu para ver detalhes do aluguel")
         print("   - Você pode adicionar comentários sobre a bike e o ponto")
         
+    except ErroServico as e:
+        print(f"❌ [ERRO] {e}")
     except Exception as e:
-        conn.rollback()
         print(f"❌ [ERRO NA TRANSAÇÃO] {e}")
-    finally:
-        cursor.close()
 
-def consultar_situacao_usuario(conn):
+def consultar_situacao_usuario():
     print("\n👤 CONSULTA DE SITUAÇÃO DO USUÁRIO")
     
-    cursor = conn.cursor()
     try:
         while True:
             cpf_input = input("Digite o CPF para consultar (11 dígitos): ").strip()
@@ -821,93 +566,116 @@ def consultar_situacao_usuario(conn):
                 break
             print("[ERRO] CPF inválido! 11 dígitos necessários.")
         
-        sql = """
-            SELECT U.nome, U.cidade, U.is_cadUnico,
-                   C.saldo, C.data_validade,
-                   (SELECT COUNT(*) FROM Aluguel A WHERE A.usuario_cpf = U.cpf AND A.status = 'EM_ANDAMENTO') as alugueis_ativos,
-                   (SELECT COUNT(*) FROM Multa M 
-                    JOIN Aluguel A ON M.aluguel_id = A.id_aluguel 
-                    WHERE A.usuario_cpf = U.cpf AND M.isPaid = 0) as multas_pendentes,
-                   (SELECT COALESCE(SUM(M.valor), 0) FROM Multa M 
-                    JOIN Aluguel A ON M.aluguel_id = A.id_aluguel 
-                    WHERE A.usuario_cpf = U.cpf AND M.isPaid = 0) as valor_multas
-            FROM Usuario U
-            LEFT JOIN Cartao C ON U.cpf = C.usuario_cpf
-            WHERE U.cpf = :1
-        """
-        cursor.execute(sql, (cpf_input,))
-        dados = cursor.fetchone()
-        
-        if not dados:
-            print(f"📭 Nenhum usuário encontrado com o CPF {formatar_cpf(cpf_input)}.")
-            return
-        
-        nome, cidade, is_cad, saldo, validade, ativos, multas, valor_multas = dados
+        situacao = servico_aluguel.consultar_situacao(cpf_input)
         
         # Formatação dos dados
-        tipo_pagamento = "✅ Isento (CadÚnico)" if is_cad == 1 else "💰 Pagante"
+        tipo_pagamento = "✅ Isento (CadÚnico)" if situacao.is_cad_unico else "💰 Pagante"
+        validade = situacao.validade_cartao
         validade_str = validade.strftime('%d/%m/%Y') if validade else "❌ Não definida"
-        saldo_str = f"R$ {saldo:.2f}" if saldo is not None else "❌ Sem Cartão"
+        saldo_str = f"R$ {situacao.saldo:.2f}" if situacao.saldo is not None else "❌ Sem Cartão"
         
         print("\n" + "="*60)
-        print(f"📋 FICHA DO USUÁRIO: {nome}")
+        print(f"📋 FICHA DO USUÁRIO: {situacao.nome}")
         print("="*60)
-        print(f"📍 Local: {cidade}")
+        print(f"📍 Local: {situacao.cidade}")
         print(f"🎫 Perfil: {tipo_pagamento}")
         print(f"💳 Cartão: {saldo_str} (Validade: {validade_str})")
-        print(f"🚴 Aluguéis em Andamento: {ativos}")
-        print(f"⚠️  Multas Pendentes: {multas}")
+        print(f"🚴 Aluguéis em Andamento: {situacao.alugueis_ativos}")
+        print(f"⚠️  Multas Pendentes: {situacao.multas_pendentes}")
         
-        if valor_multas > 0:
-            print(f"💰 Valor Total em Multas: R$ {valor_multas:.2f}")
+        if situacao.valor_multas > 0:
+            print(f"💰 Valor Total em Multas: R$ {situacao.valor_multas:.2f}")
         
         print("\n" + "-"*60)
         
-        if multas > 0:
+        if situacao.multas_pendentes > 0:
             print("❌ [ALERTA] Este usuário possui pendências financeiras!")
             print("   Bloqueado para novos aluguéis até regularização.")
-        elif ativos > 0:
+        elif situacao.bloqueado_ate is not None:
+            print("❌ [ALERTA] Usuário em período de bloqueio por multa.")
+            print(f"   Bloqueado para novos aluguéis até {situacao.bloqueado_ate.strftime('%d/%m/%Y')}.")
+        elif situacao.alugueis_ativos > 0:
             print("ℹ️  [INFO] Usuário está utilizando uma bicicleta no momento.")
         else:
             print("✅ [SITUAÇÃO REGULAR] Liberado para novos aluguéis.")
         
         # Histórico recente
-        if multas > 0:
-            sql_multas = """
-                SELECT M.id_multa, M.valor, M.tipo, M.vencimento
-                FROM Multa M
-                JOIN Aluguel A ON M.aluguel_id = A.id_aluguel
-                WHERE A.usuario_cpf = :1 AND M.isPaid = 0
-                ORDER BY M.vencimento
-            """
-            cursor.execute(sql_multas, (cpf_input,))
-            multas_detalhes = cursor.fetchall()
-            
-            if multas_detalhes:
-                print("\n📝 Detalhes das Multas Pendentes:")
-                for m_id, valor, tipo, venc in multas_detalhes:
-                    print(f"   • ID {m_id}: {tipo} - R$ {valor:.2f} (Vence: {venc.strftime('%d/%m/%Y')})")
+        if situacao.multas:
+            print("\n📝 Detalhes das Multas Pendentes:")
+            for m in situacao.multas:
+                print(f"   • ID {m.id_multa}: {m.tipo} - R$ {m.valor:.2f} (Vence: {m.vencimento.strftime('%d/%m/%Y')})")
         
         print("="*60)
         
-    except oracledb.DatabaseError as e:
+    except ErroServico as e:
+        print(f"📭 {e}")
+    except banco.ErroBanco as e:
+        print(f"❌ [ERRO NA CONSULTA] {e}")
+
+def consultar_bikes_disponiveis():
+    print("\n🔍 BIKES DISPONÍVEIS POR PONTO")
+
+    try:
+        while True:
+            ponto_str = input("Código do Ponto: ").strip()
+            if validar_numero_positivo(ponto_str):
+                ponto_id = int(ponto_str)
+                break
+            print("[ERRO] Código do ponto deve ser um número positivo.")
+
+        estoque = servico_estoque.estoque(ponto_id)
+        print(f"\n📍 {estoque.rua}, {estoque.bairro} - {estoque.cidade}: "
+              f"{estoque.disponiveis}/{estoque.capacidade_maxima} bikes disponíveis")
+
+        bikes = servico_estoque.bikes_disponiveis(ponto_id)
+        for bike in bikes:
+            print(f"   🚲 {bike.n_registro}: {bike.modelo} ({bike.cor})")
+
+        if not bikes:
+            proximos = servico_estoque.pontos_proximos(ponto_id)
+            if proximos:
+                print("\n📭 Nenhuma bike neste ponto. Pontos próximos com bikes:")
+                for p in proximos:
+                    print(f"   • Ponto {p.cod_ponto} - {p.rua}, {p.bairro}: {p.disponiveis} bike(s)")
+            else:
+                print("\n📭 Nenhuma bike disponível neste ponto nem em pontos próximos.")
+    except ErroServico as e:
+        print(f"❌ [ERRO] {e}")
+    except banco.ErroBanco as e:
         print(f"❌ [ERRO NA CONSULTA] {e}")
-    finally:
-        cursor.close()
 
 # MENU PRINCIPAL 
 def main():
-    global DB_PASS
-    if not DB_PASS:
-        DB_PASS = getpass.getpass("Senha Oracle: ")
+    parser = argparse.ArgumentParser(description="Sistema de Gestão de Bikes Circulares")
+    parser.add_argument('--profile', action='store_true',
+                        help="Mede cada chamada ao banco e mostra um resumo ao sair")
+    parser.add_argument('--metricas', metavar='ARQUIVO',
+                        help="Grava as medições ao sair (.json ou texto OpenMetrics/Prometheus)")
+    args = parser.parse_args()
+    if args.profile or args.metricas:
+        banco.ativar_instrumentacao()
+
+    if not banco.DB_PASS:
+        banco.DB_PASS = getpass.getpass("Senha Oracle: ")
     
     print("\n" + "="*60)
     print("🚲 SISTEMA DE GESTÃO DE BIKES CIRCULARES")
     print("="*60)
     
-    conn = conectar_banco()
+    banco.criar_pool()
     print("✅ Conectado ao banco de dados com sucesso!")
     
+    operacoes = {
+        '2': cadastrar_usuario,
+        '3': cadastrar_ponto,
+        '4': cadastrar_bike,
+        '5': gerir_manutencao,
+        '6': registrar_aluguel,
+        '7': realizar_devolucao,
+        '8': consultar_situacao_usuario,
+        '9': consultar_bikes_disponiveis,
+    }
+    
     while True:
         print("\n" + "="*60)
         print("📋 MENU PRINCIPAL")
@@ -920,29 +688,39 @@ def main():
         print("6. 🚀 Realizar Aluguel")
         print("7. 🔄 Informar Devolução")
         print("8. 👁️  Consultar Situação do Usuário")
+        print("9. 🔍 Bikes Disponíveis por Ponto")
         print("0. 🚪 Sair")
         print("-"*60)
         
         while True:
-            op = input("Escolha uma opção (0-8): ").strip()
-            if op in ['0', '1', '2', '3', '4', '5', '6', '7', '8']:
+            op = input("Escolha uma opção (0-9): ").strip()
+            if op in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
                 break
-            print("[ERRO] Digite um número entre 0 e 8.")
+            print("[ERRO] Digite um número entre 0 e 9.")
         
         if op == '0':
             print("\n👋 Obrigado por usar o Sistema de Gestão de Bikes!")
             break
-        elif op == '1': menu_relatorios(conn)
-        elif op == '2': cadastrar_usuario(conn)
-        elif op == '3': cadastrar_ponto(conn)
-        elif op == '4': cadastrar_bike(conn)
-        elif op == '5': gerir_manutencao(conn)
-        elif op == '6': registrar_aluguel(conn)
-        elif op == '7': realizar_devolucao(conn)
-        elif op == '8': consultar_situacao_usuario(conn)
+        elif op == '1':
+            menu_relatorios()
+        else:
+            operacoes[op]()
     
-    conn.close()
+    banco.fechar_pool()
     print("Conexão com o banco encerrada.")
+    for estatistica in (cache_pontos.estatisticas(), cache_bikes.estatisticas()):
+        print(f"Cache de {estatistica['cache']}: {estatistica['acertos']} acertos, "
+              f"{estatistica['falhas']} falhas ({estatistica['taxa_acerto']:.0%})")
+    estatistica = estoque_pontos.estatisticas()
+    print(f"Snapshot de {estatistica['cache']}: {estatistica['leituras']} leituras, "
+          f"{estatistica['cargas']} cargas")
+
+    if args.profile:
+        print("\n⏱️  CHAMADAS AO BANCO (maior tempo total primeiro)")
+        print(banco.metricas.resumo())
+    if args.metricas:
+        banco.metricas.exportar(args.metricas)
+        print(f"Métricas gravadas em {args.metricas}")
 
 if __name__ == "__main__":
     main()
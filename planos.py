@@ -0,0 +1,157 @@
+import argparse
+import ast
+import os
+import re
+import sys
+import time
+
+import oracledb
+
+import banco
+from relatorios import RELATORIOS, sql_completo, sql_pagina
+
+# Grupo 12
+# Conferência de índices: roda EXPLAIN PLAN para cada SQL da aplicação (as
+# constantes e os execute() com texto fixo dos módulos .py, as páginas dos
+# relatórios e as consultas de consultas.sql) e aponta as tabelas lidas por
+# inteiro (TABLE ACCESS FULL). Com --executar, também mede o tempo das
+# consultas que não têm parâmetros.
+#
+# Uso: python planos.py --saida planos.txt --executar
+# Sai com código 1 se alguma leitura completa não estiver em --ignorar.
+
+MODULOS = ['main.py', 'servicos.py', 'relatorios.py', 'carga.py']
+ARQUIVO_CONSULTAS = 'consultas.sql'
+COMANDOS = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'MERGE')
+
+SQL_LEITURAS_COMPLETAS = """
+    SELECT object_name, cardinality
+    FROM plan_table
+    WHERE statement_id = :1 AND operation = 'TABLE ACCESS' AND options LIKE 'FULL%'
+    ORDER BY id
+"""
+
+SQL_EXIBIR_PLANO = "SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :1, 'TYPICAL'))"
+
+def _eh_sql(texto):
+    # Modelos com {campos} são completados em tempo de execução e ficam de fora
+    return texto.strip().upper().startswith(COMANDOS) and '{' not in texto
+
+def sql_dos_modulos(diretorio, modulos=MODULOS):
+    """Gera (nome, sql) das constantes e dos execute() com texto fixo.
+
+    Blocos PL/SQL (BEGIN/DECLARE) ficam de fora: EXPLAIN PLAN não os aceita.
+    """
+    for modulo in modulos:
+        caminho = os.path.join(diretorio, modulo)
+        with open(caminho, encoding='utf-8') as arquivo:
+            arvore = ast.parse(arquivo.read(), modulo)
+        for no in ast.walk(arvore):
+            if (isinstance(no, ast.Assign) and isinstance(no.value, ast.Constant)
+                    and isinstance(no.value.value, str) and _eh_sql(no.value.value)):
+                alvo = no.targets[0]
+                # Constantes pelo nome; variáveis locais (sql, sql_multas...) pela linha
+                constante = isinstance(alvo, ast.Name) and alvo.id.isupper()
+                yield f"{modulo}:{alvo.id if constante else no.lineno}", no.value.value
+            elif (isinstance(no, ast.Call) and isinstance(no.func, ast.Attribute)
+                    and no.func.attr in ('execute', 'executemany') and no.args
+                    and isinstance(no.args[0], ast.Constant)
+                    and isinstance(no.args[0].value, str) and _eh_sql(no.args[0].value)):
+                yield f"{modulo}:{no.lineno}", no.args[0].value
+
+def sql_dos_relatorios():
+    """Relatórios completos e a página seguinte de cada um (SQL montado em relatorios.py)"""
+    for op, relatorio in sorted(RELATORIOS.items()):
+        yield f"relatorio {op}", sql_completo(relatorio)
+        if relatorio.chave is not None:
+            yield f"relatorio {op} (página)", sql_pagina(relatorio, referencia=True)
+
+def sql_do_arquivo(caminho):
+    """Gera (nome, sql) das consultas de um arquivo .sql separadas por ';'"""
+    with open(caminho, encoding='utf-8') as arquivo:
+        texto = re.sub(r'--[^\n]*', '', arquivo.read())
+    consultas = [c.strip() for c in texto.split(';')]
+    for n, consulta in enumerate((c for c in consultas if _eh_sql(c)), 1):
+        yield f"{os.path.basename(caminho)}:consulta {n}", consulta
+
+def explicar(cursor, identificador, sql):
+    """Roda EXPLAIN PLAN; devolve (linhas do plano, [(tabela, cardinalidade)] lidas por inteiro)"""
+    cursor.execute("DELETE FROM plan_table WHERE statement_id = :1", (identificador,))
+    # statement_id é literal na sintaxe do EXPLAIN PLAN (não aceita bind)
+    cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{identificador}' FOR {sql}")
+    cursor.execute(SQL_EXIBIR_PLANO, (identificador,))
+    plano = [linha for linha, in cursor.fetchall()]
+    cursor.execute(SQL_LEITURAS_COMPLETAS, (identificador,))
+    return plano, cursor.fetchall()
+
+def cronometrar(cursor, sql, repeticoes):
+    """Melhor tempo (s) de `repeticoes` execuções lendo todas as linhas"""
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        cursor.execute(sql)
+        if cursor.description:
+            while cursor.fetchmany(1000):
+                pass
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN PLAN dos SQL da aplicação")
+    parser.add_argument('--saida', help="Arquivo texto com os planos completos")
+    parser.add_argument('--executar', action='store_true',
+                        help="Mede o tempo das consultas SELECT sem parâmetros")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--ignorar', nargs='*', default=[],
+                        help="Tabelas pequenas em que a leitura completa é aceitável")
+    args = parser.parse_args()
+
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    consultas = list(sql_dos_modulos(diretorio))
+    consultas += list(sql_dos_relatorios())
+    consultas += list(sql_do_arquivo(os.path.join(diretorio, ARQUIVO_CONSULTAS)))
+    ignorar = {t.upper() for t in args.ignorar}
+
+    saida = open(args.saida, 'w', encoding='utf-8') if args.saida else None
+    problemas = 0
+    try:
+        with banco.conexao() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = 1000
+            for n, (nome, sql) in enumerate(consultas, 1):
+                identificador = f"planos_{n}"
+                try:
+                    plano, completas = explicar(cursor, identificador, sql)
+                except oracledb.DatabaseError as e:
+                    print(f"❌ {nome}: {e}")
+                    problemas += 1
+                    continue
+
+                completas = [(t, c) for t, c in completas if t.upper() not in ignorar]
+                tempo = ""
+                if args.executar and sql.lstrip().upper().startswith(('SELECT', 'WITH')) \
+                        and not re.search(r':\w+', sql):
+                    tempo = f" {cronometrar(cursor, sql, args.repeticoes) * 1000:.1f} ms"
+                if completas:
+                    problemas += 1
+                    tabelas = ", ".join(f"{t} (~{c} linhas)" for t, c in completas)
+                    print(f"⚠️  {nome}{tempo}: leitura completa de {tabelas}")
+                else:
+                    print(f"✅ {nome}{tempo}")
+
+                if saida:
+                    saida.write(f"-- {nome}{tempo}\n{sql.strip()}\n\n")
+                    saida.write("\n".join(plano) + "\n\n")
+            conn.rollback()
+            cursor.close()
+    finally:
+        if saida:
+            saida.close()
+        banco.fechar_pool()
+
+    print(f"\n{len(consultas)} SQL analisados, {problemas} com leitura completa ou erro.")
+    sys.exit(1 if problemas else 0)
+
+if __name__ == "__main__":
+    main()
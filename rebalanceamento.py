@@ -0,0 +1,353 @@
+import argparse
+import csv
+import datetime
+import sys
+import time
+from dataclasses import dataclass
+
+import banco
+from servicos import ErroServico
+
+try:
+    import numpy as np
+    from scipy import sparse
+    from scipy.optimize import linprog
+except ImportError:  # o planejador é opcional
+    np = sparse = linprog = None
+
+# Grupo 12
+# Rebalanceamento da frota: leva bikes disponíveis dos pontos com sobra para os
+# pontos com falta pelo menor custo de transporte.
+# O alvo de cada ponto é uma fração da capacidade corrigida pelo saldo diário de
+# retiradas e devoluções (Movimento_Ponto_Dia): pontos que esvaziam recebem
+# mais. Sobras e faltas viram um problema de transporte (programação linear,
+# HiGHS) restrito aos destinos mais baratos de cada origem; o plano é aplicado
+# com um UPDATE em array em Bike, em uma transação.
+#
+# Uso: python rebalanceamento.py (mostra o plano)
+#      python rebalanceamento.py --dias 28 --ocupacao 0.5 --saida plano.csv
+#      python rebalanceamento.py --coordenadas pontos.csv --aplicar
+
+# Custo por bike sem coordenadas: dentro do bairro, entre bairros da mesma
+# cidade; entre cidades a transferência não é permitida
+CUSTO_BAIRRO = 1.0
+CUSTO_CIDADE = 3.0
+# Destinos candidatos por origem (os mais baratos)
+VIZINHOS = 30
+# Origens por bloco no cálculo dos custos (limita a matriz em memória)
+BLOCO = 1024
+# Bikes por executemany na aplicação (todas na mesma transação)
+LOTE = 50000
+
+SQL_PONTOS = "SELECT cod_ponto, capacidade_maxima, bairro, cidade FROM Ponto ORDER BY cod_ponto"
+
+SQL_BIKES_DISPONIVEIS = """
+    SELECT n_registro, ponto_atual_id FROM Bike
+    WHERE status = 'DISPONIVEL' AND ponto_atual_id IS NOT NULL
+"""
+
+SQL_FLUXO = """
+    SELECT cod_ponto, SUM(retiradas), SUM(devolucoes)
+    FROM Movimento_Ponto_Dia
+    WHERE dia >= :1
+    GROUP BY cod_ponto
+"""
+
+# A bike só muda de ponto se continua disponível onde o plano a encontrou
+SQL_MOVER_BIKE = """
+    UPDATE Bike SET ponto_atual_id = :1
+    WHERE n_registro = :2 AND status = 'DISPONIVEL' AND ponto_atual_id = :3
+"""
+
+class RebalanceamentoIndisponivel(ErroServico):
+    pass
+
+@dataclass
+class Frota:
+    """Pontos (arrays alinhados por posição) e bikes disponíveis"""
+    pontos: object       # cod_ponto, em ordem
+    capacidade: object
+    bairro: object       # códigos inteiros (mesmo código = mesmo bairro da mesma cidade)
+    cidade: object
+    retiradas: object    # no período
+    devolucoes: object
+    bikes: object        # n_registro
+    posicao_bike: object # posição do ponto de cada bike
+    dias: int
+
+    @property
+    def estoque(self):
+        return np.bincount(self.posicao_bike, minlength=len(self.pontos))
+
+@dataclass(frozen=True)
+class Transferencia:
+    origem: int
+    destino: int
+    bikes: int
+    custo: float
+    viagens: int
+
+@dataclass
+class PlanoRebalanceamento:
+    transferencias: list
+    alvo: object
+    falta_restante: int   # bikes que faltam nos pontos depois do plano
+    custo_total: float
+    viagens: int
+
+    @property
+    def bikes_movidas(self):
+        return sum(t.bikes for t in self.transferencias)
+
+def _exigir():
+    if np is None:
+        raise RebalanceamentoIndisponivel("O rebalanceamento requer numpy e scipy (pip install numpy scipy).")
+
+def _codigos(valores):
+    return np.unique(np.array(valores, dtype=object).astype(str), return_inverse=True)[1]
+
+def carregar(conn, dias=28):
+    """Lê pontos, bikes disponíveis e o movimento dos últimos `dias` dias"""
+    _exigir()
+    cursor = conn.cursor()
+    cursor.arraysize = cursor.prefetchrows = LOTE
+
+    cursor.execute(SQL_PONTOS)
+    pontos = cursor.fetchall()
+    cods = np.array([p[0] for p in pontos], dtype=np.int64)
+    capacidade = np.array([p[1] or 0 for p in pontos], dtype=np.int64)
+    cidade = _codigos([p[3] or '' for p in pontos])
+    bairro = _codigos([f"{p[3]}|{p[2] or ''}" for p in pontos])
+
+    cursor.execute(SQL_BIKES_DISPONIVEIS)
+    bikes = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+    posicao = np.searchsorted(cods, bikes[:, 1])
+    validas = (posicao < len(cods)) & (cods[np.minimum(posicao, len(cods) - 1)] == bikes[:, 1])
+
+    retiradas = np.zeros(len(cods), dtype=np.int64)
+    devolucoes = np.zeros(len(cods), dtype=np.int64)
+    inicio = datetime.date.today() - datetime.timedelta(days=dias)
+    cursor.execute(SQL_FLUXO, (inicio,))
+    fluxo = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 3)
+    if len(fluxo):
+        indices = np.searchsorted(cods, fluxo[:, 0])
+        retiradas[indices] = fluxo[:, 1]
+        devolucoes[indices] = fluxo[:, 2]
+    cursor.close()
+
+    return Frota(cods, capacidade, bairro, cidade, retiradas, devolucoes,
+                 bikes[validas, 0], posicao[validas], dias)
+
+def calcular_alvos(frota, ocupacao=0.5, horizonte=1.0):
+    """Bikes desejadas por ponto: `ocupacao` da capacidade mais a saída líquida
+    esperada em `horizonte` dias, redistribuídas para somar a frota disponível"""
+    saida_diaria = (frota.retiradas - frota.devolucoes) / max(frota.dias, 1)
+    bruto = np.clip(ocupacao * frota.capacidade + horizonte * saida_diaria, 0, frota.capacidade)
+    soma = bruto.sum()
+    if soma > 0:
+        bruto = bruto * (frota.estoque.sum() / soma)
+    return np.minimum(np.floor(bruto), frota.capacidade).astype(np.int64)
+
+def _custos(frota, origens, destinos, coordenadas):
+    """Custo por bike de cada origem (linhas) a cada destino; inf = não permitido"""
+    if coordenadas is not None:
+        lat, lon = np.radians(coordenadas[:, 0]), np.radians(coordenadas[:, 1])
+        dlat = lat[destinos][None, :] - lat[origens][:, None]
+        dlon = lon[destinos][None, :] - lon[origens][:, None]
+        a = (np.sin(dlat / 2) ** 2
+             + np.cos(lat[origens])[:, None] * np.cos(lat[destinos])[None, :] * np.sin(dlon / 2) ** 2)
+        return 2 * 6371.0 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))  # km
+    custo = np.where(frota.bairro[origens][:, None] == frota.bairro[destinos][None, :],
+                     CUSTO_BAIRRO, CUSTO_CIDADE)
+    custo[frota.cidade[origens][:, None] != frota.cidade[destinos][None, :]] = np.inf
+    return custo
+
+def _mais_baratos(custo, k, eixo, sorteio):
+    """Índices dos k menores custos ao longo do eixo (todos, se k cobre o eixo).
+
+    Empates são desfeitos por sorteio: com custos por bairro quase tudo empata, e
+    a ordem dos índices faria todos os pontos escolherem os mesmos vizinhos.
+    """
+    if k >= custo.shape[eixo]:
+        return np.broadcast_to(np.arange(custo.shape[eixo]).reshape((-1, 1) if eixo == 0 else (1, -1)),
+                               custo.shape)
+    desempatado = custo + sorteio.random(custo.shape) * 1e-3
+    return np.take(np.argpartition(desempatado, k - 1, axis=eixo), np.arange(k), axis=eixo)
+
+def _candidatos(frota, origens, destinos, coordenadas, vizinhos):
+    """Arestas (origem, destino, custo): os `vizinhos` destinos mais baratos de
+    cada origem e as `vizinhos` origens mais baratas de cada destino (com custos
+    empatados, só um dos lados deixaria pontos sem nenhuma aresta)"""
+    linhas, colunas, custos = [], [], []
+    sorteio = np.random.default_rng(0)
+    for inicio in range(0, len(origens), BLOCO):
+        custo = _custos(frota, origens[inicio:inicio + BLOCO], destinos, coordenadas)
+        escolhidos = _mais_baratos(custo, vizinhos, 1, sorteio)
+        valores = np.take_along_axis(custo, escolhidos, axis=1)
+        permitidos = np.isfinite(valores)
+        linhas.append(np.nonzero(permitidos)[0] + inicio)
+        colunas.append(escolhidos[permitidos])
+        custos.append(valores[permitidos])
+    for inicio in range(0, len(destinos), BLOCO):
+        custo = _custos(frota, origens, destinos[inicio:inicio + BLOCO], coordenadas)
+        escolhidos = _mais_baratos(custo, vizinhos, 0, sorteio)
+        valores = np.take_along_axis(custo, escolhidos, axis=0)
+        permitidos = np.isfinite(valores)
+        linhas.append(escolhidos[permitidos])
+        colunas.append(np.nonzero(permitidos)[1] + inicio)
+        custos.append(valores[permitidos])
+
+    linhas, colunas, custos = np.concatenate(linhas), np.concatenate(colunas), np.concatenate(custos)
+    _, unicas = np.unique(linhas * len(destinos) + colunas, return_index=True)
+    return linhas[unicas], colunas[unicas], custos[unicas]
+
+def planejar(frota, ocupacao=0.5, horizonte=1.0, minimo=2, capacidade_caminhao=20,
+             coordenadas=None, vizinhos=VIZINHOS):
+    """Transferências de menor custo que levam os pontos para perto do alvo.
+
+    Sobras e faltas menores que `minimo` são ignoradas (não compensam a viagem).
+    Move o máximo de bikes possível e, entre os planos que movem esse máximo,
+    escolhe o de menor custo. `coordenadas`: array (pontos, [lat, lon]) na ordem
+    de frota.pontos; sem ele o custo vem de bairro e cidade.
+    """
+    _exigir()
+    estoque = frota.estoque
+    alvo = calcular_alvos(frota, ocupacao, horizonte)
+    sobra = np.maximum(estoque - alvo, 0)
+    falta = np.maximum(alvo - estoque, 0)
+    sobra[sobra < minimo] = 0
+    falta[falta < minimo] = 0
+    origens, destinos = np.nonzero(sobra)[0], np.nonzero(falta)[0]
+    if not len(origens) or not len(destinos):
+        return PlanoRebalanceamento([], alvo, int(falta.sum()), 0.0, 0)
+
+    linhas, colunas, custos = _candidatos(frota, origens, destinos, coordenadas, vizinhos)
+    if not len(custos):
+        return PlanoRebalanceamento([], alvo, int(falta.sum()), 0.0, 0)
+
+    # Problema de transporte: cada origem envia no máximo a sobra, cada destino
+    # recebe no máximo a falta. O prêmio por bike movida, maior que o custo de
+    # qualquer caminho, faz o solver mover o máximo antes de economizar.
+    n = len(custos)
+    premio = custos.max() * (len(origens) + len(destinos)) + 1
+    restricoes = sparse.csr_matrix(
+        (np.ones(2 * n), (np.concatenate([linhas, len(origens) + colunas]), np.tile(np.arange(n), 2))),
+        shape=(len(origens) + len(destinos), n))
+    limites = np.concatenate([sobra[origens], falta[destinos]])
+    # Simplex dual: solução em vértice, inteira (matriz de transporte)
+    resultado = linprog(custos - premio, A_ub=restricoes, b_ub=limites, bounds=(0, None),
+                        method='highs-ds')
+    if resultado.status != 0:
+        raise RebalanceamentoIndisponivel(f"O solver não encontrou um plano: {resultado.message}")
+
+    quantidades = np.rint(resultado.x).astype(np.int64)
+    usadas = np.nonzero(quantidades)[0]
+    transferencias = []
+    for aresta in usadas[np.argsort(linhas[usadas], kind='stable')]:
+        bikes = int(quantidades[aresta])
+        viagens = -(-bikes // capacidade_caminhao)
+        transferencias.append(Transferencia(int(frota.pontos[origens[linhas[aresta]]]),
+                                            int(frota.pontos[destinos[colunas[aresta]]]),
+                                            bikes, float(custos[aresta] * bikes), viagens))
+    recebidas = np.bincount(colunas[usadas], weights=quantidades[usadas], minlength=len(destinos))
+    return PlanoRebalanceamento(transferencias, alvo,
+                                int(falta[destinos].sum() - recebidas.sum()),
+                                float(sum(t.custo for t in transferencias)),
+                                sum(t.viagens for t in transferencias))
+
+def aplicar(conn, frota, plano):
+    """Move as bikes do plano em uma transação; devolve (movidas, ignoradas).
+
+    As bikes de cada origem são escolhidas entre as disponíveis lidas em
+    `carregar`; as que foram alugadas ou mudaram de ponto depois disso ficam
+    onde estão (ignoradas).
+    """
+    ordem = np.argsort(frota.posicao_bike, kind='stable')
+    posicoes = frota.posicao_bike[ordem]
+    proxima = {}
+    linhas = []
+    for t in plano.transferencias:
+        origem = int(np.searchsorted(frota.pontos, t.origem))
+        inicio = proxima.get(origem, int(np.searchsorted(posicoes, origem)))
+        for bike in frota.bikes[ordem[inicio:inicio + t.bikes]]:
+            linhas.append((t.destino, int(bike), t.origem))
+        proxima[origem] = inicio + t.bikes
+
+    movidas = 0
+    cursor = conn.cursor()
+    for inicio in range(0, len(linhas), LOTE):
+        cursor.executemany(SQL_MOVER_BIKE, linhas[inicio:inicio + LOTE], arraydmlrowcounts=True)
+        movidas += sum(cursor.getarraydmlrowcounts())
+    conn.commit()
+    cursor.close()
+    return movidas, len(linhas) - movidas
+
+def ler_coordenadas(caminho, pontos):
+    """CSV cod_ponto,latitude,longitude -> array na ordem de `pontos` (sem coordenada: NaN)"""
+    coordenadas = np.full((len(pontos), 2), np.nan)
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        for linha in csv.DictReader(arquivo):
+            i = np.searchsorted(pontos, int(linha['cod_ponto']))
+            if i < len(pontos) and pontos[i] == int(linha['cod_ponto']):
+                coordenadas[i] = (float(linha['latitude']), float(linha['longitude']))
+    if np.isnan(coordenadas).any():
+        raise RebalanceamentoIndisponivel("Há pontos sem coordenadas no arquivo.")
+    return coordenadas
+
+def main():
+    parser = argparse.ArgumentParser(description="Plano de rebalanceamento da frota entre pontos")
+    parser.add_argument('--dias', type=int, default=28, help="Dias de movimento considerados")
+    parser.add_argument('--ocupacao', type=float, default=0.5, help="Fração da capacidade desejada")
+    parser.add_argument('--horizonte', type=float, default=1.0,
+                        help="Dias de saída líquida que o alvo deve cobrir")
+    parser.add_argument('--minimo', type=int, default=2, help="Sobra ou falta mínima para transferir")
+    parser.add_argument('--capacidade-caminhao', type=int, default=20, help="Bikes por viagem")
+    parser.add_argument('--coordenadas', help="CSV cod_ponto,latitude,longitude (custo em km)")
+    parser.add_argument('--saida', help="Grava todas as transferências em CSV")
+    parser.add_argument('--aplicar', action='store_true', help="Move as bikes no banco")
+    args = parser.parse_args()
+
+    if not 0 < args.ocupacao <= 1:
+        parser.error("--ocupacao deve estar entre 0 e 1")
+    if args.dias < 1 or args.capacidade_caminhao < 1:
+        parser.error("--dias e --capacidade-caminhao devem ser positivos")
+
+    try:
+        with banco.conexao() as conn:
+            inicio = time.perf_counter()
+            frota = carregar(conn, args.dias)
+            coordenadas = ler_coordenadas(args.coordenadas, frota.pontos) if args.coordenadas else None
+            lido = time.perf_counter()
+            plano = planejar(frota, args.ocupacao, args.horizonte, args.minimo,
+                             args.capacidade_caminhao, coordenadas)
+            planejado = time.perf_counter()
+
+            print(f"\n🚚 REBALANCEAMENTO ({len(frota.pontos)} pontos, {len(frota.bikes)} bikes disponíveis)")
+            print(f"   Leitura {lido - inicio:.1f} s, plano {planejado - lido:.1f} s")
+            print(f"   {len(plano.transferencias)} transferência(s), {plano.bikes_movidas} bike(s), "
+                  f"{plano.viagens} viagem(ns), custo {plano.custo_total:.1f}")
+            if plano.falta_restante:
+                print(f"   ⚠️  Ainda faltam {plano.falta_restante} bike(s) sem origem permitida")
+            for t in plano.transferencias[:20]:
+                print(f"   Ponto {t.origem} -> {t.destino}: {t.bikes} bike(s), {t.viagens} viagem(ns)")
+            if len(plano.transferencias) > 20:
+                print(f"   ... (+{len(plano.transferencias) - 20})")
+
+            if args.saida:
+                with open(args.saida, 'w', newline='', encoding='utf-8') as arquivo:
+                    escritor = csv.writer(arquivo)
+                    escritor.writerow(['origem', 'destino', 'bikes', 'viagens', 'custo'])
+                    escritor.writerows((t.origem, t.destino, t.bikes, t.viagens, f"{t.custo:.2f}")
+                                       for t in plano.transferencias)
+                print(f"✅ Plano gravado em {args.saida}")
+
+            if args.aplicar and plano.transferencias:
+                movidas, ignoradas = aplicar(conn, frota, plano)
+                print(f"✅ {movidas} bike(s) movida(s)"
+                      + (f"; {ignoradas} ignorada(s) (alugadas ou movidas durante o plano)" if ignoradas else ""))
+        banco.fechar_pool()
+    except ErroServico as e:
+        sys.exit(f"❌ [ERRO] {e}")
+
+if __name__ == "__main__":
+    main()
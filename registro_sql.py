@@ -0,0 +1,114 @@
+import argparse
+from dataclasses import dataclass
+
+try:
+    import oracledb
+except ImportError:  # banco local (DB_BACKEND=sqlite): os tipos de bind não são usados
+    oracledb = None
+
+# Grupo 12
+# Registro dos comandos SQL fixos da aplicação. Cada comando tem um nome, um
+# texto único (o mesmo em todas as chamadas, reaproveitado pelo cache de
+# statements da sessão e pelo cursor compartilhado do servidor), os tipos dos
+# binds declarados antes do execute e o perfil de leitura (prefetchrows e
+# arraysize) de acordo com o formato do resultado.
+#
+# Uso: python registro_sql.py (parses e tempo médio de cada comando em V$SQL)
+
+# Perfis de leitura: (prefetchrows, arraysize)
+UMA_LINHA = (2, 2)     # busca por chave: a linha e o fim dos dados vêm no execute
+LISTA = (100, 100)     # até algumas dezenas de linhas: tudo na mesma ida
+TABELA = (1000, 1000)  # leitura completa de uma tabela pequena
+ESCRITA = (0, 1)       # DML e PL/SQL: nada a pré-buscar
+
+# Tipos de bind. Strings pelo tamanho máximo: o servidor não cria um cursor
+# filho novo quando o comprimento do valor muda de faixa. Números como NUMBER
+# (não BINARY_DOUBLE, o padrão de um float Python) evitam a conversão no servidor.
+NUMERO = oracledb.DB_TYPE_NUMBER if oracledb else None
+DATA = oracledb.DB_TYPE_DATE if oracledb else None
+CPF = 11
+TEXTO = 100
+TEXTO_LONGO = 4000
+
+@dataclass(frozen=True)
+class Comando:
+    nome: str
+    sql: str
+    tipos: object = ()  # tupla (binds posicionais) ou dict (binds por nome)
+    perfil: tuple = UMA_LINHA
+
+REGISTRO = {}
+
+def registrar(nome, sql, tipos=(), perfil=UMA_LINHA):
+    if nome in REGISTRO and REGISTRO[nome].sql != sql:
+        raise ValueError(f"Comando {nome} já registrado com outro texto")
+    REGISTRO[nome] = Comando(nome, sql, tipos, perfil)
+    return REGISTRO[nome]
+
+def preparar(cursor, nome):
+    """Ajusta o cursor para o comando e devolve o texto a executar.
+
+    Serve para cursores síncronos e assíncronos:
+    `await cursor.execute(preparar(cursor, nome), parametros)`.
+    """
+    comando = REGISTRO[nome]
+    cursor.prefetchrows, cursor.arraysize = comando.perfil
+    if isinstance(comando.tipos, dict):
+        cursor.setinputsizes(**comando.tipos)
+    elif comando.tipos:
+        cursor.setinputsizes(*comando.tipos)
+    return comando.sql
+
+def executar(cursor, nome, parametros=()):
+    cursor.execute(preparar(cursor, nome), parametros)
+    return cursor
+
+def executar_lote(cursor, nome, linhas, **opcoes):
+    """executemany do comando registrado (array DML, uma ida ao servidor)"""
+    cursor.executemany(preparar(cursor, nome), linhas, **opcoes)
+    return cursor
+
+def tamanho_cache(minimo=50, folga=20):
+    """Tamanho do cache de statements por sessão: todos os comandos registrados
+    mais uma folga para os SQL montados em tempo de execução (relatórios, rotinas)"""
+    return max(minimo, len(REGISTRO) + folga)
+
+# sql_text guarda os primeiros 1000 caracteres do texto
+SQL_ESTATISTICAS_SERVIDOR = """
+    SELECT COUNT(*), SUM(executions), SUM(parse_calls), SUM(loads),
+           SUM(elapsed_time) / NULLIF(SUM(executions), 0) / 1000
+    FROM V$SQL
+    WHERE sql_text = SUBSTR(:1, 1, 1000)
+"""
+
+def estatisticas_servidor(conn):
+    """[(nome, cursores filhos, execuções, parses, cargas, ms por execução)] de V$SQL.
+
+    Requer SELECT em V$SQL. Compare parses com execuções: com o cache de
+    statements, cada sessão faz um parse por comando, não um por chamada.
+    """
+    cursor = conn.cursor()
+    resultado = []
+    for nome, comando in sorted(REGISTRO.items()):
+        cursor.execute(SQL_ESTATISTICAS_SERVIDOR, (comando.sql,))
+        filhos, execucoes, parses, cargas, ms = cursor.fetchone()
+        resultado.append((nome, filhos, execucoes or 0, parses or 0, cargas or 0, ms))
+    cursor.close()
+    return resultado
+
+def main():
+    import banco
+    import servicos  # noqa: F401 (registra os comandos)
+
+    argparse.ArgumentParser(description="Parses e tempo por comando registrado (V$SQL)").parse_args()
+    with banco.conexao() as conn:
+        linhas = estatisticas_servidor(conn)
+    banco.fechar_pool()
+
+    print(f"{'comando':<28} {'filhos':>6} {'execuções':>10} {'parses':>8} {'cargas':>7} {'ms/exec':>8}")
+    for nome, filhos, execucoes, parses, cargas, ms in linhas:
+        tempo = f"{ms:.2f}" if ms is not None else "-"
+        print(f"{nome:<28} {filhos:>6} {execucoes:>10} {parses:>8} {cargas:>7} {tempo:>8}")
+
+if __name__ == "__main__":
+    main()
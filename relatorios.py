@@ -0,0 +1,407 @@
+import argparse
+import csv
+import datetime
+import os
+import sys
+from dataclasses import dataclass
+
+import banco
+from servicos import DadosInvalidos, ErroServico
+
+try:
+    import oracledb
+except ImportError:  # banco local (DB_BACKEND=sqlite)
+    oracledb = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # exportação Parquet é opcional
+    pa = pq = None
+
+# Grupo 12
+# Relatórios gerenciais. As linhas são lidas em fluxo (arraysize/prefetchrows)
+# em vez de fetchall(), a tela é paginada por chave (keyset: a próxima página
+# começa depois da última chave exibida, sem OFFSET) e a exportação para CSV ou
+# Parquet grava lote a lote. A memória usada não cresce com o tamanho do resultado.
+#
+# Uso: python relatorios.py 3 --csv dividas.csv
+#      python relatorios.py 1 --bairro Centro --percentual 80 --csv cobertura.csv
+#      python relatorios.py 4 --parquet manutencao.parquet
+
+# Linhas trazidas por ida ao banco nas leituras em fluxo
+ARRAYSIZE = int(os.environ.get('RELATORIO_ARRAYSIZE', '1000'))
+# Linhas por página na tela
+TAMANHO_PAGINA = int(os.environ.get('RELATORIO_PAGINA', '20'))
+
+class ExportacaoIndisponivel(ErroServico):
+    pass
+
+@dataclass(frozen=True)
+class Relatorio:
+    """Consulta de um relatório.
+
+    `chave` é a ordenação do relatório como (coluna, decrescente); a última
+    coluna deve ser única para que a paginação por chave não pule nem repita
+    linhas. Relatórios sem chave já são limitados no próprio SQL (ex.: top 10)
+    e cabem em uma página. `parametros` são os binds por nome do SQL, como
+    pares (nome, valor).
+    """
+    titulo: str
+    sql: str
+    chave: tuple = None
+    parametros: tuple = ()
+
+    def ordenacao(self, invertida=False):
+        return ", ".join(f"{coluna} {'DESC' if desc != invertida else 'ASC'}"
+                         for coluna, desc in self.chave)
+
+@dataclass
+class Pagina:
+    colunas: list
+    linhas: list
+    tem_mais: bool  # há mais linhas na direção em que se paginou
+
+# Relatórios 2 e 3 leem as tabelas de resumo mantidas por gatilhos (esquema.sql)
+SQL_RANKING_BIKES = """
+    SELECT B.n_registro, B.modelo, R.total_alugueis,
+           ROUND(R.soma_notas / NULLIF(R.qtd_notas, 0), 2) as nota_media,
+           B.tempo_total_utilizado as minutos_uso
+    FROM Resumo_Bike R
+    JOIN Bike B ON B.n_registro = R.bike_n_registro
+    WHERE R.total_alugueis > 0
+    ORDER BY nota_media DESC NULLS LAST
+    FETCH FIRST 10 ROWS ONLY
+"""
+
+SQL_INADIMPLENCIA = """
+    SELECT U.nome, U.cpf, R.multas_pendentes,
+           R.valor_multas_pendentes as valor_total
+    FROM Resumo_Usuario R
+    JOIN Usuario U ON U.cpf = R.usuario_cpf
+    WHERE R.valor_multas_pendentes > 0
+"""
+
+# Usuários que retiraram bikes em pelo menos :percentual % dos pontos de um
+# bairro. Lê Cobertura_Usuario (mantida por gatilho): uma faixa do índice
+# (cidade, bairro, pontos_visitados) a partir do mínimo de pontos, sem a
+# divisão relacional sobre Aluguel.
+SQL_COBERTURA_BAIRRO = """
+    SELECT U.nome, U.cpf, C.pontos_visitados, T.pontos_bairro,
+           ROUND(C.pontos_visitados / T.pontos_bairro * 100, 2) as cobertura
+    FROM (
+        SELECT COUNT(*) as pontos_bairro, CEIL(COUNT(*) * :percentual / 100) as minimo
+        FROM Ponto
+        WHERE cidade = :cidade AND bairro = :bairro
+    ) T
+    JOIN Cobertura_Usuario C ON C.cidade = :cidade AND C.bairro = :bairro
+                            AND C.pontos_visitados >= T.minimo
+    JOIN Usuario U ON U.cpf = C.usuario_cpf
+    WHERE T.pontos_bairro > 0
+"""
+
+# Ordenado pela data de início (e não pelos dias parados, que mudam a cada
+# consulta) para que a chave de uma página continue válida na seguinte.
+# aberta_desde só é preenchida em manutenções abertas e tem índice próprio.
+SQL_AUDITORIA_MANUTENCAO = """
+    SELECT M.id_manutencao, B.n_registro, B.modelo,
+           M.tipo, M.valor,
+           M.data_inicio,
+           ROUND(SYSDATE - M.data_inicio, 1) as dias_em_manutencao,
+           M.descricao_problema
+    FROM Bike B
+    JOIN Manutencao M ON B.n_registro = M.bike_n_registro
+    WHERE M.aberta_desde IS NOT NULL
+"""
+
+# Relatório 5 e a ocupação por período leem Movimento_Ponto_Dia (mantido por
+# gatilho): uma faixa de dias da chave, sem juntar Ponto a Aluguel por
+# retirada OU devolução. Cada retirada e cada devolução conta um movimento.
+SQL_PONTOS_SOBRECARREGADOS = """
+    SELECT P.cod_ponto, P.rua, P.bairro, P.capacidade_maxima,
+           M.movimentacoes, M.pico_bikes,
+           ROUND(M.movimentacoes / P.capacidade_maxima * 100, 2) as taxa_ocupacao
+    FROM (
+        SELECT cod_ponto, SUM(retiradas + devolucoes) as movimentacoes,
+               MAX(pico_bikes) as pico_bikes
+        FROM Movimento_Ponto_Dia
+        WHERE dia >= TRUNC(SYSDATE) - 30
+        GROUP BY cod_ponto
+    ) M
+    JOIN Ponto P ON P.cod_ponto = M.cod_ponto
+    WHERE M.movimentacoes > P.capacidade_maxima * 0.8
+"""
+
+# Pontos mais movimentados em [inicio, fim)
+SQL_OCUPACAO_PERIODO = """
+    SELECT P.cod_ponto, P.rua, P.bairro, P.capacidade_maxima,
+           M.retiradas, M.devolucoes, M.retiradas + M.devolucoes as movimentacoes,
+           M.pico_bikes,
+           ROUND(M.pico_bikes / P.capacidade_maxima * 100, 2) as ocupacao_pico
+    FROM (
+        SELECT cod_ponto, SUM(retiradas) as retiradas, SUM(devolucoes) as devolucoes,
+               MAX(pico_bikes) as pico_bikes
+        FROM Movimento_Ponto_Dia
+        WHERE dia >= :inicio AND dia < :fim
+        GROUP BY cod_ponto
+    ) M
+    JOIN Ponto P ON P.cod_ponto = M.cod_ponto
+    ORDER BY movimentacoes DESC, P.cod_ponto
+    FETCH FIRST :limite ROWS ONLY
+"""
+
+# Inclui os aluguéis arquivados (rotinas.py arquivar); cada lado da união
+# busca pelo índice de usuário da sua tabela
+SQL_HISTORICO_USUARIO = """
+    SELECT U.nome, COUNT(A.id_aluguel) as total_alugueis,
+           COALESCE(SUM(A.periodo_alugado), 0) as minutos_totais,
+           ROUND(AVG(A.nota_bike), 2) as nota_media_bikes,
+           ROUND(AVG(A.nota_ponto), 2) as nota_media_pontos
+    FROM Usuario U
+    LEFT JOIN (
+        SELECT A.usuario_cpf, A.id_aluguel, A.periodo_alugado,
+               CB.nota AS nota_bike, CP.nota AS nota_ponto
+        FROM Aluguel A
+        LEFT JOIN Comentario_Bike CB ON A.id_aluguel = CB.aluguel_id
+        LEFT JOIN Comentario_Ponto CP ON A.id_aluguel = CP.aluguel_id
+        WHERE A.usuario_cpf = :cpf
+        UNION ALL
+        SELECT A.usuario_cpf, A.id_aluguel, A.periodo_alugado,
+               CB.nota, CP.nota
+        FROM Aluguel_Historico A
+        LEFT JOIN Comentario_Bike_Historico CB ON A.id_aluguel = CB.aluguel_id
+        LEFT JOIN Comentario_Ponto_Historico CP ON A.id_aluguel = CP.aluguel_id
+        WHERE A.usuario_cpf = :cpf
+    ) A ON U.cpf = A.usuario_cpf
+    WHERE U.cpf = :cpf
+    GROUP BY U.nome
+"""
+
+def relatorio_cobertura(cidade, bairro, percentual=100):
+    """Relatório 1 para um bairro: usuários em pelo menos `percentual` % dos seus pontos"""
+    if not 0 < percentual <= 100:
+        raise DadosInvalidos("O percentual deve estar entre 0 (exclusive) e 100.")
+    return Relatorio(f"📋 USUÁRIOS 'POWER USER' ({percentual:g}% dos pontos de {bairro}, {cidade})",
+                     SQL_COBERTURA_BAIRRO, (('cobertura', True), ('cpf', False)),
+                     (('cidade', cidade), ('bairro', bairro), ('percentual', percentual)))
+
+RELATORIOS = {
+    '1': relatorio_cobertura('São Carlos', 'Centro'),
+    '2': Relatorio("🏆 RANKING DE BIKES (por avaliação)", SQL_RANKING_BIKES),
+    '3': Relatorio("💰 RELATÓRIO DE DÍVIDAS", SQL_INADIMPLENCIA,
+                   (('valor_total', True), ('cpf', False))),
+    '4': Relatorio("🔧 AUDITORIA DE MANUTENÇÃO", SQL_AUDITORIA_MANUTENCAO,
+                   (('data_inicio', False), ('id_manutencao', False))),
+    '5': Relatorio("⚠️ PONTOS COM ALTA OCUPAÇÃO", SQL_PONTOS_SOBRECARREGADOS,
+                   (('taxa_ocupacao', True), ('cod_ponto', False))),
+}
+
+def sql_completo(relatorio):
+    """SQL do relatório inteiro, já ordenado"""
+    if relatorio.chave is None:
+        return relatorio.sql
+    return f"SELECT * FROM ({relatorio.sql}) ORDER BY {relatorio.ordenacao()}"
+
+def _predicado_chave(chave, antes):
+    """(k0 > :k0) OR (k0 = :k0 AND k1 > :k1) ..., com < nas colunas decrescentes.
+
+    Escrito por extenso em vez de comparação de tuplas, que o Oracle não
+    usa para acessar índices.
+    """
+    termos = []
+    for i, (coluna, desc) in enumerate(chave):
+        operador = '<' if desc != antes else '>'
+        iguais = [f"{c} = :k{j}" for j, (c, _) in enumerate(chave[:i])]
+        termos.append("(" + " AND ".join(iguais + [f"{coluna} {operador} :k{i}"]) + ")")
+    return " OR ".join(termos)
+
+def sql_pagina(relatorio, referencia=False, antes=False):
+    """SQL de uma página; com `referencia`, começa depois (ou antes) da chave informada"""
+    filtro = f"WHERE {_predicado_chave(relatorio.chave, antes)}" if referencia else ""
+    return (f"SELECT * FROM ({relatorio.sql}) {filtro} "
+            f"ORDER BY {relatorio.ordenacao(invertida=antes)} "
+            f"FETCH FIRST :limite ROWS ONLY")
+
+def chave_da_linha(relatorio, colunas, linha):
+    """Valores da chave de uma linha, na ordem de `relatorio.chave`"""
+    return tuple(linha[colunas.index(coluna.upper())] for coluna, _ in relatorio.chave)
+
+def _colunas(cursor):
+    return [d.name for d in cursor.description]
+
+def paginar(conn, relatorio, tamanho=TAMANHO_PAGINA, apos=None, antes=None):
+    """Lê uma página do relatório.
+
+    Sem referência, devolve a primeira página. `apos` é a chave da última
+    linha exibida (próxima página); `antes`, a da primeira (página anterior).
+    """
+    referencia = apos if apos is not None else antes
+    cursor = conn.cursor()
+    try:
+        # Uma linha a mais indica se há outra página; prefetch cobre tudo em uma ida
+        cursor.arraysize = tamanho + 1
+        cursor.prefetchrows = tamanho + 2
+        parametros = dict(relatorio.parametros, limite=tamanho + 1)
+        if referencia is not None:
+            parametros.update({f"k{i}": valor for i, valor in enumerate(referencia)})
+        cursor.execute(sql_pagina(relatorio, referencia is not None, antes is not None),
+                       parametros)
+        linhas = cursor.fetchall()
+        colunas = _colunas(cursor)
+    finally:
+        cursor.close()
+
+    tem_mais = len(linhas) > tamanho
+    linhas = linhas[:tamanho]
+    if antes is not None:
+        linhas.reverse()
+    return Pagina(colunas, linhas, tem_mais)
+
+def ler_em_fluxo(conn, relatorio, arraysize=ARRAYSIZE):
+    """Gera (colunas, lote de linhas) lendo o relatório inteiro em lotes de `arraysize`"""
+    cursor = conn.cursor()
+    try:
+        cursor.arraysize = arraysize
+        cursor.prefetchrows = arraysize
+        cursor.execute(sql_completo(relatorio), dict(relatorio.parametros))
+        colunas = _colunas(cursor)
+        while True:
+            lote = cursor.fetchmany()
+            if not lote:
+                break
+            yield colunas, lote
+    finally:
+        cursor.close()
+
+def exportar_csv(conn, relatorio, caminho, arraysize=ARRAYSIZE):
+    """Grava o relatório em CSV (com cabeçalho); devolve o número de linhas"""
+    total = 0
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        escritor = csv.writer(arquivo)
+        for colunas, lote in ler_em_fluxo(conn, relatorio, arraysize):
+            if total == 0:
+                escritor.writerow(c.lower() for c in colunas)
+            escritor.writerows(lote)
+            total += len(lote)
+    return total
+
+def _tipo_parquet(info):
+    """Tipo Arrow de uma coluna pelo cursor.description do Oracle; None quando o
+    driver não informa o tipo (banco local)"""
+    if oracledb is None:
+        return None
+    if info.type_code is oracledb.DB_TYPE_NUMBER:
+        return pa.int64() if info.scale == 0 and info.precision else pa.float64()
+    if info.type_code in (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP):
+        return pa.timestamp('us')
+    return pa.string()
+
+def _tipo_valor(valor):
+    """Tipo Arrow pelo valor lido. Números viram float64: numa coluna NUMERIC o
+    SQLite devolve int ou float conforme o valor de cada linha."""
+    if isinstance(valor, bool):
+        return pa.bool_()
+    if isinstance(valor, (int, float)):
+        return pa.float64()
+    if isinstance(valor, datetime.datetime):
+        return pa.timestamp('us')
+    if isinstance(valor, bytes):
+        return pa.binary()
+    return pa.string()
+
+def exportar_parquet(conn, relatorio, caminho, arraysize=ARRAYSIZE):
+    """Grava o relatório em Parquet, um row group por lote; devolve o número de linhas.
+
+    Sem os tipos no cursor (banco local), o tipo de cada coluna vem do primeiro
+    valor não nulo; os lotes ficam em memória até que todas as colunas tenham
+    um valor (colunas só com nulos são gravadas como null).
+    """
+    if pa is None:
+        raise ExportacaoIndisponivel("Exportação Parquet requer o pacote pyarrow (pip install pyarrow).")
+
+    total = 0
+    escritor = None
+    cursor = conn.cursor()
+    try:
+        cursor.arraysize = arraysize
+        cursor.prefetchrows = arraysize
+        cursor.execute(sql_completo(relatorio), dict(relatorio.parametros))
+        nomes = [d.name.lower() for d in cursor.description]
+        tipos = [_tipo_parquet(d) for d in cursor.description]
+        pendentes = []
+        while True:
+            lote = cursor.fetchmany()
+            if lote:
+                colunas = [list(valores) for valores in zip(*lote)]
+                for i, valores in enumerate(colunas):
+                    if tipos[i] is None:
+                        tipos[i] = next((_tipo_valor(v) for v in valores if v is not None), None)
+                pendentes.append(colunas)
+                total += len(lote)
+            if escritor is None and (not lote or None not in tipos):
+                esquema = pa.schema([(nome, tipo or pa.null()) for nome, tipo in zip(nomes, tipos)])
+                escritor = pq.ParquetWriter(caminho, esquema)
+            if escritor is not None:
+                for colunas in pendentes:
+                    escritor.write_batch(pa.record_batch(colunas, schema=esquema))
+                pendentes = []
+            if not lote:
+                break
+    finally:
+        if escritor is not None:
+            escritor.close()
+        cursor.close()
+    return total
+
+def historico_usuario(conn, cpf):
+    """Relatório 6: (nome, total_alugueis, minutos_totais, nota_bikes, nota_pontos) ou None"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SQL_HISTORICO_USUARIO, cpf=cpf)
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+def ocupacao_periodo(conn, inicio, fim, limite=10):
+    """Pontos mais movimentados entre as datas `inicio` (inclusive) e `fim` (exclusive).
+
+    Devolve (colunas, linhas).
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SQL_OCUPACAO_PERIODO, inicio=inicio, fim=fim, limite=limite)
+        return _colunas(cursor), cursor.fetchall()
+    finally:
+        cursor.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta um relatório gerencial")
+    parser.add_argument('relatorio', choices=sorted(RELATORIOS))
+    destino = parser.add_mutually_exclusive_group(required=True)
+    destino.add_argument('--csv', help="Arquivo CSV de saída")
+    destino.add_argument('--parquet', help="Arquivo Parquet de saída (requer pyarrow)")
+    parser.add_argument('--arraysize', type=int, default=ARRAYSIZE, help="Linhas por ida ao banco")
+    parser.add_argument('--cidade', default='São Carlos', help="Cidade do relatório 1")
+    parser.add_argument('--bairro', default='Centro', help="Bairro do relatório 1")
+    parser.add_argument('--percentual', type=float, default=100,
+                        help="Relatório 1: percentual mínimo dos pontos do bairro")
+    args = parser.parse_args()
+
+    try:
+        if args.relatorio == '1':
+            relatorio = relatorio_cobertura(args.cidade, args.bairro, args.percentual)
+        else:
+            relatorio = RELATORIOS[args.relatorio]
+        with banco.conexao() as conn:
+            if args.csv:
+                total = exportar_csv(conn, relatorio, args.csv, args.arraysize)
+            else:
+                total = exportar_parquet(conn, relatorio, args.parquet, args.arraysize)
+    except ErroServico as e:
+        sys.exit(f"❌ [ERRO] {e}")
+    finally:
+        banco.fechar_pool()
+    print(f"✅ {total} linha(s) exportada(s) para {args.csv or args.parquet}")
+
+if __name__ == "__main__":
+    main()
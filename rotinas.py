@@ -0,0 +1,387 @@
+import argparse
+import datetime
+import sys
+from dataclasses import dataclass
+
+import banco
+from servicos import ErroServico, ServicoManutencao
+from validacoes import formatar_cpf
+
+# Grupo 12
+# Rotinas de operação executadas fora do menu (agendador/cron).
+#
+# Uso: python rotinas.py conferir-resumos [--corrigir]
+#      python rotinas.py arquivar --meses 12
+#      python rotinas.py multar --horas-atraso 24 --dias-nao-devolucao 7
+#      python rotinas.py manutencao-lote abrir --uso-minimo 6000 --problema "Revisão preventiva"
+#      python rotinas.py manutencao-lote fechar --pontos 3 5 --custo 40
+
+# Situação de cada usuário calculada a partir das tabelas de base; deve ser
+# igual ao que os gatilhos mantêm em Resumo_Usuario (mesma regra de reconstruir_resumos)
+SQL_RESUMO_USUARIO_ESPERADO = """
+    SELECT U.cpf,
+           COUNT(DISTINCT CASE WHEN A.status = 'EM_ANDAMENTO' THEN A.id_aluguel END) AS alugueis_ativos,
+           COUNT(CASE WHEN M.isPaid = 0 THEN M.id_multa END) AS multas_pendentes,
+           COALESCE(SUM(CASE WHEN M.isPaid = 0 THEN M.valor END), 0) AS valor_multas_pendentes,
+           MAX(CASE WHEN M.tempo_bloqueio > 0 THEN M.vencimento + M.tempo_bloqueio END) AS bloqueado_ate
+    FROM Usuario U
+    LEFT JOIN Aluguel A ON U.cpf = A.usuario_cpf
+    LEFT JOIN Multa M ON A.id_aluguel = M.aluguel_id
+    GROUP BY U.cpf
+"""
+
+SQL_DIVERGENCIAS_USUARIO = f"""
+    SELECT S.cpf,
+           R.alugueis_ativos, S.alugueis_ativos,
+           R.multas_pendentes, S.multas_pendentes,
+           R.valor_multas_pendentes, S.valor_multas_pendentes,
+           R.bloqueado_ate, S.bloqueado_ate
+    FROM ({SQL_RESUMO_USUARIO_ESPERADO}) S
+    LEFT JOIN Resumo_Usuario R ON R.usuario_cpf = S.cpf
+    WHERE R.usuario_cpf IS NULL
+       OR R.alugueis_ativos != S.alugueis_ativos
+       OR R.multas_pendentes != S.multas_pendentes
+       OR R.valor_multas_pendentes != S.valor_multas_pendentes
+       OR DECODE(R.bloqueado_ate, S.bloqueado_ate, 0, 1) = 1
+"""
+
+# Corrige apenas os usuários divergentes, recalculando-os no próprio MERGE
+SQL_CORRIGIR_RESUMO_USUARIO = f"""
+    MERGE INTO Resumo_Usuario R
+    USING ({SQL_RESUMO_USUARIO_ESPERADO}) S
+    ON (R.usuario_cpf = S.cpf)
+    WHEN MATCHED THEN UPDATE SET
+        R.alugueis_ativos = S.alugueis_ativos,
+        R.multas_pendentes = S.multas_pendentes,
+        R.valor_multas_pendentes = S.valor_multas_pendentes,
+        R.bloqueado_ate = S.bloqueado_ate
+        WHERE R.alugueis_ativos != S.alugueis_ativos
+           OR R.multas_pendentes != S.multas_pendentes
+           OR R.valor_multas_pendentes != S.valor_multas_pendentes
+           OR DECODE(R.bloqueado_ate, S.bloqueado_ate, 0, 1) = 1
+    WHEN NOT MATCHED THEN INSERT (usuario_cpf, alugueis_ativos, multas_pendentes,
+                                  valor_multas_pendentes, bloqueado_ate)
+        VALUES (S.cpf, S.alugueis_ativos, S.multas_pendentes,
+                S.valor_multas_pendentes, S.bloqueado_ate)
+"""
+
+CAMPOS_RESUMO_USUARIO = ['alugueis_ativos', 'multas_pendentes', 'valor_multas_pendentes', 'bloqueado_ate']
+
+def conferir_resumos(corrigir=False, limite_exibicao=50):
+    """Compara Resumo_Usuario com as tabelas de base; devolve o número de divergências.
+
+    A conferência é uma única consulta (leitura consistente), então operações
+    em andamento não aparecem como divergência. A correção recalcula no MERGE
+    só as linhas divergentes; rode-a fora do horário de pico.
+    """
+    divergentes = 0
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        cursor.arraysize = 1000
+        cursor.execute(SQL_DIVERGENCIAS_USUARIO)
+        while True:
+            linhas = cursor.fetchmany()
+            if not linhas:
+                break
+            for cpf, *valores in linhas:
+                divergentes += 1
+                if divergentes > limite_exibicao:
+                    continue
+                if valores[0] is None and valores[2] is None:
+                    print(f"   {formatar_cpf(cpf)}: sem linha em Resumo_Usuario")
+                    continue
+                diferencas = [f"{campo} {valores[2 * i]} → {valores[2 * i + 1]}"
+                              for i, campo in enumerate(CAMPOS_RESUMO_USUARIO)
+                              if valores[2 * i] != valores[2 * i + 1]]
+                print(f"   {formatar_cpf(cpf)}: " + ", ".join(diferencas))
+        if divergentes > limite_exibicao:
+            print(f"   ... e mais {divergentes - limite_exibicao} usuário(s)")
+
+        if corrigir and divergentes:
+            cursor.execute(SQL_CORRIGIR_RESUMO_USUARIO)
+            print(f"🔧 {cursor.rowcount} resumo(s) corrigido(s).")
+            conn.commit()
+        cursor.close()
+    return divergentes
+
+# ARQUIVAMENTO
+# Tabelas que referenciam Aluguel, na ordem de exclusão (filhas antes do aluguel)
+TABELAS_FILHAS_ALUGUEL = ['Comentario_Tipo', 'Comentario_Ponto', 'Comentario_Bike', 'Multa']
+
+SQL_INICIO_ARQUIVAVEL = """
+    SELECT MIN(data_hora_inicio) FROM Aluguel
+    WHERE data_hora_inicio < :limite AND status IN ('CONCLUIDO', 'CANCELADO')
+"""
+
+# Aluguéis encerrados do mês sem multa em aberto nem bloqueio ainda vigente
+# (o resumo do usuário continua correto sem eles)
+SQL_SELECIONAR_LOTE = """
+    INSERT INTO Arquivo_Lote (id_aluguel)
+    SELECT A.id_aluguel FROM Aluguel A
+    WHERE A.data_hora_inicio >= :inicio AND A.data_hora_inicio < :fim
+      AND A.status IN ('CONCLUIDO', 'CANCELADO')
+      AND NOT EXISTS (
+          SELECT 1 FROM Multa M
+          WHERE M.aluguel_id = A.id_aluguel
+            AND (M.isPaid = 0 OR (M.tempo_bloqueio > 0 AND M.vencimento + M.tempo_bloqueio > SYSDATE))
+      )
+"""
+
+SQL_COPIAR_ALUGUEIS = """
+    INSERT /*+ APPEND */ INTO Aluguel_Historico
+    SELECT * FROM Aluguel
+    WHERE data_hora_inicio >= :inicio AND data_hora_inicio < :fim
+      AND id_aluguel IN (SELECT id_aluguel FROM Arquivo_Lote)
+"""
+
+SQL_EXCLUIR_ALUGUEIS = """
+    DELETE FROM Aluguel
+    WHERE data_hora_inicio >= :inicio AND data_hora_inicio < :fim
+      AND id_aluguel IN (SELECT id_aluguel FROM Arquivo_Lote)
+"""
+
+def _somar_meses(data, meses):
+    """Primeiro dia do mês `meses` depois (ou antes) do mês de `data`"""
+    total = data.year * 12 + data.month - 1 + meses
+    return datetime.datetime(total // 12, total % 12 + 1, 1)
+
+def arquivar(meses):
+    """Move para as tabelas *_Historico os aluguéis encerrados há mais de `meses` meses.
+
+    Trabalha um mês (uma partição) por transação: seleciona o lote em
+    Arquivo_Lote, copia aluguéis, multas e comentários em modo direto
+    (compressão) e exclui das tabelas de origem. Devolve [(mês, aluguéis)].
+    """
+    limite = _somar_meses(datetime.date.today(), -meses)
+    arquivados = []
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_INICIO_ARQUIVAVEL, limite=limite)
+        primeiro, = cursor.fetchone()
+        if primeiro is None:
+            cursor.close()
+            return arquivados
+
+        inicio = _somar_meses(primeiro, 0)
+        while inicio < limite:
+            fim = _somar_meses(inicio, 1)
+            cursor.execute(SQL_SELECIONAR_LOTE, inicio=inicio, fim=fim)
+            quantidade = cursor.rowcount
+            if quantidade:
+                cursor.execute(SQL_COPIAR_ALUGUEIS, inicio=inicio, fim=fim)
+                for tabela in TABELAS_FILHAS_ALUGUEL:
+                    cursor.execute(f"INSERT /*+ APPEND */ INTO {tabela}_Historico "
+                                   f"SELECT * FROM {tabela} "
+                                   f"WHERE aluguel_id IN (SELECT id_aluguel FROM Arquivo_Lote)")
+                for tabela in TABELAS_FILHAS_ALUGUEL:
+                    cursor.execute(f"DELETE FROM {tabela} "
+                                   f"WHERE aluguel_id IN (SELECT id_aluguel FROM Arquivo_Lote)")
+                cursor.execute(SQL_EXCLUIR_ALUGUEIS, inicio=inicio, fim=fim)
+                print(f"   📦 {inicio:%Y-%m}: {quantidade} aluguel(is) arquivado(s)")
+                arquivados.append((inicio, quantidade))
+            # O commit também esvazia Arquivo_Lote
+            conn.commit()
+            inicio = fim
+        cursor.close()
+    return arquivados
+
+# MULTAS AUTOMÁTICAS
+# Prazo para pagar as multas geradas pela rotina
+PRAZO_PAGAMENTO_DIAS = 15
+
+@dataclass
+class RegraMulta:
+    tipo: str
+    horas: float  # tempo em andamento a partir do qual a multa é aplicada
+    valor: float
+    tempo_bloqueio: int  # dias
+
+# Chave inicial do checkpoint (antes de qualquer aluguel)
+INICIO_CHECKPOINT = datetime.datetime(1900, 1, 1)
+
+SQL_LER_CHECKPOINT = "SELECT ultima_data, ultimo_id FROM Checkpoint_Rotina WHERE rotina = :1"
+
+SQL_GRAVAR_CHECKPOINT = """
+    MERGE INTO Checkpoint_Rotina C
+    USING (SELECT :rotina AS rotina FROM dual) S
+    ON (C.rotina = S.rotina)
+    WHEN MATCHED THEN UPDATE SET
+        C.ultima_data = :ultima_data, C.ultimo_id = :ultimo_id, C.atualizado_em = SYSDATE
+    WHEN NOT MATCHED THEN INSERT (rotina, ultima_data, ultimo_id)
+        VALUES (S.rotina, :ultima_data, :ultimo_id)
+"""
+
+SQL_APAGAR_CHECKPOINT = "DELETE FROM Checkpoint_Rotina WHERE rotina = :1"
+
+# Próximo lote de aluguéis abertos antes do limite, em ordem de início, pelo
+# índice parcial idx_aluguel_aberto (só contém aluguéis em andamento). Nenhuma
+# linha de Aluguel é bloqueada.
+SQL_SELECIONAR_LOTE_MULTA = """
+    INSERT INTO Multa_Lote (id_aluguel, aberto_desde)
+    SELECT id_aluguel, aberto_desde FROM Aluguel
+    WHERE aberto_desde < :limite
+      AND (aberto_desde > :ultima_data OR (aberto_desde = :ultima_data AND id_aluguel > :ultimo_id))
+    ORDER BY aberto_desde, id_aluguel
+    FETCH FIRST :lote ROWS ONLY
+"""
+
+# Aluguéis que já têm a multa do tipo ficam de fora (a rotina pode ser repetida)
+SQL_INSERIR_MULTAS = """
+    INSERT INTO Multa (aluguel_id, valor, tipo, vencimento, isPaid, tempo_bloqueio)
+    SELECT L.id_aluguel, :valor, :tipo, TRUNC(SYSDATE) + :prazo, 0, :tempo_bloqueio
+    FROM Multa_Lote L
+    JOIN Aluguel A ON A.id_aluguel = L.id_aluguel
+    WHERE A.status = 'EM_ANDAMENTO'
+      AND NOT EXISTS (
+          SELECT 1 FROM Multa M WHERE M.aluguel_id = L.id_aluguel AND M.tipo = :tipo
+      )
+"""
+
+SQL_FIM_LOTE_MULTA = """
+    SELECT aberto_desde, id_aluguel FROM Multa_Lote
+    ORDER BY aberto_desde DESC, id_aluguel DESC
+    FETCH FIRST 1 ROWS ONLY
+"""
+
+def multar(regras, lote=50000):
+    """Aplica as multas automáticas aos aluguéis em andamento há mais tempo que cada regra.
+
+    Cada regra percorre os aluguéis abertos em lotes; o lote, as multas e o
+    checkpoint são uma transação, então uma execução interrompida retoma do
+    último lote confirmado. Devolve {tipo: multas criadas}.
+    """
+    criadas = {}
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        for regra in regras:
+            rotina = f"multas_{regra.tipo.lower()}"
+            limite = datetime.datetime.now() - datetime.timedelta(hours=regra.horas)
+            cursor.execute(SQL_LER_CHECKPOINT, (rotina,))
+            ultima_data, ultimo_id = cursor.fetchone() or (INICIO_CHECKPOINT, 0)
+            if ultima_data != INICIO_CHECKPOINT:
+                print(f"   ↪️  {regra.tipo}: retomando após o aluguel {ultimo_id}")
+
+            criadas[regra.tipo] = 0
+            while True:
+                cursor.execute(SQL_SELECIONAR_LOTE_MULTA, limite=limite, ultima_data=ultima_data,
+                               ultimo_id=ultimo_id, lote=lote)
+                if cursor.rowcount == 0:
+                    break
+                cursor.execute(SQL_INSERIR_MULTAS, valor=regra.valor, tipo=regra.tipo,
+                               prazo=PRAZO_PAGAMENTO_DIAS, tempo_bloqueio=regra.tempo_bloqueio)
+                criadas[regra.tipo] += cursor.rowcount
+                cursor.execute(SQL_FIM_LOTE_MULTA)
+                ultima_data, ultimo_id = cursor.fetchone()
+                cursor.execute(SQL_GRAVAR_CHECKPOINT, rotina=rotina, ultima_data=ultima_data,
+                               ultimo_id=ultimo_id)
+                # O commit também esvazia Multa_Lote
+                conn.commit()
+
+            # Passagem completa: a próxima execução começa do início
+            cursor.execute(SQL_APAGAR_CHECKPOINT, (rotina,))
+            conn.commit()
+            print(f"   💸 {regra.tipo}: {criadas[regra.tipo]} multa(s) criada(s)")
+        cursor.close()
+    return criadas
+
+# MANUTENÇÃO EM LOTE
+def manutencao_lote(args):
+    """Abre ou fecha a manutenção das bikes selecionadas; devolve o ManutencaoEmLote"""
+    criterios = {'uso_minimo': args.uso_minimo, 'multiplo_alugueis': args.multiplo_alugueis,
+                 'ponto_id': args.ponto, 'bikes': args.bikes}
+    servico = ServicoManutencao()
+    if args.acao == 'abrir':
+        return servico.abrir_em_lote(args.tipo, args.problema, **criterios)
+    return servico.fechar_em_lote(args.pontos, args.custo, tipo=args.tipo_aberta, **criterios)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rotinas de operação")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_conf = sub.add_parser('conferir-resumos',
+                            help="Confere os contadores de Resumo_Usuario com as tabelas de base")
+    p_conf.add_argument('--corrigir', action='store_true', help="Recalcula os usuários divergentes")
+
+    p_arq = sub.add_parser('arquivar',
+                           help="Move aluguéis encerrados antigos para as tabelas de histórico")
+    p_arq.add_argument('--meses', type=int, required=True,
+                       help="Arquiva aluguéis iniciados antes do mês atual menos N meses")
+
+    p_mul = sub.add_parser('multar',
+                           help="Multa aluguéis em andamento além do prazo (atraso e não devolução)")
+    p_mul.add_argument('--horas-atraso', type=float, default=24)
+    p_mul.add_argument('--valor-atraso', type=float, default=20.00)
+    p_mul.add_argument('--bloqueio-atraso', type=int, default=0, help="Dias de bloqueio")
+    p_mul.add_argument('--dias-nao-devolucao', type=float, default=7)
+    p_mul.add_argument('--valor-nao-devolucao', type=float, default=500.00)
+    p_mul.add_argument('--bloqueio-nao-devolucao', type=int, default=30, help="Dias de bloqueio")
+    p_mul.add_argument('--lote', type=int, default=50000, help="Aluguéis por transação")
+
+    p_man = sub.add_parser('manutencao-lote',
+                           help="Abre ou fecha a manutenção de várias bikes de uma vez (campanhas)")
+    p_man.add_argument('acao', choices=['abrir', 'fechar'])
+    p_man.add_argument('--uso-minimo', type=float, help="Bikes com tempo_total_utilizado >= N minutos")
+    p_man.add_argument('--multiplo-alugueis', type=int, help="Bikes com qnt_alugueis múltiplo de N")
+    p_man.add_argument('--ponto', type=int, help="Bikes estacionadas no ponto (só abrir)")
+    p_man.add_argument('--bikes', type=int, nargs='+', help="Números de registro")
+    p_man.add_argument('--tipo', default='PREVENTIVA', help="Tipo da manutenção aberta")
+    p_man.add_argument('--problema', default="Revisão preventiva da campanha",
+                       help="Descrição registrada em cada manutenção aberta")
+    p_man.add_argument('--pontos', type=int, nargs='+', help="Pontos de destino (fechar)")
+    p_man.add_argument('--custo', type=float, default=0, help="Custo de cada manutenção (fechar)")
+    p_man.add_argument('--tipo-aberta', help="Fecha só manutenções deste tipo")
+
+    args = parser.parse_args()
+
+    if args.comando == 'conferir-resumos':
+        print("\n🔎 CONFERÊNCIA DOS RESUMOS DE USUÁRIO")
+        divergentes = conferir_resumos(args.corrigir)
+        if not divergentes:
+            print("✅ Nenhuma divergência.")
+        else:
+            print(f"⚠️  {divergentes} usuário(s) divergente(s).")
+        banco.fechar_pool()
+        sys.exit(1 if divergentes and not args.corrigir else 0)
+    elif args.comando == 'arquivar':
+        if args.meses < 1:
+            parser.error("--meses deve ser pelo menos 1")
+        print(f"\n📦 ARQUIVAMENTO (aluguéis com mais de {args.meses} mês(es))")
+        arquivados = arquivar(args.meses)
+        total = sum(quantidade for _, quantidade in arquivados)
+        print(f"✅ {total} aluguel(is) arquivado(s) em {len(arquivados)} mês(es).")
+        banco.fechar_pool()
+    elif args.comando == 'multar':
+        regras = [
+            RegraMulta('ATRASO', args.horas_atraso, args.valor_atraso, args.bloqueio_atraso),
+            RegraMulta('NAO_DEVOLUCAO', args.dias_nao_devolucao * 24,
+                       args.valor_nao_devolucao, args.bloqueio_nao_devolucao),
+        ]
+        print("\n💸 MULTAS AUTOMÁTICAS")
+        criadas = multar(regras, args.lote)
+        print(f"✅ {sum(criadas.values())} multa(s) criada(s).")
+        banco.fechar_pool()
+    elif args.comando == 'manutencao-lote':
+        print(f"\n🔧 MANUTENÇÃO EM LOTE ({args.acao.upper()})")
+        try:
+            resultado = manutencao_lote(args)
+        except ErroServico as e:
+            banco.fechar_pool()
+            sys.exit(f"❌ [ERRO] {e}")
+        banco.fechar_pool()
+
+        if args.acao == 'abrir':
+            print(f"✅ {len(resultado.bikes)} bike(s) enviada(s) para manutenção.")
+        else:
+            por_ponto = {}
+            for ponto in resultado.destinos.values():
+                por_ponto[ponto] = por_ponto.get(ponto, 0) + 1
+            for ponto, quantidade in por_ponto.items():
+                print(f"   📍 Ponto {ponto}: {quantidade} bike(s)")
+            print(f"✅ {len(resultado.bikes)} bike(s) liberada(s).")
+        if resultado.ignoradas:
+            print(f"⚠️  {len(resultado.ignoradas)} bike(s) ignorada(s):")
+            for bike, motivo in resultado.ignoradas:
+                print(f"   🚲 {bike}: {motivo}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,958 @@
+import datetime
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import banco
+from cache import CacheReferencia, SnapshotTabela
+from registro_sql import (
+    CPF, ESCRITA, LISTA, NUMERO, TABELA, TEXTO, TEXTO_LONGO,
+    executar, executar_lote, registrar,
+)
+from validacoes import (
+    validar_cpf, validar_data, validar_data_passado, validar_uf,
+    validar_tipo_manutencao, validar_validade_cartao, formatar_cpf,
+)
+
+# Grupo 12
+# Camada de serviço: regras de negócio sem input()/print().
+# Cada operação empresta uma sessão do pool (banco.conexao) e devolve
+# resultados tipados ou levanta uma exceção de ErroServico.
+
+SALDO_MINIMO = 5.00
+
+# Cache de dados de referência (pontos e atributos fixos das bikes)
+CACHE_TTL = int(os.environ.get('CACHE_TTL', '300'))
+CACHE_CAPACIDADE = int(os.environ.get('CACHE_CAPACIDADE', '10000'))
+# Segundos entre recargas do estoque dos pontos em memória
+ESTOQUE_TTL = float(os.environ.get('ESTOQUE_TTL', '5'))
+
+# --- EXCEÇÕES ---
+
+class ErroServico(Exception):
+    """Erro de regra de negócio (mensagem pronta para exibição)"""
+
+class DadosInvalidos(ErroServico):
+    pass
+
+class UsuarioNaoEncontrado(ErroServico):
+    pass
+
+class UsuarioJaCadastrado(ErroServico):
+    pass
+
+class UsuarioBloqueado(ErroServico):
+    pass
+
+class SaldoInsuficiente(ErroServico):
+    pass
+
+class BikeNaoEncontrada(ErroServico):
+    pass
+
+class BikeIndisponivel(ErroServico):
+    def __init__(self, mensagem, status):
+        super().__init__(mensagem)
+        self.status = status
+
+class PontoNaoEncontrado(ErroServico):
+    pass
+
+class AluguelNaoEncontrado(ErroServico):
+    pass
+
+class AluguelInativo(ErroServico):
+    def __init__(self, mensagem, status):
+        super().__init__(mensagem)
+        self.status = status
+
+class ManutencaoNaoEncontrada(ErroServico):
+    pass
+
+# --- RESULTADOS ---
+
+@dataclass
+class Ponto:
+    cod_ponto: int
+    rua: str
+    numero: Optional[str]
+    bairro: Optional[str]
+    cidade: str
+    uf: str
+    referencia: Optional[str]
+    capacidade_maxima: int
+
+@dataclass
+class BikeCadastro:
+    n_registro: int
+    modelo: str
+    ano_fabricacao: Optional[int]
+    cor: Optional[str]
+
+@dataclass
+class UsuarioApto:
+    cpf: str
+    nome: str
+    saldo: float
+
+@dataclass
+class BikeDisponivel:
+    bike_id: int
+    ponto_id: int
+    rua: Optional[str]
+    bairro: Optional[str]
+
+@dataclass
+class AluguelIniciado:
+    id_aluguel: int
+    bike_id: int
+    cpf: str
+    nome: str
+    ponto_retirada_id: int
+
+@dataclass
+class DevolucaoRealizada:
+    id_aluguel: int
+    bike_id: int
+    nome: str
+    modelo: str
+    ponto_devolucao_id: int
+    duracao_minutos: float
+    valor: float
+    data_hora_fim: datetime.datetime
+    qnt_alugueis_bike: int
+    tempo_total_bike: float
+
+@dataclass
+class ManutencaoAberta:
+    bike_id: int
+    tipo: str
+
+@dataclass
+class ManutencaoFechada:
+    bike_id: int
+    ponto_id: int
+    custo: float
+
+@dataclass
+class ManutencaoEmLote:
+    bikes: list  # bikes processadas
+    ignoradas: list  # (bike, motivo)
+    destinos: dict = None  # bike -> ponto, no fechamento
+
+@dataclass
+class MultaPendente:
+    id_multa: int
+    valor: float
+    tipo: str
+    vencimento: datetime.datetime
+
+@dataclass
+class SituacaoUsuario:
+    cpf: str
+    nome: str
+    cidade: str
+    is_cad_unico: bool
+    saldo: Optional[float]
+    validade_cartao: Optional[datetime.datetime]
+    alugueis_ativos: int
+    multas_pendentes: int
+    valor_multas: float
+    multas: list
+    bloqueado_ate: Optional[datetime.datetime] = None
+
+@dataclass
+class EstoquePonto:
+    cod_ponto: int
+    rua: str
+    bairro: Optional[str]
+    cidade: str
+    capacidade_maxima: int
+    disponiveis: int
+
+@dataclass
+class BikeNoPonto:
+    n_registro: int
+    modelo: str
+    cor: Optional[str]
+
+# --- SQL ---
+# Compartilhado com a variante assíncrona (servicos_async.py). Os comandos
+# fixos são executados pelo nome registrado ao final desta seção (registro_sql.py).
+
+SQL_CPF_CADASTRADO = "SELECT COUNT(*) FROM Usuario WHERE cpf = :1"
+
+SQL_INSERIR_USUARIO = """
+    INSERT INTO Usuario (cpf, nome, data_nasc, rua, numero, bairro, cidade, uf, is_cadUnico)
+    VALUES (:1, :2, TO_DATE(:3, 'DD/MM/YYYY'), :4, :5, :6, :7, :8, :9)
+"""
+
+SQL_INSERIR_CARTAO = """
+    INSERT INTO Cartao (usuario_cpf, saldo, data_validade, data_emissao)
+    VALUES (:1, :2, TO_DATE(:3, 'DD/MM/YYYY'), SYSDATE)
+"""
+
+SQL_INSERIR_PONTO = """
+    INSERT INTO Ponto (rua, numero, bairro, cidade, uf, referencia, capacidade_maxima)
+    VALUES (:1, :2, :3, :4, :5, :6, :7)
+    RETURNING cod_ponto INTO :8
+"""
+
+SQL_INSERIR_BIKE = """
+    INSERT INTO Bike (modelo, ano_fabricacao, cor, status, qnt_alugueis, tempo_total_utilizado, ponto_atual_id)
+    VALUES (:1, :2, :3, 'DISPONIVEL', 0, 0, :4)
+    RETURNING n_registro INTO :5
+"""
+
+SQL_CARREGAR_PONTO = """
+    SELECT cod_ponto, rua, numero, bairro, cidade, uf, referencia, capacidade_maxima
+    FROM Ponto WHERE cod_ponto = :1
+"""
+
+SQL_CARREGAR_BIKE = "SELECT n_registro, modelo, ano_fabricacao, cor FROM Bike WHERE n_registro = :1"
+
+SQL_STATUS_BIKE = "SELECT status FROM Bike WHERE n_registro = :1"
+
+# Situação do usuário lida do resumo mantido por gatilhos (esquema.sql);
+# bloqueado_ate só vem preenchido enquanto o bloqueio estiver vigente
+SQL_VERIFICAR_USUARIO = """
+    SELECT U.nome, C.saldo, R.multas_pendentes,
+           CASE WHEN R.bloqueado_ate > SYSDATE THEN R.bloqueado_ate END as bloqueado_ate
+    FROM Usuario U
+    JOIN Resumo_Usuario R ON R.usuario_cpf = U.cpf
+    LEFT JOIN Cartao C ON U.cpf = C.usuario_cpf
+    WHERE U.cpf = :1
+"""
+
+SQL_SITUACAO_USUARIO = """
+    SELECT U.nome, U.cidade, U.is_cadUnico,
+           C.saldo, C.data_validade,
+           R.alugueis_ativos, R.multas_pendentes, R.valor_multas_pendentes,
+           CASE WHEN R.bloqueado_ate > SYSDATE THEN R.bloqueado_ate END as bloqueado_ate
+    FROM Usuario U
+    JOIN Resumo_Usuario R ON R.usuario_cpf = U.cpf
+    LEFT JOIN Cartao C ON U.cpf = C.usuario_cpf
+    WHERE U.cpf = :1
+"""
+
+SQL_MULTAS_PENDENTES = """
+    SELECT M.id_multa, M.valor, M.tipo, M.vencimento
+    FROM Multa M
+    JOIN Aluguel A ON M.aluguel_id = A.id_aluguel
+    WHERE A.usuario_cpf = :1 AND M.isPaid = 0
+    ORDER BY M.vencimento
+"""
+
+# Estoque de todos os pontos (uma linha por ponto), carregado no snapshot
+SQL_ESTOQUE_PONTOS = """
+    SELECT P.cod_ponto, P.rua, P.bairro, P.cidade, P.capacidade_maxima, E.disponiveis
+    FROM Estoque_Ponto E
+    JOIN Ponto P ON P.cod_ponto = E.cod_ponto
+"""
+
+# Faixa de idx_bike_ponto_status
+SQL_BIKES_NO_PONTO = """
+    SELECT n_registro, modelo, cor FROM Bike
+    WHERE ponto_atual_id = :1 AND status = 'DISPONIVEL'
+    ORDER BY n_registro
+    FETCH FIRST :2 ROWS ONLY
+"""
+
+SQL_VERIFICAR_BIKE = """
+    SELECT B.status, B.ponto_atual_id, P.rua, P.bairro
+    FROM Bike B
+    LEFT JOIN Ponto P ON B.ponto_atual_id = P.cod_ponto
+    WHERE B.n_registro = :1
+"""
+
+# Aluguel atômico em uma única ida ao servidor: valida o usuário, reserva a
+# bike com um UPDATE condicional (o bloqueio de linha impede que dois
+# quiosques aluguem a mesma bike), registra o aluguel e confirma.
+SQL_INICIAR_ALUGUEL = """
+DECLARE
+    v_multas NUMBER;
+BEGIN
+    BEGIN
+        SELECT U.nome, C.saldo, R.multas_pendentes,
+               CASE WHEN R.bloqueado_ate > SYSDATE THEN R.bloqueado_ate END
+        INTO :nome, :saldo, v_multas, :bloqueado_ate
+        FROM Usuario U
+        JOIN Resumo_Usuario R ON R.usuario_cpf = U.cpf
+        LEFT JOIN Cartao C ON U.cpf = C.usuario_cpf
+        WHERE U.cpf = :cpf;
+    EXCEPTION
+        WHEN NO_DATA_FOUND THEN
+            :resultado := 'USUARIO_NAO_ENCONTRADO';
+            RETURN;
+    END;
+    :multas := v_multas;
+
+    IF v_multas > 0 OR :bloqueado_ate IS NOT NULL OR :saldo IS NULL OR :saldo < :saldo_minimo THEN
+        :resultado := 'USUARIO_INAPTO';
+        RETURN;
+    END IF;
+
+    UPDATE Bike SET status = 'EM_USO'
+    WHERE n_registro = :bike_id AND status = 'DISPONIVEL'
+    RETURNING ponto_atual_id INTO :ponto_id;
+
+    IF SQL%ROWCOUNT = 0 THEN
+        BEGIN
+            SELECT status INTO :status FROM Bike WHERE n_registro = :bike_id;
+            :resultado := 'BIKE_INDISPONIVEL';
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                :resultado := 'BIKE_NAO_ENCONTRADA';
+        END;
+        RETURN;
+    END IF;
+
+    INSERT INTO Aluguel (bike_n_registro, usuario_cpf, ponto_retirada_id,
+                         data_hora_inicio, status)
+    VALUES (:bike_id, :cpf, :ponto_id, SYSTIMESTAMP, 'EM_ANDAMENTO')
+    RETURNING id_aluguel INTO :id_aluguel;
+
+    COMMIT;
+    :resultado := 'OK';
+END;
+"""
+
+# Devolução em uma única ida ao servidor: bloqueia e valida o aluguel, valida
+# o ponto, fecha o aluguel com o relógio do banco, precifica pela tarifa vigente
+# no início (tarifar_aluguel, esquema.sql), atualiza as estatísticas da bike e
+# confirma, devolvendo os valores finais.
+SQL_FINALIZAR_ALUGUEL = """
+DECLARE
+    v_inicio    Aluguel.data_hora_inicio%TYPE;
+    v_fim       Aluguel.data_hora_fim%TYPE := SYSTIMESTAMP;
+    v_intervalo INTERVAL DAY(9) TO SECOND;
+    v_pontos    NUMBER;
+    v_cad_unico Usuario.is_cadUnico%TYPE;
+BEGIN
+    BEGIN
+        SELECT A.bike_n_registro, A.data_hora_inicio, A.status, U.nome, B.modelo, U.is_cadUnico
+        INTO :bike_id, v_inicio, :status, :nome, :modelo, v_cad_unico
+        FROM Aluguel A
+        JOIN Usuario U ON A.usuario_cpf = U.cpf
+        JOIN Bike B ON A.bike_n_registro = B.n_registro
+        WHERE A.id_aluguel = :aluguel_id
+        FOR UPDATE OF A.status;
+    EXCEPTION
+        WHEN NO_DATA_FOUND THEN
+            :resultado := 'ALUGUEL_NAO_ENCONTRADO';
+            RETURN;
+    END;
+
+    IF :status IS NULL OR :status != 'EM_ANDAMENTO' THEN
+        :resultado := 'ALUGUEL_INATIVO';
+        RETURN;
+    END IF;
+
+    SELECT COUNT(*) INTO v_pontos FROM Ponto WHERE cod_ponto = :ponto_id;
+    IF v_pontos = 0 THEN
+        :resultado := 'PONTO_NAO_ENCONTRADO';
+        RETURN;
+    END IF;
+
+    v_intervalo := v_fim - v_inicio;
+    :duracao := EXTRACT(DAY FROM v_intervalo) * 1440 +
+                EXTRACT(HOUR FROM v_intervalo) * 60 +
+                EXTRACT(MINUTE FROM v_intervalo) +
+                EXTRACT(SECOND FROM v_intervalo) / 60;
+
+    UPDATE Aluguel SET
+        data_hora_fim = v_fim,
+        ponto_devolucao_id = :ponto_id,
+        status = 'CONCLUIDO',
+        valor_aluguel = tarifar_aluguel(v_inicio, :duracao, v_cad_unico)
+    WHERE id_aluguel = :aluguel_id
+    RETURNING data_hora_fim, valor_aluguel INTO :fim, :valor;
+
+    UPDATE Bike SET
+        status = 'DISPONIVEL',
+        ponto_atual_id = :ponto_id,
+        qnt_alugueis = qnt_alugueis + 1,
+        tempo_total_utilizado = tempo_total_utilizado + :duracao
+    WHERE n_registro = :bike_id
+    RETURNING qnt_alugueis, tempo_total_utilizado INTO :qnt_alugueis, :tempo_total;
+
+    COMMIT;
+    :resultado := 'OK';
+END;
+"""
+
+SQL_INSERIR_MANUTENCAO = """
+    INSERT INTO Manutencao (bike_n_registro, tipo, data_inicio, descricao_problema, valor)
+    VALUES (:1, :2, SYSDATE, :3, 0)
+"""
+
+# Só a bike ainda DISPONIVEL: um aluguel confirmado depois da leitura do status não é sobrescrito
+SQL_BIKE_EM_MANUTENCAO = """
+    UPDATE Bike SET status = 'MANUTENCAO', ponto_atual_id = NULL
+    WHERE n_registro = :1 AND status = 'DISPONIVEL'
+"""
+
+SQL_CONCLUIR_MANUTENCAO = """
+    UPDATE Manutencao SET data_fim = SYSDATE, valor = :1
+    WHERE bike_n_registro = :2 AND data_fim IS NULL
+"""
+
+# Manutenção em lote: as bikes candidatas são lidas uma vez e as alterações
+# vão em array DML (uma ida ao servidor por comando, uma transação no total).
+# A condição de status no UPDATE descarta as bikes que mudaram no meio tempo.
+SQL_BIKES_CAMPANHA = """
+    SELECT B.n_registro, B.status FROM Bike B
+    WHERE {filtro}
+    ORDER BY B.n_registro
+"""
+
+SQL_BIKE_EM_MANUTENCAO_LOTE = """
+    UPDATE Bike SET status = 'MANUTENCAO', ponto_atual_id = NULL
+    WHERE n_registro = :1 AND status = 'DISPONIVEL'
+"""
+
+SQL_BIKES_EM_OFICINA = """
+    SELECT B.n_registro, B.status, M.id_manutencao
+    FROM Bike B
+    LEFT JOIN Manutencao M ON M.bike_n_registro = B.n_registro AND M.data_fim IS NULL
+    WHERE {filtro}
+    ORDER BY M.aberta_desde, B.n_registro
+    FOR UPDATE OF B.status
+"""
+
+SQL_VAGAS_PONTOS = """
+    SELECT P.cod_ponto, P.capacidade_maxima - E.disponiveis
+    FROM Ponto P
+    JOIN Estoque_Ponto E ON E.cod_ponto = P.cod_ponto
+    WHERE P.cod_ponto IN ({pontos})
+"""
+
+SQL_CONCLUIR_MANUTENCAO_LOTE = "UPDATE Manutencao SET data_fim = SYSDATE, valor = :1 WHERE id_manutencao = :2"
+
+SQL_BIKE_LIBERADA = """
+    UPDATE Bike SET status = 'DISPONIVEL', ponto_atual_id = :1
+    WHERE n_registro = :2 AND status = 'MANUTENCAO'
+"""
+
+# Tipos dos binds na ordem dos parâmetros; None deixa o tipo ao driver
+# (variáveis de saída criadas com cursor.var)
+registrar('cpf_cadastrado', SQL_CPF_CADASTRADO, (CPF,))
+registrar('inserir_usuario', SQL_INSERIR_USUARIO,
+          (CPF, TEXTO, 10, TEXTO, 10, 50, 50, 2, NUMERO), ESCRITA)
+registrar('inserir_cartao', SQL_INSERIR_CARTAO, (CPF, NUMERO, 10), ESCRITA)
+registrar('inserir_ponto', SQL_INSERIR_PONTO,
+          (TEXTO, 10, 50, 50, 2, TEXTO, NUMERO, None), ESCRITA)
+registrar('inserir_bike', SQL_INSERIR_BIKE, (50, NUMERO, 30, NUMERO, None), ESCRITA)
+registrar('carregar_ponto', SQL_CARREGAR_PONTO, (NUMERO,))
+registrar('carregar_bike', SQL_CARREGAR_BIKE, (NUMERO,))
+registrar('estoque_pontos', SQL_ESTOQUE_PONTOS, perfil=TABELA)
+registrar('bikes_no_ponto', SQL_BIKES_NO_PONTO, (NUMERO, NUMERO), LISTA)
+registrar('status_bike', SQL_STATUS_BIKE, (NUMERO,))
+registrar('verificar_usuario', SQL_VERIFICAR_USUARIO, (CPF,))
+registrar('situacao_usuario', SQL_SITUACAO_USUARIO, (CPF,))
+registrar('multas_pendentes', SQL_MULTAS_PENDENTES, (CPF,), LISTA)
+registrar('verificar_bike', SQL_VERIFICAR_BIKE, (NUMERO,))
+registrar('iniciar_aluguel', SQL_INICIAR_ALUGUEL,
+          {'cpf': CPF, 'bike_id': NUMERO, 'saldo_minimo': NUMERO}, ESCRITA)
+registrar('finalizar_aluguel', SQL_FINALIZAR_ALUGUEL,
+          {'aluguel_id': NUMERO, 'ponto_id': NUMERO}, ESCRITA)
+registrar('inserir_manutencao', SQL_INSERIR_MANUTENCAO, (NUMERO, 20, TEXTO_LONGO), ESCRITA)
+registrar('bike_em_manutencao', SQL_BIKE_EM_MANUTENCAO, (NUMERO,), ESCRITA)
+registrar('bike_em_manutencao_lote', SQL_BIKE_EM_MANUTENCAO_LOTE, (NUMERO,), ESCRITA)
+registrar('concluir_manutencao', SQL_CONCLUIR_MANUTENCAO, (NUMERO, NUMERO), ESCRITA)
+registrar('concluir_manutencao_lote', SQL_CONCLUIR_MANUTENCAO_LOTE, (NUMERO, NUMERO), ESCRITA)
+registrar('bike_liberada', SQL_BIKE_LIBERADA, (NUMERO, NUMERO), ESCRITA)
+
+# --- REGRAS ---
+# Funções puras sobre as linhas lidas do banco, usadas pelas variantes
+# síncrona e assíncrona dos serviços.
+
+def avaliar_usuario(cpf, user_data):
+    """Confere se o usuário pode alugar (existe, sem multas nem bloqueio, saldo mínimo)"""
+    if not user_data:
+        raise UsuarioNaoEncontrado(f"Usuário com CPF {formatar_cpf(cpf)} não encontrado.")
+
+    nome, saldo, multas, bloqueado_ate = user_data
+    if multas > 0:
+        raise UsuarioBloqueado(f"Usuário {nome} possui {multas} multa(s) pendente(s).")
+    if bloqueado_ate is not None:
+        raise UsuarioBloqueado(
+            f"Usuário {nome} bloqueado por multa até {bloqueado_ate.strftime('%d/%m/%Y')}.")
+    if saldo is None or saldo < SALDO_MINIMO:
+        raise SaldoInsuficiente(
+            f"Saldo insuficiente. Mínimo necessário: R$ {SALDO_MINIMO:.2f} "
+            f"(saldo atual: R$ {saldo or 0:.2f})")
+    return UsuarioApto(cpf, nome, saldo)
+
+def avaliar_bike(bike_id, bike_data):
+    """Confere se a bike existe e está disponível"""
+    if not bike_data:
+        raise BikeNaoEncontrada("Bicicleta não encontrada.")
+
+    status, ponto_atual, rua, bairro = bike_data
+    if status != 'DISPONIVEL':
+        raise BikeIndisponivel(f"Bike indisponível. Status atual: {status}", status)
+    return BikeDisponivel(bike_id, ponto_atual, rua, bairro)
+
+def variaveis_inicio_aluguel(cursor, cpf, bike_id):
+    """Parâmetros (entrada e saída) do bloco SQL_INICIAR_ALUGUEL"""
+    return {
+        'cpf': cpf,
+        'bike_id': bike_id,
+        'saldo_minimo': SALDO_MINIMO,
+        'resultado': cursor.var(str),
+        'nome': cursor.var(str),
+        'saldo': cursor.var(float),
+        'multas': cursor.var(int),
+        'bloqueado_ate': cursor.var(datetime.datetime),
+        'status': cursor.var(str),
+        'ponto_id': cursor.var(int),
+        'id_aluguel': cursor.var(int),
+    }
+
+def avaliar_inicio_aluguel(variaveis):
+    """Converte a saída do bloco de aluguel em AluguelIniciado ou exceção"""
+    cpf, bike_id = variaveis['cpf'], variaveis['bike_id']
+    resultado = variaveis['resultado'].getvalue()
+    if resultado == 'USUARIO_NAO_ENCONTRADO':
+        avaliar_usuario(cpf, None)
+    usuario = avaliar_usuario(cpf, (variaveis['nome'].getvalue(),
+                                    variaveis['saldo'].getvalue(),
+                                    variaveis['multas'].getvalue(),
+                                    variaveis['bloqueado_ate'].getvalue()))
+    if resultado == 'BIKE_NAO_ENCONTRADA':
+        avaliar_bike(bike_id, None)
+    if resultado == 'BIKE_INDISPONIVEL':
+        avaliar_bike(bike_id, (variaveis['status'].getvalue(), None, None, None))
+    return AluguelIniciado(variaveis['id_aluguel'].getvalue(), bike_id, cpf,
+                           usuario.nome, variaveis['ponto_id'].getvalue())
+
+def variaveis_fim_aluguel(cursor, aluguel_id, ponto_id):
+    """Parâmetros (entrada e saída) do bloco SQL_FINALIZAR_ALUGUEL"""
+    return {
+        'aluguel_id': aluguel_id,
+        'ponto_id': ponto_id,
+        'resultado': cursor.var(str),
+        'bike_id': cursor.var(int),
+        'status': cursor.var(str),
+        'nome': cursor.var(str),
+        'modelo': cursor.var(str),
+        'duracao': cursor.var(float),
+        'fim': cursor.var(datetime.datetime),
+        'valor': cursor.var(float),
+        'qnt_alugueis': cursor.var(int),
+        'tempo_total': cursor.var(float),
+    }
+
+def avaliar_fim_aluguel(variaveis):
+    """Converte a saída do bloco de devolução em DevolucaoRealizada ou exceção"""
+    resultado = variaveis['resultado'].getvalue()
+    if resultado == 'ALUGUEL_NAO_ENCONTRADO':
+        raise AluguelNaoEncontrado("Aluguel não encontrado.")
+    if resultado == 'ALUGUEL_INATIVO':
+        status = variaveis['status'].getvalue()
+        raise AluguelInativo(f"Este aluguel não está ativo. Status: {status}", status)
+    if resultado == 'PONTO_NAO_ENCONTRADO':
+        raise PontoNaoEncontrado("Ponto não encontrado.")
+    return DevolucaoRealizada(
+        variaveis['aluguel_id'], variaveis['bike_id'].getvalue(),
+        variaveis['nome'].getvalue(), variaveis['modelo'].getvalue(),
+        variaveis['ponto_id'], variaveis['duracao'].getvalue(),
+        variaveis['valor'].getvalue(), variaveis['fim'].getvalue(),
+        variaveis['qnt_alugueis'].getvalue(), variaveis['tempo_total'].getvalue())
+
+def avaliar_bike_para_manutencao(row):
+    """Confere se a bike pode ser enviada para a oficina"""
+    if not row:
+        raise BikeNaoEncontrada("Bike não encontrada.")
+    if row[0] == 'EM_USO':
+        raise BikeIndisponivel("Bike está alugada. Aguarde devolução.", row[0])
+    if row[0] == 'MANUTENCAO':
+        raise BikeIndisponivel("Bike já está em manutenção.", row[0])
+
+def avaliar_bike_alterada(row):
+    """Motivo pelo qual a bike não foi para a oficina, pelo status relido depois do UPDATE"""
+    avaliar_bike_para_manutencao(row)
+    raise BikeIndisponivel(f"Bike indisponível. Status atual: {row[0]}", row[0])
+
+def validar_manutencao(tipo, problema):
+    tipo = tipo.upper()
+    if not validar_tipo_manutencao(tipo):
+        raise DadosInvalidos("Tipo inválido. Escolha entre: PREVENTIVA, CORRETIVA ou ANTECIPADA.")
+    if len(problema) < 10:
+        raise DadosInvalidos("Descrição muito curta. Forneça mais detalhes.")
+    return tipo
+
+def filtro_campanha(uso_minimo=None, multiplo_alugueis=None, ponto_id=None, bikes=None, tipo=None):
+    """Condição SQL e binds para selecionar as bikes de uma campanha.
+
+    Os critérios informados são combinados com AND; `tipo` filtra pela
+    manutenção aberta (só no fechamento).
+    """
+    condicoes, binds = [], {}
+    if uso_minimo is not None:
+        condicoes.append("B.tempo_total_utilizado >= :uso_minimo")
+        binds['uso_minimo'] = uso_minimo
+    if multiplo_alugueis is not None:
+        if multiplo_alugueis <= 0:
+            raise DadosInvalidos("O múltiplo de aluguéis deve ser positivo.")
+        condicoes.append("B.qnt_alugueis > 0 AND MOD(B.qnt_alugueis, :multiplo) = 0")
+        binds['multiplo'] = multiplo_alugueis
+    if ponto_id is not None:
+        condicoes.append("B.ponto_atual_id = :ponto_id")
+        binds['ponto_id'] = ponto_id
+    if bikes:
+        nomes = [f"b{i}" for i in range(len(bikes))]
+        condicoes.append(f"B.n_registro IN ({', '.join(':' + n for n in nomes)})")
+        binds.update(zip(nomes, bikes))
+    if tipo is not None:
+        condicoes.append("M.tipo = :tipo")
+        binds['tipo'] = tipo.upper()
+    return " AND ".join(condicoes), binds
+
+# --- CACHE ---
+
+def _carregar_ponto(cod_ponto):
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        row = executar(cursor, 'carregar_ponto', (cod_ponto,)).fetchone()
+        return Ponto(*row) if row else None
+
+def _carregar_bike(n_registro):
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        row = executar(cursor, 'carregar_bike', (n_registro,)).fetchone()
+        return BikeCadastro(*row) if row else None
+
+def _carregar_estoque():
+    with banco.conexao() as conn:
+        cursor = conn.cursor()
+        executar(cursor, 'estoque_pontos')
+        return {row[0]: EstoquePonto(*row) for row in cursor.fetchall()}
+
+cache_pontos = CacheReferencia('pontos', _carregar_ponto, CACHE_TTL, CACHE_CAPACIDADE)
+cache_bikes = CacheReferencia('bikes', _carregar_bike, CACHE_TTL, CACHE_CAPACIDADE)
+estoque_pontos = SnapshotTabela('estoque', _carregar_estoque, ESTOQUE_TTL)
+
+# --- SERVIÇOS ---
+
+class ServicoCadastro:
+    def __init__(self, conexao=banco.conexao):
+        self.conexao = conexao
+
+    def cpf_cadastrado(self, cpf):
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            return executar(cursor, 'cpf_cadastrado', (cpf,)).fetchone()[0] > 0
+
+    def ponto_existe(self, ponto_id):
+        return cache_pontos.obter(ponto_id) is not None
+
+    def obter_ponto(self, ponto_id):
+        return cache_pontos.obter(ponto_id)
+
+    def obter_bike(self, bike_id):
+        """Atributos fixos da bike (modelo, ano, cor); o status não é cacheado"""
+        return cache_bikes.obter(bike_id)
+
+    def cadastrar_usuario(self, cpf, nome, data_nasc, cidade, uf, saldo, validade,
+                          rua=None, numero=None, bairro=None, is_cad_unico=False):
+        """Cadastra o usuário e emite seu cartão na mesma transação.
+
+        Datas no formato DD/MM/AAAA.
+        """
+        if not validar_cpf(cpf):
+            raise DadosInvalidos("CPF inválido! Deve conter exatamente 11 números.")
+        if not nome or len(nome) < 3:
+            raise DadosInvalidos("Nome deve ter pelo menos 3 caracteres.")
+        if not (validar_data(data_nasc) and validar_data_passado(data_nasc)):
+            raise DadosInvalidos("Data de nascimento inválida ou futura.")
+        if not cidade:
+            raise DadosInvalidos("Cidade é obrigatória.")
+        if not validar_uf(uf):
+            raise DadosInvalidos("UF inválida! Use 2 letras (ex: SP, RJ).")
+        if saldo < 0:
+            raise DadosInvalidos("Saldo deve ser um número positivo.")
+        if not validar_validade_cartao(validade):
+            raise DadosInvalidos("Validade do cartão deve estar entre 1 mês e 5 anos à frente.")
+
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            if executar(cursor, 'cpf_cadastrado', (cpf,)).fetchone()[0] > 0:
+                raise UsuarioJaCadastrado(f"CPF {formatar_cpf(cpf)} já cadastrado!")
+
+            executar(cursor, 'inserir_usuario', (cpf, nome, data_nasc, rua, numero, bairro, cidade, uf,
+                                                  1 if is_cad_unico else 0))
+            executar(cursor, 'inserir_cartao', (cpf, saldo, validade))
+            conn.commit()
+
+    def cadastrar_ponto(self, rua, cidade, uf, capacidade, numero=None, bairro=None, referencia=None):
+        if not rua:
+            raise DadosInvalidos("Rua é obrigatória.")
+        if not cidade:
+            raise DadosInvalidos("Cidade é obrigatória.")
+        if not validar_uf(uf):
+            raise DadosInvalidos("UF inválida! Use 2 letras (ex: SP, RJ).")
+        if not 0 < capacidade <= 100:
+            raise DadosInvalidos("Capacidade deve estar entre 1 e 100.")
+
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            cod_ponto = cursor.var(int)
+            executar(cursor, 'inserir_ponto',
+                     (rua, numero, bairro, cidade, uf, referencia, capacidade, cod_ponto))
+            conn.commit()
+        cod_ponto = cod_ponto.getvalue()[0]
+        cache_pontos.invalidar(cod_ponto)
+        estoque_pontos.invalidar()
+        return cod_ponto
+
+    def cadastrar_bike(self, modelo, ano, cor, ponto_id):
+        ano_atual = datetime.datetime.now().year
+        if not modelo:
+            raise DadosInvalidos("Modelo é obrigatório.")
+        if not 1900 <= ano <= ano_atual:
+            raise DadosInvalidos(f"Ano deve estar entre 1900 e {ano_atual}.")
+
+        if cache_pontos.obter(ponto_id) is None:
+            raise PontoNaoEncontrado("Ponto não encontrado. Verifique o ID.")
+
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            n_registro = cursor.var(int)
+            executar(cursor, 'inserir_bike', (modelo, ano, cor, ponto_id, n_registro))
+            conn.commit()
+        n_registro = n_registro.getvalue()[0]
+        cache_bikes.invalidar(n_registro)
+        estoque_pontos.invalidar()
+        return n_registro
+
+class ServicoAluguel:
+    def __init__(self, conexao=banco.conexao):
+        self.conexao = conexao
+
+    def _verificar_usuario(self, cursor, cpf):
+        return avaliar_usuario(cpf, executar(cursor, 'verificar_usuario', (cpf,)).fetchone())
+
+    def _verificar_bike(self, cursor, bike_id):
+        return avaliar_bike(bike_id, executar(cursor, 'verificar_bike', (bike_id,)).fetchone())
+
+    def verificar_usuario(self, cpf):
+        """Confere se o usuário pode alugar (existe, sem multas, saldo mínimo)"""
+        with self.conexao() as conn:
+            return self._verificar_usuario(conn.cursor(), cpf)
+
+    def verificar_bike(self, bike_id):
+        """Confere se a bike existe e está disponível"""
+        with self.conexao() as conn:
+            return self._verificar_bike(conn.cursor(), bike_id)
+
+    def iniciar_aluguel(self, cpf, bike_id):
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            variaveis = variaveis_inicio_aluguel(cursor, cpf, bike_id)
+            executar(cursor, 'iniciar_aluguel', variaveis)
+            return avaliar_inicio_aluguel(variaveis)
+
+    def finalizar_aluguel(self, aluguel_id, ponto_id):
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            variaveis = variaveis_fim_aluguel(cursor, aluguel_id, ponto_id)
+            executar(cursor, 'finalizar_aluguel', variaveis)
+            return avaliar_fim_aluguel(variaveis)
+
+    def consultar_situacao(self, cpf):
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            dados = executar(cursor, 'situacao_usuario', (cpf,)).fetchone()
+
+            if not dados:
+                raise UsuarioNaoEncontrado(f"Nenhum usuário encontrado com o CPF {formatar_cpf(cpf)}.")
+
+            nome, cidade, is_cad, saldo, validade, ativos, multas, valor_multas, bloqueado_ate = dados
+
+            detalhes = []
+            if multas > 0:
+                executar(cursor, 'multas_pendentes', (cpf,))
+                detalhes = [MultaPendente(*row) for row in cursor.fetchall()]
+
+            return SituacaoUsuario(cpf, nome, cidade, is_cad == 1, saldo, validade,
+                                   ativos, multas, valor_multas, detalhes, bloqueado_ate)
+
+class ServicoManutencao:
+    def __init__(self, conexao=banco.conexao):
+        self.conexao = conexao
+
+    def abrir_manutencao(self, bike_id, tipo, problema):
+        tipo = validar_manutencao(tipo, problema)
+
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            avaliar_bike_para_manutencao(executar(cursor, 'status_bike', (bike_id,)).fetchone())
+
+            executar(cursor, 'bike_em_manutencao', (bike_id,))
+            if cursor.rowcount == 0:
+                # Alugada entre a leitura e o UPDATE; nada foi gravado
+                avaliar_bike_alterada(executar(cursor, 'status_bike', (bike_id,)).fetchone())
+
+            executar(cursor, 'inserir_manutencao', (bike_id, tipo, problema))
+
+            conn.commit()
+
+        estoque_pontos.invalidar()
+        return ManutencaoAberta(bike_id, tipo)
+
+    def fechar_manutencao(self, bike_id, custo, ponto_id):
+        if custo < 0:
+            raise DadosInvalidos("Custo deve ser um número positivo.")
+
+        if cache_pontos.obter(ponto_id) is None:
+            raise PontoNaoEncontrado("Ponto não encontrado.")
+
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            executar(cursor, 'concluir_manutencao', (custo, bike_id))
+
+            if cursor.rowcount == 0:
+                raise ManutencaoNaoEncontrada("Nenhuma manutenção aberta encontrada para essa bike.")
+
+            executar(cursor, 'bike_liberada', (ponto_id, bike_id))
+            if cursor.rowcount == 0:
+                # Sem commit: a manutenção concluída acima é desfeita junto
+                raise ManutencaoNaoEncontrada("A bike não está em manutenção.")
+
+            conn.commit()
+
+        estoque_pontos.invalidar()
+        return ManutencaoFechada(bike_id, ponto_id, custo)
+
+    def abrir_em_lote(self, tipo, problema, **criterios):
+        """Envia para a oficina todas as bikes DISPONIVEL que atendem aos critérios
+        (ver filtro_campanha); as demais voltam em `ignoradas` com o motivo.
+        """
+        tipo = validar_manutencao(tipo, problema)
+        filtro, binds = filtro_campanha(**criterios)
+        if not filtro:
+            raise DadosInvalidos("Informe ao menos um critério para selecionar as bikes.")
+
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = 1000
+            cursor.execute(SQL_BIKES_CAMPANHA.format(filtro=filtro), binds)
+            candidatas = cursor.fetchall()
+
+            ignoradas = [(bike, status) for bike, status in candidatas if status != 'DISPONIVEL']
+            livres = [bike for bike, status in candidatas if status == 'DISPONIVEL']
+            enviadas = []
+            if livres:
+                executar_lote(cursor, 'bike_em_manutencao_lote', [(b,) for b in livres],
+                              arraydmlrowcounts=True)
+                for bike, alteradas in zip(livres, cursor.getarraydmlrowcounts()):
+                    if alteradas:
+                        enviadas.append(bike)
+                    else:
+                        ignoradas.append((bike, 'ALTERADA'))  # alugada durante a operação
+            if enviadas:
+                executar_lote(cursor, 'inserir_manutencao', [(b, tipo, problema) for b in enviadas])
+            conn.commit()
+
+        estoque_pontos.invalidar()
+        return ManutencaoEmLote(enviadas, ignoradas)
+
+    def fechar_em_lote(self, pontos, custo=0, **criterios):
+        """Devolve as bikes em manutenção que atendem aos critérios, distribuindo-as
+        pelos `pontos` na ordem dada até completar as vagas de cada um.
+
+        Bikes sem manutenção aberta ou sem vaga nos pontos ficam em `ignoradas`;
+        uma bike com mais de uma manutenção aberta ocupa uma vaga e tem todas fechadas.
+        """
+        if custo < 0:
+            raise DadosInvalidos("Custo deve ser um número positivo.")
+        if not pontos:
+            raise DadosInvalidos("Informe ao menos um ponto de destino.")
+        if criterios.get('ponto_id') is not None:
+            # Bike na oficina não está em ponto nenhum (ponto_atual_id é NULL)
+            raise DadosInvalidos("O critério de ponto só vale para abrir manutenções.")
+        filtro, binds = filtro_campanha(**criterios)
+        filtro = " AND ".join(["B.status = 'MANUTENCAO'"] + ([filtro] if filtro else []))
+
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = 1000
+            nomes = [f"p{i}" for i in range(len(pontos))]
+            cursor.execute(SQL_VAGAS_PONTOS.format(pontos=", ".join(':' + n for n in nomes)),
+                           dict(zip(nomes, pontos)))
+            vagas = dict(cursor.fetchall())
+            for ponto in pontos:
+                if ponto not in vagas:
+                    raise PontoNaoEncontrado(f"Ponto {ponto} não encontrado.")
+
+            cursor.execute(SQL_BIKES_EM_OFICINA.format(filtro=filtro), binds)
+            abertas = {}
+            for bike, _, id_manutencao in cursor.fetchall():
+                ids = abertas.setdefault(bike, [])
+                if id_manutencao is not None:
+                    ids.append(id_manutencao)
+
+            ignoradas, destinos, manutencoes = [], {}, []
+            fila = [p for p in pontos if vagas[p] > 0]
+            for bike, ids in abertas.items():
+                if not ids:
+                    ignoradas.append((bike, 'SEM_MANUTENCAO_ABERTA'))
+                    continue
+                while fila and vagas[fila[0]] <= 0:
+                    fila.pop(0)
+                if not fila:
+                    ignoradas.append((bike, 'SEM_VAGA'))
+                    continue
+                destinos[bike] = fila[0]
+                vagas[fila[0]] -= 1
+                manutencoes.extend(ids)
+
+            if destinos:
+                executar_lote(cursor, 'concluir_manutencao_lote', [(custo, m) for m in manutencoes])
+                executar_lote(cursor, 'bike_liberada', [(p, b) for b, p in destinos.items()])
+            conn.commit()
+
+        estoque_pontos.invalidar()
+        return ManutencaoEmLote(list(destinos), ignoradas, destinos)
+
+class ServicoEstoque:
+    """Bikes disponíveis por ponto.
+
+    O número de bikes de cada ponto vem do snapshot em memória de Estoque_Ponto
+    (atraso de até ESTOQUE_TTL segundos); a lista de bikes de um ponto é uma
+    leitura de índice. A disponibilidade real é sempre conferida no aluguel.
+    """
+
+    def __init__(self, conexao=banco.conexao):
+        self.conexao = conexao
+
+    def estoque(self, ponto_id):
+        estoque = estoque_pontos.itens().get(ponto_id)
+        if estoque is None:
+            raise PontoNaoEncontrado("Ponto não encontrado.")
+        return estoque
+
+    def bikes_disponiveis(self, ponto_id, limite=20):
+        """Bikes DISPONIVEL no ponto; pontos sem estoque no snapshot não vão ao banco"""
+        if self.estoque(ponto_id).disponiveis <= 0:
+            return []
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            executar(cursor, 'bikes_no_ponto', (ponto_id, limite))
+            return [BikeNoPonto(*row) for row in cursor.fetchall()]
+
+    def pontos_proximos(self, ponto_id, limite=5):
+        """Outros pontos com bikes disponíveis: primeiro os do mesmo bairro, depois
+        os da mesma cidade, cada grupo do maior estoque para o menor.
+
+        Os pontos não têm coordenadas, então a proximidade é por endereço.
+        """
+        origem = self.estoque(ponto_id)
+        candidatos = [
+            e for e in estoque_pontos.itens().values()
+            if e.cod_ponto != ponto_id and e.disponiveis > 0 and e.cidade == origem.cidade
+        ]
+        candidatos.sort(key=lambda e: (e.bairro != origem.bairro, -e.disponiveis, e.cod_ponto))
+        return candidatos[:limite]
@@ -0,0 +1,95 @@
+import banco
+from registro_sql import preparar
+from servicos import (
+    DadosInvalidos, ManutencaoAberta, ManutencaoFechada, ManutencaoNaoEncontrada,
+    Ponto, PontoNaoEncontrado,
+    avaliar_bike, avaliar_bike_alterada, avaliar_bike_para_manutencao, avaliar_fim_aluguel,
+    avaliar_inicio_aluguel, avaliar_usuario, validar_manutencao,
+    cache_pontos, estoque_pontos, variaveis_fim_aluguel, variaveis_inicio_aluguel,
+)
+
+# Grupo 12
+# Variante asyncio dos serviços de aluguel e manutenção (oracledb AsyncConnection).
+# Mesmas regras, SQL registrados, resultados e exceções de servicos.py; um único processo
+# mantém centenas de operações em andamento sem uma thread por requisição.
+
+class ServicoAluguelAsync:
+    def __init__(self, conexao=banco.conexao_async):
+        self.conexao = conexao
+
+    async def verificar_usuario(self, cpf):
+        async with self.conexao() as conn:
+            cursor = conn.cursor()
+            await cursor.execute(preparar(cursor, 'verificar_usuario'), (cpf,))
+            return avaliar_usuario(cpf, await cursor.fetchone())
+
+    async def verificar_bike(self, bike_id):
+        async with self.conexao() as conn:
+            cursor = conn.cursor()
+            await cursor.execute(preparar(cursor, 'verificar_bike'), (bike_id,))
+            return avaliar_bike(bike_id, await cursor.fetchone())
+
+    async def iniciar_aluguel(self, cpf, bike_id):
+        async with self.conexao() as conn:
+            cursor = conn.cursor()
+            variaveis = variaveis_inicio_aluguel(cursor, cpf, bike_id)
+            await cursor.execute(preparar(cursor, 'iniciar_aluguel'), variaveis)
+            return avaliar_inicio_aluguel(variaveis)
+
+    async def finalizar_aluguel(self, aluguel_id, ponto_id):
+        async with self.conexao() as conn:
+            cursor = conn.cursor()
+            variaveis = variaveis_fim_aluguel(cursor, aluguel_id, ponto_id)
+            await cursor.execute(preparar(cursor, 'finalizar_aluguel'), variaveis)
+            return avaliar_fim_aluguel(variaveis)
+
+class ServicoManutencaoAsync:
+    def __init__(self, conexao=banco.conexao_async):
+        self.conexao = conexao
+
+    async def abrir_manutencao(self, bike_id, tipo, problema):
+        tipo = validar_manutencao(tipo, problema)
+
+        async with self.conexao() as conn:
+            cursor = conn.cursor()
+            await cursor.execute(preparar(cursor, 'status_bike'), (bike_id,))
+            avaliar_bike_para_manutencao(await cursor.fetchone())
+
+            await cursor.execute(preparar(cursor, 'bike_em_manutencao'), (bike_id,))
+            if cursor.rowcount == 0:
+                await cursor.execute(preparar(cursor, 'status_bike'), (bike_id,))
+                avaliar_bike_alterada(await cursor.fetchone())
+            await cursor.execute(preparar(cursor, 'inserir_manutencao'), (bike_id, tipo, problema))
+
+            await conn.commit()
+
+        estoque_pontos.invalidar()
+        return ManutencaoAberta(bike_id, tipo)
+
+    async def fechar_manutencao(self, bike_id, custo, ponto_id):
+        if custo < 0:
+            raise DadosInvalidos("Custo deve ser um número positivo.")
+
+        async with self.conexao() as conn:
+            cursor = conn.cursor()
+            encontrado, ponto = cache_pontos.espiar(ponto_id)
+            if not encontrado:
+                await cursor.execute(preparar(cursor, 'carregar_ponto'), (ponto_id,))
+                row = await cursor.fetchone()
+                ponto = Ponto(*row) if row else None
+                cache_pontos.guardar(ponto_id, ponto)
+            if ponto is None:
+                raise PontoNaoEncontrado("Ponto não encontrado.")
+
+            await cursor.execute(preparar(cursor, 'concluir_manutencao'), (custo, bike_id))
+            if cursor.rowcount == 0:
+                raise ManutencaoNaoEncontrada("Nenhuma manutenção aberta encontrada para essa bike.")
+
+            await cursor.execute(preparar(cursor, 'bike_liberada'), (ponto_id, bike_id))
+            if cursor.rowcount == 0:
+                raise ManutencaoNaoEncontrada("A bike não está em manutenção.")
+
+            await conn.commit()
+
+        estoque_pontos.invalidar()
+        return ManutencaoFechada(bike_id, ponto_id, custo)
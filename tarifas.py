@@ -0,0 +1,357 @@
+import argparse
+import datetime
+import math
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import banco
+from registro_sql import CPF, ESCRITA, NUMERO, TABELA, executar, executar_lote, registrar
+from servicos import ErroServico
+from validacoes import validar_data
+
+try:
+    import numpy as np
+except ImportError:  # a reprecificação em lote é opcional
+    np = None
+
+# Grupo 12
+# Motor de tarifas: versões de Tarifa e faixas horárias de Tarifa_Faixa
+# (esquema.sql). A devolução cobra pela função tarifar_aluguel no banco; aqui a
+# mesma conta é feita em Python para um aluguel (banco local) e com NumPy para
+# lotes inteiros na reprecificação: os aluguéis concluídos de um período são
+# lidos em janelas de tempo, recalculados em arrays e só os valores que mudaram
+# são gravados em array DML, com um evento REPRECIFICADO por aluguel alterado
+# (eventos.py). As gravações de uma janela são confirmadas a cada LOTE_ESCRITA
+# aluguéis; o checkpoint vai junto com o último lote da janela.
+#
+# Uso: python tarifas.py listar
+#      python tarifas.py reprecificar --desde 01/09/2026 --ate 30/09/2026 [--simular]
+
+# Horas de aluguéis (pelo início) lidas e gravadas por transação
+JANELA_HORAS = 6
+# Aluguéis por ida ao banco na leitura
+ARRAYSIZE = 20000
+# Aluguéis alterados por transação: cada transação que grava eventos precisa
+# confirmar bem antes de eventos.ESPERA_LACUNA
+LOTE_ESCRITA = 5000
+
+SQL_TARIFAS = """
+    SELECT id_tarifa, vigente_desde, valor_minuto, minutos_franquia, valor_maximo,
+           minutos_limite, valor_minuto_excedente, desconto_cad_unico, descricao
+    FROM Tarifa
+    ORDER BY vigente_desde
+"""
+
+SQL_FAIXAS = "SELECT id_tarifa, hora_inicio, hora_fim, fator FROM Tarifa_Faixa"
+
+SQL_TARIFA_VIGENTE = """
+    SELECT id_tarifa, vigente_desde, valor_minuto, minutos_franquia, valor_maximo,
+           minutos_limite, valor_minuto_excedente, desconto_cad_unico, descricao
+    FROM Tarifa
+    WHERE vigente_desde <= :inicio
+    ORDER BY vigente_desde DESC
+    FETCH FIRST 1 ROWS ONLY
+"""
+
+SQL_FAIXAS_TARIFA = "SELECT id_tarifa, hora_inicio, hora_fim, fator FROM Tarifa_Faixa WHERE id_tarifa = :1"
+
+SQL_CPFS_CAD_UNICO = "SELECT cpf FROM Usuario WHERE is_cadUnico = 1"
+
+# Uma janela de início: faixa de idx_aluguel_inicio (partições do período)
+SQL_ALUGUEIS_JANELA = """
+    SELECT id_aluguel, usuario_cpf, bike_n_registro, ponto_devolucao_id,
+           data_hora_inicio, data_hora_fim, valor_aluguel
+    FROM Aluguel
+    WHERE data_hora_inicio >= :inicio AND data_hora_inicio < :fim
+      AND status = 'CONCLUIDO'
+"""
+
+SQL_REPRECIFICAR_ALUGUEL = "UPDATE Aluguel SET valor_aluguel = :1 WHERE id_aluguel = :2"
+
+# A correção não muda o status (trg_evento_aluguel não dispara): o evento é
+# gravado aqui, na mesma transação
+SQL_EVENTO_REPRECIFICADO = """
+    INSERT INTO Evento (entidade, status, aluguel_id, bike_n_registro, usuario_cpf, ponto_id, valor)
+    VALUES ('ALUGUEL', 'REPRECIFICADO', :1, :2, :3, :4, :5)
+"""
+
+SQL_LER_CHECKPOINT = "SELECT ultima_data FROM Checkpoint_Rotina WHERE rotina = :1"
+SQL_ATUALIZAR_CHECKPOINT = """
+    UPDATE Checkpoint_Rotina SET ultima_data = :1, atualizado_em = SYSDATE WHERE rotina = :2
+"""
+SQL_CRIAR_CHECKPOINT = "INSERT INTO Checkpoint_Rotina (rotina, ultima_data) VALUES (:1, :2)"
+SQL_APAGAR_CHECKPOINT = "DELETE FROM Checkpoint_Rotina WHERE rotina = :1"
+
+registrar('tarifa_vigente', SQL_TARIFA_VIGENTE)
+registrar('faixas_tarifa', SQL_FAIXAS_TARIFA, (NUMERO,), TABELA)
+registrar('reprecificar_aluguel', SQL_REPRECIFICAR_ALUGUEL, (NUMERO, NUMERO), ESCRITA)
+registrar('evento_reprecificado', SQL_EVENTO_REPRECIFICADO,
+          (NUMERO, NUMERO, CPF, NUMERO, NUMERO), ESCRITA)
+
+class TarifaNaoEncontrada(ErroServico):
+    pass
+
+class ReprecificacaoIndisponivel(ErroServico):
+    pass
+
+def arredondar(valor):
+    """ROUND(valor, 2) do Oracle (metade para cima) para valores não negativos.
+    A folga absorve o erro binário de valores como 1.005 (1.00499... em float)."""
+    return math.floor(valor * 100 + 0.5 + 1e-9) / 100
+
+@dataclass(frozen=True)
+class Tarifa:
+    id_tarifa: int
+    vigente_desde: datetime.datetime
+    valor_minuto: float
+    minutos_franquia: float
+    valor_maximo: Optional[float]
+    minutos_limite: Optional[float]
+    valor_minuto_excedente: float
+    desconto_cad_unico: float
+    descricao: Optional[str]
+    fatores: tuple = (1.0,) * 24  # fator de valor_minuto por hora da retirada
+
+    def valor(self, minutos, hora, cad_unico):
+        """Valor de um aluguel: a mesma conta de tarifar_aluguel (esquema.sql)"""
+        cobrados = minutos if self.minutos_limite is None else min(minutos, self.minutos_limite)
+        uso = max(cobrados - self.minutos_franquia, 0) * self.valor_minuto * self.fatores[hora]
+        if self.valor_maximo is not None:
+            uso = min(uso, self.valor_maximo)
+        if cad_unico:
+            uso *= 1 - self.desconto_cad_unico / 100
+        return arredondar(uso + (minutos - cobrados) * self.valor_minuto_excedente)
+
+def _fatores(faixas):
+    """Fator por hora (0 a 23): o maior das faixas que cobrem a hora, ou 1"""
+    fatores = [None] * 24
+    for _, hora_inicio, hora_fim, fator in faixas:
+        for hora in range(int(hora_inicio), int(hora_fim)):
+            fatores[hora] = max(fatores[hora] or 0, float(fator))
+    return tuple(1.0 if f is None else f for f in fatores)
+
+def _tarifa(linha, faixas):
+    id_tarifa, vigente_desde, valor_minuto, franquia, maximo, limite, excedente, desconto, descricao = linha
+    return Tarifa(id_tarifa, vigente_desde, float(valor_minuto), float(franquia),
+                  None if maximo is None else float(maximo), None if limite is None else float(limite),
+                  float(excedente), float(desconto), descricao, _fatores(faixas))
+
+def tarifa_vigente(conn, inicio):
+    """Versão da tarifa que cobra um aluguel iniciado em `inicio`"""
+    cursor = conn.cursor()
+    try:
+        linha = executar(cursor, 'tarifa_vigente', {'inicio': inicio}).fetchone()
+        if linha is None:
+            raise TarifaNaoEncontrada(f"Nenhuma tarifa vigente em {inicio:%d/%m/%Y %H:%M}.")
+        return _tarifa(linha, executar(cursor, 'faixas_tarifa', (linha[0],)).fetchall())
+    finally:
+        cursor.close()
+
+def carregar_tarifas(conn):
+    """Todas as versões, em ordem de vigência"""
+    cursor = conn.cursor()
+    try:
+        faixas = {}
+        for faixa in cursor.execute(SQL_FAIXAS).fetchall():
+            faixas.setdefault(faixa[0], []).append(faixa)
+        return [_tarifa(linha, faixas.get(linha[0], []))
+                for linha in cursor.execute(SQL_TARIFAS).fetchall()]
+    finally:
+        cursor.close()
+
+_EPOCA = datetime.datetime(1970, 1, 1)
+_MICROSSEGUNDO = datetime.timedelta(microseconds=1)
+
+def _datetime64(datas):
+    """datetime64[us] de uma sequência de datetime (np.array com dtype
+    datetime64 converte objeto a objeto, várias vezes mais devagar)"""
+    return np.fromiter(((d - _EPOCA) // _MICROSSEGUNDO for d in datas),
+                       np.int64, len(datas)).view('datetime64[us]')
+
+class TabelaTarifas:
+    """As versões de tarifa em arrays, para precificar lotes de aluguéis com NumPy"""
+
+    def __init__(self, tarifas):
+        if np is None:
+            raise ReprecificacaoIndisponivel("Reprecificação requer o pacote numpy (pip install numpy).")
+        if not tarifas:
+            raise TarifaNaoEncontrada("Nenhuma tarifa cadastrada.")
+        self.tarifas = tarifas
+        self.vigencias = _datetime64([t.vigente_desde for t in tarifas])
+        self.valor_minuto = np.array([t.valor_minuto for t in tarifas])
+        self.franquia = np.array([t.minutos_franquia for t in tarifas])
+        # Sem teto ou sem limite: infinito (LEAST com NVL no banco)
+        self.maximo = np.array([np.inf if t.valor_maximo is None else t.valor_maximo for t in tarifas])
+        self.limite = np.array([np.inf if t.minutos_limite is None else t.minutos_limite for t in tarifas])
+        self.excedente = np.array([t.valor_minuto_excedente for t in tarifas])
+        self.desconto = np.array([t.desconto_cad_unico for t in tarifas])
+        self.fatores = np.array([t.fatores for t in tarifas])  # (versões, 24)
+
+    def versoes(self, inicios):
+        """Índice da versão vigente para cada início (datetime64)"""
+        versoes = np.searchsorted(self.vigencias, inicios, side='right') - 1
+        if len(versoes) and versoes.min() < 0:
+            raise TarifaNaoEncontrada("Há aluguéis iniciados antes da primeira tarifa.")
+        return versoes
+
+    def calcular(self, inicios, fins, cad_unico):
+        """Valores dos aluguéis (arrays de início, fim e CadÚnico): Tarifa.valor vetorizado"""
+        v = self.versoes(inicios)
+        minutos = (fins - inicios) / np.timedelta64(1, 'm')
+        horas = ((inicios - inicios.astype('datetime64[D]')) // np.timedelta64(1, 'h')).astype(np.intp)
+        cobrados = np.minimum(minutos, self.limite[v])
+        uso = np.maximum(cobrados - self.franquia[v], 0) * self.valor_minuto[v] * self.fatores[v, horas]
+        uso = np.minimum(uso, self.maximo[v])
+        uso = np.where(cad_unico, uso * (1 - self.desconto[v] / 100), uso)
+        valores = uso + (minutos - cobrados) * self.excedente[v]
+        return np.floor(valores * 100 + 0.5 + 1e-9) / 100  # arredondar() em arrays
+
+@dataclass
+class Reprecificacao:
+    janelas: int = 0
+    lidos: int = 0
+    alterados: int = 0
+    valor_anterior: float = 0.0  # soma dos aluguéis alterados, antes e depois
+    valor_novo: float = 0.0
+    retomado_de: Optional[datetime.datetime] = None
+
+def _ler_checkpoint(cursor, rotina):
+    linha = cursor.execute(SQL_LER_CHECKPOINT, (rotina,)).fetchone()
+    return linha[0] if linha else None
+
+def _gravar_checkpoint(cursor, rotina, ultima_data):
+    cursor.execute(SQL_ATUALIZAR_CHECKPOINT, (ultima_data, rotina))
+    if cursor.rowcount == 0:
+        cursor.execute(SQL_CRIAR_CHECKPOINT, (rotina, ultima_data))
+
+def reprecificar(desde, ate, janela=datetime.timedelta(hours=JANELA_HORAS), simular=False,
+                 conexao=banco.conexao, arraysize=ARRAYSIZE):
+    """Recalcula o valor dos aluguéis concluídos iniciados em [desde, ate) pelas tarifas atuais.
+
+    Cada janela de início é lida, recalculada e gravada (só os aluguéis cujo
+    valor mudou) em transações de até LOTE_ESCRITA aluguéis, a última com o
+    checkpoint; uma execução interrompida do mesmo período continua da última
+    janela completa, e o que já foi gravado dela não muda de novo. Com
+    `simular`, nada é gravado. Devolve a Reprecificacao.
+    """
+    rotina = f"reprecificar:{desde:%Y%m%d%H%M}-{ate:%Y%m%d%H%M}"
+    resultado = Reprecificacao()
+    with conexao() as conn:
+        tabela = TabelaTarifas(carregar_tarifas(conn))
+        cursor = conn.cursor()
+        cursor.arraysize = cursor.prefetchrows = arraysize
+        isentos = {cpf for cpf, in cursor.execute(SQL_CPFS_CAD_UNICO).fetchall()}
+
+        inicio = desde
+        if not simular:
+            ultima_data = _ler_checkpoint(cursor, rotina)
+            if ultima_data is not None:
+                inicio = resultado.retomado_de = ultima_data
+
+        escrita = conn.cursor()
+        while inicio < ate:
+            fim = min(inicio + janela, ate)
+            linhas = cursor.execute(SQL_ALUGUEIS_JANELA, inicio=inicio, fim=fim).fetchall()
+            resultado.janelas += 1
+            resultado.lidos += len(linhas)
+            if linhas:
+                ids, cpfs, bikes, pontos, inicios, fins, valores = zip(*linhas)
+                novos = tabela.calcular(_datetime64(inicios), _datetime64(fins),
+                                        np.fromiter((cpf in isentos for cpf in cpfs), bool, len(cpfs)))
+                # valor_aluguel NULL vira NaN e conta como alterado
+                anteriores = np.array(valores, dtype=float)
+                alterados = np.flatnonzero(~(np.abs(novos - anteriores) < 0.005))
+                resultado.alterados += len(alterados)
+                resultado.valor_anterior += float(np.nansum(anteriores[alterados]))
+                resultado.valor_novo += float(novos[alterados].sum())
+
+                if not simular:
+                    for k in range(0, len(alterados), LOTE_ESCRITA):
+                        lote = alterados[k:k + LOTE_ESCRITA]
+                        executar_lote(escrita, 'reprecificar_aluguel',
+                                      [(float(novos[i]), ids[i]) for i in lote])
+                        executar_lote(escrita, 'evento_reprecificado',
+                                      [(ids[i], bikes[i], cpfs[i], pontos[i], float(novos[i]))
+                                       for i in lote])
+                        if k + LOTE_ESCRITA < len(alterados):
+                            conn.commit()
+            if not simular:
+                _gravar_checkpoint(escrita, rotina, fim)
+                conn.commit()
+            inicio = fim
+
+        if not simular:
+            # Período completo: uma nova execução começa do início
+            escrita.execute(SQL_APAGAR_CHECKPOINT, (rotina,))
+            conn.commit()
+        escrita.close()
+        cursor.close()
+    return resultado
+
+def _data(texto, parser, opcao):
+    if not validar_data(texto):
+        parser.error(f"{opcao}: data inválida, use DD/MM/AAAA")
+    return datetime.datetime.strptime(texto, '%d/%m/%Y')
+
+def main():
+    parser = argparse.ArgumentParser(description="Tarifas e reprecificação dos aluguéis")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    sub.add_parser('listar', help="Versões de tarifa e faixas horárias")
+
+    p_rep = sub.add_parser('reprecificar',
+                           help="Recalcula os aluguéis concluídos de um período pelas tarifas atuais")
+    p_rep.add_argument('--desde', required=True, help="Primeiro dia de início (DD/MM/AAAA)")
+    p_rep.add_argument('--ate', required=True, help="Último dia de início, inclusive (DD/MM/AAAA)")
+    p_rep.add_argument('--janela-horas', type=float, default=JANELA_HORAS,
+                       help="Horas de aluguéis por transação")
+    p_rep.add_argument('--simular', action='store_true', help="Só calcula as diferenças")
+    args = parser.parse_args()
+
+    try:
+        if args.comando == 'listar':
+            with banco.conexao() as conn:
+                tarifas = carregar_tarifas(conn)
+            banco.fechar_pool()
+            print("\n💲 TARIFAS")
+            for t in tarifas:
+                teto = f"R$ {t.valor_maximo:.2f}" if t.valor_maximo is not None else "sem teto"
+                print(f"   {t.id_tarifa}. desde {t.vigente_desde:%d/%m/%Y %H:%M}: "
+                      f"R$ {t.valor_minuto:.4f}/min, franquia {t.minutos_franquia:g} min, {teto}, "
+                      f"CadÚnico -{t.desconto_cad_unico:g}%"
+                      + (f", excedente R$ {t.valor_minuto_excedente:.4f}/min após {t.minutos_limite:g} min"
+                         if t.minutos_limite is not None else "")
+                      + (f" ({t.descricao})" if t.descricao else ""))
+                faixas = [(h, f) for h, f in enumerate(t.fatores) if f != 1.0]
+                if faixas:
+                    print("      fatores por hora: " + ", ".join(f"{h}h x{f:g}" for h, f in faixas))
+        else:
+            desde = _data(args.desde, parser, '--desde')
+            ate = _data(args.ate, parser, '--ate') + datetime.timedelta(days=1)
+            if ate <= desde:
+                parser.error("--ate deve ser igual ou posterior a --desde")
+            if args.janela_horas <= 0:
+                parser.error("--janela-horas deve ser positivo")
+
+            print(f"\n💲 REPRECIFICAÇÃO ({args.desde} a {args.ate}{', simulação' if args.simular else ''})")
+            inicio = time.perf_counter()
+            try:
+                resultado = reprecificar(desde, ate, datetime.timedelta(hours=args.janela_horas),
+                                         args.simular)
+            finally:
+                banco.fechar_pool()
+            segundos = time.perf_counter() - inicio
+            if resultado.retomado_de:
+                print(f"   ↪️  Retomado a partir de {resultado.retomado_de:%d/%m/%Y %H:%M}")
+            print(f"   {resultado.lidos} aluguel(is) lido(s) em {resultado.janelas} janela(s), "
+                  f"{segundos:.1f} s ({resultado.lidos / max(segundos, 1e-9):.0f}/s)")
+            print(f"   Alterados: {resultado.alterados}, de R$ {resultado.valor_anterior:.2f} "
+                  f"para R$ {resultado.valor_novo:.2f}")
+            print(f"✅ {'Nada gravado (simulação).' if args.simular else 'Valores gravados.'}")
+    except ErroServico as e:
+        sys.exit(f"❌ [ERRO] {e}")
+
+if __name__ == "__main__":
+    main()
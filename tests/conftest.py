@@ -0,0 +1,62 @@
+import datetime
+import os
+import sys
+
+# Os testes rodam no banco local em memória; as variáveis precisam estar
+# definidas antes de o banco ser importado
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['DB_LOCAL'] = ':memory:'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import banco
+import banco_local
+from servicos import ServicoCadastro, cache_bikes, cache_pontos, estoque_pontos
+
+# Grupo 12
+
+CPF_COMUM = '11111111111'
+CPF_CAD_UNICO = '22222222222'
+CPF_SEM_SALDO = '33333333333'
+
+def _data(dias):
+    return (datetime.date.today() + datetime.timedelta(days=dias)).strftime('%d/%m/%Y')
+
+@pytest.fixture(autouse=True)
+def banco_vazio():
+    """Cada teste começa de um banco em memória novo e de caches vazios"""
+    banco_local.fechar()
+    cache_pontos.invalidar()
+    cache_bikes.invalidar()
+    estoque_pontos.invalidar()
+    yield
+    banco_local.fechar()
+
+@pytest.fixture
+def sql():
+    """Executa um comando no banco local e confirma; devolve as linhas de uma
+    consulta ou o número de linhas alteradas"""
+    def sql(comando, parametros=()):
+        with banco.conexao() as conn:
+            cursor = conn.cursor()
+            resultado = cursor.execute(comando, parametros)
+            conn.commit()
+            return resultado.fetchall() if resultado else cursor.rowcount
+    return sql
+
+@pytest.fixture
+def dados():
+    """Dois pontos no mesmo bairro, um em outro, três bikes no primeiro e três
+    usuários: comum, do CadÚnico e sem saldo"""
+    cadastro = ServicoCadastro()
+    centro = cadastro.cadastrar_ponto('Rua Episcopal', 'São Carlos', 'SP', 10, bairro='Centro')
+    praca = cadastro.cadastrar_ponto('Praça XV', 'São Carlos', 'SP', 10, bairro='Centro')
+    usp = cadastro.cadastrar_ponto('Av. Trabalhador', 'São Carlos', 'SP', 2, bairro='USP')
+    bikes = [cadastro.cadastrar_bike('Caloi', 2022, 'Azul', centro) for _ in range(3)]
+    validade = _data(365)
+    cadastro.cadastrar_usuario(CPF_COMUM, 'Ana Souza', '01/01/1990', 'São Carlos', 'SP', 50, validade)
+    cadastro.cadastrar_usuario(CPF_CAD_UNICO, 'Bruno Lima', '01/01/1985', 'São Carlos', 'SP', 10, validade,
+                               is_cad_unico=True)
+    cadastro.cadastrar_usuario(CPF_SEM_SALDO, 'Carla Dias', '01/01/2000', 'São Carlos', 'SP', 1, validade)
+    return {'pontos': (centro, praca, usp), 'bikes': bikes}
@@ -0,0 +1,131 @@
+import datetime
+
+import pytest
+
+from conftest import CPF_CAD_UNICO, CPF_COMUM, CPF_SEM_SALDO
+from servicos import (
+    AluguelInativo, BikeIndisponivel, BikeNaoEncontrada, PontoNaoEncontrado, SaldoInsuficiente,
+    ServicoAluguel, UsuarioNaoEncontrado,
+)
+
+# Grupo 12
+
+def _alugar_por(sql, cpf, bike, minutos):
+    """Inicia um aluguel e recua o seu início em `minutos`"""
+    aluguel = ServicoAluguel().iniciar_aluguel(cpf, bike)
+    inicio = datetime.datetime.now() - datetime.timedelta(minutes=minutos)
+    sql("UPDATE Aluguel SET data_hora_inicio = :1 WHERE id_aluguel = :2", (inicio, aluguel.id_aluguel))
+    return aluguel
+
+def test_iniciar_aluguel_atualiza_resumos(dados, sql):
+    centro, _, _ = dados['pontos']
+    bike = dados['bikes'][0]
+
+    aluguel = ServicoAluguel().iniciar_aluguel(CPF_COMUM, bike)
+
+    assert (aluguel.bike_id, aluguel.cpf, aluguel.nome, aluguel.ponto_retirada_id) == \
+        (bike, CPF_COMUM, 'Ana Souza', centro)
+    assert sql("SELECT status, ponto_atual_id FROM Bike WHERE n_registro = :1", (bike,)) == \
+        [('EM_USO', centro)]
+    assert sql("SELECT alugueis_ativos FROM Resumo_Usuario WHERE usuario_cpf = :1", (CPF_COMUM,)) == [(1,)]
+    assert sql("SELECT total_alugueis FROM Resumo_Bike WHERE bike_n_registro = :1", (bike,)) == [(1,)]
+    assert sql("SELECT disponiveis FROM Estoque_Ponto WHERE cod_ponto = :1", (centro,)) == [(2,)]
+    assert sql("SELECT retiradas, devolucoes FROM Movimento_Ponto_Dia WHERE cod_ponto = :1",
+               (centro,)) == [(1, 0)]
+    assert sql("SELECT bairro, pontos_visitados FROM Cobertura_Usuario WHERE usuario_cpf = :1",
+               (CPF_COMUM,)) == [('Centro', 1)]
+
+def test_finalizar_aluguel_cobra_tarifa_e_atualiza_resumos(dados, sql):
+    centro, praca, _ = dados['pontos']
+    bike = dados['bikes'][0]
+    aluguel = _alugar_por(sql, CPF_COMUM, bike, 30)
+
+    devolucao = ServicoAluguel().finalizar_aluguel(aluguel.id_aluguel, praca)
+
+    assert devolucao.valor == pytest.approx(3.00)
+    assert devolucao.duracao_minutos == pytest.approx(30, abs=0.5)
+    assert devolucao.qnt_alugueis_bike == 1
+    assert sql("SELECT status, valor_aluguel, ponto_devolucao_id FROM Aluguel WHERE id_aluguel = :1",
+               (aluguel.id_aluguel,)) == [('CONCLUIDO', 3.00, praca)]
+    assert sql("SELECT status, ponto_atual_id FROM Bike WHERE n_registro = :1", (bike,)) == \
+        [('DISPONIVEL', praca)]
+    assert sql("SELECT alugueis_ativos FROM Resumo_Usuario WHERE usuario_cpf = :1", (CPF_COMUM,)) == [(0,)]
+    assert sql("SELECT cod_ponto, disponiveis FROM Estoque_Ponto ORDER BY cod_ponto") == \
+        [(centro, 2), (praca, 1), (dados['pontos'][2], 0)]
+    assert sql("SELECT cod_ponto, retiradas, devolucoes FROM Movimento_Ponto_Dia ORDER BY cod_ponto") == \
+        [(centro, 1, 0), (praca, 0, 1)]
+
+def test_cad_unico_nao_paga(dados, sql):
+    aluguel = _alugar_por(sql, CPF_CAD_UNICO, dados['bikes'][0], 30)
+
+    devolucao = ServicoAluguel().finalizar_aluguel(aluguel.id_aluguel, dados['pontos'][0])
+
+    assert devolucao.valor == 0
+
+def test_tarifa_vigente_no_inicio(dados, sql):
+    vigencia = datetime.datetime.now() - datetime.timedelta(days=1)
+    sql("INSERT INTO Tarifa (vigente_desde, valor_minuto, minutos_franquia) VALUES (:1, 0.20, 10)",
+        (vigencia,))
+    aluguel = _alugar_por(sql, CPF_COMUM, dados['bikes'][0], 30)
+
+    devolucao = ServicoAluguel().finalizar_aluguel(aluguel.id_aluguel, dados['pontos'][0])
+
+    assert devolucao.valor == pytest.approx(4.00)
+
+def test_segunda_retirada_no_bairro_conta_na_cobertura(dados, sql):
+    centro, praca, _ = dados['pontos']
+    servico = ServicoAluguel()
+    aluguel = servico.iniciar_aluguel(CPF_COMUM, dados['bikes'][0])
+    servico.finalizar_aluguel(aluguel.id_aluguel, praca)
+
+    servico.iniciar_aluguel(CPF_COMUM, dados['bikes'][0])
+
+    assert sql("SELECT pontos_visitados FROM Cobertura_Usuario WHERE usuario_cpf = :1", (CPF_COMUM,)) == \
+        [(2,)]
+
+@pytest.mark.parametrize('cpf, erro', [
+    ('99999999999', UsuarioNaoEncontrado),
+    (CPF_SEM_SALDO, SaldoInsuficiente),
+])
+def test_usuario_inapto_nao_aluga(dados, sql, cpf, erro):
+    bike = dados['bikes'][0]
+
+    with pytest.raises(erro):
+        ServicoAluguel().iniciar_aluguel(cpf, bike)
+
+    assert sql("SELECT status FROM Bike WHERE n_registro = :1", (bike,)) == [('DISPONIVEL',)]
+    assert sql("SELECT COUNT(*) FROM Aluguel") == [(0,)]
+
+def test_bike_indisponivel(dados, sql):
+    servico = ServicoAluguel()
+    bike = dados['bikes'][0]
+    servico.iniciar_aluguel(CPF_COMUM, bike)
+
+    with pytest.raises(BikeIndisponivel) as erro:
+        servico.iniciar_aluguel(CPF_CAD_UNICO, bike)
+
+    assert erro.value.status == 'EM_USO'
+    assert sql("SELECT alugueis_ativos FROM Resumo_Usuario WHERE usuario_cpf = :1", (CPF_CAD_UNICO,)) == \
+        [(0,)]
+
+def test_bike_inexistente(dados):
+    with pytest.raises(BikeNaoEncontrada):
+        ServicoAluguel().iniciar_aluguel(CPF_COMUM, 9999)
+
+def test_devolucao_em_ponto_inexistente(dados, sql):
+    servico = ServicoAluguel()
+    aluguel = servico.iniciar_aluguel(CPF_COMUM, dados['bikes'][0])
+
+    with pytest.raises(PontoNaoEncontrado):
+        servico.finalizar_aluguel(aluguel.id_aluguel, 9999)
+
+    assert sql("SELECT status FROM Aluguel WHERE id_aluguel = :1", (aluguel.id_aluguel,)) == \
+        [('EM_ANDAMENTO',)]
+
+def test_devolucao_repetida(dados):
+    servico = ServicoAluguel()
+    aluguel = servico.iniciar_aluguel(CPF_COMUM, dados['bikes'][0])
+    servico.finalizar_aluguel(aluguel.id_aluguel, dados['pontos'][0])
+
+    with pytest.raises(AluguelInativo):
+        servico.finalizar_aluguel(aluguel.id_aluguel, dados['pontos'][0])
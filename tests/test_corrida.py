@@ -0,0 +1,43 @@
+import datetime
+
+import pytest
+
+import banco_local
+from benchmark import carregar_corrida, corrida
+from servicos import ServicoCadastro
+
+# Grupo 12
+
+WORKERS = 8
+RODADAS = 5
+
+@pytest.fixture
+def banco_arquivo(tmp_path, monkeypatch):
+    """Banco local em arquivo: cada operação tem a sua conexão, e as threads
+    disputam a bike no próprio SQLite (o banco em memória as serializa)"""
+    monkeypatch.setattr(banco_local, 'DB_LOCAL', str(tmp_path / 'corrida.db'))
+    cadastro = ServicoCadastro()
+    ponto = cadastro.cadastrar_ponto('Rua Episcopal', 'São Carlos', 'SP', 10, bairro='Centro')
+    cadastro.cadastrar_bike('Caloi', 2022, 'Azul', ponto)
+    cadastro.cadastrar_bike('Caloi', 2022, 'Preta', ponto)
+    validade = (datetime.date.today() + datetime.timedelta(days=365)).strftime('%d/%m/%Y')
+    for n in range(WORKERS):
+        cadastro.cadastrar_usuario(f"{n + 1:011d}", f"Usuário {n + 1}", '01/01/1990',
+                                   'São Carlos', 'SP', 50, validade)
+
+def test_carregar_corrida_escolhe_uma_bike(banco_arquivo):
+    cpfs, bike, ponto = carregar_corrida(WORKERS)
+
+    assert len(set(cpfs)) == WORKERS
+    assert isinstance(bike, int) and isinstance(ponto, int)
+
+def test_um_aluguel_aceito_por_rodada(banco_arquivo):
+    cpfs, bike, ponto = carregar_corrida(WORKERS)
+
+    rodadas = list(corrida(cpfs, bike, ponto, RODADAS))
+
+    assert len(rodadas) == RODADAS
+    for aceitos, recusados, erros in rodadas:
+        assert erros == []
+        assert [a.bike_id for a in aceitos] == [bike]
+        assert len(recusados) == WORKERS - 1
@@ -0,0 +1,102 @@
+import json
+
+import eventos
+from conftest import CPF_COMUM
+from servicos import ServicoAluguel, ServicoManutencao
+
+# Grupo 12
+
+def _eventos(sql):
+    return sql("SELECT seq, entidade, status, bike_n_registro FROM Evento ORDER BY seq")
+
+def _abrir_lacuna(sql, seq):
+    """Tira o evento `seq` da tabela, como uma transação ainda não confirmada;
+    devolve o comando que o grava de volta"""
+    linha = sql(f"SELECT {', '.join(eventos.COLUNAS)} FROM Evento WHERE seq = :1", (seq,))[0]
+    sql("DELETE FROM Evento WHERE seq = :1", (seq,))
+    return lambda: sql(f"INSERT INTO Evento ({', '.join(eventos.COLUNAS)}) "
+                       f"VALUES ({', '.join(f':{i + 1}' for i in range(len(linha)))})", linha)
+
+def test_operacoes_geram_eventos(dados, sql):
+    bike = dados['bikes'][0]
+    aluguel = ServicoAluguel().iniciar_aluguel(CPF_COMUM, bike)
+    ServicoAluguel().finalizar_aluguel(aluguel.id_aluguel, dados['pontos'][1])
+    ServicoManutencao().abrir_manutencao(bike, 'PREVENTIVA', 'Revisão dos freios')
+
+    # Três bikes cadastradas, depois o aluguel, a devolução e a manutenção
+    assert [e[1:] for e in _eventos(sql)[3:]] == [
+        ('BIKE', 'EM_USO', bike),
+        ('ALUGUEL', 'EM_ANDAMENTO', bike),
+        ('ALUGUEL', 'CONCLUIDO', bike),
+        ('BIKE', 'DISPONIVEL', bike),
+        ('BIKE', 'MANUTENCAO', bike),
+        ('MANUTENCAO', 'ABERTA', bike),
+    ]
+
+def test_consumidor_retoma_do_checkpoint(dados, sql):
+    ServicoAluguel().iniciar_aluguel(CPF_COMUM, dados['bikes'][0])
+    consumidor = eventos.Consumidor('teste', lote=3)
+
+    assert [e[0] for e in consumidor.ler()] == [1, 2, 3]
+    consumidor.confirmar()
+
+    # Sem confirmar, a posição lida não vale para outra instância
+    assert [e[0] for e in consumidor.ler()] == [4, 5]
+    retomado = eventos.Consumidor('teste', lote=3)
+    assert [e[0] for e in retomado.ler()] == [4, 5]
+    retomado.confirmar()
+
+    assert eventos.Consumidor('teste').ler() == []
+    (nome, ultimo, atraso, _, lacunas), = eventos.situacao()[0]
+    assert (nome, ultimo, atraso, lacunas) == ('teste', 5, 0, {})
+
+def test_consumidor_espera_lacuna_recente(dados, sql):
+    ServicoAluguel().iniciar_aluguel(CPF_COMUM, dados['bikes'][0])
+    _abrir_lacuna(sql, 4)
+    consumidor = eventos.Consumidor('teste', espera_lacuna=60)
+
+    assert [e[0] for e in consumidor.ler()] == [1, 2, 3]
+    assert consumidor.ler() == []
+
+def test_evento_atrasado_e_entregue(dados, sql):
+    ServicoAluguel().iniciar_aluguel(CPF_COMUM, dados['bikes'][0])
+    confirmar_transacao = _abrir_lacuna(sql, 4)
+    consumidor = eventos.Consumidor('teste', espera_lacuna=0)
+
+    assert [e[0] for e in consumidor.ler()] == [1, 2, 3, 5]
+    consumidor.confirmar()
+    assert sql("SELECT seq, situacao FROM Evento_Lacuna") == [(4, 'ABERTA')]
+    # A lacuna aberta segura a limpeza
+    assert eventos.limpar() == 3
+
+    confirmar_transacao()
+    atrasados = consumidor.ler()
+    assert [(e[0], e[2]) for e in atrasados] == [(4, 'EM_USO')]
+    assert consumidor.ler() == []
+    consumidor.confirmar()
+
+    assert eventos.situacao()[0][0][4] == {'ENTREGUE': 1}
+    assert eventos.Consumidor('teste').ler() == []
+
+def test_lacuna_expira(dados, sql):
+    ServicoAluguel().iniciar_aluguel(CPF_COMUM, dados['bikes'][0])
+    _abrir_lacuna(sql, 4)
+    consumidor = eventos.Consumidor('teste', espera_lacuna=0, janela_lacuna=0)
+
+    consumidor.ler()
+    consumidor.confirmar()
+
+    assert sql("SELECT seq, situacao FROM Evento_Lacuna") == [(4, 'EXPIRADA')]
+    assert eventos.limpar() == 4
+    assert sql("SELECT COUNT(*) FROM Evento_Lacuna") == [(0,)]
+
+def test_consumir_grava_jsonl(dados, tmp_path):
+    caminho = tmp_path / 'eventos.jsonl'
+    saida = eventos.SaidaJsonl(str(caminho))
+
+    assert eventos.consumir(eventos.Consumidor('teste', lote=2), saida) == 3
+    saida.fechar()
+
+    linhas = [json.loads(l) for l in caminho.read_text(encoding='utf-8').splitlines()]
+    assert [(l['seq'], l['entidade']) for l in linhas] == [(1, 'BIKE'), (2, 'BIKE'), (3, 'BIKE')]
+    assert eventos.situacao()[0][0][1] == 3
@@ -0,0 +1,97 @@
+import pytest
+
+from conftest import CPF_COMUM
+from servicos import (
+    BikeIndisponivel, DadosInvalidos, ManutencaoNaoEncontrada, PontoNaoEncontrado, ServicoAluguel,
+    ServicoManutencao,
+)
+
+# Grupo 12
+
+PROBLEMA = 'Corrente saindo da coroa'
+
+def test_abrir_e_fechar_manutencao(dados, sql):
+    centro, praca, _ = dados['pontos']
+    bike = dados['bikes'][0]
+    servico = ServicoManutencao()
+
+    servico.abrir_manutencao(bike, 'corretiva', PROBLEMA)
+
+    assert sql("SELECT status, ponto_atual_id FROM Bike WHERE n_registro = :1", (bike,)) == \
+        [('MANUTENCAO', None)]
+    assert sql("SELECT tipo, data_fim FROM Manutencao WHERE bike_n_registro = :1", (bike,)) == \
+        [('CORRETIVA', None)]
+    assert sql("SELECT disponiveis FROM Estoque_Ponto WHERE cod_ponto = :1", (centro,)) == [(2,)]
+
+    fechada = servico.fechar_manutencao(bike, 45.5, praca)
+
+    assert (fechada.bike_id, fechada.ponto_id, fechada.custo) == (bike, praca, 45.5)
+    assert sql("SELECT status, ponto_atual_id FROM Bike WHERE n_registro = :1", (bike,)) == \
+        [('DISPONIVEL', praca)]
+    assert sql("SELECT valor FROM Manutencao WHERE bike_n_registro = :1 AND data_fim IS NOT NULL",
+               (bike,)) == [(45.5,)]
+    assert sql("SELECT cod_ponto, disponiveis FROM Estoque_Ponto WHERE cod_ponto IN (:1, :2) "
+               "ORDER BY cod_ponto", (centro, praca)) == [(centro, 2), (praca, 1)]
+
+def test_bike_alugada_nao_vai_para_oficina(dados, sql):
+    bike = dados['bikes'][0]
+    ServicoAluguel().iniciar_aluguel(CPF_COMUM, bike)
+
+    with pytest.raises(BikeIndisponivel) as erro:
+        ServicoManutencao().abrir_manutencao(bike, 'CORRETIVA', PROBLEMA)
+
+    assert erro.value.status == 'EM_USO'
+    assert sql("SELECT COUNT(*) FROM Manutencao") == [(0,)]
+
+def test_fechar_sem_manutencao_aberta(dados, sql):
+    with pytest.raises(ManutencaoNaoEncontrada):
+        ServicoManutencao().fechar_manutencao(dados['bikes'][0], 10, dados['pontos'][0])
+
+def test_fechar_em_ponto_inexistente(dados):
+    servico = ServicoManutencao()
+    servico.abrir_manutencao(dados['bikes'][0], 'PREVENTIVA', PROBLEMA)
+
+    with pytest.raises(PontoNaoEncontrado):
+        servico.fechar_manutencao(dados['bikes'][0], 10, 9999)
+
+def test_abrir_em_lote_ignora_bikes_alugadas(dados, sql):
+    centro = dados['pontos'][0]
+    alugada, *livres = dados['bikes']
+    ServicoAluguel().iniciar_aluguel(CPF_COMUM, alugada)
+
+    lote = ServicoManutencao().abrir_em_lote('PREVENTIVA', PROBLEMA, bikes=dados['bikes'])
+
+    assert lote.bikes == livres
+    assert lote.ignoradas == [(alugada, 'EM_USO')]
+    assert sql("SELECT bike_n_registro FROM Manutencao ORDER BY bike_n_registro") == \
+        [(b,) for b in livres]
+    assert sql("SELECT disponiveis FROM Estoque_Ponto WHERE cod_ponto = :1", (centro,)) == [(0,)]
+
+def test_fechar_em_lote_distribui_pelas_vagas(dados, sql):
+    centro, praca, usp = dados['pontos']
+    servico = ServicoManutencao()
+    servico.abrir_em_lote('PREVENTIVA', PROBLEMA, ponto_id=centro)
+
+    lote = servico.fechar_em_lote([usp, praca], custo=20, tipo='preventiva')
+
+    # usp tem duas vagas; a terceira bike vai para o próximo ponto
+    primeira, segunda, terceira = dados['bikes']
+    assert lote.destinos == {primeira: usp, segunda: usp, terceira: praca}
+    assert lote.ignoradas == []
+    assert sql("SELECT COUNT(*) FROM Manutencao WHERE data_fim IS NULL") == [(0,)]
+    assert sql("SELECT cod_ponto, disponiveis FROM Estoque_Ponto ORDER BY cod_ponto") == \
+        [(centro, 0), (praca, 1), (usp, 2)]
+
+def test_fechar_em_lote_sem_vaga(dados):
+    centro, _, usp = dados['pontos']
+    servico = ServicoManutencao()
+    servico.abrir_em_lote('PREVENTIVA', PROBLEMA, ponto_id=centro)
+
+    lote = servico.fechar_em_lote([usp])
+
+    assert len(lote.bikes) == 2
+    assert lote.ignoradas == [(dados['bikes'][2], 'SEM_VAGA')]
+
+def test_fechar_em_lote_recusa_criterio_de_ponto(dados):
+    with pytest.raises(DadosInvalidos):
+        ServicoManutencao().fechar_em_lote([dados['pontos'][0]], ponto_id=dados['pontos'][0])
@@ -0,0 +1,74 @@
+import csv
+
+import pytest
+
+import banco
+import relatorios
+from conftest import CPF_CAD_UNICO, CPF_COMUM
+from servicos import DadosInvalidos, ServicoAluguel, ServicoManutencao
+
+# Grupo 12
+
+AUDITORIA = relatorios.RELATORIOS['4']
+
+@pytest.fixture
+def oficina(dados):
+    """As três bikes em manutenção, na ordem de abertura"""
+    servico = ServicoManutencao()
+    for bike in dados['bikes']:
+        servico.abrir_manutencao(bike, 'CORRETIVA', 'Pneu furado na roda traseira')
+    return dados['bikes']
+
+def _bikes(pagina):
+    return [linha[pagina.colunas.index('N_REGISTRO')] for linha in pagina.linhas]
+
+def test_paginar_para_frente_e_para_tras(oficina):
+    with banco.conexao() as conn:
+        primeira = relatorios.paginar(conn, AUDITORIA, tamanho=2)
+        apos = relatorios.chave_da_linha(AUDITORIA, primeira.colunas, primeira.linhas[-1])
+        segunda = relatorios.paginar(conn, AUDITORIA, tamanho=2, apos=apos)
+        antes = relatorios.chave_da_linha(AUDITORIA, segunda.colunas, segunda.linhas[0])
+        anterior = relatorios.paginar(conn, AUDITORIA, tamanho=2, antes=antes)
+
+    assert (_bikes(primeira), primeira.tem_mais) == (oficina[:2], True)
+    assert (_bikes(segunda), segunda.tem_mais) == (oficina[2:], False)
+    assert (_bikes(anterior), anterior.tem_mais) == (oficina[:2], False)
+
+def test_relatorio_vazio(dados):
+    with banco.conexao() as conn:
+        pagina = relatorios.paginar(conn, AUDITORIA)
+
+    assert (pagina.linhas, pagina.tem_mais) == ([], False)
+
+def test_exportar_csv(oficina, tmp_path):
+    caminho = tmp_path / 'auditoria.csv'
+
+    with banco.conexao() as conn:
+        total = relatorios.exportar_csv(conn, AUDITORIA, str(caminho), arraysize=2)
+
+    with open(caminho, encoding='utf-8', newline='') as arquivo:
+        cabecalho, *linhas = csv.reader(arquivo)
+    assert total == len(linhas) == 3
+    assert cabecalho[:3] == ['id_manutencao', 'n_registro', 'modelo']
+    assert [int(l[1]) for l in linhas] == oficina
+
+def test_cobertura_do_bairro(dados):
+    _, praca, _ = dados['pontos']
+    primeira, segunda, _ = dados['bikes']
+    servico = ServicoAluguel()
+    # Ana retira no centro e, com a bike devolvida na praça, retira de novo lá
+    for cpf, bike in ((CPF_COMUM, primeira), (CPF_COMUM, primeira), (CPF_CAD_UNICO, segunda)):
+        aluguel = servico.iniciar_aluguel(cpf, bike)
+        servico.finalizar_aluguel(aluguel.id_aluguel, praca)
+
+    with banco.conexao() as conn:
+        todos = relatorios.paginar(conn, relatorios.relatorio_cobertura('São Carlos', 'Centro'))
+        metade = relatorios.paginar(conn, relatorios.relatorio_cobertura('São Carlos', 'Centro', 50))
+
+    cpf = todos.colunas.index('CPF')
+    assert [l[cpf] for l in todos.linhas] == [CPF_COMUM]
+    assert [l[cpf] for l in metade.linhas] == [CPF_COMUM, CPF_CAD_UNICO]
+
+def test_percentual_de_cobertura_invalido():
+    with pytest.raises(DadosInvalidos):
+        relatorios.relatorio_cobertura('São Carlos', 'Centro', 0)
@@ -0,0 +1,86 @@
+import re
+from datetime import datetime as dt, timedelta
+
+# Grupo 12
+
+def validar_cpf(cpf):
+    """Valida se o CPF tem 11 dígitos numéricos"""
+    return cpf.isdigit() and len(cpf) == 11
+
+def validar_data(data_str, formato='%d/%m/%Y'):
+    """Valida se a data está no formato correto"""
+    try:
+        dt.strptime(data_str, formato)
+        return True
+    except ValueError:
+        return False
+
+def validar_data_futura(data_str, formato='%d/%m/%Y'):
+    """Valida se a data é futura"""
+    try:
+        data = dt.strptime(data_str, formato)
+        return data.date() > dt.now().date()
+    except ValueError:
+        return False
+
+def validar_data_passado(data_str, formato='%d/%m/%Y'):
+    """Valida se a data é no passado (para nascimento)"""
+    try:
+        data = dt.strptime(data_str, formato)
+        return data.date() < dt.now().date()
+    except ValueError:
+        return False
+
+def validar_uf(uf):
+    """Valida UF (2 letras maiúsculas)"""
+    return len(uf) == 2 and uf.isalpha() and uf.isupper()
+
+def validar_numero_positivo(valor_str, decimal=False):
+    """Valida número positivo"""
+    try:
+        if decimal:
+            valor = float(valor_str)
+            return valor >= 0
+        else:
+            valor = int(valor_str)
+            return valor > 0
+    except ValueError:
+        return False
+
+def validar_email(email):
+    """Valida formato de email básico"""
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(pattern, email) is not None
+
+def validar_telefone(telefone):
+    """Valida telefone (10 ou 11 dígitos)"""
+    telefone_limpo = re.sub(r'\D', '', telefone)
+    return len(telefone_limpo) in [10, 11]
+
+def validar_sn(resposta):
+    """Valida resposta Sim/Não"""
+    return resposta.upper() in ['S', 'N']
+
+def validar_tipo_manutencao(tipo):
+    """Valida tipo de manutenção"""
+    return tipo.upper() in ['PREVENTIVA', 'CORRETIVA', 'ANTECIPADA']
+
+def validar_status_bike(status):
+    """Valida status da bike"""
+    return status.upper() in ['DISPONIVEL', 'EM_USO', 'MANUTENCAO']
+
+def formatar_cpf(cpf):
+    """Formata CPF para exibição"""
+    cpf_limpo = re.sub(r'\D', '', cpf)
+    if len(cpf_limpo) == 11:
+        return f'{cpf_limpo[:3]}.{cpf_limpo[3:6]}.{cpf_limpo[6:9]}-{cpf_limpo[9:]}'
+    return cpf
+
+def validar_validade_cartao(data_str, formato='%d/%m/%Y'):
+    """Valida se a validade do cartão está entre 1 mês e 5 anos à frente"""
+    try:
+        data = dt.strptime(data_str, formato).date()
+    except ValueError:
+        return False
+    hoje = dt.now().date()
+    return hoje + timedelta(days=30) <= data <= hoje + timedelta(days=5*365)